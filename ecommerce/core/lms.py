@@ -0,0 +1,239 @@
+"""
+Guarded HTTP sessions for outbound calls to the LMS.
+
+Every call to the LMS is made through the session of one of the endpoints below. Each endpoint has:
+
+    * a pool of keep-alive connections, shared by every session of the endpoint in this process;
+    * a concurrency cap, beyond which calls are rejected rather than queued, so that a slow endpoint cannot
+      occupy every worker;
+    * a circuit breaker, which rejects calls for LMS_CIRCUIT_BREAKER_RESET_TIMEOUT seconds once
+      LMS_CIRCUIT_BREAKER_THRESHOLD consecutive calls have failed, and then lets a single trial call through to
+      determine whether the endpoint has recovered.
+
+Rejected calls raise LmsEndpointUnavailable, a subclass of requests' ConnectionError, so they are handled wherever
+the LMS being unreachable is already handled. The state of each endpoint in this process, including latency of its
+calls, is reported by `get_lms_endpoint_stats`.
+
+Example:
+    >>> response = get_lms_session(ENROLLMENT).post(url, data=data, timeout=timeout)
+    >>> api = EdxRestApiClient(url, oauth_access_token=token, session=get_lms_session(CREDIT))
+"""
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from django.conf import settings
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+
+# LMS endpoints
+COMMERCE = 'commerce'
+COURSES = 'courses'
+CREDIT = 'credit'
+ENROLLMENT = 'enrollment'
+HEARTBEAT = 'heartbeat'
+
+
+class LmsEndpointUnavailable(ConnectionError):
+    """ Raised, instead of calling the LMS, if an endpoint is not accepting calls. """
+    pass
+
+
+class CircuitOpenError(LmsEndpointUnavailable):
+    """ Raised if an endpoint's circuit breaker is open, following consecutive failed calls. """
+    pass
+
+
+class ConcurrencyLimitError(LmsEndpointUnavailable):
+    """ Raised if the maximum number of concurrent calls to an endpoint are already in progress. """
+    pass
+
+
+class CircuitBreaker(object):
+    """ Tracks consecutive failures of calls to an endpoint, and decides whether further calls may be made. """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.time() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self):
+        """ Returns True if a call may be made. While half-open, only one trial call is allowed at a time. """
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_progress or self.failures >= self.threshold:
+                self._opened_at = time.time()
+            self._trial_in_progress = False
+
+
+class LmsEndpointAdapter(HTTPAdapter):
+    """ Transport adapter which guards calls to an endpoint with a circuit breaker and concurrency cap. """
+
+    def __init__(self, name, max_concurrency, breaker):
+        super(LmsEndpointAdapter, self).__init__(pool_maxsize=max_concurrency)
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.rejections = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        if not self._slots.acquire(False):
+            self._record_rejection()
+            raise ConcurrencyLimitError(
+                '[{}] calls to LMS endpoint [{}] are already in progress.'.format(self.max_concurrency, self.name),
+                request=request
+            )
+
+        if not self.breaker.allow():
+            self._slots.release()
+            self._record_rejection()
+            raise CircuitOpenError(
+                'Calls to LMS endpoint [{}] are suspended following repeated failures.'.format(self.name),
+                request=request
+            )
+
+        with self._stats_lock:
+            self.in_flight += 1
+
+        start = time.time()
+        failed = True
+        try:
+            response = super(LmsEndpointAdapter, self).send(request, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self._slots.release()
+            self._record_call(time.time() - start, failed)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'state': self.breaker.state,
+                'consecutive_failures': self.breaker.failures,
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self.in_flight,
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejections': self.rejections,
+                'mean_latency': self.total_latency / self.calls if self.calls else None,
+                'max_latency': self.max_latency if self.calls else None,
+            }
+
+    def _record_call(self, latency, failed):
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        with self._stats_lock:
+            self.in_flight -= 1
+            self.calls += 1
+            self.failures += int(failed)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def _record_rejection(self):
+        with self._stats_lock:
+            self.rejections += 1
+
+
+class LmsSession(requests.Session):
+    """ Session whose calls are made through an endpoint's adapter, and which applies a default timeout. """
+
+    def __init__(self, adapter):
+        super(LmsSession, self).__init__()
+        # Clients such as EdxRestApiClient set their timeout on the session, rather than on each call.
+        self.timeout = None
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def request(self, method, url, **kwargs):  # pylint: disable=arguments-differ
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super(LmsSession, self).request(method, url, **kwargs)
+
+    def close(self):
+        # The adapter's connections are shared with other sessions of the endpoint, so are left open.
+        pass
+
+
+_adapters = {}
+_adapters_lock = threading.Lock()
+
+
+def _get_adapter(endpoint):
+    with _adapters_lock:
+        adapter = _adapters.get(endpoint)
+        if adapter is None:
+            breaker = CircuitBreaker(settings.LMS_CIRCUIT_BREAKER_THRESHOLD, settings.LMS_CIRCUIT_BREAKER_RESET_TIMEOUT)
+            adapter = LmsEndpointAdapter(endpoint, settings.LMS_ENDPOINT_CONCURRENCY[endpoint], breaker)
+            _adapters[endpoint] = adapter
+
+        return adapter
+
+
+def get_lms_session(endpoint):
+    """ Returns a new session for calls to the given LMS endpoint.
+
+    Sessions are cheap, and should not be shared between users, since clients such as EdxRestApiClient store
+    credentials on them. The connections, circuit breaker and concurrency cap of the endpoint are shared by all of
+    its sessions.
+    """
+    return LmsSession(_get_adapter(endpoint))
+
+
+def get_lms_endpoint_stats():
+    """ Returns the state of each LMS endpoint called by this process, and the latency of its calls in seconds. """
+    with _adapters_lock:
+        adapters = dict(_adapters)
+
+    return {endpoint: adapter.stats() for endpoint, adapter in adapters.items()}
+
+
+def reset_lms_endpoints():
+    """ Closes the connections of every LMS endpoint, and resets their circuit breakers and statistics. """
+    with _adapters_lock:
+        adapters = _adapters.values()
+        _adapters.clear()
+
+    for adapter in adapters:
+        adapter.close()
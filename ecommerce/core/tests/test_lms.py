@@ -0,0 +1,180 @@
+from __future__ import unicode_literals
+
+import json
+import threading
+
+from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.test import override_settings
+import httpretty
+import mock
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+from ecommerce.core.lms import (
+    CREDIT, ENROLLMENT, CircuitBreaker, CircuitOpenError, ConcurrencyLimitError, get_lms_endpoint_stats,
+    get_lms_session, reset_lms_endpoints
+)
+from ecommerce.tests.testcases import TestCase
+
+URL = 'http://lms.example.com/api/enrollment/v1/enrollment'
+
+
+def ok_response(*args, **kwargs):  # pylint: disable=unused-argument
+    response = Response()
+    response.status_code = 200
+    return response
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        super(CircuitBreakerTests, self).setUp()
+        self.breaker = CircuitBreaker(threshold=2, reset_timeout=30)
+
+    def test_open(self):
+        """ Verify the breaker opens once the threshold of consecutive failures is reached. """
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    @mock.patch('time.time')
+    def test_half_open(self, mock_time):
+        """ Verify a single trial call is allowed once the reset timeout elapses, which closes or reopens the breaker. """
+        mock_time.return_value = 1000
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        mock_time.return_value = 1030
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        # A failed trial reopens the breaker for another reset timeout.
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        mock_time.return_value = 1060
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+
+
+@override_settings(LMS_CIRCUIT_BREAKER_THRESHOLD=2)
+class LmsSessionTests(TestCase):
+    @httpretty.activate
+    def test_circuit_breaker(self):
+        """ Verify calls to an endpoint are rejected after consecutive server errors, without affecting others. """
+        httpretty.register_uri(httpretty.GET, URL, status=500)
+
+        for __ in range(settings.LMS_CIRCUIT_BREAKER_THRESHOLD):
+            self.assertEqual(get_lms_session(ENROLLMENT).get(URL).status_code, 500)
+
+        self.assertRaises(CircuitOpenError, get_lms_session(ENROLLMENT).get, URL)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), settings.LMS_CIRCUIT_BREAKER_THRESHOLD)
+
+        # Rejections are connection errors, so are handled wherever the LMS being unreachable is handled.
+        self.assertRaises(ConnectionError, get_lms_session(ENROLLMENT).get, URL)
+
+        self.assertEqual(get_lms_session(CREDIT).get(URL).status_code, 500)
+
+        # Resetting the endpoints closes their breakers.
+        reset_lms_endpoints()
+        self.assertEqual(get_lms_session(ENROLLMENT).get(URL).status_code, 500)
+
+    def test_circuit_breaker_exceptions(self):
+        """ Verify calls which raise count as failures. """
+        with mock.patch.object(HTTPAdapter, 'send', side_effect=Timeout):
+            for __ in range(settings.LMS_CIRCUIT_BREAKER_THRESHOLD):
+                self.assertRaises(Timeout, get_lms_session(ENROLLMENT).get, URL)
+
+        self.assertRaises(CircuitOpenError, get_lms_session(ENROLLMENT).get, URL)
+
+    @override_settings(LMS_ENDPOINT_CONCURRENCY={ENROLLMENT: 1})
+    def test_concurrency_limit(self):
+        """ Verify calls beyond an endpoint's concurrency cap are rejected, rather than queued. """
+        started = threading.Event()
+        finish = threading.Event()
+
+        def send(*args, **kwargs):  # pylint: disable=unused-argument
+            started.set()
+            finish.wait(5)
+            return ok_response()
+
+        with mock.patch.object(HTTPAdapter, 'send', side_effect=send):
+            thread = threading.Thread(target=get_lms_session(ENROLLMENT).get, args=(URL,))
+            thread.start()
+            started.wait(5)
+
+            try:
+                self.assertRaises(ConcurrencyLimitError, get_lms_session(ENROLLMENT).get, URL)
+                self.assertEqual(get_lms_endpoint_stats()[ENROLLMENT]['in_flight'], 1)
+            finally:
+                finish.set()
+                thread.join()
+
+            # The slot is released once the call in progress finishes.
+            self.assertEqual(get_lms_session(ENROLLMENT).get(URL).status_code, 200)
+
+        # Rejections do not count as failures.
+        stats = get_lms_endpoint_stats()[ENROLLMENT]
+        self.assertEqual(stats['state'], CircuitBreaker.CLOSED)
+        self.assertEqual((stats['calls'], stats['failures'], stats['rejections']), (2, 0, 1))
+
+    def test_default_timeout(self):
+        """ Verify the session's timeout is applied to calls which do not specify one. """
+        session = get_lms_session(ENROLLMENT)
+        session.timeout = 7
+
+        with mock.patch.object(HTTPAdapter, 'send', side_effect=ok_response) as mock_send:
+            session.get(URL)
+            self.assertEqual(mock_send.call_args[1]['timeout'], 7)
+
+            session.get(URL, timeout=1)
+            self.assertEqual(mock_send.call_args[1]['timeout'], 1)
+
+    @httpretty.activate
+    def test_stats(self):
+        """ Verify the calls to each endpoint are reported. """
+        self.assertEqual(get_lms_endpoint_stats(), {})
+        httpretty.register_uri(httpretty.GET, URL, status=200)
+
+        get_lms_session(ENROLLMENT).get(URL)
+
+        stats = get_lms_endpoint_stats()
+        self.assertEqual(stats.keys(), [ENROLLMENT])
+        stats = stats[ENROLLMENT]
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['max_concurrency'], settings.LMS_ENDPOINT_CONCURRENCY[ENROLLMENT])
+        self.assertGreaterEqual(stats['max_latency'], stats['mean_latency'])
+
+
+class LmsEndpointStatsViewTests(TestCase):
+    path = reverse('lms_endpoint_stats')
+
+    def test_staff_only(self):
+        """ Verify only staff users may view the stats. """
+        user = self.create_user()
+        self.client.login(username=user.username, password=self.password)
+        self.assertEqual(self.client.get(self.path).status_code, 404)
+
+    @httpretty.activate
+    def test_get(self):
+        """ Verify the view returns the stats of each endpoint. """
+        httpretty.register_uri(httpretty.GET, URL, status=200)
+        get_lms_session(CREDIT).get(URL)
+
+        user = self.create_user(is_staff=True)
+        self.client.login(username=user.username, password=self.password)
+        response = self.client.get(self.path)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), get_lms_endpoint_stats())
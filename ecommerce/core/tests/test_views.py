@@ -19,7 +19,7 @@ LOGGER_NAME = 'ecommerce.core.views'
 User = get_user_model()
 
 
-@mock.patch('requests.get')
+@mock.patch('requests.Session.get')
 class HealthTests(TestCase):
     """Tests of the health endpoint."""
 
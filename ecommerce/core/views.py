@@ -2,7 +2,6 @@
 import logging
 import uuid
 
-import requests
 from requests.exceptions import RequestException
 from rest_framework import status
 from django.db import transaction, connection, DatabaseError
@@ -16,6 +15,7 @@ from django.views.generic import View
 from django.utils.decorators import method_decorator
 
 from ecommerce.core.constants import Status, UnavailabilityMessage
+from ecommerce.core.lms import HEARTBEAT, get_lms_endpoint_stats, get_lms_session
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -53,7 +53,7 @@ def health(_):
         database_status = Status.UNAVAILABLE
 
     try:
-        response = requests.get(settings.LMS_HEARTBEAT_URL, timeout=1)
+        response = get_lms_session(HEARTBEAT).get(settings.LMS_HEARTBEAT_URL, timeout=1)
 
         if response.status_code == status.HTTP_200_OK:
             lms_status = Status.OK
@@ -111,3 +111,10 @@ class StaffOnlyMixin(object):
             raise Http404
 
         return super(StaffOnlyMixin, self).dispatch(request, *args, **kwargs)
+
+
+class LmsEndpointStatsView(StaffOnlyMixin, View):
+    """ Reports the circuit breaker state, concurrency and latency of calls to each LMS endpoint by this process. """
+
+    def get(self, request):
+        return JsonResponse(get_lms_endpoint_stats())
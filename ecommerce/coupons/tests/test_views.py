@@ -3,16 +3,19 @@ from decimal import Decimal
 import json
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.http import HttpResponseRedirect
 from django.utils.timezone import now
 from django.utils.translation import ugettext_lazy as _
 import httpretty
+import mock
 from oscar.core.loading import get_class, get_model
 from oscar.test.factories import (OrderFactory, ConditionalOfferFactory, VoucherFactory,
                                   RangeFactory, BenefitFactory, ProductFactory)
 from oscar.test.utils import RequestFactory
 import pytz
+from requests.exceptions import ConnectionError
 
 from ecommerce.coupons.views import get_voucher, voucher_is_valid
 from ecommerce.courses.tests.factories import CourseFactory
@@ -24,6 +27,7 @@ Applicator = get_class('offer.utils', 'Applicator')
 Basket = get_model('basket', 'Basket')
 Catalog = get_model('catalogue', 'Catalog')
 Course = get_model('courses', 'Course')
+Order = get_model('order', 'Order')
 StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 VoucherApplication = get_model('voucher', 'VoucherApplication')
@@ -60,6 +64,7 @@ class CouponOfferViewTests(TestCase):
 
     def setUp(self):
         super(CouponOfferViewTests, self).setUp()
+        cache.clear()
 
     def prepare_voucher(self, range_=None, start_datetime=None, benefit_value=100):
         """ Create a voucher and add an offer to it that contains a created product. """
@@ -87,6 +92,16 @@ class CouponOfferViewTests(TestCase):
         self.assertIsNotNone(product)
         self.assertEqual(product.title, 'Test product')
 
+    def test_get_voucher_cached(self):
+        """ Verify that get_voucher() resolves the code from the cache, retrieving only the voucher and product. """
+        self.prepare_voucher()
+        get_voucher(code='COUPONTEST')
+
+        with self.assertNumQueries(2):
+            voucher, product = get_voucher(code='COUPONTEST')
+        self.assertEqual(voucher.code, 'COUPONTEST')
+        self.assertEqual(product.title, 'Test product')
+
     def test_no_product(self):
         """ Verify that None is returned if there is no product. """
         voucher = VoucherFactory(code='NOPRODUCT')
@@ -174,6 +189,19 @@ class CouponOfferViewTests(TestCase):
         ).format(course.id)
         self.assertEqual(response.context['error'], _(response_text))
 
+    def test_course_information_unreachable(self):
+        """ Verify a response is returned when the LMS cannot be reached for course information. """
+        course = CourseFactory()
+        seat = course.create_or_update_seat('verified', True, 50, self.partner)
+        range_ = RangeFactory(products=[seat, ])
+        self.prepare_voucher(range_=range_)
+
+        url = self.offer_url + '?code={}'.format('COUPONTEST')
+        with mock.patch('requests.adapters.HTTPAdapter.send', side_effect=ConnectionError('LMS unreachable')):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['error'], _('Could not get course information. [LMS unreachable]'))
+
     @httpretty.activate
     def test_proper_code(self):
         """ Verify that proper information is returned when a valid code is provided. """
@@ -274,3 +302,60 @@ class CouponRedeemViewTests(TestCase):
         url = self.redeem_url + '?code={}'.format('COUPONTEST')
         response = self.client.get(url)
         self.assertIsInstance(response, HttpResponseRedirect)
+
+    def _create_enrollment_code(self, benefit_value=100):
+        """ Create a coupon with a single, currently active, voucher with the code COUPONTEST. """
+        create_coupon(catalog=self.catalog, code='COUPONTEST', benefit_value=benefit_value)
+        Voucher.objects.filter(code='COUPONTEST').update(end_datetime=now() + datetime.timedelta(days=1))
+
+    @httpretty.activate
+    def test_redeem_enrollment_code(self):
+        """ Verify enrollment codes are redeemed by ordering only their product, applying only their offer. """
+        self._create_enrollment_code()
+        httpretty.register_uri(httpretty.POST, settings.ENROLLMENT_API_URL, status=200)
+
+        url = self.redeem_url + '?code={}'.format('COUPONTEST')
+        with mock.patch.object(Applicator, 'get_offers') as mock_get_offers:
+            response = self.client.get(url)
+        self.assertIsInstance(response, HttpResponseRedirect)
+        self.assertFalse(mock_get_offers.called)
+
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(order.total_excl_tax, Decimal('0.00'))
+        self.assertEqual([line.product for line in order.lines.all()], [self.seat])
+        self.assertEqual(VoucherApplication.objects.filter(voucher__code='COUPONTEST', user=self.user).count(), 1)
+
+    @httpretty.activate
+    def test_redeem_enrollment_code_once(self):
+        """ Verify single-use enrollment codes cannot be redeemed again. """
+        self._create_enrollment_code()
+        httpretty.register_uri(httpretty.POST, settings.ENROLLMENT_API_URL, status=200)
+
+        url = self.redeem_url + '?code={}'.format('COUPONTEST')
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.context['error'], _('This coupon has already been used'))
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+
+    @httpretty.activate
+    def test_redeem_enrollment_code_concurrently(self):
+        """ Verify the availability of enrollment codes is checked again when their orders are placed. """
+        self._create_enrollment_code()
+        httpretty.register_uri(httpretty.POST, settings.ENROLLMENT_API_URL, status=200)
+
+        url = self.redeem_url + '?code={}'.format('COUPONTEST')
+        self.client.get(url)
+        # Another request may have validated the code before the first order was placed.
+        with mock.patch('ecommerce.coupons.views.voucher_is_valid', return_value=(True, None)):
+            response = self.client.get(url)
+        self.assertEqual(response.context['error'], _('Error when trying to redeem code'))
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+
+    def test_redeem_discount_code(self):
+        """ Verify codes which do not provide a 100% discount are applied to the user's basket. """
+        self._create_enrollment_code(benefit_value=50)
+
+        url = self.redeem_url + '?code={}'.format('COUPONTEST')
+        response = self.client.get(url)
+        self.assertEqual(str(response.context['error']), _('Basket total not $0, current value = $25.00'))
+        self.assertEqual(Basket.get_basket(self.user, self.site).vouchers.get().code, 'COUPONTEST')
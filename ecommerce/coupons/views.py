@@ -2,6 +2,7 @@ from __future__ import unicode_literals
 import logging
 
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.http import HttpResponseRedirect
 from django.utils.decorators import method_decorator
 from django.utils.translation import ugettext_lazy as _
@@ -9,20 +10,25 @@ from django.shortcuts import render
 from django.views.generic import TemplateView, View
 from oscar.core.loading import get_class, get_model
 
-from edx_rest_api_client.client import EdxRestApiClient
-from edx_rest_api_client.exceptions import SlumberHttpBaseException
+from requests.exceptions import RequestException
+from slumber.exceptions import SlumberBaseException
 
 from ecommerce.core.views import StaffOnlyMixin
+from ecommerce.courses.tasks import get_course_info
 from ecommerce.extensions.api import data as data_api
 from ecommerce.extensions.api.constants import APIConstants as AC
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
 from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.voucher.cache import voucher_code_cache
+from ecommerce.extensions.voucher.utils import get_coupon_type
 from ecommerce.settings import get_lms_url
 
 
 Applicator = get_class('offer.utils', 'Applicator')
 Basket = get_model('basket', 'Basket')
+CouponSummary = get_model('voucher', 'CouponSummary')
 logger = logging.getLogger(__name__)
+Product = get_model('catalogue', 'Product')
 Selector = get_class('partner.strategy', 'Selector')
 StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
@@ -32,6 +38,8 @@ def get_voucher(code):
     """
     Returns a voucher and prodcut for a given code.
 
+    The voucher and product are resolved from the code with the voucher code cache.
+
     Arguments:
         code (str): The code of a coupon voucher.
 
@@ -42,16 +50,15 @@ def get_voucher(code):
     voucher = None
     product = None
     # Check to see if a voucher exists for the code.
-    try:
-        voucher = Voucher.objects.get(code=code)
-    except Voucher.DoesNotExist:
-        logger.exception('Voucher does not exist for code [%s].', code)
+    info = voucher_code_cache.get(code)
+    if info is None:
+        logger.error('Voucher does not exist for code [%s].', code)
         return voucher, product
 
+    voucher = Voucher.objects.get(id=info.voucher_id)
     # Just get the first product.
-    products = voucher.offers.all()[0].benefit.range.all_products()
-    if products:
-        product = products[0]
+    if info.product_id:
+        product = Product.objects.get(id=info.product_id)
     return voucher, product
 
 
@@ -102,23 +109,19 @@ class CouponOfferView(TemplateView):
             voucher, product = get_voucher(code=code)
             valid_voucher, msg = voucher_is_valid(voucher, product, self.request)
             if valid_voucher:
-                api = EdxRestApiClient(
-                    get_lms_url('api/courses/v1/'),
-                )
                 try:
-                    course = api.courses(product.course_id).get()
-                except SlumberHttpBaseException as e:
+                    course = get_course_info(product.course_id)
+                except (SlumberBaseException, RequestException) as e:
                     logger.exception('Could not get course information. [%s]', e)
                     return {
                         'error': _('Could not get course information. [{error}]'.format(error=e))
                     }
 
                 course['image_url'] = get_lms_url(course['media']['course_image']['uri'])
-                stock_records = voucher.offers.first().benefit.range.catalog.stock_records.first()
                 context.update({
                     'course': course,
                     'code': code,
-                    'price': stock_records.price_excl_tax,
+                    'price': voucher_code_cache.get(code).price,
                     'verified': (product.attr.certificate_type is 'verified')
                 })
                 return context
@@ -136,6 +139,12 @@ class CouponOfferView(TemplateView):
 
 class CouponRedeemView(EdxOrderPlacementMixin, View):
 
+    # Orders are placed in transactions of their own, which must be committed before receivers are notified
+    # of them, so that the orders can be fulfilled asynchronously. See BasketCreateView.
+    @method_decorator(transaction.non_atomic_requests)
+    def dispatch(self, request, *args, **kwargs):
+        return super(CouponRedeemView, self).dispatch(request, *args, **kwargs)
+
     @method_decorator(login_required)
     def get(self, request):
         """
@@ -154,8 +163,91 @@ class CouponRedeemView(EdxOrderPlacementMixin, View):
         if not valid_voucher:
             return render(request, template_name, {'error': msg})
 
-        basket = self._prepare_basket(request.site, request.user, product, voucher)
-        if basket.total_excl_tax == AC.FREE:
+        offer = voucher.offers.select_related('benefit', 'condition').first()
+        if offer and get_coupon_type(offer.benefit) == CouponSummary.ENROLLMENT_CODE:
+            order = self._redeem_enrollment_code(request.site, request.user, product, voucher, offer)
+            if order is None:
+                return render(request, template_name, {'error': _('Error when trying to redeem code')})
+        else:
+            basket = self._prepare_basket(request.site, request.user, product, voucher)
+            if basket.total_excl_tax == AC.FREE:
+                basket.freeze()
+                order_metadata = data_api.get_order_metadata(basket)
+
+                logger.info(
+                    u"Preparing to place order [%s] for the contents of basket [%d]",
+                    order_metadata[AC.KEYS.ORDER_NUMBER],
+                    basket.id,
+                )
+
+                # Place an order. If order placement succeeds, the order is committed
+                # to the database so that it can be fulfilled asynchronously.
+                order = self.handle_order_placement(
+                    order_number=order_metadata[AC.KEYS.ORDER_NUMBER],
+                    user=basket.owner,
+                    basket=basket,
+                    shipping_address=None,
+                    shipping_method=order_metadata[AC.KEYS.SHIPPING_METHOD],
+                    shipping_charge=order_metadata[AC.KEYS.SHIPPING_CHARGE],
+                    billing_address=None,
+                    order_total=order_metadata[AC.KEYS.ORDER_TOTAL],
+                )
+            else:
+                return render(
+                    request,
+                    template_name,
+                    {'error': _('Basket total not $0, current value = ${basket_price}'.format(
+                        basket_price=basket.total_excl_tax
+                    ))}
+                )
+
+        if order.status is ORDER.COMPLETE:
+            return HttpResponseRedirect(get_lms_url(''))
+        else:
+            logger.error('Order was not completed [%s]', order.id)
+            return render(request, template_name, {'error': _('Error when trying to redeem code')})
+
+    def _redeem_enrollment_code(self, site, user, product, voucher, offer):
+        """
+        Place an order for the product of an enrollment code, which is known to be free.
+
+        Rather than preparing the user's basket, a new basket containing only the product is
+        created, and only the voucher's offer is applied to it. The basket is created, and the
+        order placed, in a single transaction, in which the voucher is locked and its availability
+        to the user checked again, so that concurrent redemptions cannot exceed its usage limits.
+
+        Arguments:
+            site (Site): The site from which the request came.
+            user (User): User who made the request.
+            product (Product): Product to be redeemed.
+            voucher (Voucher): Voucher being redeemed.
+            offer (ConditionalOffer): The voucher's offer, providing a 100% discount.
+
+        Returns:
+            Order: The order placed, or None if the voucher is no longer available to the user, or the
+                product is not free once the offer is applied.
+        """
+        with transaction.atomic():
+            voucher = Voucher.objects.select_for_update().get(id=voucher.id)
+            is_available, message = voucher.is_available_to_user(user=user)
+            if not (voucher.is_active() and is_available):
+                logger.info('Enrollment code [%s] is no longer available to user [%s]: %s', voucher.code,
+                            user.username, message)
+                return None
+
+            basket = Basket.objects.create(site=site, owner=user)
+            basket.strategy = Selector().strategy(user=user)
+            basket.add_product(product, 1)
+            basket.vouchers.add(voucher)
+
+            offer.set_voucher(voucher)
+            Applicator().apply_offers(basket, [offer])
+
+            if basket.total_excl_tax != AC.FREE:
+                logger.error('Enrollment code [%s] does not discount product [%d].', voucher.code, product.id)
+                transaction.set_rollback(True)
+                return None
+
             basket.freeze()
             order_metadata = data_api.get_order_metadata(basket)
 
@@ -165,11 +257,9 @@ class CouponRedeemView(EdxOrderPlacementMixin, View):
                 basket.id,
             )
 
-            # Place an order. If order placement succeeds, the order is committed
-            # to the database so that it can be fulfilled asynchronously.
-            order = self.handle_order_placement(
+            order = self.submit_order(
                 order_number=order_metadata[AC.KEYS.ORDER_NUMBER],
-                user=basket.owner,
+                user=user,
                 basket=basket,
                 shipping_address=None,
                 shipping_method=order_metadata[AC.KEYS.SHIPPING_METHOD],
@@ -177,20 +267,9 @@ class CouponRedeemView(EdxOrderPlacementMixin, View):
                 billing_address=None,
                 order_total=order_metadata[AC.KEYS.ORDER_TOTAL],
             )
-        else:
-            return render(
-                request,
-                template_name,
-                {'error': _('Basket total not $0, current value = ${basket_price}'.format(
-                    basket_price=basket.total_excl_tax
-                ))}
-            )
 
-        if order.status is ORDER.COMPLETE:
-            return HttpResponseRedirect(get_lms_url(''))
-        else:
-            logger.error('Order was not completed [%s]', order.id)
-            return render(request, template_name, {'error': _('Error when trying to redeem code')})
+        # Receivers are notified once the order has been committed, so that it can be fulfilled asynchronously.
+        return self.handle_successful_order(order)
 
     def _prepare_basket(self, site, user, product, voucher):
         """
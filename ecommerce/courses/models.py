@@ -8,14 +8,13 @@ from oscar.core.loading import get_model
 from simple_history.models import HistoricalRecords
 
 from ecommerce.courses.publishers import LMSPublisher
+from ecommerce.extensions.catalogue.registry import category_registry, product_class_registry
 from ecommerce.extensions.catalogue.utils import generate_sku
 
 logger = logging.getLogger(__name__)
-Category = get_model('catalogue', 'Category')
 Partner = get_model('partner', 'Partner')
 Product = get_model('catalogue', 'Product')
 ProductCategory = get_model('catalogue', 'ProductCategory')
-ProductClass = get_model('catalogue', 'ProductClass')
 StockRecord = get_model('partner', 'StockRecord')
 
 
@@ -38,9 +37,9 @@ class Course(models.Model):
         parent, created = self.products.get_or_create(
             course=self,
             structure=Product.PARENT,
-            product_class=ProductClass.objects.get(slug='seat'),
+            product_class=product_class_registry.get(slug='seat'),
         )
-        ProductCategory.objects.get_or_create(category=Category.objects.get(name='Seats'), product=parent)
+        ProductCategory.objects.get_or_create(category=category_registry.get(slug='seats'), product=parent)
         parent.title = 'Seat in {}'.format(self.name)
         parent.is_discountable = True
         parent.attr.course_key = self.id
@@ -6,8 +6,8 @@ from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 from edx_rest_api_client.client import EdxRestApiClient
 from edx_rest_api_client.exceptions import SlumberHttpBaseException
-import requests
 
+from ecommerce.core.lms import COMMERCE, CREDIT, get_lms_session
 from ecommerce.courses.utils import mode_for_seat
 from ecommerce.settings import get_lms_url
 
@@ -43,7 +43,8 @@ class LMSPublisher(object):
         api = EdxRestApiClient(
             get_lms_url('api/credit/v1/'),
             oauth_access_token=access_token,
-            timeout=self.timeout
+            timeout=self.timeout,
+            session=get_lms_session(CREDIT)
         )
 
         data = {
@@ -117,7 +118,7 @@ class LMSPublisher(object):
         }
 
         try:
-            response = requests.put(url, data=json.dumps(data), headers=headers, timeout=self.timeout)
+            response = get_lms_session(COMMERCE).put(url, data=json.dumps(data), headers=headers, timeout=self.timeout)
             status_code = response.status_code
             if status_code in (200, 201):
                 logger.info(u'Successfully published commerce data for [%s].', course_id)
@@ -0,0 +1,91 @@
+"""Course tasks."""
+import time
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import cache
+from edx_rest_api_client.client import EdxRestApiClient
+from requests.exceptions import RequestException
+from slumber.exceptions import SlumberBaseException
+
+from ecommerce.core.lms import COURSES, get_lms_session
+from ecommerce.settings import get_lms_url
+
+logger = get_task_logger(__name__)
+
+COURSE_INFO_CACHE_KEY_TEMPLATE = 'course_info.{course_id}'
+COURSE_INFO_REFRESH_LOCK_KEY_TEMPLATE = 'course_info_refresh.{course_id}'
+
+
+def fetch_course_info(course_id):
+    """Retrieve the metadata of the given course from the LMS course API, and store it in the cache.
+
+    Returns:
+        dict: The course metadata.
+
+    Raises:
+        SlumberBaseException, RequestException: If the metadata could not be retrieved.
+    """
+    api = EdxRestApiClient(
+        get_lms_url('api/courses/v1/'),
+        timeout=settings.COURSE_INFO_API_TIMEOUT,
+        session=get_lms_session(COURSES)
+    )
+    course = api.courses(course_id).get()
+
+    cache.set(
+        COURSE_INFO_CACHE_KEY_TEMPLATE.format(course_id=course_id),
+        {
+            'course': course,
+            'expires': time.time() + settings.COURSE_INFO_CACHE_TIMEOUT,
+        },
+        settings.COURSE_INFO_CACHE_TIMEOUT + settings.COURSE_INFO_STALE_TIMEOUT
+    )
+    return course
+
+
+def get_course_info(course_id):
+    """Retrieve the metadata of the given course, from the cache if possible.
+
+    Metadata which has been cached for longer than COURSE_INFO_CACHE_TIMEOUT is returned as is, and
+    refreshed in the background, so that LMS round trips and outages are kept off the request path.
+    The LMS is only called directly if the course has not been cached at all.
+
+    Returns:
+        dict: The course metadata.
+
+    Raises:
+        SlumberBaseException, RequestException: If the course is not cached, and its metadata could not be
+            retrieved.
+    """
+    entry = cache.get(COURSE_INFO_CACHE_KEY_TEMPLATE.format(course_id=course_id))
+    if entry is None:
+        return fetch_course_info(course_id)
+
+    # Only one refresh is scheduled at a time, no matter how many requests see the stale metadata.
+    lock_key = COURSE_INFO_REFRESH_LOCK_KEY_TEMPLATE.format(course_id=course_id)
+    if entry['expires'] < time.time() and cache.add(lock_key, True, settings.COURSE_INFO_API_TIMEOUT * 2):
+        try:
+            refresh_course_info.delay(course_id)
+        except Exception:  # pylint: disable=broad-except
+            # The stale metadata is served regardless. The refresh is scheduled again by the next request.
+            logger.exception('Failed to schedule refresh of metadata of course [%s].', course_id)
+            cache.delete(lock_key)
+
+    return entry['course']
+
+
+@shared_task(ignore_result=True)
+def refresh_course_info(course_id):
+    """Refresh the cached metadata of the given course.
+
+    If the LMS cannot be reached, the stale metadata continues to be served until it is next refreshed.
+    """
+    try:
+        fetch_course_info(course_id)
+    except (SlumberBaseException, RequestException):
+        logger.warning('Failed to refresh metadata of course [%s]. Stale metadata will be served.', course_id,
+                       exc_info=True)
+    finally:
+        cache.delete(COURSE_INFO_REFRESH_LOCK_KEY_TEMPLATE.format(course_id=course_id))
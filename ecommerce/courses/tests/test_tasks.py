@@ -0,0 +1,99 @@
+from __future__ import unicode_literals
+
+import json
+
+from django.core.cache import cache
+import httpretty
+import mock
+from slumber.exceptions import HttpNotFoundError
+
+from ecommerce.courses.tasks import COURSE_INFO_CACHE_KEY_TEMPLATE, get_course_info
+from ecommerce.settings import get_lms_url
+from ecommerce.tests.testcases import TestCase
+
+COURSE_ID = 'edX/DemoX/Demo_Course'
+
+
+class GetCourseInfoTests(TestCase):
+    """ Tests for get_course_info and the refresh_course_info task. """
+
+    def setUp(self):
+        super(GetCourseInfoTests, self).setUp()
+        cache.clear()
+
+    def mock_course_api(self, status=200, name='Demo Course'):
+        self.assertTrue(httpretty.is_enabled(), 'httpretty must be enabled to mock LMS course API calls.')
+        url = get_lms_url('api/courses/v1/courses/{}/'.format(COURSE_ID))
+        httpretty.register_uri(
+            httpretty.GET, url, status=status, body=json.dumps({'name': name}), content_type='application/json'
+        )
+
+    def expire(self):
+        """ Mark the cached metadata as stale. """
+        key = COURSE_INFO_CACHE_KEY_TEMPLATE.format(course_id=COURSE_ID)
+        entry = cache.get(key)
+        entry['expires'] = 0
+        cache.set(key, entry)
+
+    @httpretty.activate
+    def test_cached(self):
+        """ Verify metadata is retrieved from the LMS once, and then served from the cache. """
+        self.mock_course_api()
+        self.assertEqual(get_course_info(COURSE_ID), {'name': 'Demo Course'})
+        self.assertEqual(get_course_info(COURSE_ID), {'name': 'Demo Course'})
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    @httpretty.activate
+    def test_not_cached_error(self):
+        """ Verify errors are raised if the metadata is not cached, and cannot be retrieved. """
+        self.mock_course_api(status=404)
+        with self.assertRaises(HttpNotFoundError):
+            get_course_info(COURSE_ID)
+
+    @httpretty.activate
+    def test_stale_while_revalidate(self):
+        """ Verify stale metadata is served, and refreshed in the background. """
+        self.mock_course_api()
+        get_course_info(COURSE_ID)
+
+        self.expire()
+        with mock.patch('ecommerce.courses.tasks.refresh_course_info.delay') as mock_delay:
+            self.assertEqual(get_course_info(COURSE_ID), {'name': 'Demo Course'})
+            # Further requests serve the stale metadata without scheduling another refresh.
+            self.assertEqual(get_course_info(COURSE_ID), {'name': 'Demo Course'})
+        mock_delay.assert_called_once_with(COURSE_ID)
+
+    @httpretty.activate
+    def test_refresh(self):
+        """ Verify stale metadata is replaced once it has been refreshed. """
+        self.mock_course_api()
+        get_course_info(COURSE_ID)
+        self.mock_course_api(name='Renamed Course')
+
+        # The refresh task is executed eagerly by the test settings.
+        self.expire()
+        self.assertEqual(get_course_info(COURSE_ID), {'name': 'Demo Course'})
+        self.assertEqual(get_course_info(COURSE_ID), {'name': 'Renamed Course'})
+
+    @httpretty.activate
+    def test_stale_if_error(self):
+        """ Verify stale metadata continues to be served if the LMS cannot be reached. """
+        self.mock_course_api()
+        get_course_info(COURSE_ID)
+        self.mock_course_api(status=500)
+
+        self.expire()
+        self.assertEqual(get_course_info(COURSE_ID), {'name': 'Demo Course'})
+        self.assertEqual(get_course_info(COURSE_ID), {'name': 'Demo Course'})
+
+    @httpretty.activate
+    def test_refresh_not_scheduled(self):
+        """ Verify stale metadata is served if the refresh cannot be scheduled, and scheduled again later. """
+        self.mock_course_api()
+        get_course_info(COURSE_ID)
+
+        self.expire()
+        with mock.patch('ecommerce.courses.tasks.refresh_course_info.delay', side_effect=Exception) as mock_delay:
+            self.assertEqual(get_course_info(COURSE_ID), {'name': 'Demo Course'})
+            self.assertEqual(get_course_info(COURSE_ID), {'name': 'Demo Course'})
+        self.assertEqual(mock_delay.call_count, 2)
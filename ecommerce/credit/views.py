@@ -15,6 +15,7 @@ from edx_rest_api_client.client import EdxRestApiClient
 from slumber.exceptions import SlumberHttpBaseException
 import waffle
 
+from ecommerce.core.lms import CREDIT, get_lms_session
 from ecommerce.courses.models import Course
 from ecommerce.extensions.partner.shortcuts import get_partner_for_site
 from ecommerce.extensions.payment.helpers import get_processor_class
@@ -48,7 +49,7 @@ class Checkout(TemplateView):
         credit_seats = [
             seat for seat in course.seat_products
             if getattr(seat.attr, 'certificate_type', None) == self.CREDIT_MODE and
-            seat.stockrecords.filter(partner=partner).exists()
+            self._get_stockrecord(seat, partner)
         ]
 
         if not credit_seats:
@@ -158,7 +159,7 @@ class Checkout(TemplateView):
 
         partner = get_partner_for_site(self.request)
         for seat in credit_seats:
-            stockrecord = seat.stockrecords.filter(partner=partner).first()
+            stockrecord = self._get_stockrecord(seat, partner)
             providers_dict[seat.attr.credit_provider].update({
                 'price': stockrecord.price_excl_tax,
                 'sku': stockrecord.partner_sku,
@@ -167,6 +168,16 @@ class Checkout(TemplateView):
 
         return providers_dict.values()
 
+    def _get_stockrecord(self, seat, partner):
+        """ Returns the seat's stock record for the given partner, or None if the partner does not sell the seat.
+
+        The stock records of seats are prefetched, so they are searched in memory, rather than queried.
+        """
+        for stockrecord in seat.stockrecords.all():
+            if stockrecord.partner_id == partner.id:
+                return stockrecord
+        return None
+
     def _get_providers_from_lms(self, credit_seats):
         """ Helper method for getting provider info from LMS.
 
@@ -191,5 +202,6 @@ class Checkout(TemplateView):
 
         return EdxRestApiClient(
             get_lms_url('api/credit/v1/'),
-            oauth_access_token=self.request.user.access_token
+            oauth_access_token=self.request.user.access_token,
+            session=get_lms_session(CREDIT)
         )
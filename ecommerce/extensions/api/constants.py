@@ -3,30 +3,44 @@
 
 class APIDictionaryKeys(object):
     """Dictionary keys used repeatedly in the ecommerce API."""
+    AFTER = u'after'
+    ASYNC = u'async'
     BASKET_ID = u'id'
+    BASKETS = u'baskets'
     BENEFIT_TYPE = u'benefit_type'
     BENEFIT_VALUE = u'benefit_value'
     CHECKOUT = u'checkout'
     CLIENT_USERNAME = u'client_username'
     CODE = u'code'
+    CODES = u'codes'
+    COUNT = u'count'
     COUPON_ID = u'coupon_id'
+    COURSE_ID = u'course_id'
+    DRY_RUN = u'dry_run'
     END_DATE = u'end_date'
     ORDER = u'order'
     ORDER_NUMBER = u'number'
     ORDER_TOTAL = u'total'
     PAYMENT_DATA = u'payment_data'
+    PAYMENT_DATA_URL = u'payment_data_url'
     PAYMENT_FORM_DATA = u'payment_form_data'
     PAYMENT_PAGE_URL = u'payment_page_url'
     PAYMENT_PROCESSOR_NAME = u'payment_processor_name'
     PRICE = u'price'
+    PRODUCT_CLASS = u'product_class'
     PRODUCTS = u'products'
     QUANTITY = u'quantity'
+    REFULFILLMENT_ID = u'id'
+    REFULFILLMENT_URL = u'refulfillment_url'
     SHIPPING_CHARGE = u'shipping_charge'
     SHIPPING_METHOD = u'shipping_method'
     START_DATE = u'start_date'
+    STATUSES = u'statuses'
     STOCK_RECORD_IDS = u'stock_record_ids'
     SKU = u'sku'
     TITLE = u'title'
+    USERNAME = u'username'
+    VOUCHER_GENERATION_URL = u'voucher_generation_url'
     VOUCHER_TYPE = u'voucher_type'
 
 
@@ -1,8 +1,11 @@
 """Functions used for data retrieval and manipulation by the API."""
+from collections import OrderedDict
+
 from oscar.core.loading import get_model, get_class
 
 from ecommerce.extensions.api import exceptions
 from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.catalogue.cache import sku_cache
 
 NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
 OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
@@ -10,14 +13,75 @@ Product = get_model('catalogue', 'Product')
 
 
 def get_product(sku):
-    """Retrieve the product corresponding to the provided SKU."""
-    try:
-        return Product.objects.get(stockrecords__partner_sku=sku)
-    except Product.DoesNotExist:
+    """Retrieve the product corresponding to the provided SKU.
+
+    The SKU is resolved to a product ID using the shared SKU lookup cache, and the product
+    is loaded in the same manner as by `get_products`.
+    """
+    return get_products([sku])[sku]
+
+
+def get_products(skus):
+    """Retrieve the products corresponding to the provided SKUs.
+
+    SKUs are resolved to product IDs using the shared SKU lookup cache, after which all products
+    are loaded with a fixed number of queries, regardless of the number of SKUs requested. Each
+    product's stock records, product class (including the parent's, for child products) and attribute
+    values are loaded alongside it, so that purchase information can be computed without issuing
+    any additional queries.
+
+    Arguments:
+        skus (list): SKUs of the products to retrieve.
+
+    Returns:
+        OrderedDict: Products keyed by SKU, in the order in which the SKUs were requested.
+
+    Raises:
+        ProductNotFoundError: If any of the SKUs do not correspond to a product. The error
+            message lists every SKU which could not be found.
+    """
+    products_by_sku = find_products(skus)
+    missing_skus = [sku for sku in skus if sku not in products_by_sku]
+
+    if missing_skus:
         raise exceptions.ProductNotFoundError(
-            exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=sku)
+            exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=u', '.join(missing_skus))
         )
 
+    return products_by_sku
+
+
+def find_products(skus):
+    """Retrieve the products corresponding to the provided SKUs, ignoring SKUs which do not exist.
+
+    Products are loaded in the same manner as `get_products`.
+
+    Arguments:
+        skus (list): SKUs of the products to retrieve.
+
+    Returns:
+        OrderedDict: Products keyed by SKU, in the order in which the SKUs were requested. SKUs
+            which do not correspond to a product are omitted.
+    """
+    skus_info = sku_cache.get_many(skus)
+    products = Product.objects.filter(
+        id__in=set(info.product_id for info in skus_info.values())
+    ).select_related(
+        'product_class', 'parent__product_class'
+    ).prefetch_related(
+        'stockrecords', 'attribute_values__attribute'
+    )
+    products = {product.id: product for product in products}
+
+    products_by_sku = OrderedDict()
+    for sku in skus:
+        info = skus_info.get(sku)
+        product = products.get(info.product_id) if info else None
+        if product:
+            products_by_sku[sku] = product
+
+    return products_by_sku
+
 
 def get_order_metadata(basket):
     """Retrieve information required to place an order.
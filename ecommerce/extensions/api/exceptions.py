@@ -16,6 +16,21 @@ PRODUCT_NOT_FOUND_USER_MESSAGE = _("We couldn't find one of the products you're
 PRODUCT_UNAVAILABLE_DEVELOPER_MESSAGE = u"Product with SKU [{sku}] is [{availability}]"
 PRODUCT_UNAVAILABLE_USER_MESSAGE = _("One of the products you're trying to order is unavailable.")
 
+BASKET_OBJECTS_MISSING_DEVELOPER_MESSAGE = u"No basket objects could be found in the request body"
+TOO_MANY_BASKETS_DEVELOPER_MESSAGE = u"No more than [{max_size}] baskets may be created in a single request"
+USERNAME_NOT_FOUND_DEVELOPER_MESSAGE = u"Username missing from a requested basket object"
+USER_NOT_FOUND_DEVELOPER_MESSAGE = u"No user with username [{username}] exists"
+INVALID_BASKET_OBJECTS_DEVELOPER_MESSAGE = \
+    u"Basket objects, and their product objects, must be objects whose usernames and SKUs are strings"
+BASKET_CREATION_FAILED_DEVELOPER_MESSAGE = u"An unexpected error occurred while creating the basket"
+PAYMENT_REQUIRED_DEVELOPER_MESSAGE = u"Basket [{basket_id}] is not free. Only free baskets can be checked out in bulk"
+
+CODES_MISSING_DEVELOPER_MESSAGE = u"No codes could be found in the request body"
+TOO_MANY_CODES_DEVELOPER_MESSAGE = u"No more than [{max_size}] codes may be validated in a single request"
+INVALID_CODES_DEVELOPER_MESSAGE = u"Codes must be strings"
+
+INVALID_REFULFILLMENT_CRITERIA_DEVELOPER_MESSAGE = u"Orders to re-fulfill could not be selected: {error}"
+
 
 class ApiError(Exception):
     """Standard error raised by the API."""
@@ -0,0 +1,161 @@
+"""Support for idempotent API requests.
+
+Clients may retry non-idempotent requests (e.g. basket creation) by supplying an `Idempotency-Key` header.
+The first request carrying a given key is processed normally, and its response is stored in the cache.
+Subsequent requests with the same key, from the same user, to the same endpoint receive the stored response
+without being processed again. Requests which arrive while the original is still being processed wait briefly
+for it to complete, and receive a 409 if it does not.
+
+Responses are stored as soon as the view returns, so only views exempt from ATOMIC_REQUESTS, which have committed
+their changes by then, may be made idempotent. Otherwise, a retry could replay the response to a request whose
+transaction subsequently failed to commit.
+"""
+from functools import wraps
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+IDEMPOTENCY_REPLAYED_HEADER = 'Idempotent-Replayed'
+IDEMPOTENCY_CACHE_KEY_PREFIX = 'idempotency'
+IN_PROGRESS = 'in_progress'
+COMPLETE = 'complete'
+POLL_INTERVAL = 0.25
+
+IN_PROGRESS_DEVELOPER_MESSAGE = u"A request with idempotency key [{key}] is already being processed"
+KEY_REUSED_DEVELOPER_MESSAGE = u"Idempotency key [{key}] has already been used with a different request body"
+ATOMIC_VIEW_MESSAGE = u"[{view}] cannot be made idempotent, since it is not exempt from ATOMIC_REQUESTS"
+
+# View classes found to be exempt from ATOMIC_REQUESTS, which are not checked again.
+_non_atomic_view_classes = set()
+
+
+def _get_cache_key(request, key):
+    digest = hashlib.sha256(u'{user_id}:{path}:{key}'.format(
+        user_id=request.user.id,
+        path=request.path,
+        key=key
+    ).encode('utf-8')).hexdigest()
+    return '{prefix}.{digest}'.format(prefix=IDEMPOTENCY_CACHE_KEY_PREFIX, digest=digest)
+
+
+def _get_fingerprint(request):
+    return hashlib.sha256(json.dumps(request.data, sort_keys=True)).hexdigest()
+
+
+def _is_atomic(view):
+    """ Returns True if the view's changes are only committed once the request has concluded. """
+    non_atomic_requests = getattr(view.dispatch, '_non_atomic_requests', set())
+    return connection.settings_dict.get('ATOMIC_REQUESTS', False) and connection.alias not in non_atomic_requests
+
+
+def _check_non_atomic(view):
+    """ Raises ImproperlyConfigured if the view is not exempt from ATOMIC_REQUESTS.
+
+    Whether a view is exempt depends only on its class, and the database settings, which do not change once the
+    process has started. Each view class is therefore only checked on the first request it handles.
+    """
+    view_class = view.__class__
+    if view_class in _non_atomic_view_classes:
+        return
+
+    if _is_atomic(view):
+        raise ImproperlyConfigured(ATOMIC_VIEW_MESSAGE.format(view=view_class.__name__))
+
+    _non_atomic_view_classes.add(view_class)
+
+
+def _wait_for_completion(cache_key):
+    """ Poll the cache until the in-flight request completes, or the configured wait time elapses. """
+    deadline = time.time() + settings.IDEMPOTENCY_KEY_WAIT
+    entry = cache.get(cache_key)
+
+    while entry and entry['state'] == IN_PROGRESS and time.time() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(cache_key)
+
+    return entry
+
+
+def idempotent(view_method):
+    """Make a view method idempotent for requests which carry an `Idempotency-Key` header.
+
+    Only successful and client error (4xx) responses are stored. If the view raises an exception, or
+    returns a server error, the key is released so that the request can be retried.
+
+    The view must be exempt from ATOMIC_REQUESTS (i.e., its dispatch method must be decorated with
+    `transaction.non_atomic_requests`), so that its changes have been committed before its response is stored.
+    This is checked once for each view class, when it handles its first request.
+    """
+
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        _check_non_atomic(view)
+
+        key = request.META.get(IDEMPOTENCY_KEY_HEADER)
+        if not key:
+            return view_method(view, request, *args, **kwargs)
+
+        cache_key = _get_cache_key(request, key)
+        fingerprint = _get_fingerprint(request)
+        in_progress = {'state': IN_PROGRESS, 'fingerprint': fingerprint}
+
+        if not cache.add(cache_key, in_progress, settings.IDEMPOTENCY_KEY_LOCK_TIMEOUT):
+            entry = _wait_for_completion(cache_key)
+
+            if entry is None:
+                # The original request failed and released the key in the meantime.
+                return wrapper(view, request, *args, **kwargs)
+
+            if entry['fingerprint'] != fingerprint:
+                logger.warning(KEY_REUSED_DEVELOPER_MESSAGE.format(key=key))
+                return Response(
+                    {'developer_message': KEY_REUSED_DEVELOPER_MESSAGE.format(key=key)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            if entry['state'] == IN_PROGRESS:
+                logger.warning(IN_PROGRESS_DEVELOPER_MESSAGE.format(key=key))
+                return Response(
+                    {'developer_message': IN_PROGRESS_DEVELOPER_MESSAGE.format(key=key)},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            logger.info(u"Replaying stored response for idempotency key [%s].", key)
+            response = Response(entry['data'], status=entry['status'])
+            response[IDEMPOTENCY_REPLAYED_HEADER] = 'true'
+            return response
+
+        try:
+            response = view_method(view, request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+
+        if response.status_code < 500:
+            cache.set(
+                cache_key,
+                {
+                    'state': COMPLETE,
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'data': response.data,
+                },
+                settings.IDEMPOTENCY_KEY_TIMEOUT
+            )
+        else:
+            cache.delete(cache_key)
+
+        return response
+
+    return wrapper
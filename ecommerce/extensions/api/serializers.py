@@ -13,12 +13,12 @@ import waffle
 
 from ecommerce.core.constants import ISO_8601_FORMAT, COURSE_ID_REGEX
 from ecommerce.courses.models import Course
+from ecommerce.extensions.voucher.utils import get_coupon_type
 
 
 logger = logging.getLogger(__name__)
 
 Basket = get_model('basket', 'Basket')
-Benefit = get_model('offer', 'Benefit')
 BillingAddress = get_model('order', 'BillingAddress')
 Catalog = get_model('catalogue', 'Catalog')
 Line = get_model('order', 'Line')
@@ -125,6 +125,20 @@ class ProductSerializer(ProductPaymentInfoMixin, serializers.HyperlinkedModelSer
         info = self._get_info(product)
         return info.availability.is_available_to_buy
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load the data serialized for each product alongside it.
+
+        Serializing the products in the returned queryset requires a fixed number of queries, regardless
+        of the number of products. Attribute values referencing other objects (e.g., coupon vouchers)
+        are still resolved individually.
+        """
+        return queryset.select_related(
+            'product_class', 'parent__product_class'
+        ).prefetch_related(
+            'attribute_values__attribute', 'stockrecords', 'children__stockrecords'
+        )
+
     class Meta(object):
         model = Product
         fields = ('id', 'url', 'structure', 'product_class', 'title', 'price', 'expires', 'attribute_values',
@@ -368,7 +382,9 @@ class VoucherSerializer(serializers.ModelSerializer):
         return obj.is_available_to_user(user=request.user)
 
     def get_benefit(self, obj):
-        return (obj.offers.first().benefit.type, obj.offers.first().benefit.value)
+        # Index the offers, rather than calling first(), so that prefetched offers are used.
+        benefit = obj.offers.all()[0].benefit
+        return (benefit.type, benefit.value)
 
     def get_redeem_url(self, obj):
         domain = settings.ECOMMERCE_URL_ROOT
@@ -392,24 +408,35 @@ class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
     vouchers = serializers.SerializerMethodField()
 
     def get_coupon_type(self, obj):
+        summary = getattr(obj, 'coupon_summary', None)
+        if summary:
+            return summary.coupon_type
+
         voucher = obj.attr.coupon_vouchers.vouchers.first()
-        benefit = voucher.offers.first().benefit
-        if benefit.type == Benefit.PERCENTAGE and benefit.value == 100:
-            return "Enrollment code"
-        return "Discount code"
+        return get_coupon_type(voucher.offers.first().benefit)
 
     def get_last_edited(self, obj):
         history = obj.history.latest()
         return (history.history_user.username, history.history_date)
 
     def get_seats(self, obj):
-        voucher = obj.attr.coupon_vouchers.vouchers.first()
-        stockrecords = voucher.offers.first().condition.range.catalog.stock_records.all()
-        seats = Product.objects.filter(id__in=[sr.product.id for sr in stockrecords])
+        summary = getattr(obj, 'coupon_summary', None)
+        if summary:
+            seat_ids = [seat.id for seat in summary.seats.all()]
+        else:
+            voucher = obj.attr.coupon_vouchers.vouchers.first()
+            stockrecords = voucher.offers.first().condition.range.catalog.stock_records.all()
+            seat_ids = [sr.product_id for sr in stockrecords]
+
+        seats = ProductSerializer.setup_eager_loading(Product.objects.filter(id__in=seat_ids))
         serializer = ProductSerializer(seats, many=True, context={'request': self.context['request']})
         return serializer.data
 
     def get_client(self, obj):
+        summary = getattr(obj, 'coupon_summary', None)
+        if summary and summary.client:
+            return summary.client.username
+
         return Basket.objects.filter(lines__product_id=obj.id).first().owner.username
 
     def get_vouchers(self, obj):
@@ -420,3 +447,53 @@ class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
     class Meta(object):
         model = Product
         fields = ('id', 'title', 'coupon_type', 'last_edited', 'seats', 'client', 'price', 'vouchers',)
+
+
+class CouponListSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
+    """ Serializer for listing coupons, using each coupon's summary.
+
+    Vouchers are not included, but can be retrieved, a page at a time, from the URL in the vouchers field.
+    """
+    coupon_type = serializers.SerializerMethodField()
+    benefit = serializers.SerializerMethodField()
+    last_edited = serializers.SerializerMethodField()
+    seats = serializers.SerializerMethodField()
+    client = serializers.SerializerMethodField()
+    voucher_count = serializers.SerializerMethodField()
+    vouchers = serializers.HyperlinkedIdentityField(view_name='api:v2:coupons-vouchers')
+
+    def _get_summary(self, obj):
+        return getattr(obj, 'coupon_summary', None)
+
+    def get_coupon_type(self, obj):
+        summary = self._get_summary(obj)
+        return summary.coupon_type if summary else None
+
+    def get_benefit(self, obj):
+        summary = self._get_summary(obj)
+        return (summary.benefit_type, summary.benefit_value) if summary else None
+
+    def get_last_edited(self, obj):
+        summary = self._get_summary(obj)
+        if summary and summary.last_edited_by:
+            return (summary.last_edited_by.username, summary.last_edited)
+        return None
+
+    def get_seats(self, obj):
+        summary = self._get_summary(obj)
+        return [seat.id for seat in summary.seats.all()] if summary else []
+
+    def get_client(self, obj):
+        summary = self._get_summary(obj)
+        return summary.client.username if summary and summary.client else None
+
+    def get_voucher_count(self, obj):
+        summary = self._get_summary(obj)
+        return summary.voucher_count if summary else None
+
+    class Meta(object):
+        model = Product
+        fields = (
+            'id', 'title', 'coupon_type', 'benefit', 'last_edited', 'seats', 'client', 'price', 'voucher_count',
+            'vouchers',
+        )
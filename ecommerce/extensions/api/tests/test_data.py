@@ -0,0 +1,57 @@
+from oscar.core.loading import get_class
+from oscar.test import factories
+from oscar.test.newfactories import ProductAttributeValueFactory
+
+from ecommerce.extensions.api import data as data_api, exceptions as api_exceptions
+from ecommerce.tests.testcases import TestCase
+
+Selector = get_class('partner.strategy', 'Selector')
+
+
+class GetProductsTests(TestCase):
+    def setUp(self):
+        super(GetProductsTests, self).setUp()
+        self.products = [
+            factories.ProductFactory(stockrecords__partner=self.partner, stockrecords__partner_sku='SKU-{}'.format(i))
+            for i in range(5)
+        ]
+        for product in self.products:
+            ProductAttributeValueFactory(product=product)
+
+        self.skus = [product.stockrecords.first().partner_sku for product in self.products]
+
+    def test_get_products(self):
+        """ Verify the products are returned keyed by SKU, in the order requested. """
+        skus = list(reversed(self.skus))
+        products = data_api.get_products(skus)
+        self.assertEqual(products.keys(), skus)
+        self.assertEqual(products.values(), list(reversed(self.products)))
+
+    def test_query_count(self):
+        """ Verify the number of queries does not depend on the number of SKUs requested. """
+        # Warm the SKU lookup cache
+        data_api.get_products(self.skus)
+
+        with self.assertNumQueries(4):
+            products = data_api.get_products(self.skus)
+
+        # Purchase information should be computed from the prefetched data.
+        strategy = Selector().strategy()
+        with self.assertNumQueries(0):
+            for product in products.values():
+                strategy.fetch_for_product(product)
+
+    def test_missing_products(self):
+        """ Verify every SKU which does not correspond to a product is reported. """
+        missing_skus = ['not-a-sku', 'also-not-a-sku']
+        expected = api_exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=u', '.join(missing_skus))
+
+        with self.assertRaisesMessage(api_exceptions.ProductNotFoundError, expected):
+            data_api.get_products(self.skus[:1] + missing_skus)
+
+    def test_get_product(self):
+        """ Verify a single product is retrieved using the SKU lookup cache. """
+        self.assertEqual(data_api.get_product(self.skus[0]), self.products[0])
+
+        with self.assertRaises(api_exceptions.ProductNotFoundError):
+            data_api.get_product('not-a-sku')
@@ -0,0 +1,112 @@
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.test import override_settings
+from django.utils.decorators import method_decorator
+import mock
+from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ecommerce.extensions.api.idempotency import (
+    idempotent, IDEMPOTENCY_REPLAYED_HEADER, _get_cache_key, IN_PROGRESS
+)
+from ecommerce.tests.testcases import TestCase
+
+
+class NonAtomicView(object):
+    @method_decorator(transaction.non_atomic_requests)
+    def dispatch(self, request, *args, **kwargs):
+        pass
+
+
+@override_settings(IDEMPOTENCY_KEY_WAIT=0)
+class IdempotentTests(TestCase):
+    key = 'abc123'
+
+    def setUp(self):
+        super(IdempotentTests, self).setUp()
+        self.addCleanup(cache.clear)
+        self.user = self.create_user()
+        self.view_method = mock.Mock(return_value=Response({'id': 1}, status=status.HTTP_200_OK))
+        self.view_method.__name__ = 'create'
+
+    def _get_request(self, data=None, key=key):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        request = APIRequestFactory().post('/', data or {'sku': 'ABC'}, format='json', **headers)
+        force_authenticate(request, user=self.user)
+        request = Request(request, parsers=[JSONParser()])
+        request.user = self.user
+        return request
+
+    def _call(self, request, view=None):
+        return idempotent(self.view_method)(view or NonAtomicView(), request)
+
+    def test_without_key(self):
+        """ Verify requests without an idempotency key are always processed. """
+        self._call(self._get_request(key=None))
+        self._call(self._get_request(key=None))
+        self.assertEqual(self.view_method.call_count, 2)
+
+    def test_replay(self):
+        """ Verify retried requests receive the stored response, without being processed again. """
+        first = self._call(self._get_request())
+        second = self._call(self._get_request())
+
+        self.assertEqual(self.view_method.call_count, 1)
+        self.assertEqual(second.status_code, first.status_code)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second[IDEMPOTENCY_REPLAYED_HEADER], 'true')
+
+    def test_in_progress(self):
+        """ Verify a 409 is returned if the original request is still being processed. """
+        request = self._get_request()
+        cache.set(_get_cache_key(request, self.key), {'state': IN_PROGRESS, 'fingerprint': mock.ANY})
+
+        response = self._call(request)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(self.view_method.called)
+
+    def test_key_reused(self):
+        """ Verify a 400 is returned if the key is reused with a different request body. """
+        self._call(self._get_request())
+        response = self._call(self._get_request(data={'sku': 'XYZ'}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.view_method.call_count, 1)
+
+    def test_failure_releases_key(self):
+        """ Verify the key is released if the request fails, so that it can be retried. """
+        self.view_method.return_value = Response({}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self._call(self._get_request())
+
+        self.view_method.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            self._call(self._get_request())
+
+        self.view_method.side_effect = None
+        self.view_method.return_value = Response({'id': 1}, status=status.HTTP_200_OK)
+        self.assertEqual(self._call(self._get_request()).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.view_method.call_count, 3)
+
+    def test_atomic_view(self):
+        """ Verify views which are not exempt from ATOMIC_REQUESTS cannot be made idempotent. """
+        class AtomicView(object):
+            def dispatch(self, request, *args, **kwargs):
+                pass
+
+        with self.assertRaises(ImproperlyConfigured):
+            self._call(self._get_request(), view=AtomicView())
+        self.assertFalse(self.view_method.called)
+
+    def test_atomic_check_once_per_class(self):
+        """ Verify each view class is only checked for exemption from ATOMIC_REQUESTS once. """
+        class OtherNonAtomicView(NonAtomicView):
+            pass
+
+        with mock.patch('ecommerce.extensions.api.idempotency._is_atomic', return_value=False) as mock_is_atomic:
+            self._call(self._get_request(key=None), view=OtherNonAtomicView())
+            self._call(self._get_request(key=None), view=OtherNonAtomicView())
+
+        self.assertEqual(mock_is_atomic.call_count, 1)
@@ -17,7 +17,8 @@ from testfixtures import LogCapture
 from ecommerce.extensions.api import exceptions as api_exceptions
 from ecommerce.extensions.api.constants import APIConstants as AC
 from ecommerce.extensions.api.v2.tests.views import OrderDetailViewTestMixin, JSON_CONTENT_TYPE
-from ecommerce.extensions.api.v2.views.baskets import BasketCreateView
+from ecommerce.extensions.api.v2.views.baskets import BasketBatchCreateView, BasketCreateView
+from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
 from ecommerce.extensions.payment import exceptions as payment_exceptions
 from ecommerce.extensions.payment.processors.cybersource import Cybersource
 from ecommerce.tests.mixins import ThrottlingMixin, BasketCreationMixin
@@ -168,6 +169,19 @@ class BasketCreateViewTests(BasketCreationMixin, ThrottlingMixin, TransactionTes
             )
         )
 
+    def test_no_products_for_skus(self):
+        """Test that every missing SKU is reported in a single response, and nothing is added to the basket."""
+        response = self.create_basket(skus=[self.FREE_SKU, self.BAD_SKU, self.PAID_SKU, 'another-bad-sku'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data,
+            self._bad_request_dict(
+                api_exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=u'not-a-sku, another-bad-sku'),
+                api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE
+            )
+        )
+        self.assertEqual(Basket.objects.get().lines.count(), 0)
+
     def test_no_payment_processor(self):
         """Test that requests for handling payment with a non-existent processor fail."""
         response = self.create_basket(
@@ -184,6 +198,81 @@ class BasketCreateViewTests(BasketCreationMixin, ThrottlingMixin, TransactionTes
             )
         )
 
+    def test_idempotency_key(self):
+        """Test that retried requests carrying an idempotency key do not repeat checkout."""
+        ShippingEventType.objects.get_or_create(name=SHIPPING_EVENT_NAME)
+        request_data = {AC.KEYS.PRODUCTS: [{AC.KEYS.SKU: self.FREE_SKU}], AC.KEYS.CHECKOUT: True}
+
+        responses = [
+            self.client.post(
+                self.PATH,
+                data=json.dumps(request_data),
+                content_type=JSON_CONTENT_TYPE,
+                HTTP_AUTHORIZATION='JWT ' + self.generate_token(self.USER_DATA),
+                HTTP_IDEMPOTENCY_KEY='retry-me'
+            ) for __ in range(2)
+        ]
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[1].status_code, 200)
+        self.assertEqual(responses[1].data, responses[0].data)
+        self.assertEqual(Basket.objects.count(), 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def _create_basket_asynchronously(self):
+        request_data = {
+            AC.KEYS.PRODUCTS: [{AC.KEYS.SKU: self.PAID_SKU}],
+            AC.KEYS.CHECKOUT: True,
+            AC.KEYS.PAYMENT_PROCESSOR_NAME: Cybersource.NAME,
+            AC.KEYS.ASYNC: True,
+        }
+        return self.client.post(
+            self.PATH,
+            data=json.dumps(request_data),
+            content_type=JSON_CONTENT_TYPE,
+            HTTP_AUTHORIZATION='JWT ' + self.generate_token(self.USER_DATA)
+        )
+
+    def _get_payment_data(self, url, user_data=None):
+        return self.client.get(url, HTTP_AUTHORIZATION='JWT ' + self.generate_token(user_data or self.USER_DATA))
+
+    def test_asynchronous_checkout(self):
+        """Test that payment data can be generated asynchronously, and retrieved from the returned URL."""
+        response = self._create_basket_asynchronously()
+        self.assertEqual(response.status_code, 202)
+
+        basket = Basket.objects.get()
+        self.assertEqual(basket.status, 'Frozen')
+        self.assertEqual(response.data['id'], basket.id)
+        self.assertIsNone(response.data[AC.KEYS.PAYMENT_DATA])
+
+        url = response.data[AC.KEYS.PAYMENT_DATA_URL]
+        self.assertTrue(url.endswith(reverse('api:v2:baskets:payment_data', kwargs={'basket_id': basket.id})))
+
+        response = self._get_payment_data(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'complete')
+        payment_data = response.data[AC.KEYS.PAYMENT_DATA]
+        self.assertEqual(payment_data[AC.KEYS.PAYMENT_PROCESSOR_NAME], Cybersource.NAME)
+        self.assertIsNotNone(payment_data[AC.KEYS.PAYMENT_FORM_DATA])
+        self.assertIsNotNone(payment_data[AC.KEYS.PAYMENT_PAGE_URL])
+
+        # Payment data should not be exposed to other users.
+        other_user = {'username': 'other', 'email': 'other@example.com'}
+        self.assertEqual(self._get_payment_data(url, user_data=other_user).status_code, 404)
+
+    @mock.patch.object(Cybersource, 'get_transaction_parameters', mock.Mock(side_effect=ValueError('Test message')))
+    def test_asynchronous_checkout_failure(self):
+        """Test that the basket is thawed if payment data cannot be generated asynchronously."""
+        response = self._create_basket_asynchronously()
+        self.assertEqual(response.status_code, 202)
+
+        response = self._get_payment_data(response.data[AC.KEYS.PAYMENT_DATA_URL])
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertEqual(response.data['developer_message'], 'Test message')
+        self.assertEqual(Basket.objects.get().status, 'Open')
+
     def test_throttling(self):
         """Test that the rate of requests to the basket creation endpoint is throttled."""
         request_limit = UserRateThrottle().num_requests
@@ -246,6 +335,181 @@ class BasketCreateViewTests(BasketCreationMixin, ThrottlingMixin, TransactionTes
         self.assertDictEqual(actual, expected)
 
 
+@ddt.ddt
+@override_settings(
+    FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule']
+)
+class BasketBatchCreateViewTests(BasketCreationMixin, ThrottlingMixin, TransactionTestCase):
+    PAID_SKU = u'PAID-PRODUCT'
+    BAD_SKU = 'not-a-sku'
+    BATCH_PATH = reverse('api:v2:baskets:batch')
+
+    def setUp(self):
+        super(BasketBatchCreateViewTests, self).setUp()
+        ShippingEventType.objects.get_or_create(name=SHIPPING_EVENT_NAME)
+
+        factories.ProductFactory(
+            structure='child',
+            parent=self.base_product,
+            title=u'Paid product',
+            stockrecords__partner_sku=self.PAID_SKU,
+            stockrecords__price_excl_tax=Decimal('100.00'),
+            stockrecords__partner__short_code='oscr',
+        )
+
+        self.user = self.create_user(is_staff=True)
+        self.client.login(username=self.user.username, password=self.password)
+
+    def create_baskets(self, requested_baskets, checkout=True):
+        return self.client.post(
+            self.BATCH_PATH,
+            data=json.dumps({AC.KEYS.BASKETS: requested_baskets, AC.KEYS.CHECKOUT: checkout}),
+            content_type=JSON_CONTENT_TYPE
+        )
+
+    def _requested_basket(self, username, skus):
+        return {AC.KEYS.USERNAME: username, AC.KEYS.PRODUCTS: [{AC.KEYS.SKU: sku} for sku in skus]}
+
+    def test_batch_creation(self):
+        """Test that baskets are created, and free orders placed, for each user, and failures reported per basket."""
+        users = [self.create_user() for __ in range(4)]
+        response = self.create_baskets([
+            self._requested_basket(users[0].username, [self.FREE_SKU]),
+            self._requested_basket(users[1].username, [self.FREE_SKU]),
+            self._requested_basket(users[2].username, [self.PAID_SKU]),
+            self._requested_basket(users[3].username, [self.BAD_SKU]),
+            {AC.KEYS.PRODUCTS: [{AC.KEYS.SKU: self.FREE_SKU}]},
+            self._requested_basket('unknown-user', [self.FREE_SKU]),
+        ])
+        self.assertEqual(response.status_code, 200)
+
+        orders = Order.objects.order_by('id')
+        self.assertEqual(orders.count(), 2)
+        self.assertEqual([order.user for order in orders], users[:2])
+        self.assertTrue(all(order.basket.status == 'Submitted' for order in orders))
+
+        expected = [
+            {
+                AC.KEYS.USERNAME: order.user.username,
+                AC.KEYS.BASKET_ID: order.basket.id,
+                AC.KEYS.ORDER: {AC.KEYS.ORDER_NUMBER: order.number},
+            } for order in orders
+        ]
+        self.assertEqual(response.data[:2], expected)
+
+        # Failed baskets should have been rolled back, and no users created.
+        self.assertIn('is not free', response.data[2]['developer_message'])
+        self.assertEqual(
+            response.data[3]['developer_message'],
+            api_exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=self.BAD_SKU)
+        )
+        self.assertEqual(response.data[4], {
+            AC.KEYS.USERNAME: None,
+            'developer_message': api_exceptions.USERNAME_NOT_FOUND_DEVELOPER_MESSAGE
+        })
+        self.assertEqual(response.data[5], {
+            AC.KEYS.USERNAME: 'unknown-user',
+            'developer_message': api_exceptions.USER_NOT_FOUND_DEVELOPER_MESSAGE.format(username='unknown-user')
+        })
+        self.assertFalse(User.objects.filter(username='unknown-user').exists())
+        self.assertEqual(Basket.objects.count(), 2)
+
+    def test_without_checkout(self):
+        """Test that baskets are populated, but not checked out, if checkout is not requested."""
+        username = self.create_user().username
+        response = self.create_baskets([self._requested_basket(username, [self.FREE_SKU, self.PAID_SKU])], False)
+        self.assertEqual(response.status_code, 200)
+
+        basket = Basket.objects.get()
+        self.assertEqual(
+            response.data,
+            [{AC.KEYS.USERNAME: username, AC.KEYS.BASKET_ID: basket.id, AC.KEYS.ORDER: None}]
+        )
+        self.assertEqual(basket.status, 'Open')
+        self.assertEqual(basket.lines.count(), 2)
+        self.assertFalse(Order.objects.exists())
+
+    @override_settings(BASKET_BATCH_CHUNK_SIZE=2)
+    def test_chunking(self):
+        """Test that fulfillment is initiated once for each chunk of baskets."""
+        usernames = [self.create_user().username for __ in range(3)]
+        with mock.patch.object(BasketBatchCreateView, 'handle_successful_orders') as mock_handle:
+            response = self.create_baskets([self._requested_basket(username, [self.FREE_SKU]) for username in usernames])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [[order.user.username for order in call[0][0]] for call in mock_handle.call_args_list],
+            [usernames[:2], usernames[2:]]
+        )
+
+    @ddt.data([], 'not-a-list', None)
+    def test_basket_objects_missing(self, requested_baskets):
+        """Test that requests without basket objects are rejected."""
+        response = self.create_baskets(requested_baskets)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'developer_message': api_exceptions.BASKET_OBJECTS_MISSING_DEVELOPER_MESSAGE})
+
+    @ddt.data(
+        ['not-an-object'],
+        [{AC.KEYS.USERNAME: ['not-a-string'], AC.KEYS.PRODUCTS: []}],
+        [{AC.KEYS.USERNAME: 'user', AC.KEYS.PRODUCTS: 'not-a-list'}],
+        [{AC.KEYS.USERNAME: 'user', AC.KEYS.PRODUCTS: ['not-an-object']}],
+        [{AC.KEYS.USERNAME: 'user', AC.KEYS.PRODUCTS: [{AC.KEYS.SKU: {}}]}],
+    )
+    def test_invalid_basket_objects(self, requested_baskets):
+        """Test that requests containing malformed basket objects are rejected."""
+        response = self.create_baskets(requested_baskets)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'developer_message': api_exceptions.INVALID_BASKET_OBJECTS_DEVELOPER_MESSAGE})
+
+    @override_settings(BASKET_BATCH_CHUNK_SIZE=1)
+    def test_unexpected_error(self):
+        """Test that an unexpected failure to create one basket is reported, without failing the request."""
+        usernames = [self.create_user().username for __ in range(3)]
+        create_basket = BasketBatchCreateView._create_basket  # pylint: disable=protected-access
+
+        def _create_basket(view, requested_basket, *args):
+            if requested_basket[AC.KEYS.USERNAME] == usernames[1]:
+                raise Exception('Boom!')
+            return create_basket(view, requested_basket, *args)
+
+        with mock.patch.object(BasketBatchCreateView, '_create_basket', _create_basket):
+            response = self.create_baskets([self._requested_basket(username, [self.FREE_SKU]) for username in usernames])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[1], {
+            AC.KEYS.USERNAME: usernames[1],
+            'developer_message': api_exceptions.BASKET_CREATION_FAILED_DEVELOPER_MESSAGE
+        })
+        self.assertEqual(
+            [order.user.username for order in Order.objects.order_by('id')],
+            [usernames[0], usernames[2]]
+        )
+
+    def test_fulfillment_error(self):
+        """Test that a failure to initiate fulfillment does not fail the request, since the orders were placed."""
+        with mock.patch.object(BasketBatchCreateView, 'handle_successful_orders', side_effect=Exception):
+            response = self.create_baskets([self._requested_basket(self.create_user().username, [self.FREE_SKU])])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0][AC.KEYS.ORDER], {AC.KEYS.ORDER_NUMBER: Order.objects.get().number})
+
+    @override_settings(BASKET_BATCH_MAX_SIZE=1)
+    def test_too_many_baskets(self):
+        """Test that requests for more baskets than allowed are rejected."""
+        response = self.create_baskets([self._requested_basket(username, [self.FREE_SKU]) for username in 'ab'])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Basket.objects.exists())
+
+    def test_staff_only(self):
+        """Test that only staff users may create baskets for other users."""
+        user = self.create_user()
+        self.client.login(username=user.username, password=self.password)
+
+        response = self.create_baskets([self._requested_basket(user.username, [self.FREE_SKU])])
+        self.assertEqual(response.status_code, 403)
+
+
 class OrderByBasketRetrieveViewTests(OrderDetailViewTestMixin, TestCase):
     """Test cases for getting orders using the basket id. """
 
@@ -4,8 +4,10 @@ import datetime
 import json
 
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.db.utils import IntegrityError
-from django.test import RequestFactory
+from django.test import RequestFactory, override_settings
+import mock
 from oscar.core.loading import get_model
 
 from ecommerce.core.models import Client
@@ -13,11 +15,13 @@ from ecommerce.extensions.api.constants import APIConstants as AC
 from ecommerce.extensions.api.v2.views.coupons import CouponViewSet
 from ecommerce.extensions.test.factories import create_coupon
 from ecommerce.tests.factories import SiteFactory, SiteConfigurationFactory
+from ecommerce.tests.mixins import ThrottlingMixin
 from ecommerce.tests.testcases import TestCase
 
 Basket = get_model('basket', 'Basket')
 Benefit = get_model('offer', 'Benefit')
 Catalog = get_model('catalogue', 'Catalog')
+CouponSummary = get_model('voucher', 'CouponSummary')
 Course = get_model('courses', 'Course')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
@@ -64,6 +68,7 @@ class CouponViewSetTest(TestCase):
         request = RequestFactory()
         request.data = data
         request.site = site
+        request.META = {}
 
         response = CouponViewSet().create(request)
 
@@ -196,7 +201,7 @@ class CouponViewSetTest(TestCase):
         self.assertEqual(Basket.objects.first().status, 'Submitted')
 
 
-class CouponViewSetFunctionalTest(TestCase):
+class CouponViewSetFunctionalTest(ThrottlingMixin, TestCase):
     """Test the coupon order creation functionality."""
 
     def setUp(self):
@@ -243,6 +248,58 @@ class CouponViewSetFunctionalTest(TestCase):
         self.assertEqual(Order.objects.first().lines.count(), 1)
         self.assertEqual(Order.objects.first().lines.first().product.title, 'Test coupon')
 
+    @override_settings(VOUCHER_ASYNC_GENERATION_THRESHOLD=1)
+    def test_create_with_voucher_generation_task(self):
+        """Test that a coupon's vouchers are created by a background task, if there are many of them."""
+        self.data['title'] = 'Test bulk coupon'
+        response = self.client.post(COUPONS_LINK, data=self.data, format='json')
+        self.assertEqual(response.status_code, 202)
+        response_data = json.loads(response.content)
+        coupon = Product.objects.get(title='Test bulk coupon')
+        self.assertEqual(response_data[AC.KEYS.COUPON_ID], coupon.id)
+        self.assertIsNotNone(response_data[AC.KEYS.ORDER])
+
+        response = self.client.get(response_data[AC.KEYS.VOUCHER_GENERATION_URL])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {
+            'status': 'complete',
+            'quantity': 2,
+            'created': 2,
+            'developer_message': None,
+        })
+        self.assertEqual(coupon.attr.coupon_vouchers.vouchers.count(), 2)
+        self.assertEqual(coupon.coupon_summary.voucher_count, 2)
+        self.assertEqual(coupon.coupon_summary.coupon_type, 'Enrollment code')
+
+    @override_settings(VOUCHER_ASYNC_GENERATION_THRESHOLD=1)
+    def test_retry_voucher_generation(self):
+        """Test that a failed voucher generation task can be retried, and only once it has failed."""
+        self.data['title'] = 'Test bulk coupon'
+        with mock.patch('ecommerce.extensions.voucher.tasks.create_vouchers', side_effect=Exception('Boom')):
+            response = self.client.post(COUPONS_LINK, data=self.data, format='json')
+        url = json.loads(response.content)[AC.KEYS.VOUCHER_GENERATION_URL]
+        self.assertEqual(self.client.get(url).status_code, 500)
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['status'], 'complete')
+        coupon = Product.objects.get(title='Test bulk coupon')
+        self.assertEqual(coupon.attr.coupon_vouchers.vouchers.count(), 2)
+        self.assertEqual(coupon.coupon_summary.voucher_count, 2)
+
+        # Tasks which have not failed are not retried.
+        self.assertEqual(self.client.post(url).status_code, 409)
+        self.assertEqual(coupon.attr.coupon_vouchers.vouchers.count(), 2)
+
+    def test_voucher_generation_not_found(self):
+        """Test that a 404 is returned for coupons whose vouchers were not created by a background task."""
+        coupon = Product.objects.get(title='Test coupon')
+        response = self.client.get(reverse('api:v2:coupons-voucher-generation', kwargs={'pk': coupon.id}))
+        self.assertEqual(response.status_code, 404)
+
+    # The view is exempt from ATOMIC_REQUESTS, so DRF must not mark the test's transaction for rollback when
+    # the request is rejected. Otherwise, the session cannot be saved once the view has returned.
+    @mock.patch.dict(connection.settings_dict, {'ATOMIC_REQUESTS': False})
     def test_authentication_required(self):
         """Test that a guest cannot access the view."""
         response = self.client.post(COUPONS_LINK, data=self.data)
@@ -252,6 +309,7 @@ class CouponViewSetFunctionalTest(TestCase):
         response = self.client.post(COUPONS_LINK, data=self.data)
         self.assertEqual(response.status_code, 401)
 
+    @mock.patch.dict(connection.settings_dict, {'ATOMIC_REQUESTS': False})
     def test_authorization_required(self):
         """Test that a non-staff user cannot access the view."""
         user = self.create_user(is_staff=False)
@@ -261,11 +319,55 @@ class CouponViewSetFunctionalTest(TestCase):
         self.assertEqual(response.status_code, 403)
 
     def test_list_coupons(self):
-        """Test that the endpoint returns information needed for the details page."""
+        """Test that the endpoint returns the summary of each coupon."""
         response = self.client.get(COUPONS_LINK)
         self.assertEqual(response.status_code, 200)
         response_data = json.loads(response.content)
+        coupon = Product.objects.get(title='Test coupon')
         coupon_data = response_data['results'][0]
+        self.assertEqual(coupon_data['id'], coupon.id)
+        self.assertEqual(coupon_data['title'], 'Test coupon')
+        self.assertEqual(coupon_data['coupon_type'], 'Enrollment code')
+        self.assertEqual(coupon_data['benefit'], [Benefit.PERCENTAGE, 100.0])
+        self.assertIsNotNone(coupon_data['last_edited'][0])
+        seat = Course.objects.get(id='edx/Demo_Course2/DemoX').seat_products[0]
+        self.assertEqual(coupon_data['seats'], [seat.id])
+        self.assertEqual(coupon_data['client'], 'TestX')
+        self.assertEqual(coupon_data['price'], '100.00')
+        self.assertEqual(coupon_data['voucher_count'], 2)
+        self.assertTrue(coupon_data['vouchers'].endswith(reverse('api:v2:coupons-vouchers', kwargs={'pk': coupon.id})))
+        self.assertNotIn('code', coupon_data)
+
+        self.data['title'] = 'Test discount code'
+        self.data['benefit_value'] = 20
+        self.client.post(COUPONS_LINK, data=self.data, format='json')
+        response = self.client.get(COUPONS_LINK)
+        response_data = json.loads(response.content)
+        coupon_data = [coupon for coupon in response_data['results'] if coupon['title'] == 'Test discount code'][0]
+        self.assertEqual(coupon_data['coupon_type'], 'Discount code')
+        self.assertEqual(coupon_data['benefit'], [Benefit.PERCENTAGE, 20.0])
+
+    def test_list_query_count(self):
+        """Test that the number of queries made when listing coupons does not grow with the number of coupons."""
+        self.client.get(COUPONS_LINK)
+        with self.assertNumQueries(6) as context:
+            self.client.get(COUPONS_LINK)
+        initial_count = len(context.captured_queries)
+
+        for title in ('Second coupon', 'Third coupon'):
+            self.data['title'] = title
+            self.client.post(COUPONS_LINK, data=self.data, format='json')
+
+        with self.assertNumQueries(initial_count):
+            response = self.client.get(COUPONS_LINK)
+        self.assertEqual(json.loads(response.content)['count'], 3)
+
+    def test_retrieve_coupon(self):
+        """Test that the endpoint returns information needed for the details page."""
+        coupon = Product.objects.get(title='Test coupon')
+        response = self.client.get(reverse('api:v2:coupons-detail', kwargs={'pk': coupon.id}))
+        self.assertEqual(response.status_code, 200)
+        coupon_data = json.loads(response.content)
         self.assertEqual(coupon_data['title'], 'Test coupon')
         self.assertEqual(coupon_data['coupon_type'], 'Enrollment code')
         self.assertIsNotNone(coupon_data['last_edited'][0])
@@ -280,13 +382,45 @@ class CouponViewSetFunctionalTest(TestCase):
         self.assertEqual(coupon_data['client'], 'TestX')
         self.assertEqual(coupon_data['price'], '100.00')
 
-        self.data['title'] = 'Test discount code'
-        self.data['benefit_value'] = 20
-        self.client.post(COUPONS_LINK, data=self.data, format='json')
-        response = self.client.get(COUPONS_LINK)
+    def test_retrieve_coupon_without_summary(self):
+        """Test that coupons created before summaries were introduced can be retrieved."""
+        coupon = Product.objects.get(title='Test coupon')
+        CouponSummary.objects.all().delete()
+        response = self.client.get(reverse('api:v2:coupons-detail', kwargs={'pk': coupon.id}))
+        self.assertEqual(response.status_code, 200)
+        coupon_data = json.loads(response.content)
+        self.assertEqual(coupon_data['coupon_type'], 'Enrollment code')
+        self.assertEqual(coupon_data['seats'][0]['attribute_values'][0]['value'], 'verified')
+        self.assertEqual(coupon_data['client'], 'TestX')
+
+    def test_list_vouchers(self):
+        """Test that the vouchers of a coupon are returned a page at a time."""
+        coupon = Product.objects.get(title='Test coupon')
+        path = reverse('api:v2:coupons-vouchers', kwargs={'pk': coupon.id})
+        response = self.client.get(path, {'page_size': 1})
+        self.assertEqual(response.status_code, 200)
         response_data = json.loads(response.content)
-        self.assertEqual(response_data['results'][0]['coupon_type'], 'Discount code')
-        self.assertEqual(response_data['results'][0]['vouchers'][0]['benefit'][1], 20.0)
+        vouchers = coupon.attr.coupon_vouchers.vouchers.order_by('id')
+        self.assertEqual(response_data['count'], 2)
+        self.assertIsNotNone(response_data['next'])
+        self.assertEqual(len(response_data['results']), 1)
+        self.assertEqual(response_data['results'][0]['code'], vouchers[0].code)
+        self.assertEqual(response_data['results'][0]['benefit'], [Benefit.PERCENTAGE, 100.0])
+
+        response_data = json.loads(self.client.get(response_data['next']).content)
+        self.assertEqual(response_data['results'][0]['code'], vouchers[1].code)
+
+    def test_update_summary(self):
+        """Test that updating a coupon updates its summary."""
+        coupon = Product.objects.get(title='Test coupon')
+        CouponSummary.objects.filter(coupon=coupon).update(voucher_count=0, last_edited=None)
+        path = reverse('api:v2:coupons-detail', kwargs={'pk': coupon.id})
+        self.client.put(path, json.dumps({'title': 'New title'}), 'application/json')
+
+        summary = CouponSummary.objects.get(coupon=coupon)
+        self.assertEqual(summary.voucher_count, 2)
+        self.assertEqual(summary.last_edited_by, self.user)
+        self.assertEqual(summary.last_edited, coupon.history.latest().history_date)
 
     def test_update(self):
         """Test updating a coupon."""
@@ -9,10 +9,13 @@ from django.test import override_settings
 from oscar.core.loading import get_model
 from oscar.test import factories
 
+from ecommerce.extensions.api.constants import APIConstants as AC
 from ecommerce.extensions.api.tests.test_authentication import AccessTokenMixin, OAUTH2_PROVIDER_URL
 from ecommerce.extensions.api.v2.tests.views import OrderDetailViewTestMixin
+from ecommerce.extensions.fulfillment.refulfillment import claim_order, release_order
 from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
 from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.fulfillment.tasks import RefulfillmentStatus
 from ecommerce.tests.mixins import ThrottlingMixin
 from ecommerce.tests.testcases import TestCase
 
@@ -189,6 +192,12 @@ class OrderFulfillViewTests(TestCase):
         self.order.save()
         self.assertEqual(406, self._put_to_view().status_code)
 
+    def test_order_claimed(self):
+        """ If the order is being fulfilled by another process, the view must return an HTTP 409. """
+        claim_order(self.order)
+        self.addCleanup(release_order, self.order)
+        self.assertEqual(409, self._put_to_view().status_code)
+
     @ddt.data(ORDER.OPEN, ORDER.FULFILLMENT_ERROR)
     def test_ideal_conditions(self, order_status):
         """
@@ -213,6 +222,84 @@ class OrderFulfillViewTests(TestCase):
         response = self._put_to_view()
         self.assertEqual(500, response.status_code)
 
+        # The order is released for other processes to fulfill.
+        self.assertTrue(claim_order(self.order))
+        release_order(self.order)
+
+
+@ddt.ddt
+class OrderRefulfillViewTests(TestCase):
+    path = reverse('api:v2:orders:refulfill')
+
+    def setUp(self):
+        super(OrderRefulfillViewTests, self).setUp()
+        self.user = self.create_user(is_staff=True)
+        self.client.login(username=self.user.username, password=self.password)
+        self.orders = [factories.create_order(status=ORDER.FULFILLMENT_ERROR) for __ in range(2)]
+
+    def _post_to_view(self, data):
+        return self.client.post(self.path, data=json.dumps(data), content_type='application/json')
+
+    def test_staff_only(self):
+        """ Verify only staff users may re-fulfill orders. """
+        user = self.create_user()
+        self.client.login(username=user.username, password=self.password)
+        self.assertEqual(self._post_to_view({}).status_code, 403)
+        path = reverse('api:v2:orders:refulfillment', kwargs={'job_id': 'abc'})
+        self.assertEqual(self.client.get(path).status_code, 403)
+
+    def test_dry_run(self):
+        """ Verify the number of orders selected is returned, and no orders are re-fulfilled. """
+        with mock.patch('ecommerce.extensions.fulfillment.tasks.refulfill_orders.delay') as mock_delay:
+            response = self._post_to_view({AC.KEYS.DRY_RUN: True, AC.KEYS.AFTER: self.orders[0].id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {AC.KEYS.COUNT: 1})
+        self.assertFalse(mock_delay.called)
+
+    @ddt.data(
+        {AC.KEYS.STATUSES: [ORDER.COMPLETE]},
+        {AC.KEYS.STATUSES: ORDER.OPEN},
+        {AC.KEYS.START_DATE: 'not-a-date'},
+        {AC.KEYS.AFTER: 'abc'},
+    )
+    def test_invalid_criteria(self, data):
+        """ Verify a 400 is returned if the criteria are invalid. """
+        response = self._post_to_view(data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('developer_message', json.loads(response.content))
+
+    @override_settings(REFULFILLMENT_CONCURRENCY=1)
+    def test_refulfill(self):
+        """ Verify the orders are re-fulfilled by a background task, whose progress can be polled. """
+        data = {
+            AC.KEYS.STATUSES: [ORDER.FULFILLMENT_ERROR],
+            AC.KEYS.START_DATE: '2000-01-01T00:00:00Z',
+            AC.KEYS.PRODUCT_CLASS: None,
+        }
+        with mock.patch('ecommerce.extensions.fulfillment.refulfillment.refulfill_order', return_value=True):
+            response = self._post_to_view(data)
+
+        self.assertEqual(response.status_code, 202)
+        response_data = json.loads(response.content)
+        self.assertEqual(response_data[AC.KEYS.COUNT], 2)
+
+        response = self.client.get(response_data[AC.KEYS.REFULFILLMENT_URL])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {
+            'status': RefulfillmentStatus.COMPLETE,
+            'total': 2,
+            'processed': 2,
+            'fulfilled': 2,
+            'checkpoint': self.orders[-1].id,
+            'developer_message': None,
+        })
+
+    def test_refulfillment_not_found(self):
+        """ Verify a 404 is returned for jobs which do not exist. """
+        path = reverse('api:v2:orders:refulfillment', kwargs={'job_id': 'abc'})
+        self.assertEqual(self.client.get(path).status_code, 404)
+
 
 class OrderDetailViewTests(OrderDetailViewTestMixin, TestCase):
     @property
@@ -3,6 +3,10 @@ import datetime
 import json
 
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import mock
+from oscar.apps.partner.strategy import Structured
 from oscar.core.loading import get_model
 import pytz
 
@@ -10,6 +14,7 @@ from ecommerce.courses.models import Course
 from ecommerce.extensions.api.v2.tests.views import JSON_CONTENT_TYPE, ProductSerializerMixin
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.test.factories import create_coupon
+from ecommerce.tests.mixins import ThrottlingMixin
 from ecommerce.tests.testcases import TestCase
 
 Benefit = get_model('offer', 'Benefit')
@@ -19,7 +24,7 @@ ProductClass = get_model('catalogue', 'ProductClass')
 Voucher = get_model('voucher', 'Voucher')
 
 
-class ProductViewSetTests(ProductSerializerMixin, CourseCatalogTestMixin, TestCase):
+class ProductViewSetTests(ProductSerializerMixin, CourseCatalogTestMixin, ThrottlingMixin, TestCase):
     maxDiff = None
 
     def setUp(self):
@@ -48,6 +53,37 @@ class ProductViewSetTests(ProductSerializerMixin, CourseCatalogTestMixin, TestCa
         expected = {'count': 0, 'next': None, 'previous': None, 'results': []}
         self.assertDictEqual(json.loads(response.content), expected)
 
+    def test_list_purchase_info_computed_once(self):
+        """ Verify the availability and price of each listed product are computed once. """
+        fetch_for_product = Structured.fetch_for_product
+        with mock.patch.object(Structured, 'fetch_for_product', autospec=True,
+                               side_effect=fetch_for_product) as mock_fetch:
+            response = self.client.get(reverse('api:v2:product-list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_fetch.call_count, self.course.products.count())
+
+    def test_list_query_count(self):
+        """ Verify the number of queries required to list products does not depend on the number of products. """
+        path = reverse('api:v2:product-list')
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(path, {'page_size': 100})
+            self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        # The first request populates caches (e.g., of the current site) used by subsequent requests.
+        count_queries()
+        expected = count_queries()
+
+        for i in range(5):
+            course = Course.objects.create(id='edX/DemoX/Course_{}'.format(i), name='Test Course')
+            course.create_or_update_seat('verified', True, 10, self.partner)
+            course.create_or_update_seat('professional', True, 100, self.partner)
+
+        self.assertEqual(count_queries(), expected)
+
     def test_retrieve(self):
         """ Verify a single product is returned. """
         path = reverse('api:v2:product-detail', kwargs={'pk': 999})
@@ -0,0 +1,124 @@
+from __future__ import unicode_literals
+
+import datetime
+import json
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.courses.models import Course
+from ecommerce.extensions.api import exceptions as api_exceptions
+from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.api.v2.tests.views import JSON_CONTENT_TYPE
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.extensions.test.factories import create_coupon
+from ecommerce.tests.mixins import ThrottlingMixin
+from ecommerce.tests.testcases import TestCase
+
+Catalog = get_model('catalogue', 'Catalog')
+CouponVouchers = get_model('voucher', 'CouponVouchers')
+StockRecord = get_model('partner', 'StockRecord')
+Voucher = get_model('voucher', 'Voucher')
+VoucherApplication = get_model('voucher', 'VoucherApplication')
+
+
+class VoucherValidateViewTests(CourseCatalogTestMixin, ThrottlingMixin, TestCase):
+    path = reverse('api:v2:vouchers:validate')
+
+    def setUp(self):
+        super(VoucherValidateViewTests, self).setUp()
+        self.user = self.create_user(is_staff=True)
+        self.client.login(username=self.user.username, password=self.password)
+
+        course = Course.objects.create(id='edX/DemoX/Demo_Course', name='Demo Course')
+        seat = course.create_or_update_seat('verified', True, 50, self.partner)
+        self.stock_record = StockRecord.objects.get(product=seat)
+        catalog = Catalog.objects.create(name='Test catalog', partner=self.partner)
+        catalog.stock_records.add(self.stock_record)
+
+        coupon = create_coupon(catalog=catalog)
+        self.vouchers = CouponVouchers.objects.get(coupon=coupon).vouchers.order_by('id')
+        self.vouchers.update(end_datetime=now() + datetime.timedelta(days=1))
+        self.codes = [voucher.code for voucher in self.vouchers]
+
+    def validate(self, codes):
+        return self.client.post(self.path, data=json.dumps({AC.KEYS.CODES: codes}), content_type=JSON_CONTENT_TYPE)
+
+    def assert_bad_request(self, response, developer_message):
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'developer_message': developer_message})
+
+    def test_validate(self):
+        """ Verify a result is returned for each code, in the order requested. """
+        used, expired = self.vouchers[0], self.vouchers[1]
+        VoucherApplication.objects.create(voucher=used, user=self.user, order=factories.create_order())
+        expired.end_datetime = now() - datetime.timedelta(days=1)
+        expired.save()
+
+        response = self.validate([self.codes[2], 'INVALID', used.code, expired.code])
+        self.assertEqual(response.status_code, 200)
+
+        sku = self.stock_record.partner_sku
+        self.assertEqual(response.data, [
+            {'code': self.codes[2], 'is_valid': True, 'message': '', 'sku': sku},
+            {'code': 'INVALID', 'is_valid': False, 'message': 'Coupon does not exist', 'sku': None},
+            {'code': used.code, 'is_valid': False, 'message': 'This coupon has already been used', 'sku': sku},
+            {'code': expired.code, 'is_valid': False, 'message': 'Coupon expired', 'sku': sku},
+        ])
+
+    def test_product_unavailable(self):
+        """ Verify codes are invalid if their product is not available to buy. """
+        product = self.stock_record.product
+        product.expires = now() - datetime.timedelta(days=1)
+        product.save()
+
+        response = self.validate(self.codes[:1])
+        self.assertFalse(response.data[0]['is_valid'])
+        self.assertIn('not available for purchase', response.data[0]['message'])
+
+    @override_settings(VOUCHER_VALIDATION_CHUNK_SIZE=2)
+    def test_query_count(self):
+        """ Verify the number of queries made depends on the number of chunks of codes, not on the number of codes. """
+        # Queries made by the first request alone (e.g., to load the product class registry) are not counted.
+        self.validate(self.codes[:1])
+
+        with CaptureQueriesContext(connection) as one_chunk:
+            self.validate(self.codes[:1])
+        with CaptureQueriesContext(connection) as two_chunks:
+            self.validate(self.codes[:3])
+        with CaptureQueriesContext(connection) as three_chunks:
+            self.validate(self.codes + ['INVALID'])
+
+        chunk_queries = len(two_chunks) - len(one_chunk)
+        self.assertGreater(chunk_queries, 0)
+        self.assertEqual(len(three_chunks) - len(two_chunks), chunk_queries)
+
+    def test_codes_missing(self):
+        """ Verify requests must contain an array of codes. """
+        for codes in (None, [], 'CODE'):
+            self.assert_bad_request(self.validate(codes), api_exceptions.CODES_MISSING_DEVELOPER_MESSAGE)
+
+    def test_invalid_codes(self):
+        """ Verify requests containing codes which are not strings are rejected. """
+        for codes in ([None], [123], [['CODE']], [{}]):
+            self.assert_bad_request(
+                self.validate(self.codes[:1] + codes), api_exceptions.INVALID_CODES_DEVELOPER_MESSAGE
+            )
+
+    @override_settings(VOUCHER_VALIDATION_MAX_SIZE=2)
+    def test_too_many_codes(self):
+        """ Verify the number of codes which may be validated in a single request is limited. """
+        self.assert_bad_request(
+            self.validate(self.codes[:3]), api_exceptions.TOO_MANY_CODES_DEVELOPER_MESSAGE.format(max_size=2)
+        )
+
+    def test_staff_only(self):
+        """ Verify the endpoint is restricted to staff users. """
+        user = self.create_user()
+        self.client.login(username=user.username, password=self.password)
+        self.assertEqual(self.validate(self.codes).status_code, 403)
@@ -8,14 +8,21 @@ from ecommerce.extensions.api.v2.views import (baskets as basket_views, payments
                                                publication as publication_views, partners as partner_views,
                                                catalog as catalog_views,
                                                stockrecords as stockrecords_views,
-                                               coupons as coupon_views)
+                                               coupons as coupon_views, vouchers as voucher_views)
 from ecommerce.extensions.voucher.views import CouponReportCSVView
 
 ORDER_NUMBER_PATTERN = r'(?P<number>[-\w]+)'
 BASKET_ID_PATTERN = r'(?P<basket_id>[\w]+)'
+REFULFILLMENT_JOB_ID_PATTERN = r'(?P<job_id>[\w]+)'
 
 BASKET_URLS = [
     url(r'^$', basket_views.BasketCreateView.as_view(), name='create'),
+    url(r'^batch/$', basket_views.BasketBatchCreateView.as_view(), name='batch'),
+    url(
+        r'^{basket_id}/payment_data/$'.format(basket_id=BASKET_ID_PATTERN),
+        basket_views.BasketPaymentDataView.as_view(),
+        name='payment_data'
+    ),
     url(
         r'^{basket_id}/order/$'.format(basket_id=BASKET_ID_PATTERN),
         basket_views.OrderByBasketRetrieveView.as_view(),
@@ -23,6 +30,15 @@ BASKET_URLS = [
     ),
 ]
 
+ORDER_URLS = [
+    url(r'^refulfill/$', order_views.OrderRefulfillView.as_view(), name='refulfill'),
+    url(
+        r'^refulfill/{job_id}/$'.format(job_id=REFULFILLMENT_JOB_ID_PATTERN),
+        order_views.RefulfillmentRetrieveView.as_view(),
+        name='refulfillment'
+    ),
+]
+
 PAYMENT_URLS = [
     url(r'^processors/$', payment_views.PaymentProcessorListView.as_view(),
         name='list_processors'),
@@ -37,6 +53,10 @@ COUPON_URLS = [
     url(r'^coupon_reports/(?P<coupon_id>[\d]+)/$', CouponReportCSVView.as_view(), name='coupon_reports'),
 ]
 
+VOUCHER_URLS = [
+    url(r'^validate/$', voucher_views.VoucherValidateView.as_view(), name='validate'),
+]
+
 ATOMIC_PUBLICATION_URLS = [
     url(r'^$', publication_views.AtomicPublicationView.as_view(), name='create'),
     url(
@@ -48,8 +68,10 @@ ATOMIC_PUBLICATION_URLS = [
 
 urlpatterns = [
     url(r'^baskets/', include(BASKET_URLS, namespace='baskets')),
-    url(r'^coupons/', include(COUPON_URLS, namespace='vouchers')),
+    url(r'^coupons/', include(COUPON_URLS, namespace='coupons')),
+    url(r'^orders/', include(ORDER_URLS, namespace='orders')),
     url(r'^payment/', include(PAYMENT_URLS, namespace='payment')),
+    url(r'^vouchers/', include(VOUCHER_URLS, namespace='vouchers')),
     url(r'^refunds/', include(REFUND_URLS, namespace='refunds')),
     url(r'^publication/', include(ATOMIC_PUBLICATION_URLS, namespace='publication')),
 ]
@@ -1,26 +1,80 @@
 """HTTP endpoints for interacting with baskets."""
+from collections import OrderedDict
 import logging
 import warnings
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.urlresolvers import reverse
 from django.db import transaction
 from django.utils.decorators import method_decorator
 from oscar.core.loading import get_class, get_model
 from rest_framework import status, generics
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 
 from ecommerce.extensions.analytics.utils import audit_log
 from ecommerce.extensions.api import data as data_api, exceptions as api_exceptions
 from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.api.idempotency import idempotent
 from ecommerce.extensions.api.serializers import OrderSerializer
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
 from ecommerce.extensions.payment import exceptions as payment_exceptions
 from ecommerce.extensions.payment.helpers import (get_default_processor_class, get_processor_class_by_name)
+from ecommerce.extensions.payment.tasks import (generate_payment_data, get_payment_data, set_payment_data,
+                                                PaymentDataStatus)
 
 Basket = get_model('basket', 'Basket')
 logger = logging.getLogger(__name__)
 Order = get_model('order', 'Order')
 OrderNumberGenerator = get_class('order.utils', 'OrderNumberGenerator')
+User = get_user_model()
+
+
+def _get_unavailable_messages(basket, products):
+    """Describe each of the given products which is not available to buy.
+
+    Arguments:
+        basket (Basket): The basket to which the products are to be added.
+        products (dict): Products keyed by SKU.
+
+    Returns:
+        list: Developer messages, one for each unavailable product.
+    """
+    unavailable_messages = []
+    for sku, product in products.items():
+        availability = basket.strategy.fetch_for_product(product).availability
+        if not availability.is_available_to_buy:
+            unavailable_messages.append(
+                api_exceptions.PRODUCT_UNAVAILABLE_DEVELOPER_MESSAGE.format(
+                    sku=sku,
+                    availability=availability.message
+                )
+            )
+
+    return unavailable_messages
+
+
+def _is_valid_basket_object(requested_basket):
+    """Determine whether a requested basket, and each of its requested products, is of the expected type.
+
+    Usernames, product objects and SKUs may be missing, in which case the basket is reported as a failure.
+    """
+    if not isinstance(requested_basket, dict) or not _is_string_or_none(requested_basket.get(AC.KEYS.USERNAME)):
+        return False
+
+    requested_products = requested_basket.get(AC.KEYS.PRODUCTS) or []
+    if not isinstance(requested_products, list):
+        return False
+
+    return all(
+        isinstance(requested_product, dict) and _is_string_or_none(requested_product.get(AC.KEYS.SKU))
+        for requested_product in requested_products
+    )
+
+
+def _is_string_or_none(value):
+    return value is None or isinstance(value, basestring)
 
 
 class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
@@ -39,6 +93,7 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
     def dispatch(self, request, *args, **kwargs):
         return super(BasketCreateView, self).dispatch(request, *args, **kwargs)
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         """Add products to the authenticated user's basket.
 
@@ -60,17 +115,31 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
         contain user details. At a minimum, these details must include a
         username; providing an email is recommended.
 
+        Generating payment parameters may require a request to the payment processor (e.g., PayPal). Callers
+        can avoid waiting on this request by providing a Boolean value in the request body, 'async'. If
+        asynchronous checkout is requested and payment is required, the endpoint responds immediately with
+        a URL, 'payment_data_url', which should be polled for the payment information.
+
+        Callers which may retry the request (e.g., on timeout) should provide a unique value in the
+        Idempotency-Key HTTP header. Retries carrying the same key receive the response to the original
+        request, without the basket being modified or payment being initiated again.
+
         Arguments:
-            request (HttpRequest): With parameters 'products', 'checkout', and
+            request (HttpRequest): With parameters 'products', 'checkout', 'async', and
                 'payment_processor_name' in the body.
 
         Returns:
             200 if a basket was created successfully; the basket ID is included in the response body along with
                 either an order number corresponding to the placed order (None if one wasn't placed) or
                 payment information (None if payment isn't required).
+            202 if a basket was created successfully and payment information is being generated asynchronously;
+                the basket ID is included in the response body along with the URL from which payment information
+                can be retrieved.
             400 if the client provided invalid data or attempted to add an unavailable product to their basket,
-                with reason for the failure in JSON format.
+                with reason for the failure in JSON format, or if the idempotency key has already been used
+                for a request with a different body.
             401 if an unauthenticated request is denied permission to access the endpoint.
+            409 if a request with the same idempotency key is still being processed.
             429 if the client has made requests at a rate exceeding that allowed by the configured rate limit.
             500 if an error occurs when attempting to initiate checkout.
 
@@ -131,44 +200,41 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
             basket = Basket.get_basket(request.user, request.site)
 
             requested_products = request.data.get(AC.KEYS.PRODUCTS)
-            if requested_products:
-                for requested_product in requested_products:
-                    # Ensure the requested products exist
-                    sku = requested_product.get(AC.KEYS.SKU)
-                    if sku:
-                        try:
-                            product = data_api.get_product(sku)
-                        except api_exceptions.ProductNotFoundError as error:
-                            return self._report_bad_request(
-                                error.message,
-                                api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE
-                            )
-                    else:
-                        return self._report_bad_request(
-                            api_exceptions.SKU_NOT_FOUND_DEVELOPER_MESSAGE,
-                            api_exceptions.SKU_NOT_FOUND_USER_MESSAGE
-                        )
-
-                    # Ensure the requested products are available for purchase before adding them to the basket
-                    availability = basket.strategy.fetch_for_product(product).availability
-                    if not availability.is_available_to_buy:
-                        return self._report_bad_request(
-                            api_exceptions.PRODUCT_UNAVAILABLE_DEVELOPER_MESSAGE.format(
-                                sku=sku,
-                                availability=availability.message
-                            ),
-                            api_exceptions.PRODUCT_UNAVAILABLE_USER_MESSAGE
-                        )
-
-                    basket.add_product(product)
-                    logger.info(u"Added product with SKU [%s] to basket [%d]", sku, basket.id)
-            else:
+            if not requested_products:
                 # If no products were included in the request, we cannot checkout.
                 return self._report_bad_request(
                     api_exceptions.PRODUCT_OBJECTS_MISSING_DEVELOPER_MESSAGE,
                     api_exceptions.PRODUCT_OBJECTS_MISSING_USER_MESSAGE
                 )
 
+            skus = [requested_product.get(AC.KEYS.SKU) for requested_product in requested_products]
+            if not all(skus):
+                return self._report_bad_request(
+                    api_exceptions.SKU_NOT_FOUND_DEVELOPER_MESSAGE,
+                    api_exceptions.SKU_NOT_FOUND_USER_MESSAGE
+                )
+
+            # Ensure the requested products exist. All SKUs are resolved at once.
+            try:
+                products = data_api.get_products(skus)
+            except api_exceptions.ProductNotFoundError as error:
+                return self._report_bad_request(
+                    error.message,
+                    api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE
+                )
+
+            # Ensure the requested products are available for purchase before adding any of them to the basket
+            unavailable_messages = _get_unavailable_messages(basket, products)
+            if unavailable_messages:
+                return self._report_bad_request(
+                    u' '.join(unavailable_messages),
+                    api_exceptions.PRODUCT_UNAVAILABLE_USER_MESSAGE
+                )
+
+            for sku in skus:
+                basket.add_product(products[sku])
+                logger.info(u"Added product with SKU [%s] to basket [%d]", sku, basket.id)
+
         if request.data.get(AC.KEYS.CHECKOUT) is True:
             # Begin the checkout process, if requested, with the requested payment processor.
             payment_processor_name = request.data.get(AC.KEYS.PAYMENT_PROCESSOR_NAME)
@@ -184,7 +250,11 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
                 payment_processor = get_default_processor_class()
 
             try:
-                response_data = self._checkout(basket, payment_processor())
+                response_data = self._checkout(
+                    basket,
+                    payment_processor(),
+                    asynchronous=request.data.get(AC.KEYS.ASYNC) is True
+                )
             except Exception as ex:  # pylint: disable=broad-except
                 basket.thaw()
                 logger.exception('Failed to initiate checkout for Basket [%d]. Basket has been thawed.', basket.id)
@@ -193,9 +263,12 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
             # Return a serialized basket, if checkout was not requested.
             response_data = self._generate_basic_response(basket)
 
+        if response_data.get(AC.KEYS.PAYMENT_DATA_URL):
+            return Response(response_data, status=status.HTTP_202_ACCEPTED)
+
         return Response(response_data, status=status.HTTP_200_OK)
 
-    def _checkout(self, basket, payment_processor):
+    def _checkout(self, basket, payment_processor, asynchronous=False):
         """Perform checkout operations for the given basket.
 
         If the contents of the basket are free, places an order immediately. Otherwise,
@@ -209,6 +282,8 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
             basket (Basket): The basket on which to perform checkout operations.
             payment_processor (class): An instance of the payment processor class corresponding
                 to the payment processor the user will visit to pay for the items in their basket.
+            asynchronous (bool): If True, payment parameters are generated by a Celery task rather than
+                during the request. The response data includes a URL from which they can be retrieved.
 
         Returns:
             dict: Response data.
@@ -250,6 +325,15 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
             # Note: Our order serializer could be used here, but in an effort to pare down the information
             # returned by this endpoint, simply returning the order number will suffice for now.
             response_data[AC.KEYS.ORDER] = {AC.KEYS.ORDER_NUMBER: order.number}
+        elif asynchronous:
+            # The pending state must be recorded before the task is enqueued, since the task may
+            # complete (and record its result) before delay() returns.
+            set_payment_data(basket.id, PaymentDataStatus.PENDING)
+            generate_payment_data.delay(basket.id, payment_processor.NAME)
+
+            response_data[AC.KEYS.PAYMENT_DATA_URL] = self.request.build_absolute_uri(
+                reverse('api:v2:baskets:payment_data', kwargs={'basket_id': basket.id})
+            )
         else:
             parameters = payment_processor.get_transaction_parameters(basket, request=self.request)
             payment_page_url = parameters.pop('payment_page_url')
@@ -295,6 +379,264 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
         )
 
 
+class BasketBatchCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
+    """Endpoint for creating baskets, and placing free orders, on behalf of many users at once."""
+    permission_classes = (IsAuthenticated, IsAdminUser,)
+
+    # See BasketCreateView. Orders must be committed before they can be fulfilled asynchronously.
+    @method_decorator(transaction.non_atomic_requests)
+    def dispatch(self, request, *args, **kwargs):
+        return super(BasketBatchCreateView, self).dispatch(request, *args, **kwargs)
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """Add products to the baskets of many users.
+
+        Expects an array of basket objects, 'baskets', in the request body. Each basket object contains
+        a username and an array of product objects, 'products', formatted as expected by the basket
+        creation endpoint. Baskets are only created for existing users; baskets requested for unknown
+        usernames are reported as failures. The products and users for all baskets are retrieved at once.
+
+        If the caller provides a Boolean value in the request body, 'checkout', orders are placed for
+        the contents of each basket. Only free baskets can be checked out in bulk; baskets which require
+        payment are reported as failures, and are left unmodified.
+
+        Baskets are created, and orders placed, in transactions of BASKET_BATCH_CHUNK_SIZE baskets.
+        Fulfillment of the orders placed in each transaction is initiated once it has been committed.
+        A failure to create one basket, expected or otherwise, does not prevent the creation of the others.
+
+        Restricted to staff users. Callers which may retry the request should provide a unique value in
+        the Idempotency-Key HTTP header, as with the basket creation endpoint.
+
+        Arguments:
+            request (HttpRequest): With parameters 'baskets' and 'checkout' in the body.
+
+        Returns:
+            200 if the request was processed; the response body contains a result for each requested basket,
+                in the order requested. Each result contains the username, and either the basket ID and the
+                order number corresponding to the placed order (None if one wasn't placed), or the reason
+                the basket could not be created.
+            400 if the request body does not contain any basket objects, or contains too many, or any which are
+                malformed, or if the idempotency key has already been used for a request with a different body.
+            401 if an unauthenticated request is denied permission to access the endpoint.
+            403 if the requesting user is not staff.
+            409 if a request with the same idempotency key is still being processed.
+            429 if the client has made requests at a rate exceeding that allowed by the configured rate limit.
+
+        Examples:
+            >>> url = 'http://localhost:8002/api/v2/baskets/batch/'
+            >>> data = {
+                'baskets': [
+                    {'username': 'Saul', 'products': [{'sku': 'FREE-SEAT'}]},
+                    {'username': 'Kim', 'products': [{'sku': 'PAID-SEAT'}]},
+                ],
+                'checkout': True
+            }
+            >>> response = requests.post(url, data=json.dumps(data), headers=headers)
+            >>> response.json()
+            [
+                {
+                    u'username': u'Saul',
+                    u'id': 7,
+                    u'order': {u'number': u'OSCR-100007'}
+                },
+                {
+                    u'username': u'Kim',
+                    u'developer_message': u'Basket [8] is not free. Only free baskets can be checked out in bulk'
+                }
+            ]
+        """
+        requested_baskets = request.data.get(AC.KEYS.BASKETS)
+        if not requested_baskets or not isinstance(requested_baskets, list):
+            return self._report_bad_request(api_exceptions.BASKET_OBJECTS_MISSING_DEVELOPER_MESSAGE)
+
+        max_size = settings.BASKET_BATCH_MAX_SIZE
+        if len(requested_baskets) > max_size:
+            return self._report_bad_request(
+                api_exceptions.TOO_MANY_BASKETS_DEVELOPER_MESSAGE.format(max_size=max_size)
+            )
+
+        if not all(_is_valid_basket_object(requested_basket) for requested_basket in requested_baskets):
+            return self._report_bad_request(api_exceptions.INVALID_BASKET_OBJECTS_DEVELOPER_MESSAGE)
+
+        # Retrieve every requested product, and every existing user, up front.
+        skus = set()
+        usernames = set()
+        for requested_basket in requested_baskets:
+            usernames.add(requested_basket.get(AC.KEYS.USERNAME))
+            for requested_product in requested_basket.get(AC.KEYS.PRODUCTS) or []:
+                skus.add(requested_product.get(AC.KEYS.SKU))
+        skus.discard(None)
+
+        products = data_api.find_products(list(skus))
+        users = {user.username: user for user in User.objects.filter(username__in=usernames)}
+        checkout = request.data.get(AC.KEYS.CHECKOUT) is True
+
+        results = []
+        chunk_size = settings.BASKET_BATCH_CHUNK_SIZE
+        for start in xrange(0, len(requested_baskets), chunk_size):
+            orders = []
+
+            with transaction.atomic():
+                for requested_basket in requested_baskets[start:start + chunk_size]:
+                    result = {AC.KEYS.USERNAME: requested_basket.get(AC.KEYS.USERNAME)}
+
+                    try:
+                        # Each basket is created in a savepoint, so that its failure does not
+                        # roll back the other baskets in the transaction.
+                        with transaction.atomic():
+                            basket, order = self._create_basket(requested_basket, products, users, checkout)
+                    except api_exceptions.ApiError as error:
+                        logger.error(error.message)
+                        result['developer_message'] = error.message
+                    except Exception:  # pylint: disable=broad-except
+                        # Baskets in earlier transactions have been committed, and their orders fulfilled,
+                        # so the request must not fail. Otherwise, a retry would place duplicate orders.
+                        logger.exception(
+                            u"An unexpected error occurred while creating a basket for [%s].", result[AC.KEYS.USERNAME]
+                        )
+                        result['developer_message'] = api_exceptions.BASKET_CREATION_FAILED_DEVELOPER_MESSAGE
+                    else:
+                        result[AC.KEYS.BASKET_ID] = basket.id
+                        result[AC.KEYS.ORDER] = {AC.KEYS.ORDER_NUMBER: order.number} if order else None
+                        if order:
+                            orders.append(order)
+
+                    results.append(result)
+
+            # The transaction has been committed, so the orders can now be fulfilled. If fulfillment cannot be
+            # initiated, the orders remain open, and can be re-fulfilled with the refulfill_orders command.
+            if orders:
+                try:
+                    self.handle_successful_orders(orders)
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception(
+                        u"Failed to initiate fulfillment of orders [%s].", u', '.join(order.number for order in orders)
+                    )
+
+        return Response(results, status=status.HTTP_200_OK)
+
+    def _create_basket(self, requested_basket, products, users, checkout):
+        """Populate a user's basket, placing an order for its contents if requested.
+
+        Arguments:
+            requested_basket (dict): Containing a username and an array of product objects.
+            products (dict): Products for all requested baskets, keyed by SKU.
+            users (dict): Existing users for all requested baskets, keyed by username.
+            checkout (bool): Whether an order should be placed for the contents of the basket.
+
+        Returns:
+            tuple: The basket, and the order placed for its contents (None if one wasn't placed).
+
+        Raises:
+            ApiError: If the basket could not be created, or checkout could not be performed.
+        """
+        username = requested_basket.get(AC.KEYS.USERNAME)
+        if not username:
+            raise api_exceptions.ApiError(api_exceptions.USERNAME_NOT_FOUND_DEVELOPER_MESSAGE)
+
+        requested_products = requested_basket.get(AC.KEYS.PRODUCTS)
+        if not requested_products:
+            raise api_exceptions.ApiError(api_exceptions.PRODUCT_OBJECTS_MISSING_DEVELOPER_MESSAGE)
+
+        skus = [requested_product.get(AC.KEYS.SKU) for requested_product in requested_products]
+        if not all(skus):
+            raise api_exceptions.ApiError(api_exceptions.SKU_NOT_FOUND_DEVELOPER_MESSAGE)
+
+        missing_skus = [sku for sku in skus if sku not in products]
+        if missing_skus:
+            raise api_exceptions.ProductNotFoundError(
+                api_exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=u', '.join(missing_skus))
+            )
+
+        user = users.get(username)
+        if not user:
+            raise api_exceptions.ApiError(api_exceptions.USER_NOT_FOUND_DEVELOPER_MESSAGE.format(username=username))
+
+        basket = Basket.get_basket(user, self.request.site)
+        basket_products = OrderedDict((sku, products[sku]) for sku in skus)
+
+        unavailable_messages = _get_unavailable_messages(basket, basket_products)
+        if unavailable_messages:
+            raise api_exceptions.ApiError(u' '.join(unavailable_messages))
+
+        for sku, product in basket_products.items():
+            basket.add_product(product)
+            logger.info(u"Added product with SKU [%s] to basket [%d]", sku, basket.id)
+
+        if not checkout:
+            return basket, None
+
+        if basket.total_excl_tax != AC.FREE:
+            raise api_exceptions.ApiError(
+                api_exceptions.PAYMENT_REQUIRED_DEVELOPER_MESSAGE.format(basket_id=basket.id)
+            )
+
+        basket.freeze()
+
+        audit_log(
+            'basket_frozen',
+            amount=basket.total_excl_tax,
+            basket_id=basket.id,
+            currency=basket.currency,
+            user_id=basket.owner.id
+        )
+
+        order_metadata = data_api.get_order_metadata(basket)
+
+        logger.info(
+            u"Preparing to place order [%s] for the contents of basket [%d]",
+            order_metadata[AC.KEYS.ORDER_NUMBER],
+            basket.id,
+        )
+
+        order = self.submit_order(
+            order_number=order_metadata[AC.KEYS.ORDER_NUMBER],
+            user=basket.owner,
+            basket=basket,
+            shipping_address=None,
+            shipping_method=order_metadata[AC.KEYS.SHIPPING_METHOD],
+            shipping_charge=order_metadata[AC.KEYS.SHIPPING_CHARGE],
+            billing_address=None,
+            order_total=order_metadata[AC.KEYS.ORDER_TOTAL],
+        )
+
+        return basket, order
+
+    def _report_bad_request(self, developer_message):
+        """Log error and create a response containing conventional error messaging."""
+        logger.error(developer_message)
+        return Response({'developer_message': developer_message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BasketPaymentDataView(generics.GenericAPIView):
+    """Allow the polling of payment data generated during asynchronous checkout."""
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, basket_id):
+        """Retrieve the payment data generated for a basket.
+
+        Returns:
+            200 if the payment data is available, with the payment data in the response body.
+            202 if the payment data is still being generated.
+            404 if payment data is not being generated for the basket, or the basket belongs to another user.
+            500 if the payment data could not be generated. The basket has been thawed, and checkout may be retried.
+        """
+        basket = generics.get_object_or_404(Basket.objects.all(), id=basket_id)
+        payment_data = get_payment_data(basket.id)
+
+        if payment_data is None or not (request.user.is_staff or basket.owner == request.user):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        response_status = {
+            PaymentDataStatus.PENDING: status.HTTP_202_ACCEPTED,
+            PaymentDataStatus.COMPLETE: status.HTTP_200_OK,
+            PaymentDataStatus.FAILED: status.HTTP_500_INTERNAL_SERVER_ERROR,
+        }[payment_data['status']]
+
+        return Response(payment_data, status=response_status)
+
+
 class OrderByBasketRetrieveView(generics.RetrieveAPIView):
     """Allow the viewing of Orders by Basket. """
     permission_classes = (IsAuthenticated,)
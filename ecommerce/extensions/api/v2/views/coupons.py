@@ -4,31 +4,40 @@ import logging
 from decimal import Decimal
 import dateutil.parser
 
+from django.conf import settings
+from django.core.urlresolvers import reverse
 from django.db import transaction
 from django.db.utils import IntegrityError
+from django.utils.decorators import method_decorator
 from oscar.core.loading import get_model
 from rest_framework import status
+from rest_framework.decorators import detail_route
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 
 from ecommerce.core.models import Client
 from ecommerce.extensions.api import data as data_api
 from ecommerce.extensions.api.constants import APIConstants as AC
-from ecommerce.extensions.api.serializers import CouponSerializer
+from ecommerce.extensions.api.idempotency import idempotent
+from ecommerce.extensions.api.serializers import CouponListSerializer, CouponSerializer, VoucherSerializer
 from ecommerce.extensions.api.v2.views import NonDestroyableModelViewSet
+from ecommerce.extensions.catalogue.registry import product_class_registry
 from ecommerce.extensions.catalogue.utils import generate_sku, get_or_create_catalog, generate_coupon_slug
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
 from ecommerce.extensions.payment.processors.invoice import InvoicePayment
+from ecommerce.extensions.voucher.cache import voucher_code_cache
 from ecommerce.extensions.voucher.models import CouponVouchers
-from ecommerce.extensions.voucher.utils import create_vouchers
+from ecommerce.extensions.voucher.tasks import (get_voucher_generation, retry_voucher_generation,
+                                                start_voucher_generation, VoucherGenerationStatus)
+from ecommerce.extensions.voucher.utils import claim_pooled_codes, create_vouchers, update_coupon_summary
 
 Basket = get_model('basket', 'Basket')
 Catalog = get_model('catalogue', 'Catalog')
 logger = logging.getLogger(__name__)
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
-ProductClass = get_model('catalogue', 'ProductClass')
 StockRecord = get_model('partner', 'StockRecord')
+Voucher = get_model('voucher', 'Voucher')
 
 
 class CouponViewSet(EdxOrderPlacementMixin, NonDestroyableModelViewSet):
@@ -41,6 +50,29 @@ class CouponViewSet(EdxOrderPlacementMixin, NonDestroyableModelViewSet):
     serializer_class = CouponSerializer
     permission_classes = (IsAuthenticated, IsAdminUser)
 
+    def get_queryset(self):
+        queryset = super(CouponViewSet, self).get_queryset()
+        if self.action == 'list':
+            queryset = queryset.select_related(
+                'coupon_summary__client', 'coupon_summary__last_edited_by'
+            ).prefetch_related(
+                'coupon_summary__seats', 'stockrecords'
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CouponListSerializer
+        return self.serializer_class
+
+    # Disable atomicity for the view. Otherwise, we'd be unable to commit to the database
+    # until the request had concluded. Without the coupon present in the database at the time
+    # its vouchers are created, the asynchronous voucher generation task will fail.
+    @method_decorator(transaction.non_atomic_requests)
+    def dispatch(self, request, *args, **kwargs):
+        return super(CouponViewSet, self).dispatch(request, *args, **kwargs)
+
+    @idempotent
     def create(self, request, *args, **kwargs):
         """Adds coupon to the user's basket.
 
@@ -51,26 +83,40 @@ class CouponViewSet(EdxOrderPlacementMixin, NonDestroyableModelViewSet):
         Arguments:
             request (HttpRequest): With parameters title, client_username,
             stock_record_ids, start_date, end_date, code, benefit_type,
-            benefit_value, voucher_type, quantity and price in the body.
+            benefit_value, voucher_type, quantity and price in the body. An optional
+            Idempotency-Key header prevents retried requests from creating duplicate coupons.
+
+        Coupons with more than settings.VOUCHER_ASYNC_GENERATION_THRESHOLD vouchers have their
+        vouchers created by a background task. The response to such requests includes a URL,
+        'voucher_generation_url', which can be polled for the progress of the task.
 
         Returns:
             200 if the order was created successfully; the basket ID is included in the response
                 body along with the order ID and payment information.
+            202 if the order was created successfully, and the coupon's vouchers are being created
+                by a background task.
             401 if an unauthenticated request is denied permission to access the endpoint.
+            409 if a request with the same idempotency key is still being processed.
             429 if the client has made requests at a rate exceeding that allowed by the configured rate limit.
             500 if an error occurs when attempting to create a coupon.
         """
+        code = request.data[AC.KEYS.CODE]
+        quantity = request.data[AC.KEYS.QUANTITY]
+        asynchronous = not code and int(quantity) > settings.VOUCHER_ASYNC_GENERATION_THRESHOLD
+
+        # Codes are claimed from the pool before the coupon's transaction starts, so that the pool is not
+        # locked until that transaction commits. Vouchers created by the background task claim their own.
+        codes = None if code or asynchronous else claim_pooled_codes(int(quantity))
+
         with transaction.atomic():
             title = request.data[AC.KEYS.TITLE]
             client_username = request.data[AC.KEYS.CLIENT_USERNAME]
             stock_record_ids = request.data[AC.KEYS.STOCK_RECORD_IDS]
             start_date = dateutil.parser.parse(request.data[AC.KEYS.START_DATE])
             end_date = dateutil.parser.parse(request.data[AC.KEYS.END_DATE])
-            code = request.data[AC.KEYS.CODE]
             benefit_type = request.data[AC.KEYS.BENEFIT_TYPE]
             benefit_value = request.data[AC.KEYS.BENEFIT_VALUE]
             voucher_type = request.data[AC.KEYS.VOUCHER_TYPE]
-            quantity = request.data[AC.KEYS.QUANTITY]
             price = request.data[AC.KEYS.PRICE]
             partner = request.site.siteconfiguration.partner
 
@@ -92,12 +138,13 @@ class CouponViewSet(EdxOrderPlacementMixin, NonDestroyableModelViewSet):
                 'catalog': coupon_catalog,
                 'end_date': end_date,
                 'code': code,
+                'codes': codes,
                 'quantity': quantity,
                 'start_date': start_date,
                 'voucher_type': voucher_type
             }
 
-            coupon_product = self.create_coupon_product(title, price, data)
+            coupon_product = self.create_coupon_product(title, price, data, asynchronous=asynchronous)
 
             basket = self.add_product_to_basket(
                 product=coupon_product,
@@ -109,9 +156,30 @@ class CouponViewSet(EdxOrderPlacementMixin, NonDestroyableModelViewSet):
             # Create an order now since payment is handled out of band via an invoice.
             response_data = self.create_order_for_invoice(basket, coupon_id=coupon_product.id)
 
+            update_coupon_summary(coupon_product, client=client)
+
+        if not asynchronous:
             return Response(response_data, status=status.HTTP_200_OK)
 
-    def create_coupon_product(self, title, price, data):
+        # The task is only sent once the coupon has been committed, so that the worker can retrieve it.
+        start_voucher_generation(
+            coupon_product.id,
+            coupon_catalog.id,
+            title,
+            benefit_type,
+            str(benefit_value),
+            start_date.isoformat(),
+            end_date.isoformat(),
+            voucher_type,
+            int(quantity)
+        )
+
+        response_data[AC.KEYS.VOUCHER_GENERATION_URL] = request.build_absolute_uri(
+            reverse('api:v2:coupons-voucher-generation', kwargs={'pk': coupon_product.id})
+        )
+        return Response(response_data, status=status.HTTP_202_ACCEPTED)
+
+    def create_coupon_product(self, title, price, data, asynchronous=False):
         """Creates a coupon product and a stock record for it.
 
         Arguments:
@@ -124,9 +192,12 @@ class CouponViewSet(EdxOrderPlacementMixin, NonDestroyableModelViewSet):
                 - catalog (Catalog)
                 - end_date (Datetime)
                 - code (str)
+                - codes (list): Codes claimed from the voucher code pool (optional)
                 - quantity (int)
                 - start_date (Datetime)
                 - voucher_type (str)
+            asynchronous (bool): If True, vouchers are not created. The caller is
+                responsible for creating them, e.g. with a background task.
 
         Returns:
             A coupon product object.
@@ -139,7 +210,7 @@ class CouponViewSet(EdxOrderPlacementMixin, NonDestroyableModelViewSet):
         """
         coupon_slug = generate_coupon_slug(title=title, catalog=data['catalog'], partner=data['partner'])
 
-        product_class = ProductClass.objects.get(slug='coupon')
+        product_class = product_class_registry.get(slug='coupon')
         coupon_product, __ = Product.objects.get_or_create(
             title=title,
             product_class=product_class,
@@ -147,20 +218,25 @@ class CouponViewSet(EdxOrderPlacementMixin, NonDestroyableModelViewSet):
         )
 
         # Vouchers are created during order and not fulfillment like usual
-        # because we want vouchers to be part of the line in the order.
+        # because we want vouchers to be part of the line in the order. Large
+        # numbers of vouchers are instead created by a background task.
         try:
-            create_vouchers(
-                name=title,
-                benefit_type=data['benefit_type'],
-                benefit_value=Decimal(data['benefit_value']),
-                catalog=data['catalog'],
-                coupon=coupon_product,
-                end_datetime=data['end_date'],
-                code=data['code'] or None,
-                quantity=int(data['quantity']),
-                start_datetime=data['start_date'],
-                voucher_type=data['voucher_type']
-            )
+            if asynchronous:
+                CouponVouchers.objects.get_or_create(coupon=coupon_product)
+            else:
+                create_vouchers(
+                    name=title,
+                    benefit_type=data['benefit_type'],
+                    benefit_value=Decimal(data['benefit_value']),
+                    catalog=data['catalog'],
+                    coupon=coupon_product,
+                    end_datetime=data['end_date'],
+                    code=data['code'] or None,
+                    codes=data.get('codes'),
+                    quantity=int(data['quantity']),
+                    start_datetime=data['start_date'],
+                    voucher_type=data['voucher_type']
+                )
         except IntegrityError as ex:
             logger.exception('Failed to create vouchers for [%s] coupon.', coupon_product.title)
             raise IntegrityError(ex)  # pylint: disable=nonstandard-exception
@@ -239,16 +315,70 @@ class CouponViewSet(EdxOrderPlacementMixin, NonDestroyableModelViewSet):
 
     def update(self, request, *args, **kwargs):
         """Update start and end dates of all vouchers associated with the coupon."""
-        super(CouponViewSet, self).update(request, *args, **kwargs)
-        coupon = self.get_object()
+        with transaction.atomic():
+            super(CouponViewSet, self).update(request, *args, **kwargs)
+            coupon = self.get_object()
 
-        start_datetime = request.data.get('start_datetime', '')
-        if start_datetime:
-            coupon.attr.coupon_vouchers.vouchers.all().update(start_datetime=start_datetime)
+            start_datetime = request.data.get('start_datetime', '')
+            if start_datetime:
+                coupon.attr.coupon_vouchers.vouchers.all().update(start_datetime=start_datetime)
 
-        end_datetime = request.data.get('end_datetime', '')
-        if end_datetime:
-            coupon.attr.coupon_vouchers.vouchers.all().update(end_datetime=end_datetime)
+            end_datetime = request.data.get('end_datetime', '')
+            if end_datetime:
+                coupon.attr.coupon_vouchers.vouchers.all().update(end_datetime=end_datetime)
+
+            update_coupon_summary(coupon)
+
+        if start_datetime or end_datetime:
+            # Bulk updates do not send the signals which invalidate cached voucher code lookups.
+            voucher_code_cache.invalidate()
 
         serializer = self.get_serializer(coupon)
         return Response(serializer.data)
+
+    @detail_route()
+    def vouchers(self, request, pk=None):  # pylint: disable=unused-argument
+        """Return a page of the vouchers associated with the coupon."""
+        coupon = self.get_object()
+        vouchers = Voucher.objects.filter(
+            coupon_vouchers__coupon=coupon
+        ).prefetch_related(
+            'offers__benefit'
+        ).order_by('id')
+
+        page = self.paginate_queryset(vouchers)
+        serializer = VoucherSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+    @detail_route(methods=['get', 'post'])
+    def voucher_generation(self, request, pk=None):  # pylint: disable=unused-argument
+        """Return the progress of the coupon's vouchers being created by a background task.
+
+        POST requests retry the task if it failed, and return the progress of the retry.
+
+        Returns:
+            200 if the vouchers have been created.
+            202 if the vouchers are still being created, or the task is being retried.
+            404 if no vouchers are being created for the coupon.
+            409 if a retry was requested, but the task has not failed, or is already being retried.
+            500 if creating the vouchers failed.
+        """
+        coupon = self.get_object()
+        voucher_generation = get_voucher_generation(coupon.id)
+
+        if voucher_generation is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        if request.method == 'POST':
+            if not retry_voucher_generation(coupon.id):
+                return Response(voucher_generation, status=status.HTTP_409_CONFLICT)
+            voucher_generation = get_voucher_generation(coupon.id)
+
+        response_status = {
+            VoucherGenerationStatus.PENDING: status.HTTP_202_ACCEPTED,
+            VoucherGenerationStatus.IN_PROGRESS: status.HTTP_202_ACCEPTED,
+            VoucherGenerationStatus.COMPLETE: status.HTTP_200_OK,
+            VoucherGenerationStatus.FAILED: status.HTTP_500_INTERNAL_SERVER_ERROR,
+        }[voucher_generation['status']]
+
+        return Response(voucher_generation, status=response_status)
@@ -1,16 +1,24 @@
 """HTTP endpoints for interacting with orders."""
 import logging
+import uuid
 
+from django.core.urlresolvers import reverse
 from oscar.core.loading import get_model, get_class
-from rest_framework import status, viewsets
+from rest_framework import generics, status, viewsets
 from rest_framework.decorators import detail_route
-from rest_framework.permissions import IsAuthenticated, DjangoModelPermissions
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, DjangoModelPermissions
 from rest_framework.response import Response
 
-from ecommerce.extensions.api import serializers
+from ecommerce.extensions.api import exceptions as api_exceptions, serializers
 from ecommerce.extensions.api.constants import APIConstants as AC
 from ecommerce.extensions.api.permissions import IsStaffOrOwner
 from ecommerce.extensions.api.throttles import ServiceUserThrottle
+from ecommerce.extensions.fulfillment.refulfillment import (
+    claim_order, get_refulfillable_orders, parse_datetime, release_order
+)
+from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.fulfillment.tasks import (get_refulfillment, refulfill_orders, set_refulfillment,
+                                                    RefulfillmentStatus)
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +50,17 @@ class OrderViewSet(viewsets.ReadOnlyModelViewSet):
         if not order.is_fulfillable:
             return Response(status=status.HTTP_406_NOT_ACCEPTABLE)
 
+        if not claim_order(order):
+            # The order is being fulfilled by another process (e.g., bulk re-fulfillment, or a retry run).
+            logger.info('Order [%s] is already being fulfilled.', order.number)
+            return Response(status=status.HTTP_409_CONFLICT)
+
         logger.info('Attempting fulfillment of order [%s]...', order.number)
         post_checkout = get_class('checkout.signals', 'post_checkout')
-        post_checkout.send(sender=post_checkout, order=order)
+        try:
+            post_checkout.send(sender=post_checkout, order=order)
+        finally:
+            release_order(order)
 
         if order.is_fulfillable:
             logger.warning('Fulfillment of order [%s] failed!', order.number)
@@ -52,3 +68,124 @@ class OrderViewSet(viewsets.ReadOnlyModelViewSet):
 
         serializer = self.get_serializer(order)
         return Response(serializer.data)
+
+
+class OrderRefulfillView(generics.GenericAPIView):
+    """Endpoint for re-fulfilling orders in bulk."""
+    permission_classes = (IsAuthenticated, IsAdminUser,)
+
+    def post(self, request):
+        """Re-fulfill orders in bulk.
+
+        Orders are selected by the criteria in the request body, and re-fulfilled by a background task, whose
+        progress can be polled at the returned 'refulfillment_url'. Restricted to staff users.
+
+        Arguments:
+            request (HttpRequest): With optional parameters 'statuses' (defaults to ['Fulfillment Error']),
+                'start_date', 'end_date' (times without a timezone are taken to be UTC), 'product_class', 'course_id',
+                'after' (the ID after which orders are re-fulfilled, used to resume an earlier job from its
+                checkpoint), and 'dry_run' in the body.
+
+        Returns:
+            200 if the request is a dry run; the response body contains the number of orders selected.
+            202 if the orders are being re-fulfilled; the response body contains the number of orders selected,
+                the ID of the job re-fulfilling them, and the URL at which its progress can be polled.
+            400 if the criteria are invalid.
+            401 if an unauthenticated request is denied permission to access the endpoint.
+            403 if the requesting user is not staff.
+
+        Examples:
+            >>> url = 'http://localhost:8002/api/v2/orders/refulfill/'
+            >>> data = {'statuses': ['Fulfillment Error'], 'start_date': '2016-01-01T00:00:00Z'}
+            >>> response = requests.post(url, data=json.dumps(data), headers=headers)
+            >>> response.json()
+            {
+                u'count': 5000,
+                u'id': u'b7e0c4e8bd2f4fb7a0a1f2a3e4c5d6e7',
+                u'refulfillment_url': u'http://localhost:8002/api/v2/orders/refulfill/b7e0c4e8bd2f4fb7a0a1f2a3e4c5d6e7/'
+            }
+        """
+        data = request.data
+        statuses = data.get(AC.KEYS.STATUSES) or [ORDER.FULFILLMENT_ERROR]
+        start_date = data.get(AC.KEYS.START_DATE)
+        end_date = data.get(AC.KEYS.END_DATE)
+        product_class = data.get(AC.KEYS.PRODUCT_CLASS)
+        course_id = data.get(AC.KEYS.COURSE_ID)
+        after = data.get(AC.KEYS.AFTER)
+
+        try:
+            if not isinstance(statuses, list):
+                raise ValueError('Statuses must be given as a list.')
+
+            orders = get_refulfillable_orders(
+                statuses=statuses,
+                start=parse_datetime(start_date) if start_date else None,
+                end=parse_datetime(end_date) if end_date else None,
+                product_class=product_class,
+                course_id=course_id
+            )
+            after = int(after) if after else None
+        except (TypeError, ValueError) as ex:
+            return self._report_bad_request(
+                api_exceptions.INVALID_REFULFILLMENT_CRITERIA_DEVELOPER_MESSAGE.format(error=ex)
+            )
+
+        count = (orders.filter(id__gt=after) if after else orders).count()
+        if data.get(AC.KEYS.DRY_RUN):
+            return Response({AC.KEYS.COUNT: count}, status=status.HTTP_200_OK)
+
+        job_id = uuid.uuid4().hex
+        logger.info('User [%s] started re-fulfillment job [%s] of [%d] orders.', request.user.username, job_id, count)
+        set_refulfillment(job_id, RefulfillmentStatus.PENDING, count, checkpoint=after)
+        refulfill_orders.delay(
+            job_id,
+            statuses,
+            start_datetime=start_date,
+            end_datetime=end_date,
+            product_class=product_class,
+            course_id=course_id,
+            after=after
+        )
+
+        return Response(
+            {
+                AC.KEYS.COUNT: count,
+                AC.KEYS.REFULFILLMENT_ID: job_id,
+                AC.KEYS.REFULFILLMENT_URL: request.build_absolute_uri(
+                    reverse('api:v2:orders:refulfillment', kwargs={'job_id': job_id})
+                ),
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    def _report_bad_request(self, developer_message):
+        """Log error and create a response containing conventional error messaging."""
+        logger.error(developer_message)
+        return Response({'developer_message': developer_message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class RefulfillmentRetrieveView(generics.GenericAPIView):
+    """Endpoint for polling the progress of orders being re-fulfilled in bulk."""
+    permission_classes = (IsAuthenticated, IsAdminUser,)
+
+    def get(self, request, job_id):  # pylint: disable=unused-argument
+        """Return the progress of a bulk re-fulfillment job.
+
+        Returns:
+            200 if the job is complete.
+            202 if the job is pending or in progress.
+            404 if the job does not exist.
+            500 if the job failed. It may be resumed by a new job, from the returned checkpoint.
+        """
+        refulfillment = get_refulfillment(job_id)
+        if refulfillment is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        response_status = {
+            RefulfillmentStatus.PENDING: status.HTTP_202_ACCEPTED,
+            RefulfillmentStatus.IN_PROGRESS: status.HTTP_202_ACCEPTED,
+            RefulfillmentStatus.COMPLETE: status.HTTP_200_OK,
+            RefulfillmentStatus.FAILED: status.HTTP_500_INTERNAL_SERVER_ERROR,
+        }[refulfillment['status']]
+
+        return Response(refulfillment, status=response_status)
@@ -31,3 +31,7 @@ class ProductViewSet(NestedViewSetMixin, NonDestroyableModelViewSet):
     filter_backends = (filters.DjangoFilterBackend,)
     filter_class = ProductFilter
     permission_classes = (IsAuthenticated, IsAdminUser,)
+
+    def get_queryset(self):
+        queryset = super(ProductViewSet, self).get_queryset()
+        return self.get_serializer_class().setup_eager_loading(queryset)
@@ -0,0 +1,82 @@
+"""HTTP endpoints for interacting with vouchers."""
+import logging
+
+from django.conf import settings
+from oscar.core.loading import get_class
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.response import Response
+
+from ecommerce.extensions.api import exceptions as api_exceptions
+from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.voucher.utils import validate_vouchers
+
+logger = logging.getLogger(__name__)
+Selector = get_class('partner.strategy', 'Selector')
+
+
+class VoucherValidateView(generics.GenericAPIView):
+    """Endpoint for checking whether many voucher codes can be redeemed."""
+    permission_classes = (IsAuthenticated, IsAdminUser,)
+
+    def post(self, request):
+        """Validate voucher codes.
+
+        Expects an array of codes, 'codes', in the request body. A code is valid if it exists and is
+        active, has not been used (for single-use codes), and its product is available to learners.
+        Codes are validated together, with a fixed number of queries per chunk of codes, rather than
+        one at a time.
+
+        Restricted to staff users.
+
+        Arguments:
+            request (HttpRequest): With parameter 'codes' in the body.
+
+        Returns:
+            200 if the codes were validated; the response body contains a result for each code, in the
+                order requested. Each result contains the code, whether it is valid, a message describing
+                why it is not, and the SKU of the product to which it applies.
+            400 if the request body does not contain any codes, or contains too many, or any which are not strings.
+            401 if an unauthenticated request is denied permission to access the endpoint.
+            403 if the requesting user is not staff.
+            429 if the client has made requests at a rate exceeding that allowed by the configured rate limit.
+
+        Examples:
+            >>> url = 'http://localhost:8002/api/v2/vouchers/validate/'
+            >>> data = {'codes': ['VALIDCODE', 'USEDCODE']}
+            >>> response = requests.post(url, data=json.dumps(data), headers=headers)
+            >>> response.json()
+            [
+                {
+                    u'code': u'VALIDCODE',
+                    u'is_valid': True,
+                    u'message': u'',
+                    u'sku': u'8CF08E5'
+                },
+                {
+                    u'code': u'USEDCODE',
+                    u'is_valid': False,
+                    u'message': u'This coupon has already been used',
+                    u'sku': u'8CF08E5'
+                }
+            ]
+        """
+        codes = request.data.get(AC.KEYS.CODES)
+        if not codes or not isinstance(codes, list):
+            return self._report_bad_request(api_exceptions.CODES_MISSING_DEVELOPER_MESSAGE)
+
+        max_size = settings.VOUCHER_VALIDATION_MAX_SIZE
+        if len(codes) > max_size:
+            return self._report_bad_request(api_exceptions.TOO_MANY_CODES_DEVELOPER_MESSAGE.format(max_size=max_size))
+
+        if not all(isinstance(code, basestring) for code in codes):
+            return self._report_bad_request(api_exceptions.INVALID_CODES_DEVELOPER_MESSAGE)
+
+        # Codes are validated on behalf of the learners to whom they will be distributed, not the staff caller,
+        # to whom every product is available.
+        return Response(validate_vouchers(codes, Selector().strategy()), status=status.HTTP_200_OK)
+
+    def _report_bad_request(self, developer_message):
+        """Log error and create a response containing conventional error messaging."""
+        logger.error(developer_message)
+        return Response({'developer_message': developer_message}, status=status.HTTP_400_BAD_REQUEST)
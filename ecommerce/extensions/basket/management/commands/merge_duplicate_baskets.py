@@ -0,0 +1,54 @@
+"""
+Management command that merges each user's editable baskets into a single basket.
+
+Basket.get_basket returns a user's most recently created editable basket, leaving any older editable
+baskets untouched. This command should be run periodically to merge the older baskets into the newest.
+"""
+from __future__ import unicode_literals
+from django.core.management import BaseCommand
+from django.db.models import Count
+from oscar.core.loading import get_model
+
+Basket = get_model('basket', 'Basket')
+
+
+class Command(BaseCommand):
+    help = 'Merge the editable baskets of users with more than one into their most recently created basket.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--commit',
+                            action='store_true',
+                            dest='commit',
+                            default=False,
+                            help='Actually merge the baskets.')
+
+    def handle(self, *args, **options):
+        duplicates = Basket.objects.filter(
+            status__in=Basket.editable_statuses
+        ).values(
+            'site_id', 'owner_id'
+        ).annotate(
+            count=Count('id')
+        ).filter(
+            count__gt=1
+        ).order_by()
+        duplicates = list(duplicates)
+
+        if options['commit']:
+            if duplicates:
+                self.stderr.write('Merging the baskets of [{}] users...'.format(len(duplicates)))
+                count = 0
+                for duplicate in duplicates:
+                    count += Basket.merge_duplicates(duplicate['site_id'], duplicate['owner_id'])
+
+                self.stderr.write('Merged [{}] baskets.'.format(count))
+                self.stderr.write('Done.')
+            else:
+                self.stderr.write('No baskets to merge.')
+        else:
+            msg = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                  'would have merged [{count}] baskets belonging to [{users}] users.'.format(
+                      count=sum(duplicate['count'] - 1 for duplicate in duplicates),
+                      users=len(duplicates)
+                  )
+            self.stderr.write(msg)
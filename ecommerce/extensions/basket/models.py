@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils.timezone import now
 from django.utils.translation import ugettext_lazy as _
 from oscar.apps.basket.abstract_models import AbstractBasket
 from oscar.core.loading import get_class
@@ -15,28 +16,84 @@ class Basket(AbstractBasket):
     def order_number(self):
         return OrderNumberGenerator().order_number(self)
 
+    class Meta(AbstractBasket.Meta):
+        # Supports the retrieval of a user's editable baskets by get_basket.
+        index_together = (('site', 'owner', 'status'),)
+
     @classmethod
     def get_basket(cls, user, site):
         """Retrieve the basket belonging to the indicated user.
 
-        If no such basket exists, create a new one. If multiple such baskets exist,
-        merge them into one.
+        If no such basket exists, create a new one. If multiple such baskets exist, the most
+        recently created basket is returned. Older baskets are not merged into it here, since
+        doing so on the request path is slow for users with many stale baskets. Instead, they
+        are merged periodically by the merge_duplicate_baskets management command.
         """
-        editable_baskets = cls.objects.filter(site=site, owner=user, status__in=Basket.editable_statuses)
-        if len(editable_baskets) == 0:
+        basket = cls.objects.filter(
+            site=site, owner=user, status__in=Basket.editable_statuses
+        ).order_by('-id').first()
+
+        if basket is None:
             basket = cls.objects.create(site=site, owner=user)
-        else:
-            stale_baskets = list(editable_baskets)
-            basket = stale_baskets.pop(0)
-            for stale_basket in stale_baskets:
-                # Don't add line quantities when merging baskets
-                basket.merge(stale_basket, add_quantities=False)
 
         # Assign the appropriate strategy class to the basket
         basket.strategy = Selector().strategy(user=user)
 
         return basket
 
+    @classmethod
+    def merge_duplicates(cls, site_id, owner_id):
+        """Merge all of a user's editable baskets into the basket returned by get_basket.
+
+        Lines, and vouchers, are moved from the older baskets with a fixed number of queries. As
+        with Basket.merge, line quantities are not added: if several baskets contain the same line,
+        the largest quantity is kept. The older baskets are marked as merged.
+
+        Arguments:
+            site_id (int): ID of the site to which the baskets belong.
+            owner_id (int): ID of the user who owns the baskets.
+
+        Returns:
+            int: Number of baskets merged.
+        """
+        with transaction.atomic():
+            baskets = list(
+                cls.objects.select_for_update().filter(
+                    site_id=site_id, owner_id=owner_id, status__in=cls.editable_statuses
+                ).order_by('-id')
+            )
+            if len(baskets) < 2:
+                return 0
+
+            basket = baskets[0]
+            stale_basket_ids = [stale_basket.id for stale_basket in baskets[1:]]
+
+            # Keep the existing line for each line reference, preferring lines in the newest basket.
+            lines = Line.objects.filter(basket_id__in=[basket.id] + stale_basket_ids).order_by('-basket_id', 'id')
+            kept_lines = {}
+            quantities = {}
+            for line in lines:
+                kept_line = kept_lines.setdefault(line.line_reference, line)
+                quantities[kept_line.id] = max(quantities.get(kept_line.id, 0), line.quantity)
+
+            moved_line_ids = [line.id for line in kept_lines.values() if line.basket_id != basket.id]
+            Line.objects.filter(id__in=moved_line_ids).update(basket=basket)
+            Line.objects.filter(basket_id__in=stale_basket_ids).delete()
+
+            # Quantities only differ when the same line was added to several baskets.
+            for line in kept_lines.values():
+                if quantities[line.id] != line.quantity:
+                    Line.objects.filter(id=line.id).update(quantity=quantities[line.id])
+
+            BasketVoucher = cls.vouchers.through
+            stale_vouchers = BasketVoucher.objects.filter(basket_id__in=stale_basket_ids)
+            basket.vouchers.add(*set(stale_vouchers.values_list('voucher_id', flat=True)))
+            stale_vouchers.delete()
+
+            cls.objects.filter(id__in=stale_basket_ids).update(status=cls.MERGED, date_merged=now())
+
+        return len(stale_basket_ids)
+
     def __unicode__(self):
         return _(u"{id} - {status} basket (owner: {owner}, lines: {num_lines})").format(
             id=self.id,
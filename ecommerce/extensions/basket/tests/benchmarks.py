@@ -0,0 +1,75 @@
+"""
+Benchmark of Basket.get_basket for users with many stale baskets.
+
+This module is not collected by the test runner. Run it explicitly with:
+
+    $ ./manage.py test ecommerce.extensions.basket.tests.benchmarks --nocapture
+"""
+from __future__ import print_function, unicode_literals
+import timeit
+
+from django.db import transaction
+from oscar.core.loading import get_class, get_model
+from oscar.test import factories
+
+from ecommerce.tests.testcases import TestCase
+
+Basket = get_model('basket', 'Basket')
+Selector = get_class('partner.strategy', 'Selector')
+
+REPETITIONS = 5
+STALE_BASKET_COUNTS = (1, 10, 50, 200)
+
+
+def legacy_get_basket(user, site):
+    """ The previous implementation of Basket.get_basket, which merged stale baskets on the request path. """
+    editable_baskets = Basket.objects.filter(site=site, owner=user, status__in=Basket.editable_statuses)
+    if len(editable_baskets) == 0:
+        basket = Basket.objects.create(site=site, owner=user)
+    else:
+        stale_baskets = list(editable_baskets)
+        basket = stale_baskets.pop(0)
+        for stale_basket in stale_baskets:
+            basket.merge(stale_basket, add_quantities=False)
+
+    basket.strategy = Selector().strategy(user=user)
+    return basket
+
+
+class GetBasketBenchmark(TestCase):
+    def setUp(self):
+        super(GetBasketBenchmark, self).setUp()
+        self.user = factories.UserFactory()
+        self.products = [factories.create_product() for __ in range(5)]
+        for product in self.products:
+            factories.create_stockrecord(product, num_in_stock=2)
+
+    def _create_stale_baskets(self, count):
+        for __ in range(count):
+            basket = Basket.objects.create(site=self.site, owner=self.user)
+            basket.strategy = Selector().strategy(user=self.user)
+            for product in self.products:
+                basket.add_product(product)
+
+    def _time(self, get_basket, stale_basket_count):
+        """ Returns the best time, in milliseconds, taken by get_basket with the given number of stale baskets. """
+        timings = []
+        for __ in range(REPETITIONS):
+            with transaction.atomic():
+                self._create_stale_baskets(stale_basket_count)
+
+                start = timeit.default_timer()
+                get_basket(self.user, self.site)
+                timings.append(timeit.default_timer() - start)
+
+                # Discard the baskets, so that each repetition starts from the same state.
+                transaction.set_rollback(True)
+
+        return min(timings) * 1000
+
+    def test_get_basket(self):
+        print('\n{:>14} {:>12} {:>12}'.format('stale baskets', 'legacy (ms)', 'current (ms)'))
+        for count in STALE_BASKET_COUNTS:
+            legacy = self._time(legacy_get_basket, count)
+            current = self._time(Basket.get_basket, count)
+            print('{:>14} {:>12.2f} {:>12.2f}'.format(count, legacy, current))
@@ -122,3 +122,51 @@ class AddSiteToBasketsBasketsCommandTests(TestCase):
         """ Verify an error is raised if no site ID is specified. """
         with self.assertRaisesMessage(CommandError, 'A valid Site ID must be specified!'):
             call_command(self.command, commit=False)
+
+
+class MergeDuplicateBasketsCommandTests(TestCase):
+    command = 'merge_duplicate_baskets'
+
+    def setUp(self):
+        super(MergeDuplicateBasketsCommandTests, self).setUp()
+        self.user = factories.UserFactory()
+        self.stale_baskets = [factories.BasketFactory(owner=self.user, site=self.site) for __ in range(0, 2)]
+        self.basket = factories.BasketFactory(owner=self.user, site=self.site)
+
+        # Users with a single editable basket should not be affected.
+        factories.BasketFactory(owner=factories.UserFactory(), site=self.site)
+
+    def test_without_commit(self):
+        """ Verify the command does not merge baskets if the commit flag is not set. """
+        out = StringIO()
+        call_command(self.command, commit=False, stderr=out)
+
+        self.assertEqual(Basket.objects.filter(status=Basket.MERGED).count(), 0)
+
+        expected = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                   'would have merged [2] baskets belonging to [1] users.'
+        self.assertEqual(out.getvalue().strip(), expected)
+
+    def test_with_commit(self):
+        """ Verify the command, when called with the commit flag, merges each user's older editable baskets. """
+        out = StringIO()
+        call_command(self.command, commit=True, stderr=out)
+
+        self.assertEqual(
+            list(Basket.objects.filter(status=Basket.MERGED).order_by('id')),
+            self.stale_baskets
+        )
+        self.assertEqual(Basket.get_basket(self.user, self.site), self.basket)
+
+        actual = out.getvalue().strip()
+        self.assertTrue(actual.startswith('Merging the baskets of [1] users...'))
+        self.assertTrue(actual.endswith('Done.'))
+
+    def test_commit_without_duplicates(self):
+        """ Verify the command does nothing if no user has more than one editable basket. """
+        Basket.objects.filter(id__in=[basket.id for basket in self.stale_baskets]).delete()
+
+        out = StringIO()
+        call_command(self.command, commit=True, stderr=out)
+
+        self.assertEqual(out.getvalue().strip(), 'No baskets to merge.')
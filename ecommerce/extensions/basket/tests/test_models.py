@@ -1,5 +1,3 @@
-import itertools
-
 from django.contrib.sites.models import Site
 from oscar.core.loading import get_class, get_model
 from oscar.test import factories
@@ -69,40 +67,67 @@ class BasketTests(TestCase):
         self.assertEqual(user.baskets.count(), 2, 'A new basket was not created for the second site.')
 
     def test_get_basket_with_existing_baskets(self):
-        """ If the user has existing baskets in editable states, the method should return a single merged basket. """
+        """ If the user has existing baskets in editable states, the method should return the newest. """
         user = factories.UserFactory()
 
-        # Create baskets in a state that qualifies them for merging
+        # Create baskets in editable states
         editable_baskets = []
         for status in Basket.editable_statuses:
             editable_baskets.append(self._create_basket(user, self.site1, status))
 
-        # Create baskets that should NOT be merged
-        non_editable_baskets = []
+        # Create baskets that should NOT be returned
         for status in (Basket.MERGED, Basket.FROZEN, Basket.SUBMITTED):
-            non_editable_baskets.append(self._create_basket(user, self.site1, status))
+            self._create_basket(user, self.site1, status)
 
         # Create a basket for the other site/tenant
         Basket.get_basket(user, self.site2)
 
         self.assertEqual(user.baskets.count(), 6)
 
-        basket = Basket.get_basket(user, self.site1)
+        with self.assertNumQueries(1):
+            basket = Basket.get_basket(user, self.site1)
 
-        # No new basket should be created
+        # No new basket should be created, and the older editable baskets should not be modified.
         self.assertEqual(user.baskets.count(), 6)
-
-        # Check the basic details of the new basket
-        self.assertEqual(basket.status, Basket.OPEN)
-        self.assertEqual(basket.owner, user)
-
-        # One of the previously editable baskets should be in the merged state.
+        self.assertEqual(basket, editable_baskets[-1])
         actual_states = [Basket.objects.get(id=eb.id).status for eb in editable_baskets]
-        self.assertEqual(actual_states, [Basket.OPEN, Basket.MERGED])
-
-        # The merged basket should include the products from the original baskets
-        expected_lines = list(itertools.chain.from_iterable([list(eb.lines.all()) for eb in editable_baskets]))
-        self.assertEqual(list(basket.lines.all()), expected_lines)
+        self.assertEqual(actual_states, list(Basket.editable_statuses))
 
         # Verify the basket for the second site/tenant is not modified
         self.assert_basket_state(user.baskets.get(site=self.site2), Basket.OPEN, user, self.site2)
+
+    def test_merge_duplicates(self):
+        """ Verify the user's older editable baskets are merged into the newest. """
+        user = factories.UserFactory()
+        product = factories.create_product()
+        factories.create_stockrecord(product, num_in_stock=2)
+        voucher = factories.VoucherFactory()
+
+        stale_baskets = [self._create_basket(user, self.site1) for __ in range(3)]
+        stale_baskets[0].add_product(product, quantity=2)
+        stale_baskets[1].add_product(product)
+        stale_baskets[1].vouchers.add(voucher)
+        other_site_basket = self._create_basket(user, self.site2)
+        basket = self._create_basket(user, self.site1)
+
+        expected_products = [line.product for line in basket.lines.all()]
+        expected_products += [line.product for stale_basket in stale_baskets for line in stale_basket.lines.all()]
+
+        self.assertEqual(Basket.merge_duplicates(self.site1.id, user.id), len(stale_baskets))
+
+        self.assertEqual(sorted(line.product.id for line in basket.lines.all()),
+                         sorted(set(product.id for product in expected_products)))
+        self.assertEqual(basket.lines.get(product=product).quantity, 2)
+        self.assertEqual(list(basket.vouchers.all()), [voucher])
+
+        for stale_basket in stale_baskets:
+            stale_basket = Basket.objects.get(id=stale_basket.id)
+            self.assertEqual(stale_basket.status, Basket.MERGED)
+            self.assertIsNotNone(stale_basket.date_merged)
+            self.assertEqual(stale_basket.lines.count(), 0)
+            self.assertEqual(stale_basket.vouchers.count(), 0)
+
+        self.assert_basket_state(Basket.objects.get(id=other_site_basket.id), Basket.OPEN, user, self.site2)
+
+        # Merging again should be a no-op.
+        self.assertEqual(Basket.merge_duplicates(self.site1.id, user.id), 0)
@@ -0,0 +1,197 @@
+"""
+Read-through cache of SKU lookups.
+
+Resolving a SKU to its product and stock record requires joining several tables. Since the catalogue
+only changes when courses are published, the results of these lookups are cached in both a per-process
+LRU and the shared Django cache. Both layers are keyed by a catalogue version, which is replaced whenever
+a stock record, product or product attribute value is saved or deleted, and again once the request or command
+which made the change has committed it, so that every process sees the invalidation on its next lookup. The
+same scheme can be applied to other lookups by subclassing VersionedLookupCache.
+"""
+from __future__ import unicode_literals
+
+from collections import namedtuple, OrderedDict
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from oscar.core.loading import get_model
+
+StockRecord = get_model('partner', 'StockRecord')
+
+SKU_CACHE_KEY_PREFIX = 'sku_lookup'
+SKU_CACHE_VERSION_KEY = 'sku_lookup_version'
+
+SkuInfo = namedtuple(
+    'SkuInfo',
+    ['sku', 'product_id', 'stockrecord_id', 'price', 'currency', 'product_class', 'course_key', 'certificate_type']
+)
+
+
+class LRUCache(object):
+    """ A thread-safe mapping which evicts its least recently used entries once it reaches its maximum size. """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+
+            # Re-insert the value to mark it as the most recently used.
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class VersionedLookupCache(object):
+    """ Resolves keys to values, consulting the process-local cache, then the shared cache, then the database.
+
+    Subclasses define the prefix of keys in the shared cache, the key under which the version is stored,
+    and `_load()`, which loads values from the database. Keys which cannot be loaded are not cached.
+
+    Hit and miss counts are kept per process, and can be retrieved with `stats()`.
+    """
+    key_prefix = None
+    version_key = None
+
+    def __init__(self, timeout, max_size):
+        self.timeout = timeout
+        self.local = LRUCache(max_size)
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """ Returns the value for the given key, or None if the key does not exist. """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """ Returns a dict mapping each of the given keys that exists to its value. """
+        version = self._get_version()
+        found = {}
+
+        missing = []
+        for key in set(keys):
+            value = self.local.get((version, key))
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        self.local_hits += len(found)
+
+        if missing:
+            cache_keys = {self._make_key(version, key): key for key in missing}
+            shared = cache.get_many(cache_keys.keys())
+            for cache_key, value in shared.items():
+                key = cache_keys[cache_key]
+                found[key] = value
+                self.local.set((version, key), value)
+            self.shared_hits += len(shared)
+
+            missing = [key for key in missing if key not in found]
+
+        if missing:
+            self.misses += len(missing)
+            loaded = self._load(missing)
+            cache.set_many({self._make_key(version, key): value for key, value in loaded.items()}, self.timeout)
+            for key, value in loaded.items():
+                self.local.set((version, key), value)
+            found.update(loaded)
+
+        return found
+
+    def get_cached(self, key):
+        """ Returns the cached value for the given key, or None if the value is not cached.
+
+        Unlike `get()`, the value is never loaded from the database.
+        """
+        version = self._get_version()
+        value = self.local.get((version, key))
+        if value is None:
+            value = cache.get(self._make_key(version, key))
+        return value
+
+    def invalidate(self):
+        """ Invalidates every cached lookup, in this and all other processes. """
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        self.local.clear()
+
+    def stats(self):
+        """ Returns the hit and miss counts recorded by this process. """
+        return {
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+        }
+
+    def _get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, None)
+            version = cache.get(self.version_key)
+        return version
+
+    def _make_key(self, version, key):
+        return '{prefix}.{version}.{key}'.format(prefix=self.key_prefix, version=version, key=key)
+
+    def _load(self, keys):
+        """ Returns a dict mapping each of the given keys that exists to its value, loaded from the database. """
+        raise NotImplementedError
+
+
+class SkuLookupCache(VersionedLookupCache):
+    """ Resolves SKUs to SkuInfo. """
+    key_prefix = SKU_CACHE_KEY_PREFIX
+    version_key = SKU_CACHE_VERSION_KEY
+
+    def _load(self, skus):
+        stockrecords = StockRecord.objects.filter(
+            partner_sku__in=skus
+        ).select_related(
+            'product__product_class', 'product__parent__product_class'
+        ).prefetch_related(
+            'product__attribute_values__attribute'
+        )
+
+        loaded = {}
+        for stockrecord in stockrecords:
+            product = stockrecord.product
+            attributes = {value.attribute.code: value.value for value in product.attribute_values.all()}
+            product_class = product.get_product_class()
+
+            loaded[stockrecord.partner_sku] = SkuInfo(
+                sku=stockrecord.partner_sku,
+                product_id=product.id,
+                stockrecord_id=stockrecord.id,
+                price=stockrecord.price_excl_tax,
+                currency=stockrecord.price_currency,
+                product_class=product_class.name if product_class else None,
+                course_key=attributes.get('course_key'),
+                certificate_type=attributes.get('certificate_type'),
+            )
+
+        return loaded
+
+
+sku_cache = SkuLookupCache(settings.SKU_LOOKUP_CACHE_TIMEOUT, settings.SKU_LOOKUP_CACHE_SIZE)
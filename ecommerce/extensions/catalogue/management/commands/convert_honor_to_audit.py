@@ -8,6 +8,7 @@ from django.db import transaction
 from oscar.core.loading import get_model
 
 from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.cache import sku_cache
 
 logger = logging.getLogger(__name__)
 Partner = get_model('partner', 'Partner')
@@ -68,3 +69,6 @@ class Command(BaseCommand):
                         raise Exception('Forced rollback.')
             except Exception:  # pylint: disable=broad-except
                 logger.exception('Failed to convert [%s]!', course_id)
+
+            # Lookups made while the course was being saved may have cached its products as they were before.
+            sku_cache.invalidate()
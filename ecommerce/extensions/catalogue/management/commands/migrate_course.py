@@ -11,6 +11,7 @@ import requests
 import waffle
 
 from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.cache import sku_cache
 
 
 logger = logging.getLogger(__name__)
@@ -226,3 +227,6 @@ class Command(BaseCommand):
                         raise Exception('Forced rollback.')
             except Exception:  # pylint: disable=broad-except
                 logger.exception('Failed to migrate [%s]!', course_id)
+
+            # Lookups made while the course was being saved may have cached its products as they were before.
+            sku_cache.invalidate()
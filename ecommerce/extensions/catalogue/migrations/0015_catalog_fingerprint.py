@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0014_alter_couponvouchers_attribute'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalog',
+            name='fingerprint',
+            field=models.CharField(default=b'', max_length=32, db_index=True, blank=True),
+        ),
+    ]
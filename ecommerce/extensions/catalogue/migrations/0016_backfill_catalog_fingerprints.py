@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from hashlib import md5
+
+from django.db import migrations
+
+
+def generate_fingerprint(partner_id, stock_record_ids):
+    """ Returns the fingerprint of a catalog, as calculated by Catalog.generate_fingerprint. """
+    _hash = ' '.join([unicode(partner_id)] + [unicode(_id) for _id in sorted(set(stock_record_ids))])
+    return md5(_hash).hexdigest()
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """ Calculates the fingerprint of every existing catalog. """
+    Catalog = apps.get_model('catalogue', 'Catalog')
+
+    for catalog in Catalog.objects.all().iterator():
+        stock_record_ids = catalog.stock_records.values_list('id', flat=True)
+        Catalog.objects.filter(id=catalog.id).update(
+            fingerprint=generate_fingerprint(catalog.partner_id, stock_record_ids)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0015_catalog_fingerprint'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,36 @@
 # noinspection PyUnresolvedReferences
+from hashlib import md5
+
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
-from oscar.apps.catalogue.abstract_models import AbstractProduct, AbstractProductAttributeValue
+from oscar.apps.catalogue.abstract_models import (AbstractProduct, AbstractProductAttributeValue,
+                                                  ProductAttributesContainer)
 from simple_history.models import HistoricalRecords
 
+from ecommerce.extensions.catalogue.registry import product_class_registry
+
+
+class PrefetchAwareAttributesContainer(ProductAttributesContainer):
+    """
+    Product attribute container which is populated from the product's prefetched attribute values, if any.
+
+    Oscar's container always queries for the product's attribute values, even if they have been loaded with
+    prefetch_related('attribute_values__attribute').
+    """
+
+    def __getattr__(self, name):
+        if not name.startswith('_') and not self.initialised:
+            values = self.get_values()
+            if 'attribute_values' not in getattr(self.product, '_prefetched_objects_cache', {}):
+                values = values.select_related('attribute')
+
+            for value in values:
+                setattr(self, value.attribute.code, value.value)
+            self.initialised = True
+            return getattr(self, name)
+
+        return super(PrefetchAwareAttributesContainer, self).__getattr__(name)
+
 
 class Product(AbstractProduct):
     course = models.ForeignKey('courses.Course', null=True, blank=True, related_name='products')
@@ -11,6 +38,18 @@ class Product(AbstractProduct):
                                    help_text=_('Last date/time on which this product can be purchased.'))
     history = HistoricalRecords()
 
+    def __init__(self, *args, **kwargs):
+        super(Product, self).__init__(*args, **kwargs)
+        self.attr = PrefetchAwareAttributesContainer(product=self)
+
+    def get_product_class(self):
+        """ Return the product's class, or its parent's for child products, from the product class registry. """
+        product = self.parent if self.is_child else self
+        if product.product_class_id is None:
+            return None
+
+        return product_class_registry.get(id=product.product_class_id)
+
 
 class ProductAttributeValue(AbstractProductAttributeValue):
     history = HistoricalRecords()
@@ -20,6 +59,26 @@ class Catalog(models.Model):
     name = models.CharField(max_length=255)
     partner = models.ForeignKey('partner.Partner', related_name='catalogs')
     stock_records = models.ManyToManyField('partner.StockRecord', blank=True, related_name='catalogs')
+    # Hash of the partner and stock records, used to find catalogs by their contents
+    fingerprint = models.CharField(max_length=32, db_index=True, blank=True, default='')
+
+    @staticmethod
+    def generate_fingerprint(partner_id, stock_record_ids):
+        """ Returns the fingerprint of a catalog with the given partner and stock records. """
+        _hash = ' '.join([unicode(partner_id)] + [unicode(_id) for _id in sorted(set(stock_record_ids))])
+        return md5(_hash).hexdigest()
+
+    def update_fingerprint(self):
+        """ Recalculates, and stores, the fingerprint of the catalog. """
+        self.fingerprint = self.generate_fingerprint(
+            self.partner_id, self.stock_records.values_list('id', flat=True)
+        )
+        Catalog.objects.filter(id=self.id).update(fingerprint=self.fingerprint)
+
+    def save(self, *args, **kwargs):
+        stock_record_ids = self.stock_records.values_list('id', flat=True) if self.pk else []
+        self.fingerprint = self.generate_fingerprint(self.partner_id, stock_record_ids)
+        super(Catalog, self).save(*args, **kwargs)
 
     def __unicode__(self):
         return u'{id}: {partner_code}-{catalog_name}'.format(
@@ -0,0 +1,135 @@
+"""
+Process-wide registries of product classes and categories.
+
+Product classes and categories are looked up by slug (or, for product classes, name) throughout checkout and
+fulfillment, but rarely change once created. Each registry loads every instance of its model on first use, and
+serves subsequent lookups from memory. As with the SKU lookup cache, registries are keyed by a version held in
+the shared Django cache, which is replaced whenever an instance is saved or deleted, so that every process
+reloads on its next lookup. The version is retrieved at most once per request.
+
+Lookups return a new instance each time, built from the loaded field values, so callers may modify the
+instances they are given without affecting other lookups.
+"""
+from __future__ import unicode_literals
+
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import router
+from oscar.core.loading import get_model
+
+
+class ModelRegistry(object):
+    """ Lazily-loaded, in-memory index of every instance of a model, by ID and by each of the given fields. """
+
+    def __init__(self, app_label, model_name, fields):
+        self.app_label = app_label
+        self.model_name = model_name
+        self.fields = ('id',) + tuple(fields)
+        self.version_key = 'registry_version.{app_label}.{model_name}'.format(
+            app_label=app_label,
+            model_name=model_name.lower()
+        )
+        self._lock = threading.Lock()
+        self._version = None
+        self._index = None
+        self._field_names = None
+        # Tracks, per thread, whether a request is being handled, and the version retrieved while handling it.
+        self._request_state = threading.local()
+
+    @property
+    def model(self):
+        return get_model(self.app_label, self.model_name)
+
+    def get(self, **kwargs):
+        """ Returns a new copy of the instance whose value for the given field matches the given value.
+
+        Arguments:
+            Exactly one keyword argument, naming one of the registry's fields.
+
+        Raises:
+            DoesNotExist: If no such instance exists.
+        """
+        if len(kwargs) != 1 or kwargs.keys()[0] not in self.fields:
+            raise ValueError('Lookups must specify exactly one of the fields {}.'.format(self.fields))
+
+        field, value = kwargs.items()[0]
+        values = self._get_index()[field].get(value)
+
+        if values is None:
+            # The instance may have been created without a signal being sent (e.g., by a data migration).
+            values = self._get_index(reload=True)[field].get(value)
+
+        if values is None:
+            raise self.model.DoesNotExist(
+                '{model_name} matching {field}={value} does not exist.'.format(
+                    model_name=self.model_name,
+                    field=field,
+                    value=value
+                )
+            )
+
+        return self.model.from_db(router.db_for_read(self.model), self._field_names, values)
+
+    def invalidate(self):
+        """ Invalidates the registry, in this and all other processes. """
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        self.clear()
+
+    def clear(self):
+        """ Discards the instances loaded by this process. """
+        with self._lock:
+            self._index = None
+            self._version = None
+        self._request_state.version = None
+
+    def start_request(self):
+        """ Records that a request is being handled by the current thread, until `finish_request` is called.
+
+        The version is retrieved from the shared cache at most once while the request is handled.
+        """
+        self._request_state.in_request = True
+        self._request_state.version = None
+
+    def finish_request(self):
+        """ Records that the request being handled by the current thread has finished. """
+        self._request_state.in_request = False
+        self._request_state.version = None
+
+    def _get_version(self):
+        """ Returns the current version, retrieving it from the shared cache at most once per request. """
+        in_request = getattr(self._request_state, 'in_request', False)
+        version = getattr(self._request_state, 'version', None) if in_request else None
+
+        if version is None:
+            version = cache.get(self.version_key)
+            if version is None:
+                cache.add(self.version_key, uuid.uuid4().hex, None)
+                version = cache.get(self.version_key)
+
+            if in_request:
+                self._request_state.version = version
+
+        return version
+
+    def _get_index(self, reload=False):
+        version = self._get_version()
+
+        with self._lock:
+            if reload or self._index is None or self._version != version:
+                concrete_fields = self.model._meta.concrete_fields  # pylint: disable=protected-access
+                field_names = [field.attname for field in concrete_fields]
+                rows = list(self.model.objects.values_list(*field_names))
+                positions = [field_names.index(field) for field in self.fields]
+                self._index = {
+                    field: {row[position]: row for row in rows} for field, position in zip(self.fields, positions)
+                }
+                self._field_names = field_names
+                self._version = version
+
+            return self._index
+
+
+product_class_registry = ModelRegistry('catalogue', 'ProductClass', ('slug', 'name'))
+category_registry = ModelRegistry('catalogue', 'Category', ('slug',))
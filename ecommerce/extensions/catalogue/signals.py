@@ -0,0 +1,115 @@
+import threading
+
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.catalogue.cache import sku_cache
+from ecommerce.extensions.catalogue.registry import category_registry, product_class_registry
+from ecommerce.extensions.partner.strategy import clear_purchase_info_caches
+
+Catalog = get_model('catalogue', 'Catalog')
+Category = get_model('catalogue', 'Category')
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+ProductClass = get_model('catalogue', 'ProductClass')
+StockRecord = get_model('partner', 'StockRecord')
+
+# Tracks, per thread, whether a request is being handled, and whether the SKU lookup cache has been invalidated
+# within its transaction.
+_pending_invalidation = threading.local()
+
+
+@receiver(post_save, sender=StockRecord, dispatch_uid='invalidate_sku_cache_stockrecord_save')
+@receiver(post_delete, sender=StockRecord, dispatch_uid='invalidate_sku_cache_stockrecord_delete')
+@receiver(post_save, sender=Product, dispatch_uid='invalidate_sku_cache_product_save')
+@receiver(post_delete, sender=Product, dispatch_uid='invalidate_sku_cache_product_delete')
+@receiver(post_save, sender=ProductAttributeValue, dispatch_uid='invalidate_sku_cache_attribute_value_save')
+@receiver(post_delete, sender=ProductAttributeValue, dispatch_uid='invalidate_sku_cache_attribute_value_delete')
+def invalidate_sku_cache(*_args, **_kwargs):
+    """ Invalidate cached SKU lookups whenever the catalogue data they are built from changes.
+
+    These signals are sent before the surrounding transaction, if any, is committed, so a lookup made by another
+    request in the meantime would cache the previously committed data under the new version. Changes made within
+    a transaction are therefore invalidated again once the request has finished, and its transaction committed.
+    Code which modifies the catalogue within a transaction outside of a request (e.g., a Celery task or management
+    command) should invalidate the cache itself once the transaction has been committed; such changes are not
+    deferred, since no request would finish on the same thread until some later, unrelated request.
+    """
+    sku_cache.invalidate()
+
+    if connection.in_atomic_block and getattr(_pending_invalidation, 'in_request', False):
+        _pending_invalidation.sku_cache = True
+
+
+@receiver(request_started, dispatch_uid='track_sku_cache_request_started')
+def track_sku_cache_request_started(*_args, **_kwargs):
+    """ Record that a request is being handled, so that changes made within its transaction are invalidated again. """
+    _pending_invalidation.in_request = True
+    _pending_invalidation.sku_cache = False
+
+
+@receiver(request_started, dispatch_uid='start_registry_request')
+def start_registry_request(*_args, **_kwargs):
+    """ Check the versions of the registries at most once while the request is handled. """
+    product_class_registry.start_request()
+    category_registry.start_request()
+
+
+@receiver(request_finished, dispatch_uid='finish_registry_request')
+def finish_registry_request(*_args, **_kwargs):
+    product_class_registry.finish_request()
+    category_registry.finish_request()
+
+
+@receiver(request_finished, dispatch_uid='invalidate_sku_cache_request_finished')
+def invalidate_sku_cache_after_request(*_args, **_kwargs):
+    """ Invalidate cached SKU lookups again, if the catalogue was changed within the request's transaction. """
+    _pending_invalidation.in_request = False
+
+    if getattr(_pending_invalidation, 'sku_cache', False):
+        _pending_invalidation.sku_cache = False
+        sku_cache.invalidate()
+
+
+@receiver(post_save, sender=StockRecord, dispatch_uid='clear_purchase_info_stockrecord_save')
+@receiver(post_delete, sender=StockRecord, dispatch_uid='clear_purchase_info_stockrecord_delete')
+@receiver(post_save, sender=Product, dispatch_uid='clear_purchase_info_product_save')
+@receiver(post_delete, sender=Product, dispatch_uid='clear_purchase_info_product_delete')
+def clear_purchase_info(*_args, **_kwargs):
+    """ Discard purchase info memoized by strategies, which may have been computed from the changed data. """
+    clear_purchase_info_caches()
+
+
+@receiver(post_save, sender=ProductClass, dispatch_uid='invalidate_product_class_registry_save')
+@receiver(post_delete, sender=ProductClass, dispatch_uid='invalidate_product_class_registry_delete')
+def invalidate_product_class_registry(*_args, **_kwargs):
+    product_class_registry.invalidate()
+
+
+@receiver(post_save, sender=Category, dispatch_uid='invalidate_category_registry_save')
+@receiver(post_delete, sender=Category, dispatch_uid='invalidate_category_registry_delete')
+def invalidate_category_registry(*_args, **_kwargs):
+    category_registry.invalidate()
+
+
+@receiver(m2m_changed, sender=Catalog.stock_records.through, dispatch_uid='update_catalog_fingerprint')
+def update_catalog_fingerprint(instance, action, reverse, pk_set, **_kwargs):
+    """ Update the fingerprints of catalogs whose stock records have changed. """
+    if reverse:
+        # The stock records of the catalogs identified by pk_set have changed.
+        # Catalogs cleared of the stock record are identified before they are cleared.
+        if action == 'pre_clear':
+            instance._cleared_catalog_ids = list(instance.catalogs.values_list('id', flat=True))
+            return
+
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_cleared_catalog_ids', [])
+
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            for catalog in Catalog.objects.filter(id__in=pk_set):
+                catalog.update_fingerprint()
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        instance.update_fingerprint()
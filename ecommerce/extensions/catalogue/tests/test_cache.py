@@ -0,0 +1,113 @@
+from __future__ import unicode_literals
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from oscar.core.loading import get_model
+
+from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.cache import LRUCache, SkuInfo, SkuLookupCache, SKU_CACHE_VERSION_KEY
+from ecommerce.extensions.catalogue.signals import (
+    invalidate_sku_cache_after_request, track_sku_cache_request_started
+)
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.tests.testcases import TestCase
+
+StockRecord = get_model('partner', 'StockRecord')
+
+
+class LRUCacheTests(TestCase):
+    def test_eviction(self):
+        """ Verify the least recently used entries are evicted once the maximum size is reached. """
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+
+        # Mark 'a' as recently used, so that 'b' is evicted.
+        self.assertEqual(lru.get('a'), 1)
+        lru.set('c', 3)
+
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('c'), 3)
+
+
+class SkuLookupCacheTests(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(SkuLookupCacheTests, self).setUp()
+        self.addCleanup(cache.clear)
+
+        course = Course.objects.create(id='a/b/c', name='Test Course')
+        self.seat = course.create_or_update_seat('verified', True, 50, self.partner)
+        self.stockrecord = self.seat.stockrecords.get()
+        self.sku_cache = SkuLookupCache(60, 10)
+
+    def test_get(self):
+        """ Verify the SKU is resolved to the details of its product and stock record. """
+        expected = SkuInfo(
+            sku=self.stockrecord.partner_sku,
+            product_id=self.seat.id,
+            stockrecord_id=self.stockrecord.id,
+            price=Decimal('50.00'),
+            currency=self.stockrecord.price_currency,
+            product_class='Seat',
+            course_key='a/b/c',
+            certificate_type='verified',
+        )
+        self.assertEqual(self.sku_cache.get(self.stockrecord.partner_sku), expected)
+        self.assertIsNone(self.sku_cache.get('not-a-sku'))
+
+    def test_read_through(self):
+        """ Verify lookups are served from the local cache, then the shared cache, before the database. """
+        sku = self.stockrecord.partner_sku
+        self.sku_cache.get(sku)
+        self.assertEqual(self.sku_cache.stats(), {'local_hits': 0, 'shared_hits': 0, 'misses': 1})
+
+        with self.assertNumQueries(0):
+            self.sku_cache.get(sku)
+        self.assertEqual(self.sku_cache.stats(), {'local_hits': 1, 'shared_hits': 0, 'misses': 1})
+
+        # Simulate a lookup from another process
+        other = SkuLookupCache(60, 10)
+        with self.assertNumQueries(0):
+            other.get(sku)
+        self.assertEqual(other.stats(), {'local_hits': 0, 'shared_hits': 1, 'misses': 0})
+
+    def test_invalidation(self):
+        """ Verify changes to stock records invalidate cached lookups in every process. """
+        sku = self.stockrecord.partner_sku
+        other = SkuLookupCache(60, 10)
+        self.assertEqual(self.sku_cache.get(sku).price, Decimal('50.00'))
+        self.assertEqual(other.get(sku).price, Decimal('50.00'))
+
+        self.stockrecord.price_excl_tax = Decimal('75.00')
+        self.stockrecord.save()
+
+        self.assertEqual(self.sku_cache.get(sku).price, Decimal('75.00'))
+        self.assertEqual(other.get(sku).price, Decimal('75.00'))
+
+    def test_invalidation_after_request(self):
+        """ Verify changes made within a transaction invalidate cached lookups again, once the request finishes. """
+        track_sku_cache_request_started()
+        self.stockrecord.save()
+        version = cache.get(SKU_CACHE_VERSION_KEY)
+
+        invalidate_sku_cache_after_request()
+        self.assertNotEqual(cache.get(SKU_CACHE_VERSION_KEY), version)
+
+        # Requests which do not change the catalogue do not invalidate cached lookups.
+        track_sku_cache_request_started()
+        version = cache.get(SKU_CACHE_VERSION_KEY)
+        invalidate_sku_cache_after_request()
+        self.assertEqual(cache.get(SKU_CACHE_VERSION_KEY), version)
+
+    def test_no_invalidation_after_unrelated_request(self):
+        """ Verify changes made outside of a request (e.g., by a Celery task) are not invalidated again once some
+        later, unrelated request finishes. """
+        self.stockrecord.save()
+        version = cache.get(SKU_CACHE_VERSION_KEY)
+
+        track_sku_cache_request_started()
+        invalidate_sku_cache_after_request()
+        self.assertEqual(cache.get(SKU_CACHE_VERSION_KEY), version)
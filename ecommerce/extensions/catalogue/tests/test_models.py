@@ -0,0 +1,80 @@
+from __future__ import unicode_literals
+
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.tests.testcases import TestCase
+
+Catalog = get_model('catalogue', 'Catalog')
+Product = get_model('catalogue', 'Product')
+
+
+class ProductTests(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(ProductTests, self).setUp()
+        course = Course.objects.create(id='a/b/c', name='Test Course')
+        self.seat = course.create_or_update_seat('verified', True, 50, self.partner)
+
+    def test_attr_from_prefetched_values(self):
+        """ Verify product attributes are read from prefetched attribute values, without further queries. """
+        product = Product.objects.prefetch_related('attribute_values__attribute').get(id=self.seat.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(product.attr.course_key, 'a/b/c')
+            self.assertEqual(product.attr.certificate_type, 'verified')
+
+    def test_attr_without_prefetched_values(self):
+        """ Verify product attributes are loaded with a single query, if they have not been prefetched. """
+        product = Product.objects.get(id=self.seat.id)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(product.attr.course_key, 'a/b/c')
+            self.assertEqual(product.attr.certificate_type, 'verified')
+
+        with self.assertRaises(AttributeError):
+            product.attr.not_an_attribute  # pylint: disable=pointless-statement
+
+
+class CatalogTests(TestCase):
+    def setUp(self):
+        super(CatalogTests, self).setUp()
+        self.catalog = Catalog.objects.create(name='Test', partner=self.partner)
+        self.stock_records = [
+            factories.ProductFactory(stockrecords__partner=self.partner).stockrecords.first() for __ in range(3)
+        ]
+
+    def assert_fingerprint(self, stock_records):
+        """ Verify the stored fingerprint of the catalog matches that of the given stock records. """
+        expected = Catalog.generate_fingerprint(self.partner.id, [stock_record.id for stock_record in stock_records])
+        self.assertEqual(Catalog.objects.get(id=self.catalog.id).fingerprint, expected)
+
+    def test_generate_fingerprint(self):
+        """ Verify fingerprints depend on the partner and set of stock records, but not their order. """
+        self.assertEqual(Catalog.generate_fingerprint(1, [3, 2, 10]), Catalog.generate_fingerprint(1, [10, 2, 3, 2]))
+        self.assertNotEqual(Catalog.generate_fingerprint(1, [2, 3]), Catalog.generate_fingerprint(2, [2, 3]))
+        self.assertNotEqual(Catalog.generate_fingerprint(1, [2, 3]), Catalog.generate_fingerprint(1, [23]))
+
+    def test_fingerprint_updated(self):
+        """ Verify the fingerprint is updated when stock records are added to, or removed from, the catalog. """
+        self.assert_fingerprint([])
+
+        self.catalog.stock_records.add(*self.stock_records)
+        self.assert_fingerprint(self.stock_records)
+
+        self.catalog.stock_records.remove(self.stock_records[0])
+        self.assert_fingerprint(self.stock_records[1:])
+
+        self.catalog.stock_records.clear()
+        self.assert_fingerprint([])
+
+    def test_fingerprint_updated_from_stock_record(self):
+        """ Verify the fingerprint is updated when the catalog is added to, or removed from, a stock record. """
+        stock_record = self.stock_records[0]
+
+        stock_record.catalogs.add(self.catalog)
+        self.assert_fingerprint([stock_record])
+
+        stock_record.catalogs.clear()
+        self.assert_fingerprint([])
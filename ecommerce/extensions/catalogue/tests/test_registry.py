@@ -0,0 +1,103 @@
+from __future__ import unicode_literals
+
+import mock
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.catalogue.registry import ModelRegistry, category_registry, product_class_registry
+from ecommerce.tests.testcases import TestCase
+
+ProductClass = get_model('catalogue', 'ProductClass')
+
+
+class ModelRegistryTests(TestCase):
+    def setUp(self):
+        super(ModelRegistryTests, self).setUp()
+        self.product_class = factories.ProductClassFactory(name='Widget', slug='widget')
+        self.registry = ModelRegistry('catalogue', 'ProductClass', ('slug', 'name'))
+
+    def test_get(self):
+        """ Verify instances can be retrieved by ID, and by each of the registry's fields. """
+        self.assertEqual(self.registry.get(id=self.product_class.id), self.product_class)
+        self.assertEqual(self.registry.get(slug='widget'), self.product_class)
+        self.assertEqual(self.registry.get(name='Widget'), self.product_class)
+
+    def test_get_copy(self):
+        """ Verify each lookup returns a new instance, so that modifying one does not affect other lookups. """
+        product_class = self.registry.get(slug='widget')
+        product_class.name = 'Gizmo'
+
+        self.assertEqual(self.registry.get(slug='widget').name, 'Widget')
+        self.assertIsNot(self.registry.get(slug='widget'), self.registry.get(slug='widget'))
+
+    def test_version_checked_once_per_request(self):
+        """ Verify the version is retrieved from the shared cache at most once while a request is handled. """
+        self.registry.start_request()
+        self.addCleanup(self.registry.finish_request)
+        self.registry.get(slug='widget')
+
+        with mock.patch('ecommerce.extensions.catalogue.registry.cache') as mock_cache:
+            self.registry.get(slug='widget')
+            self.assertFalse(mock_cache.get.called)
+
+            # Outside of requests, the version is retrieved on every lookup.
+            self.registry.finish_request()
+            mock_cache.get.return_value = 'new-version'
+            self.registry.get(slug='widget')
+            self.assertTrue(mock_cache.get.called)
+
+    def test_category_lookups(self):
+        """ Verify categories may only be looked up by ID or slug. """
+        self.assertEqual(category_registry.fields, ('id', 'slug'))
+        with self.assertRaises(ValueError):
+            category_registry.get(name='Seats')
+
+    def test_get_from_memory(self):
+        """ Verify instances are loaded once, and subsequently retrieved without querying the database. """
+        self.registry.get(slug='widget')
+
+        with self.assertNumQueries(0):
+            self.registry.get(name='Widget')
+
+    def test_does_not_exist(self):
+        """ Verify DoesNotExist is raised if no instance matches the lookup. """
+        with self.assertRaises(ProductClass.DoesNotExist):
+            self.registry.get(slug='gadget')
+
+    def test_invalid_lookup(self):
+        """ Verify lookups must specify exactly one of the registry's fields. """
+        for lookup in ({}, {'requires_shipping': True}, {'slug': 'widget', 'name': 'Widget'}):
+            with self.assertRaises(ValueError):
+                self.registry.get(**lookup)
+
+    def test_invalidation(self):
+        """ Verify saving an instance invalidates the registry in every process. """
+        self.assertEqual(self.registry.get(slug='widget').name, 'Widget')
+
+        self.product_class.name = 'Gizmo'
+        self.product_class.save()
+
+        self.assertEqual(self.registry.get(slug='widget').name, 'Gizmo')
+        with self.assertRaises(ProductClass.DoesNotExist):
+            self.registry.get(name='Widget')
+
+    def test_reload_on_miss(self):
+        """ Verify instances created without a signal being sent are found. """
+        self.registry.get(slug='widget')
+        ProductClass.objects.bulk_create([ProductClass(name='Gadget', slug='gadget')])
+
+        self.assertEqual(self.registry.get(slug='gadget').name, 'Gadget')
+
+    def test_product_class(self):
+        """ Verify products retrieve their product class, or their parent's, from the product class registry. """
+        parent = factories.ProductFactory(
+            structure='parent', product_class=self.product_class, stockrecords__partner=self.partner
+        )
+        child = factories.ProductFactory(
+            structure='child', parent=parent, product_class=None, stockrecords__partner=self.partner
+        )
+        product_class_registry.get(id=self.product_class.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(parent.get_product_class(), self.product_class)
+            self.assertEqual(child.get_product_class(), self.product_class)
@@ -4,6 +4,7 @@ import datetime
 from hashlib import md5
 
 from oscar.core.loading import get_model
+from oscar.test import factories
 
 from ecommerce.extensions.api.v2.views.coupons import CouponViewSet
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
@@ -97,6 +98,32 @@ class UtilsTests(CourseCatalogTestMixin, TestCase):
         self.assertNotEqual(self.catalog, new_catalog)
         self.assertEqual(Catalog.objects.count(), 2)
 
+    def test_get_or_create_catalog_query_count(self):
+        """Verify existing catalogs are found with a constant number of queries, regardless of how many exist."""
+        stock_record = StockRecord.objects.first()
+        self.catalog.stock_records.add(stock_record)
+        for __ in range(5):
+            product = factories.ProductFactory(stockrecords__partner=self.partner)
+            Catalog.objects.create(name='Test', partner=self.partner).stock_records.add(product.stockrecords.first())
+
+        with self.assertNumQueries(2):
+            existing_catalog, created = get_or_create_catalog(
+                name='Test',
+                partner=self.partner,
+                stock_record_ids=[stock_record.id]
+            )
+        self.assertFalse(created)
+        self.assertEqual(self.catalog, existing_catalog)
+
+    def test_get_or_create_catalog_missing_stock_record(self):
+        """Verify an error is raised if any of the stock records does not exist."""
+        with self.assertRaises(StockRecord.DoesNotExist):
+            get_or_create_catalog(
+                name='Test',
+                partner=self.partner,
+                stock_record_ids=[StockRecord.objects.first().id, 999]
+            )
+
     def test_generate_coupon_slug(self):
         """Verify the method generates proper slug."""
         title = 'Test coupon'
@@ -43,18 +43,23 @@ def get_or_create_catalog(name, partner, stock_record_ids):
     """
     Returns the catalog which has the same name, partner and stock records.
     If there isn't one with that data, creates and returns a new one.
+
+    Raises:
+        StockRecord.DoesNotExist: If any of the stock records does not exist.
     """
-    catalogs = Catalog.objects.all()
-    stock_records = [StockRecord.objects.get(id=id) for id in stock_record_ids]  # pylint: disable=redefined-builtin
+    stock_records = list(StockRecord.objects.filter(id__in=stock_record_ids))
+    if len(stock_records) != len(set(stock_record_ids)):
+        raise StockRecord.DoesNotExist(
+            'Stock records {} do not exist.'.format(set(stock_record_ids) - set(sr.id for sr in stock_records))
+        )
 
-    for catalog in catalogs:
-        if catalog.name == name and catalog.partner == partner:
-            if set(catalog.stock_records.all()) == set(stock_records):
-                return catalog, False
+    fingerprint = Catalog.generate_fingerprint(partner.id, [stock_record.id for stock_record in stock_records])
+    catalog = Catalog.objects.filter(name=name, partner=partner, fingerprint=fingerprint).first()
+    if catalog:
+        return catalog, False
 
     catalog = Catalog.objects.create(name=name, partner=partner)
-    for stock_record in stock_records:
-        catalog.stock_records.add(stock_record)
+    catalog.stock_records.add(*stock_records)
     return catalog, True
 
 
@@ -1,6 +1,7 @@
 # Note: If future versions of django-oscar include new mixins, they will need to be imported here.
 import abc
 
+from celery import group
 from django.db import transaction
 from ecommerce_worker.fulfillment.v1.tasks import fulfill_order
 from oscar.apps.checkout.mixins import OrderPlacementMixin
@@ -70,6 +71,37 @@ class EdxOrderPlacementMixin(OrderPlacementMixin):
         and basket submission in a transaction. Should be used only in
         the context of an exception handler.
         """
+        order = self.submit_order(
+            order_number=order_number,
+            user=user,
+            basket=basket,
+            shipping_address=shipping_address,
+            shipping_method=shipping_method,
+            shipping_charge=shipping_charge,
+            billing_address=billing_address,
+            order_total=order_total,
+            **kwargs
+        )
+
+        return self.handle_successful_order(order)
+
+    def submit_order(self,
+                     order_number,
+                     user,
+                     basket,
+                     shipping_address,
+                     shipping_method,
+                     shipping_charge,
+                     billing_address,
+                     order_total,
+                     **kwargs):
+        """
+        Place an order and mark the corresponding basket as submitted, in a transaction.
+
+        Unlike handle_order_placement, receivers are not notified of the order. Callers placing
+        many orders in a single transaction should notify receivers with handle_successful_orders
+        once the transaction has been committed.
+        """
         with transaction.atomic():
             order = self.place_order(
                 order_number=order_number,
@@ -85,18 +117,11 @@ class EdxOrderPlacementMixin(OrderPlacementMixin):
 
             basket.submit()
 
-        return self.handle_successful_order(order)
+        return order
 
     def handle_successful_order(self, order):
         """Send a signal so that receivers can perform relevant tasks (e.g., fulfill the order)."""
-        audit_log(
-            'order_placed',
-            amount=order.total_excl_tax,
-            basket_id=order.basket.id,
-            currency=order.currency,
-            order_number=order.number,
-            user_id=order.user.id
-        )
+        self._audit_order_placement(order)
 
         if waffle.sample_is_active('async_order_fulfillment'):
             # Always commit transactions before sending tasks depending on state from the current transaction!
@@ -108,3 +133,31 @@ class EdxOrderPlacementMixin(OrderPlacementMixin):
             post_checkout.send(sender=self, order=order)
 
         return order
+
+    def handle_successful_orders(self, orders):
+        """Notify receivers of many orders at once.
+
+        When fulfillment is asynchronous, fulfillment tasks for all of the orders are published
+        together, as a group. As with handle_successful_order, the transaction in which the orders
+        were placed must be committed before this method is called.
+        """
+        for order in orders:
+            self._audit_order_placement(order)
+
+        if waffle.sample_is_active('async_order_fulfillment'):
+            group(fulfill_order.si(order.number) for order in orders).delay()
+        else:
+            for order in orders:
+                post_checkout.send(sender=self, order=order)
+
+        return orders
+
+    def _audit_order_placement(self, order):
+        audit_log(
+            'order_placed',
+            amount=order.total_excl_tax,
+            basket_id=order.basket.id,
+            currency=order.currency,
+            order_number=order.number,
+            user_id=order.user.id
+        )
@@ -3,6 +3,7 @@ import requests
 
 from django.conf import settings
 
+from ecommerce.core.lms import CREDIT, get_lms_session
 from ecommerce.settings import get_lms_url
 
 
@@ -24,7 +25,7 @@ def get_provider_data(provider_id):
         'X-Edx-Api-Key': settings.EDX_API_KEY
     }
     try:
-        response = requests.get(provider_info_url, headers=headers, timeout=timeout)
+        response = get_lms_session(CREDIT).get(provider_info_url, headers=headers, timeout=timeout)
         if response.status_code == 200:
             return response.json()
         else:
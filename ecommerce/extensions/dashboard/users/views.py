@@ -4,9 +4,10 @@ from django.conf import settings
 from django.contrib import messages
 from django.utils.translation import ugettext_lazy as _
 from oscar.apps.dashboard.users.views import UserDetailView as CoreUserDetailView
-import requests
 import waffle
 
+from ecommerce.core.lms import ENROLLMENT, get_lms_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,7 +32,7 @@ class UserDetailView(CoreUserDetailView):
                 'X-Edx-Api-Key': settings.EDX_API_KEY
             }
 
-            response = requests.get(url, headers=headers, timeout=timeout)
+            response = get_lms_session(ENROLLMENT).get(url, headers=headers, timeout=timeout)
 
             status_code = response.status_code
             if status_code == 200:
@@ -7,11 +7,10 @@ can successfully fulfill the product. Success can be reported back based on each
 """
 import logging
 
-from django.conf import settings
-from django.utils import importlib
-
 from ecommerce.extensions.fulfillment import exceptions
+from ecommerce.extensions.fulfillment.registry import fulfillment_module_registry
 from ecommerce.extensions.fulfillment.status import ORDER, LINE
+from ecommerce.extensions.order.utils import set_line_statuses
 from ecommerce.extensions.refund.status import REFUND_LINE
 
 
@@ -29,7 +28,8 @@ def fulfill_order(order, lines):
     Args:
         order (Order): The Order associated with this line item. The status of the Order may be altered based on
             fulfilling the line items.
-        lines (List of Lines): A list of Line items in the Order that should be fulfilled.
+        lines (List of Lines): A list, or queryset, of Line items in the Order that should be fulfilled. The
+            statuses of the given lines are updated in place.
 
     Returns:
         The modified Order and Lines. The status of the Order, or any given Line item, may be 'Complete', or
@@ -42,33 +42,32 @@ def fulfill_order(order, lines):
         logger.error(error_msg)
         raise exceptions.IncorrectOrderStatusError(error_msg)
 
-    # Construct a dict of lines by their product type.
-    line_items = list(lines.all())
+    # Lines are read once. Fulfillment modules update the statuses of these instances as they save them, so the
+    # status of the order can be determined without reading them again.
+    line_items = list(lines.all()) if hasattr(lines, 'all') else list(lines)
 
     try:
-        # Iterate over the Fulfillment Modules defined in our configuration and determine if they support
-        # any of the lines in the order. Fulfill line items in the order they are designated by the configuration.
+        # Group the line items by the first of the Fulfillment Modules defined in our configuration which supports
+        # them, and fulfill each group in the order the modules are designated by the configuration.
         # Remaining line items should be marked with a fulfillment error since we have no configuration that
         # allows them to be fulfilled.
-        for module_class in get_fulfillment_modules():
-            module = module_class()
-            supported_lines = module.get_supported_lines(line_items)
-            line_items = list(set(line_items) - set(supported_lines))
-            module.fulfill_product(order, supported_lines)
+        supported_lines, unsupported_lines = fulfillment_module_registry.group_lines(line_items)
+        for module, module_lines in supported_lines:
+            module.fulfill_product(order, module_lines)
 
         # Check to see if any line items in the order have not been accounted for by a FulfillmentModule
         # Any product does not line up with a module, we have to mark a fulfillment error.
-        for line in line_items:
+        for line in unsupported_lines:
             product_type = line.product.get_product_class().name
             logger.error("Product Type [%s] does not have an associated Fulfillment Module. It cannot be fulfilled.",
                          product_type)
-            line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
+        set_line_statuses([(line, LINE.FULFILLMENT_CONFIGURATION_ERROR) for line in unsupported_lines])
     except Exception:   # pylint: disable=broad-except
         logger.exception('An unexpected error occurred while fulfilling order [%s].', order.number)
     finally:
         # Check if all lines are successful, or there were errors, and set the status of the Order.
         order_status = ORDER.COMPLETE
-        for line in lines.all():
+        for line in line_items:
             if line.status != LINE.COMPLETE:
                 logger.error('There was an error while fulfilling order [%s]', order.number)
                 order_status = ORDER.FULFILLMENT_ERROR
@@ -81,18 +80,7 @@ def fulfill_order(order, lines):
 
 def get_fulfillment_modules():
     """ Retrieves all fulfillment modules declared in settings. """
-    module_paths = getattr(settings, 'FULFILLMENT_MODULES', [])
-    modules = []
-
-    for cls_path in module_paths:
-        try:
-            module_path, _, name = cls_path.rpartition('.')
-            module = getattr(importlib.import_module(module_path), name)
-            modules.append(module)
-        except (ImportError, ValueError, AttributeError):
-            logger.exception("Could not load module at [%s]", cls_path)
-
-    return modules
+    return [module.__class__ for module in fulfillment_module_registry.modules]
 
 
 def get_fulfillment_modules_for_line(line):
@@ -102,7 +90,7 @@ def get_fulfillment_modules_for_line(line):
     Arguments
         line (Line): Line to be considered for fulfillment.
     """
-    return [module for module in get_fulfillment_modules() if module().supports_line(line)]
+    return [module.__class__ for module in fulfillment_module_registry.get_modules_for_line(line)]
 
 
 def revoke_fulfillment_for_refund(refund):
@@ -121,14 +109,13 @@ def revoke_fulfillment_for_refund(refund):
         for refund_line in refund.lines.all():
             refund_line.set_status(REFUND_LINE.COMPLETE)
     else:
-        # TODO (CCB): As our list of product types and fulfillment modules grows, this may become slow,
-        # and should be updated. Runtime is O(n^2).
-        for refund_line in refund.lines.all():
+        # The modules supporting each product class are looked up once, rather than once per line.
+        for refund_line in refund.lines.select_related('order_line__product'):
             order_line = refund_line.order_line
-            modules = get_fulfillment_modules_for_line(order_line)
+            modules = fulfillment_module_registry.get_modules_for_line(order_line)
 
             for module in modules:
-                if module().revoke_line(order_line):
+                if module.revoke_line(order_line):
                     refund_line.set_status(REFUND_LINE.COMPLETE)
                 else:
                     succeeded = False
@@ -10,3 +10,7 @@ class FulfillmentAppConfig(AppConfig):
 
         # noinspection PyUnresolvedReferences
         import ecommerce.extensions.fulfillment.signals  # pylint: disable=unused-variable
+        from ecommerce.extensions.fulfillment.registry import fulfillment_module_registry
+
+        # Import and instantiate the fulfillment modules now, rather than when the first order is fulfilled.
+        fulfillment_module_registry.modules  # pylint: disable=pointless-statement
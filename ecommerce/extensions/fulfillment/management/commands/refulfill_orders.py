@@ -0,0 +1,125 @@
+"""
+Management command that re-fulfills orders in bulk (e.g., every order whose fulfillment failed during an outage).
+
+Orders are processed in order of ID, and the ID of the last order processed is printed after each batch as a
+checkpoint. An interrupted run may be resumed by running the command again with --after set to the last checkpoint.
+"""
+from __future__ import unicode_literals
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from ecommerce.extensions.fulfillment.refulfillment import (
+    get_max_concurrency, get_refulfillable_orders, parse_datetime, refulfill_orders
+)
+from ecommerce.extensions.fulfillment.status import ORDER
+
+
+class Command(BaseCommand):
+    help = 'Re-fulfill orders matching the given criteria, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status',
+                            action='append',
+                            dest='statuses',
+                            default=None,
+                            help='Status of the orders to re-fulfill. May be given more than once. '
+                                 'Defaults to [{}].'.format(ORDER.FULFILLMENT_ERROR))
+        parser.add_argument('--start-date',
+                            action='store',
+                            dest='start',
+                            type=parse_datetime,
+                            default=None,
+                            help='Only re-fulfill orders placed at or after this ISO 8601 formatted date (or time).')
+        parser.add_argument('--end-date',
+                            action='store',
+                            dest='end',
+                            type=parse_datetime,
+                            default=None,
+                            help='Only re-fulfill orders placed before this ISO 8601 formatted date (or time).')
+        parser.add_argument('--product-class',
+                            action='store',
+                            dest='product_class',
+                            default=None,
+                            help='Only re-fulfill orders containing a product of this class (e.g., Seat).')
+        parser.add_argument('--course-id',
+                            action='store',
+                            dest='course_id',
+                            default=None,
+                            help='Only re-fulfill orders containing a product of this course.')
+        parser.add_argument('--after',
+                            action='store',
+                            dest='after',
+                            type=int,
+                            default=None,
+                            help='Only re-fulfill orders with greater IDs. Used to resume from a checkpoint.')
+        parser.add_argument('--batch-size',
+                            action='store',
+                            dest='batch_size',
+                            type=int,
+                            default=settings.REFULFILLMENT_BATCH_SIZE,
+                            help='Number of orders read at once. Defaults to REFULFILLMENT_BATCH_SIZE.')
+        parser.add_argument('--concurrency',
+                            action='store',
+                            dest='concurrency',
+                            type=int,
+                            default=settings.REFULFILLMENT_CONCURRENCY,
+                            help='Maximum number of orders re-fulfilled at once. Defaults to '
+                                 'REFULFILLMENT_CONCURRENCY. May not exceed the Enrollment API concurrency cap '
+                                 'divided by ENROLLMENT_FULFILLMENT_CONCURRENCY.')
+        parser.add_argument('--commit',
+                            action='store_true',
+                            dest='commit',
+                            default=False,
+                            help='Actually re-fulfill the orders.')
+
+    def handle(self, *args, **options):
+        max_concurrency = get_max_concurrency()
+        if options['concurrency'] > max_concurrency:
+            raise CommandError('No more than [{}] orders may be re-fulfilled at once.'.format(max_concurrency))
+
+        try:
+            orders = get_refulfillable_orders(
+                statuses=options['statuses'] or (ORDER.FULFILLMENT_ERROR,),
+                start=options['start'],
+                end=options['end'],
+                product_class=options['product_class'],
+                course_id=options['course_id']
+            )
+        except ValueError as ex:
+            raise CommandError(ex.message)
+
+        after = options['after']
+        total = (orders.filter(id__gt=after) if after else orders).count()
+
+        if not options['commit']:
+            msg = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                  'would have re-fulfilled [{}] orders.'.format(total)
+            self.stderr.write(msg)
+            return
+
+        self.stderr.write('Re-fulfilling [{}] orders...'.format(total))
+        start_time = time.time()
+
+        def report_progress(processed, fulfilled, checkpoint):
+            elapsed = time.time() - start_time
+            self.stderr.write(
+                'Re-fulfilled [{processed}] of [{total}] orders, of which [{fulfilled}] were fulfilled, at '
+                '[{rate:.1f}] orders per second. Checkpoint: [{checkpoint}].'.format(
+                    processed=processed,
+                    total=total,
+                    fulfilled=fulfilled,
+                    rate=processed / elapsed if elapsed else 0,
+                    checkpoint=checkpoint
+                )
+            )
+
+        processed, fulfilled, __ = refulfill_orders(
+            orders,
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+            after=after,
+            progress_callback=report_progress
+        )
+        self.stderr.write('Done. Re-fulfilled [{}] orders, of which [{}] were fulfilled.'.format(processed, fulfilled))
@@ -0,0 +1,45 @@
+"""
+Management command that retries fulfillment of orders whose lines failed to be fulfilled for transient reasons.
+
+This command should be run periodically (e.g., every minute, by cron). Each order is retried with exponential
+backoff, subject to the FULFILLMENT_RETRY_* settings.
+"""
+from __future__ import unicode_literals
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from ecommerce.extensions.fulfillment.retry import get_retryable_lines, retry_fulfillment
+
+
+class Command(BaseCommand):
+    help = 'Retry fulfillment of orders which failed due to network problems or time outs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-orders',
+                            action='store',
+                            dest='max_orders',
+                            type=int,
+                            default=settings.FULFILLMENT_RETRY_BATCH_SIZE,
+                            help='Maximum number of orders to retry. Defaults to FULFILLMENT_RETRY_BATCH_SIZE.')
+        parser.add_argument('--commit',
+                            action='store_true',
+                            dest='commit',
+                            default=False,
+                            help='Actually retry fulfillment.')
+
+    def handle(self, *args, **options):
+        max_orders = options['max_orders']
+
+        if options['commit']:
+            self.stderr.write('Retrying fulfillment of up to [{}] orders...'.format(max_orders))
+            result = retry_fulfillment(max_orders)
+
+            if result is None:
+                self.stderr.write('Skipped. The maximum number of concurrent retry runs are already in progress.')
+            else:
+                self.stderr.write('Done. Retried [{}] orders, of which [{}] were fulfilled.'.format(*result))
+        else:
+            count = min(get_retryable_lines().values('order_id').distinct().count(), max_orders)
+            msg = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                  'would have retried fulfillment of [{}] orders.'.format(count)
+            self.stderr.write(msg)
@@ -6,15 +6,17 @@ in an Order.
 import abc
 import json
 import logging
+from multiprocessing.pool import ThreadPool
 
 from django.conf import settings
 from rest_framework import status
-import requests
 from requests.exceptions import ConnectionError, Timeout
 from ecommerce.courses.utils import mode_for_seat
 
+from ecommerce.core.lms import ENROLLMENT, LmsEndpointUnavailable, get_lms_session
 from ecommerce.extensions.analytics.utils import audit_log, parse_tracking_context
 from ecommerce.extensions.fulfillment.status import LINE
+from ecommerce.extensions.order.utils import set_line_statuses
 
 
 logger = logging.getLogger(__name__)
@@ -93,9 +95,7 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
     Allows the enrollment of a student via purchase of a 'seat'.
     """
 
-    def _post_to_enrollment_api(self, data, user):
-        enrollment_api_url = settings.ENROLLMENT_API_URL
-        timeout = settings.ENROLLMENT_FULFILLMENT_TIMEOUT
+    def _get_enrollment_api_headers(self, user):
         headers = {
             'Content-Type': 'application/json',
             'X-Edx-Api-Key': settings.EDX_API_KEY
@@ -109,7 +109,48 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
         if ip:
             headers['X-Forwarded-For'] = ip
 
-        return requests.post(enrollment_api_url, data=json.dumps(data), headers=headers, timeout=timeout)
+        return headers
+
+    def _post_to_enrollment_api(self, data, user, headers=None):
+        enrollment_api_url = settings.ENROLLMENT_API_URL
+        timeout = settings.ENROLLMENT_FULFILLMENT_TIMEOUT
+        headers = headers or self._get_enrollment_api_headers(user)
+
+        return get_lms_session(ENROLLMENT).post(
+            enrollment_api_url, data=json.dumps(data), headers=headers, timeout=timeout
+        )
+
+    def _post_enrollments(self, enrollments, user):
+        """ Posts the given enrollments to the Enrollment API, several at a time.
+
+        At most ENROLLMENT_FULFILLMENT_CONCURRENCY calls are in flight at once. Network errors and time outs are
+        returned, rather than raised, so that the failure of one call does not affect the others.
+
+        Args:
+            enrollments (list): Enrollment API request bodies.
+            user (User): The user being enrolled.
+
+        Returns:
+            list: (response, error) pairs, in the same order as enrollments. Only one of each pair is set.
+        """
+        headers = self._get_enrollment_api_headers(user)
+
+        def post(data):
+            try:
+                return self._post_to_enrollment_api(data, user, headers=headers), None
+            except (ConnectionError, Timeout) as error:
+                return None, error
+
+        concurrency = min(settings.ENROLLMENT_FULFILLMENT_CONCURRENCY, len(enrollments))
+        if concurrency <= 1:
+            return [post(data) for data in enrollments]
+
+        pool = ThreadPool(concurrency)
+        try:
+            return pool.map(post, enrollments)
+        finally:
+            pool.close()
+            pool.join()
 
     def supports_line(self, line):
         return line.product.get_product_class().name == 'Seat'
@@ -136,6 +177,9 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
         certificate types. May result in an error if the Enrollment API cannot be reached, or if there is
         additional business logic errors when trying to enroll the student.
 
+        Lines are enrolled concurrently, by up to ENROLLMENT_FULFILLMENT_CONCURRENCY threads, and their
+        statuses are saved together once every enrollment has been attempted.
+
         Args:
             order (Order): The Order associated with the lines to be fulfilled. The user associated with the order
                 is presumed to be the student to enroll in a course.
@@ -154,18 +198,19 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
             logger.error(
                 'ENROLLMENT_API_URL and EDX_API_KEY must be set to use the EnrollmentFulfillmentModule'
             )
-            for line in lines:
-                line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
+            set_line_statuses([(line, LINE.FULFILLMENT_CONFIGURATION_ERROR) for line in lines])
 
             return order, lines
 
+        line_statuses = []
+        enrollments = []
         for line in lines:
             try:
                 mode = mode_for_seat(line.product)
                 course_key = line.product.attr.course_key
             except AttributeError:
                 logger.error("Supported Seat Product does not have required attributes, [certificate_type, course_key]")
-                line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
+                line_statuses.append((line, LINE.FULFILLMENT_CONFIGURATION_ERROR))
                 continue
             try:
                 provider = line.product.attr.credit_provider
@@ -196,44 +241,54 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
                         'value': provider
                     }
                 )
-            try:
-                response = self._post_to_enrollment_api(data, user=order.user)
-
-                if response.status_code == status.HTTP_200_OK:
-                    line.set_status(LINE.COMPLETE)
-
-                    audit_log(
-                        'line_fulfilled',
-                        order_line_id=line.id,
-                        order_number=order.number,
-                        product_class=line.product.get_product_class().name,
-                        course_id=course_key,
-                        mode=mode,
-                        user_id=order.user.id,
-                        credit_provider=provider,
-                    )
-                else:
-                    try:
-                        data = response.json()
-                        reason = data.get('message')
-                    except Exception:  # pylint: disable=broad-except
-                        reason = '(No detail provided.)'
-
-                    logger.error(
-                        "Unable to fulfill line [%d] of order [%s] due to a server-side error: %s", line.id,
-                        order.number, reason
-                    )
-                    line.set_status(LINE.FULFILLMENT_SERVER_ERROR)
-            except ConnectionError:
+            enrollments.append((line, mode, course_key, provider, data))
+
+        results = self._post_enrollments([data for __, __, __, __, data in enrollments], user=order.user)
+
+        for (line, mode, course_key, provider, __), (response, error) in zip(enrollments, results):
+            if isinstance(error, LmsEndpointUnavailable):
+                # The call was rejected without being made, so the Enrollment API is not known to be unreachable.
+                logger.error(
+                    "Unable to fulfill line [%d] of order [%s] because the Enrollment API call was rejected: %s",
+                    line.id, order.number, error
+                )
+                line_statuses.append((line, LINE.FULFILLMENT_REJECTED_ERROR))
+            elif isinstance(error, ConnectionError):
                 logger.error(
                     "Unable to fulfill line [%d] of order [%s] due to a network problem", line.id, order.number
                 )
-                line.set_status(LINE.FULFILLMENT_NETWORK_ERROR)
-            except Timeout:
+                line_statuses.append((line, LINE.FULFILLMENT_NETWORK_ERROR))
+            elif isinstance(error, Timeout):
                 logger.error(
                     "Unable to fulfill line [%d] of order [%s] due to a request time out", line.id, order.number
                 )
-                line.set_status(LINE.FULFILLMENT_TIMEOUT_ERROR)
+                line_statuses.append((line, LINE.FULFILLMENT_TIMEOUT_ERROR))
+            elif response.status_code == status.HTTP_200_OK:
+                line_statuses.append((line, LINE.COMPLETE))
+
+                audit_log(
+                    'line_fulfilled',
+                    order_line_id=line.id,
+                    order_number=order.number,
+                    product_class=line.product.get_product_class().name,
+                    course_id=course_key,
+                    mode=mode,
+                    user_id=order.user.id,
+                    credit_provider=provider,
+                )
+            else:
+                try:
+                    reason = response.json().get('message')
+                except Exception:  # pylint: disable=broad-except
+                    reason = '(No detail provided.)'
+
+                logger.error(
+                    "Unable to fulfill line [%d] of order [%s] due to a server-side error: %s", line.id,
+                    order.number, reason
+                )
+                line_statuses.append((line, LINE.FULFILLMENT_SERVER_ERROR))
+
+        set_line_statuses(line_statuses)
         logger.info("Finished fulfilling 'Seat' product types for order [%s]", order.number)
         return order, lines
 
@@ -322,8 +377,7 @@ class CouponFulfillmentModule(BaseFulfillmentModule):
         """
         logger.info("Attempting to fulfill 'Coupon' product types for order [%s]", order.number)
 
-        for line in lines:
-            line.set_status(LINE.COMPLETE)
+        set_line_statuses([(line, LINE.COMPLETE) for line in lines])
 
         logger.info("Finished fulfilling 'Coupon' product types for order [%s]", order.number)
         return order, lines
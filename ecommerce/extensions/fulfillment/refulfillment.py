@@ -0,0 +1,250 @@
+"""
+Bulk re-fulfillment of orders (e.g., of every order whose fulfillment failed during an outage of the LMS).
+
+Orders are selected by `get_refulfillable_orders`, and re-fulfilled by `refulfill_orders` in batches, in order of ID.
+Each batch is read as the orders following the last order of the previous batch, rather than by offset, so reading a
+batch costs the same however far into the selection it is, and a run may be resumed from the ID of the last order it
+processed. The orders of each batch are re-fulfilled concurrently, by up to REFULFILLMENT_CONCURRENCY threads. Since
+each order's lines are enrolled by up to ENROLLMENT_FULFILLMENT_CONCURRENCY threads, no more orders are re-fulfilled
+at once than the Enrollment API's concurrency cap (see `get_max_concurrency`) allows.
+
+Each order is claimed, by `claim_order`, before it is re-fulfilled, and released afterwards. Fulfillment retry runs
+and the fulfillment endpoint claim orders in the same way, so no order is fulfilled by two processes at once. Orders
+claimed by another process, and orders fulfilled since their batch was read, are skipped. Open orders are not
+re-fulfilled, since they may still be being fulfilled by checkout, which does not claim them.
+"""
+from __future__ import unicode_literals
+
+from contextlib import closing
+import logging
+from multiprocessing.pool import ThreadPool
+
+import dateutil.parser
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from oscar.core.loading import get_class, get_model
+
+from ecommerce.core.lms import ENROLLMENT
+from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+
+EventHandler = get_class('order.processing', 'EventHandler')
+Order = get_model('order', 'Order')
+ShippingEventType = get_model('order', 'ShippingEventType')
+
+logger = logging.getLogger(__name__)
+
+REFULFILLABLE_ORDER_STATUSES = (ORDER.FULFILLMENT_ERROR,)
+ORDER_CLAIM_CACHE_KEY_TEMPLATE = 'fulfillment_claim.{order_id}'
+
+# Seconds after which a claim which was not released (e.g., because the process holding it was killed) lapses.
+ORDER_CLAIM_TIMEOUT = 60 * 10
+
+
+def parse_datetime(value):
+    """ Parses an ISO 8601 formatted date or time, for selecting orders. Times without a timezone are taken to be UTC.
+
+    Raises:
+        ValueError: If the value is not a date or time.
+    """
+    value = dateutil.parser.parse(value)
+    return value if timezone.is_aware(value) else timezone.make_aware(value, timezone.utc)
+
+
+def get_refulfillable_orders(statuses=(ORDER.FULFILLMENT_ERROR,), start=None, end=None, product_class=None,
+                             course_id=None):
+    """ Returns the orders matching all of the given criteria.
+
+    Arguments:
+        statuses (iterable): Statuses of the orders. Only orders whose fulfillment failed may be re-fulfilled.
+        start (datetime): If given, only orders placed at or after this time are returned.
+        end (datetime): If given, only orders placed before this time are returned.
+        product_class (str): If given, only orders containing a product of the named class are returned.
+        course_id (str): If given, only orders containing a product of the course are returned.
+
+    Raises:
+        ValueError: If any of the statuses cannot be fulfilled.
+    """
+    invalid_statuses = set(statuses) - set(REFULFILLABLE_ORDER_STATUSES)
+    if invalid_statuses:
+        raise ValueError('Orders with status [{}] cannot be fulfilled.'.format(', '.join(sorted(invalid_statuses))))
+
+    orders = Order.objects.filter(status__in=statuses)
+
+    if start:
+        orders = orders.filter(date_placed__gte=start)
+
+    if end:
+        orders = orders.filter(date_placed__lt=end)
+
+    if product_class:
+        # Child products (e.g., seats) take their class from their parent.
+        orders = orders.filter(
+            Q(lines__product__product_class__name=product_class) |
+            Q(lines__product__parent__product_class__name=product_class)
+        )
+
+    if course_id:
+        orders = orders.filter(lines__course_id=course_id)
+
+    return orders.distinct()
+
+
+def get_order_batches(orders, batch_size, after=None):
+    """ Yields lists of up to batch_size of the given orders, in order of ID.
+
+    Arguments:
+        orders (QuerySet): Orders to be read.
+        batch_size (int): Maximum number of orders per batch.
+        after (int): If given, only orders with greater IDs are read.
+    """
+    orders = orders.order_by('id')
+
+    while True:
+        batch = list((orders.filter(id__gt=after) if after else orders)[:batch_size])
+        if not batch:
+            return
+
+        yield batch
+        after = batch[-1].id
+
+
+def get_max_concurrency():
+    """ Returns the maximum number of orders which may be re-fulfilled at once.
+
+    Each order's lines are enrolled by up to ENROLLMENT_FULFILLMENT_CONCURRENCY threads, so re-fulfilling more orders
+    at once could exceed the Enrollment API's concurrency cap, and calls beyond the cap would be rejected.
+    """
+    return max(settings.LMS_ENDPOINT_CONCURRENCY[ENROLLMENT] // settings.ENROLLMENT_FULFILLMENT_CONCURRENCY, 1)
+
+
+def claim_order(order):
+    """ Claims the given order for fulfillment, so that no other process fulfills it at the same time.
+
+    Claims must be released, with `release_order`, once fulfillment has been attempted.
+
+    Returns:
+        bool: True if the order was claimed; False if another process has already claimed it.
+    """
+    return cache.add(ORDER_CLAIM_CACHE_KEY_TEMPLATE.format(order_id=order.id), True, ORDER_CLAIM_TIMEOUT)
+
+
+def release_order(order):
+    """ Releases the claim on the given order taken by `claim_order`. """
+    cache.delete(ORDER_CLAIM_CACHE_KEY_TEMPLATE.format(order_id=order.id))
+
+
+def refulfill_order(order):
+    """ Re-drives fulfillment of the unfulfilled lines of the given order, as placing the order did.
+
+    Returns:
+        bool: True if the order was fulfilled; otherwise, False.
+    """
+    logger.info('Re-fulfilling order [%s]...', order.number)
+
+    lines = order.lines.exclude(status=LINE.COMPLETE)
+    line_quantities = [line.quantity for line in lines]
+    shipping_event, __ = ShippingEventType.objects.get_or_create(name=SHIPPING_EVENT_NAME)
+    order = EventHandler().handle_shipping_event(order, shipping_event, lines, line_quantities)
+
+    if order.status == ORDER.COMPLETE:
+        logger.info('Re-fulfillment of order [%s] succeeded.', order.number)
+        return True
+
+    logger.warning('Re-fulfillment of order [%s] failed.', order.number)
+    return False
+
+
+def refulfill_orders(orders, batch_size=None, concurrency=None, after=None, progress_callback=None):
+    """ Re-fulfills the given orders, in batches, in order of ID.
+
+    Arguments:
+        orders (QuerySet): Orders to re-fulfill, as returned by `get_refulfillable_orders`.
+        batch_size (int): Number of orders read at once. Defaults to REFULFILLMENT_BATCH_SIZE.
+        concurrency (int): Maximum number of orders re-fulfilled at once. Defaults to REFULFILLMENT_CONCURRENCY.
+            Limited to the value returned by `get_max_concurrency`.
+        after (int): If given, only orders with greater IDs are re-fulfilled. Used to resume an interrupted run.
+        progress_callback (callable): If given, called after each batch with the number of orders processed and
+            fulfilled so far, and the ID of the last order processed.
+
+    Orders claimed by another process, and orders which are no longer fulfillable once claimed (e.g., because another
+    process fulfilled them after their batch was read), are skipped, and are not counted as processed.
+
+    Returns:
+        tuple: The number of orders processed, the number of those which were fulfilled, and the ID of the last
+            order read (None if no orders were read).
+    """
+    batch_size = batch_size or settings.REFULFILLMENT_BATCH_SIZE
+    concurrency = concurrency or settings.REFULFILLMENT_CONCURRENCY
+
+    max_concurrency = get_max_concurrency()
+    if concurrency > max_concurrency:
+        logger.warning(
+            'Re-fulfilling no more than [%d] orders at once, rather than [%d], so that calls to the Enrollment API '
+            'do not exceed its concurrency cap.', max_concurrency, concurrency
+        )
+        concurrency = max_concurrency
+
+    processed = fulfilled = 0
+    checkpoint = after
+
+    for batch in get_order_batches(orders, batch_size, after=after):
+        results = _refulfill_batch(_claim_batch(batch), concurrency)
+
+        processed += len(results)
+        fulfilled += sum(results)
+        checkpoint = batch[-1].id
+
+        if progress_callback:
+            progress_callback(processed, fulfilled, checkpoint)
+
+    return processed, fulfilled, checkpoint
+
+
+def _claim_batch(orders):
+    """ Claims the given orders, and returns those which were claimed and are still fulfillable, as reloaded. """
+    claimed = []
+    for order in orders:
+        if not claim_order(order):
+            logger.info('Skipping order [%s], which is being fulfilled by another process.', order.number)
+            continue
+
+        # The order may have been fulfilled by another process between the batch being read and the order claimed.
+        order = Order.objects.get(id=order.id)
+        if order.is_fulfillable:
+            claimed.append(order)
+        else:
+            logger.info('Skipping order [%s], which has been fulfilled by another process.', order.number)
+            release_order(order)
+
+    return claimed
+
+
+def _refulfill_batch(orders, concurrency):
+    """ Re-fulfills the given claimed orders, by up to the given number at once, releasing each afterwards.
+
+    Returns:
+        list: Whether each order was fulfilled.
+    """
+    concurrency = min(concurrency, len(orders))
+
+    def refulfill(order):
+        try:
+            return refulfill_order(order)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('An unexpected error occurred while re-fulfilling order [%s].', order.number)
+            return False
+        finally:
+            release_order(order)
+            if concurrency > 1:
+                # Each thread has its own database connection, which would otherwise be left open.
+                connection.close()
+
+    if concurrency <= 1:
+        return [refulfill(order) for order in orders]
+
+    with closing(ThreadPool(concurrency)) as pool:
+        return pool.map(refulfill, orders)
@@ -0,0 +1,105 @@
+"""
+Process-wide registry of the fulfillment modules declared in the FULFILLMENT_MODULES setting.
+
+The modules are imported and instantiated once, when the fulfillment app is ready, rather than each time an
+order is fulfilled or a refund revoked. Lines are dispatched to modules by product class: the modules which
+support a product class are determined from the first line of that class seen by the process, and reused for
+every subsequent line of the class. Modules must therefore decide whether they support a line by its product
+class alone, as every module in this project does.
+"""
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import logging
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import importlib
+
+logger = logging.getLogger(__name__)
+
+
+class FulfillmentModuleRegistry(object):
+    """ Lazily-loaded, ordered collection of fulfillment module instances, indexed by supported product class. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._modules = None
+        self._modules_by_product_class = {}
+
+    @property
+    def modules(self):
+        """ Returns an instance of each module declared in settings, in the order in which they are declared. """
+        with self._lock:
+            if self._modules is None:
+                self._modules = self._load()
+                self._modules_by_product_class = {}
+
+            return self._modules
+
+    def get_modules_for_line(self, line):
+        """ Returns the modules which support the given line, in the order in which they are declared. """
+        product_class = line.product.get_product_class().name
+        modules = self.modules
+
+        supporting_modules = self._modules_by_product_class.get(product_class)
+        if supporting_modules is None:
+            supporting_modules = [module for module in modules if module.supports_line(line)]
+            self._modules_by_product_class[product_class] = supporting_modules
+
+        return supporting_modules
+
+    def group_lines(self, lines):
+        """ Groups the given lines by the module which should fulfill them.
+
+        Each line is assigned to the first declared module which supports it.
+
+        Arguments:
+            lines (list): Order Lines.
+
+        Returns:
+            tuple: A list of (module, lines) pairs, in the order in which the modules are declared, and a list of
+                the lines which no module supports.
+        """
+        lines_by_module = OrderedDict((module, []) for module in self.modules)
+        unsupported_lines = []
+
+        for line in lines:
+            modules = self.get_modules_for_line(line)
+            if modules:
+                lines_by_module[modules[0]].append(line)
+            else:
+                unsupported_lines.append(line)
+
+        return [(module, module_lines) for module, module_lines in lines_by_module.items() if module_lines], \
+            unsupported_lines
+
+    def clear(self):
+        """ Discards the loaded modules. They are reloaded from settings when next needed. """
+        with self._lock:
+            self._modules = None
+            self._modules_by_product_class = {}
+
+    def _load(self):
+        modules = []
+
+        for cls_path in getattr(settings, 'FULFILLMENT_MODULES', []):
+            try:
+                module_path, _, name = cls_path.rpartition('.')
+                modules.append(getattr(importlib.import_module(module_path), name)())
+            except (ImportError, ValueError, AttributeError):
+                logger.exception("Could not load module at [%s]", cls_path)
+
+        return modules
+
+
+fulfillment_module_registry = FulfillmentModuleRegistry()
+
+
+@receiver(setting_changed)
+def clear_fulfillment_module_registry(setting, **kwargs):  # pylint: disable=unused-argument
+    """ Reloads the modules when FULFILLMENT_MODULES is changed (e.g., by tests overriding the setting). """
+    if setting == 'FULFILLMENT_MODULES':
+        fulfillment_module_registry.clear()
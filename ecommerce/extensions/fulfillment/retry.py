@@ -0,0 +1,163 @@
+"""
+Retries of fulfillment which failed for transient reasons.
+
+Lines whose fulfillment fails because the Enrollment API could not be reached, timed out, or was not called because
+calls to it were being rejected (e.g., by its concurrency cap or circuit breaker), are retried with
+jittered exponential backoff, until they are fulfilled or FULFILLMENT_RETRY_MAX_ATTEMPTS attempts have been made.
+The number of attempts, and the time of the next attempt, are stored on each line, so retries survive restarts and
+are never made by more than one process at a time. Orders are claimed with `claim_order` while they are retried, as
+they are by bulk re-fulfillment, so they are not retried while being fulfilled by any other process.
+
+Retries are made by `retry_fulfillment`, which should be run periodically (e.g., by cron, using the
+retry_fulfillment management command). No more than FULFILLMENT_RETRY_CONCURRENCY runs may be in progress at once,
+and no more than FULFILLMENT_RETRY_RATE_LIMIT orders are retried per minute, across all runs, so that an outage of
+the LMS is not followed by a flood of Enrollment API calls.
+"""
+from __future__ import unicode_literals
+
+import datetime
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max, Q
+from django.utils.timezone import now
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.fulfillment.refulfillment import claim_order, refulfill_order, release_order
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+
+Line = get_model('order', 'Line')
+Order = get_model('order', 'Order')
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_LINE_STATUSES = (
+    LINE.FULFILLMENT_NETWORK_ERROR, LINE.FULFILLMENT_REJECTED_ERROR, LINE.FULFILLMENT_TIMEOUT_ERROR,
+)
+RETRY_SLOT_CACHE_KEY_TEMPLATE = 'fulfillment_retry_slot.{slot}'
+RETRY_RATE_CACHE_KEY_TEMPLATE = 'fulfillment_retry_rate.{minute}'
+
+# Seconds after which a slot held by a run which did not release it (e.g., because it was killed) is freed.
+RETRY_SLOT_TIMEOUT = 60 * 60
+
+
+def get_retry_delay(attempts):
+    """ Returns the number of seconds to wait after the given number of retries before retrying fulfillment again.
+
+    The delay doubles with each attempt, up to FULFILLMENT_RETRY_MAX_DELAY, and is jittered by up to half its
+    length, so that lines which failed together are not retried together.
+    """
+    delay = min(settings.FULFILLMENT_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.FULFILLMENT_RETRY_MAX_DELAY)
+    return random.uniform(delay / 2.0, delay)
+
+
+def get_retryable_lines():
+    """ Returns the lines whose fulfillment is due to be retried.
+
+    Orders are only retried if all of their unfulfilled lines failed for transient reasons. Other failures (e.g.,
+    misconfigured products) must be corrected by hand.
+    """
+    permanent_failures = Line.objects.filter(
+        order__status=ORDER.FULFILLMENT_ERROR
+    ).exclude(
+        status__in=RETRYABLE_LINE_STATUSES + (LINE.COMPLETE,)
+    )
+
+    return Line.objects.filter(
+        Q(next_fulfillment_attempt__isnull=True) | Q(next_fulfillment_attempt__lte=now()),
+        order__status=ORDER.FULFILLMENT_ERROR,
+        status__in=RETRYABLE_LINE_STATUSES,
+        fulfillment_attempts__lt=settings.FULFILLMENT_RETRY_MAX_ATTEMPTS,
+    ).exclude(
+        order_id__in=permanent_failures.values('order_id')
+    )
+
+
+def retry_fulfillment(max_orders=None):
+    """ Retries fulfillment of the orders which are due to be retried, oldest first.
+
+    Arguments:
+        max_orders (int): Maximum number of orders to retry. Defaults to FULFILLMENT_RETRY_BATCH_SIZE.
+
+    Returns:
+        tuple: The number of orders retried, and the number of those which were fulfilled. None if the maximum
+            number of concurrent runs are already in progress.
+    """
+    max_orders = max_orders or settings.FULFILLMENT_RETRY_BATCH_SIZE
+
+    slot_key = _acquire_slot()
+    if slot_key is None:
+        logger.info('[%d] fulfillment retry runs are already in progress.', settings.FULFILLMENT_RETRY_CONCURRENCY)
+        return None
+
+    retried = fulfilled = 0
+    try:
+        order_ids = get_retryable_lines().values_list('order_id', flat=True).order_by('order_id').distinct()
+
+        for order_id in order_ids[:max_orders]:
+            if not _acquire_rate_limit_token():
+                logger.info('Fulfillment retry rate limit reached. Remaining orders will be retried by a later run.')
+                break
+
+            order = Order.objects.get(id=order_id)
+            if not claim_order(order):
+                logger.info('Skipping order [%s], which is being fulfilled by another process.', order.number)
+                continue
+
+            try:
+                if not _claim_order(order_id):
+                    # Another run retried the order after the due orders were listed.
+                    continue
+
+                retried += 1
+                if refulfill_order(order):
+                    fulfilled += 1
+            finally:
+                release_order(order)
+    finally:
+        cache.delete(slot_key)
+
+    return retried, fulfilled
+
+
+def _acquire_slot():
+    """ Returns the cache key of a free concurrent run slot, having taken it, or None if all slots are taken. """
+    for slot in range(settings.FULFILLMENT_RETRY_CONCURRENCY):
+        slot_key = RETRY_SLOT_CACHE_KEY_TEMPLATE.format(slot=slot)
+        if cache.add(slot_key, True, RETRY_SLOT_TIMEOUT):
+            return slot_key
+
+    return None
+
+
+def _acquire_rate_limit_token():
+    """ Returns True if another order may be retried in the current minute, counting it against the rate limit. """
+    rate_key = RETRY_RATE_CACHE_KEY_TEMPLATE.format(minute=int(time.time() // 60))
+    cache.add(rate_key, 0, 60 * 2)
+
+    try:
+        count = cache.incr(rate_key)
+    except ValueError:
+        # The count expired between being added and incremented.
+        count = 1
+        cache.set(rate_key, count, 60 * 2)
+
+    return count <= settings.FULFILLMENT_RETRY_RATE_LIMIT
+
+
+def _claim_order(order_id):
+    """ Records an attempt to fulfill the retryable lines of the given order, and schedules the next attempt.
+
+    The lines are only claimed if no other run has claimed them since they were found to be due.
+
+    Returns:
+        bool: True if the lines were claimed; otherwise, False.
+    """
+    lines = get_retryable_lines().filter(order_id=order_id)
+    attempts = lines.aggregate(attempts=Max('fulfillment_attempts'))['attempts'] or 0
+    next_attempt = now() + datetime.timedelta(seconds=get_retry_delay(attempts + 1))
+
+    return lines.update(fulfillment_attempts=F('fulfillment_attempts') + 1, next_fulfillment_attempt=next_attempt) > 0
@@ -13,6 +13,7 @@ class LINE(object):
     COMPLETE = 'Complete'
     FULFILLMENT_CONFIGURATION_ERROR = 'Fulfillment Configuration Error'
     FULFILLMENT_NETWORK_ERROR = 'Fulfillment Network Error'
+    FULFILLMENT_REJECTED_ERROR = 'Fulfillment Rejected Error'
     FULFILLMENT_TIMEOUT_ERROR = 'Fulfillment Timeout Error'
     FULFILLMENT_SERVER_ERROR = 'Fulfillment Server Error'
     OPEN = 'Open'
@@ -0,0 +1,91 @@
+"""Fulfillment tasks."""
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import cache
+
+from ecommerce.extensions.fulfillment import refulfillment
+
+logger = get_task_logger(__name__)
+
+REFULFILLMENT_CACHE_KEY_TEMPLATE = 'refulfillment.{job_id}'
+
+
+class RefulfillmentStatus(object):
+    """Statuses of orders being re-fulfilled by a background task."""
+    PENDING = u'pending'
+    IN_PROGRESS = u'in_progress'
+    COMPLETE = u'complete'
+    FAILED = u'failed'
+
+
+def get_refulfillment(job_id):
+    """Retrieve the progress of the given re-fulfillment job.
+
+    Returns:
+        dict: Containing a status, the number of orders to be re-fulfilled, processed and fulfilled, the ID of the
+            last order processed, and a developer message if the job failed. None if the job does not exist.
+    """
+    return cache.get(REFULFILLMENT_CACHE_KEY_TEMPLATE.format(job_id=job_id))
+
+
+def set_refulfillment(job_id, status, total, processed=0, fulfilled=0, checkpoint=None, developer_message=None):
+    """Record the progress of the given re-fulfillment job."""
+    cache.set(
+        REFULFILLMENT_CACHE_KEY_TEMPLATE.format(job_id=job_id),
+        {
+            'status': status,
+            'total': total,
+            'processed': processed,
+            'fulfilled': fulfilled,
+            'checkpoint': checkpoint,
+            'developer_message': developer_message,
+        },
+        settings.REFULFILLMENT_STATUS_TIMEOUT
+    )
+
+
+@shared_task(ignore_result=True)
+def refulfill_orders(job_id, statuses, start_datetime=None, end_datetime=None, product_class=None, course_id=None,
+                     after=None):
+    """Re-fulfill the orders matching the given criteria.
+
+    Progress is recorded in the cache, from which it can be retrieved with `get_refulfillment`. If the job fails,
+    it may be resumed by a new job, from the recorded checkpoint.
+
+    Arguments:
+        job_id (str): ID under which progress is recorded.
+        statuses (list): Statuses of the orders to be re-fulfilled.
+        start_datetime (str): If given, ISO 8601 formatted time at or after which the orders were placed. Times
+            without a timezone are taken to be UTC.
+        end_datetime (str): If given, ISO 8601 formatted time before which the orders were placed. Times without a
+            timezone are taken to be UTC.
+        product_class (str): If given, name of a class of product which the orders contain.
+        course_id (str): If given, ID of a course of which the orders contain a product.
+        after (int): If given, only orders with greater IDs are re-fulfilled.
+    """
+    orders = refulfillment.get_refulfillable_orders(
+        statuses=statuses,
+        start=refulfillment.parse_datetime(start_datetime) if start_datetime else None,
+        end=refulfillment.parse_datetime(end_datetime) if end_datetime else None,
+        product_class=product_class,
+        course_id=course_id
+    )
+    total = (orders.filter(id__gt=after) if after else orders).count()
+    progress = {'processed': 0, 'fulfilled': 0, 'checkpoint': after}
+    set_refulfillment(job_id, RefulfillmentStatus.IN_PROGRESS, total, **progress)
+
+    def record_progress(processed, fulfilled, checkpoint):
+        progress.update(processed=processed, fulfilled=fulfilled, checkpoint=checkpoint)
+        set_refulfillment(job_id, RefulfillmentStatus.IN_PROGRESS, total, **progress)
+
+    try:
+        refulfillment.refulfill_orders(orders, after=after, progress_callback=record_progress)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.exception('Re-fulfillment job [%s] failed.', job_id)
+        set_refulfillment(job_id, RefulfillmentStatus.FAILED, total, developer_message=ex.message, **progress)
+        return
+
+    set_refulfillment(job_id, RefulfillmentStatus.COMPLETE, total, **progress)
+    logger.info('Re-fulfillment job [%s] processed [%d] orders, of which [%d] were fulfilled.', job_id,
+                progress['processed'], progress['fulfilled'])
@@ -0,0 +1,85 @@
+"""
+Benchmark of EnrollmentFulfillmentModule.fulfill_product for orders of many seats.
+
+Enrollment API calls are made to a local stub, which responds after a fixed latency. Each order is fulfilled
+with increasing concurrency, with and without failing calls.
+
+This module is not collected by the test runner. Run it explicitly with:
+
+    $ ./manage.py test ecommerce.extensions.fulfillment.tests.benchmarks --nocapture
+"""
+from __future__ import print_function, unicode_literals
+import timeit
+
+from django.db import transaction
+from django.test import override_settings
+from oscar.test import factories
+from oscar.test.newfactories import BasketFactory, UserFactory
+
+from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.extensions.fulfillment.modules import EnrollmentFulfillmentModule
+from ecommerce.extensions.fulfillment.tests.stub_enrollment_api import (
+    DISCONNECT, SERVER_ERROR, TIMEOUT, StubEnrollmentApiServer
+)
+from ecommerce.tests.testcases import TestCase
+
+LINE_COUNTS = (1, 10, 50)
+CONCURRENCIES = (1, 4, 16)
+
+# Latency of each Enrollment API call, in seconds.
+LATENCY = 0.1
+
+# Client timeout, in seconds. Calls to courses which time out take this long to fail.
+TIMEOUT_SECONDS = 1
+
+
+@override_settings(EDX_API_KEY='benchmark', ENROLLMENT_FULFILLMENT_TIMEOUT=TIMEOUT_SECONDS)
+class FulfillProductBenchmark(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(FulfillProductBenchmark, self).setUp()
+        self.courses = [
+            Course.objects.create(id='edX/Benchmark/Course_{}'.format(i), name='Benchmark')
+            for i in range(max(LINE_COUNTS))
+        ]
+        self.seats = [course.create_or_update_seat('verified', True, 100, self.partner) for course in self.courses]
+
+    def _create_order(self, line_count):
+        basket = BasketFactory()
+        for seat in self.seats[:line_count]:
+            basket.add_product(seat, 1)
+        return factories.create_order(basket=basket, user=UserFactory())
+
+    def _time(self, server, line_count, concurrency):
+        """ Returns the time, in seconds, taken to fulfill an order with the given number of lines. """
+        with transaction.atomic():
+            order = self._create_order(line_count)
+            lines = list(order.lines.all())
+
+            with override_settings(ENROLLMENT_API_URL=server.url, ENROLLMENT_FULFILLMENT_CONCURRENCY=concurrency):
+                start = timeit.default_timer()
+                EnrollmentFulfillmentModule().fulfill_product(order, lines)
+                elapsed = timeit.default_timer() - start
+
+            transaction.set_rollback(True)
+
+        return elapsed
+
+    def _benchmark(self, title, behaviours=None):
+        print('\n{} ({:.0f} ms latency)'.format(title, LATENCY * 1000))
+        print('{:>10} '.format('lines') + ' '.join('{:>12}'.format('{} thread(s)'.format(c)) for c in CONCURRENCIES))
+
+        with StubEnrollmentApiServer(latency=LATENCY, hang=TIMEOUT_SECONDS * 2, behaviours=behaviours) as server:
+            for line_count in LINE_COUNTS:
+                timings = [self._time(server, line_count, concurrency) for concurrency in CONCURRENCIES]
+                print('{:>10} '.format(line_count) + ' '.join('{:>11.2f}s'.format(t) for t in timings))
+
+    def test_fulfill_product(self):
+        self._benchmark('All enrollments succeed')
+
+    def test_fulfill_product_with_errors(self):
+        # One course of every ten fails with each type of error.
+        behaviours = {}
+        for i, course in enumerate(self.courses):
+            behaviours[course.id] = {1: SERVER_ERROR, 2: TIMEOUT, 3: DISCONNECT}.get(i % 10)
+        self._benchmark('Some enrollments fail', behaviours)
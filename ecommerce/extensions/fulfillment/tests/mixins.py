@@ -1,19 +1,43 @@
+from django.conf import settings
+import httpretty
 from oscar.test import factories
+from oscar.test.newfactories import BasketFactory
 
 from ecommerce.extensions.fulfillment.status import ORDER, LINE
 
+JSON = 'application/json'
+
 
 class FulfillmentTestMixin(object):
     """
     Mixin for fulfillment tests.
 
-    Inheriting classes should have a `create_user` method.
+    Inheriting classes should have a `create_user` method, and a `seat` attribute if they create failed orders
+    without specifying a product.
     """
     def generate_open_order(self):
         """ Returns an open order, ready to be fulfilled. """
         user = self.create_user()
         return factories.create_order(user=user, status=ORDER.OPEN)
 
+    def create_failed_order(self, product=None, status=ORDER.FULFILLMENT_ERROR,
+                            line_status=LINE.FULFILLMENT_SERVER_ERROR):
+        """ Returns an order for the given product (by default, the seat), with the given status.
+
+        The lines of orders whose fulfillment failed are given the line status; those of other orders keep theirs.
+        """
+        basket = BasketFactory()
+        basket.add_product(product or self.seat, 1)
+        order = factories.create_order(basket=basket, user=self.create_user(), status=status)
+        if status == ORDER.FULFILLMENT_ERROR:
+            order.lines.update(status=line_status)
+        return order
+
+    def mock_enrollment_api(self):
+        """ Mocks successful responses from the Enrollment API. httpretty must be enabled. """
+        self.assertTrue(httpretty.is_enabled(), 'httpretty must be enabled to mock Enrollment API calls.')
+        httpretty.register_uri(httpretty.POST, settings.ENROLLMENT_API_URL, status=200, body='{}', content_type=JSON)
+
     def assert_order_fulfilled(self, order):
         """
         Verifies that an order has been fulfilled.
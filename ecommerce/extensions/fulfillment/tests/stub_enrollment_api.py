@@ -0,0 +1,106 @@
+"""A local stand-in for the LMS Enrollment API, used to exercise fulfillment over real connections."""
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+import json
+from SocketServer import ThreadingMixIn
+import threading
+import time
+
+# Behaviours which can be assigned to individual courses.
+SERVER_ERROR = 'server_error'
+TIMEOUT = 'timeout'
+DISCONNECT = 'disconnect'
+
+
+class StubEnrollmentApiRequestHandler(BaseHTTPRequestHandler):
+    # Keep connections alive, as the LMS does.
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        course_id = data['course_details']['course_id']
+        server = self.server
+        behaviour = server.behaviours.get(course_id)
+
+        server.request_started(course_id, self.client_address)
+        try:
+            time.sleep(server.latency)
+            if behaviour == TIMEOUT:
+                time.sleep(server.hang)
+        finally:
+            server.request_ended()
+
+        if behaviour == DISCONNECT:
+            self.close_connection = 1
+        elif behaviour == SERVER_ERROR:
+            self._respond(500, {'message': 'Enrollment of [{}] failed.'.format(course_id)})
+        else:
+            self._respond(200, data)
+
+    def _respond(self, status, body):
+        body = json.dumps(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class StubEnrollmentApiServer(ThreadingMixIn, HTTPServer):
+    """
+    Enrollment API server, listening on a random local port, which handles each connection on its own thread.
+
+    Each enrollment succeeds after `latency` seconds, unless a behaviour has been assigned to its course:
+
+        * SERVER_ERROR: Respond with a 500.
+        * TIMEOUT: Respond only after a further `hang` seconds, which should exceed the client's timeout.
+        * DISCONNECT: Close the connection without responding.
+
+    Example:
+        >>> with StubEnrollmentApiServer(latency=0.1) as server:
+        ...     with override_settings(ENROLLMENT_API_URL=server.url):
+        ...         fulfill_order(order, order.lines)
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0, hang=1, behaviours=None):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubEnrollmentApiRequestHandler)
+        self.latency = latency
+        self.hang = hang
+        self.behaviours = behaviours or {}
+        self.requests = []
+        self.concurrent_requests = 0
+        self.max_concurrent_requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://{}:{}/api/enrollment/v1/enrollment'.format(*self.server_address)
+
+    def request_started(self, course_id, client_address):
+        with self._lock:
+            self.requests.append((course_id, client_address))
+            self.concurrent_requests += 1
+            self.max_concurrent_requests = max(self.max_concurrent_requests, self.concurrent_requests)
+
+    def request_ended(self):
+        with self._lock:
+            self.concurrent_requests -= 1
+
+    def handle_error(self, request, client_address):
+        # Clients which have timed out will have closed their connections before the stub responds.
+        pass
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
@@ -44,6 +44,17 @@ class FulfillmentApiTests(FulfillmentTestMixin, TestCase):
         self.assertEquals(ORDER.FULFILLMENT_ERROR, self.order.status)
         self.assertEquals(LINE.FULFILLMENT_CONFIGURATION_ERROR, self.order.lines.all()[0].status)
 
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FulfillNothingModule', ])
+    def test_fulfill_order_lines_updated_in_place(self):
+        """ Verify the statuses of the given lines are updated, and determine the status of the order. """
+        lines = list(self.order.lines.all())
+
+        api.fulfill_order(self.order, lines)
+
+        self.assertEqual(self.order.status, ORDER.FULFILLMENT_ERROR)
+        self.assertEqual([line.status for line in lines], [LINE.FULFILLMENT_CONFIGURATION_ERROR])
+        self.assertEqual(self.order.lines.get().status, LINE.FULFILLMENT_CONFIGURATION_ERROR)
+
     @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.NotARealModule', ])
     def test_fulfill_order_incorrect_module(self):
         """Test an incorrect Fulfillment Module."""
@@ -58,7 +69,7 @@ class FulfillmentApiTests(FulfillmentTestMixin, TestCase):
         Verify the function retrieves the modules specified in settings.
         An error should be logged for modules that cannot be loaded.
         """
-        logger_name = 'ecommerce.extensions.fulfillment.api'
+        logger_name = 'ecommerce.extensions.fulfillment.registry'
 
         with LogCapture(logger_name) as l:
             actual = get_fulfillment_modules()
@@ -13,12 +13,16 @@ from oscar.test.newfactories import UserFactory, BasketFactory
 from requests.exceptions import ConnectionError, Timeout
 from testfixtures import LogCapture
 
+from ecommerce.core.lms import ConcurrencyLimitError
 from ecommerce.courses.models import Course
 from ecommerce.courses.utils import mode_for_seat
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.fulfillment.modules import CouponFulfillmentModule, EnrollmentFulfillmentModule
 from ecommerce.extensions.fulfillment.status import LINE
 from ecommerce.extensions.fulfillment.tests.mixins import FulfillmentTestMixin
+from ecommerce.extensions.fulfillment.tests.stub_enrollment_api import (
+    DISCONNECT, SERVER_ERROR, TIMEOUT, StubEnrollmentApiServer
+)
 from ecommerce.extensions.test.factories import create_coupon
 from ecommerce.extensions.voucher.utils import create_vouchers
 from ecommerce.tests.testcases import TestCase
@@ -149,13 +153,20 @@ class EnrollmentFulfillmentModuleTests(CourseCatalogTestMixin, FulfillmentTestMi
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_CONFIGURATION_ERROR, self.order.lines.all()[0].status)
 
-    @mock.patch('requests.post', mock.Mock(side_effect=ConnectionError))
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=ConnectionError))
     def test_enrollment_module_network_error(self):
         """Test that lines receive a network error status if a fulfillment request experiences a network error."""
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_NETWORK_ERROR, self.order.lines.all()[0].status)
 
-    @mock.patch('requests.post', mock.Mock(side_effect=Timeout))
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=ConcurrencyLimitError))
+    def test_enrollment_module_rejected(self):
+        """Test that lines receive a rejected error status, rather than a network error status, if a fulfillment
+        request is rejected without being made."""
+        EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
+        self.assertEqual(LINE.FULFILLMENT_REJECTED_ERROR, self.order.lines.all()[0].status)
+
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=Timeout))
     def test_enrollment_module_request_timeout(self):
         """Test that lines receive a timeout error status if a fulfillment request times out."""
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
@@ -394,6 +405,76 @@ class EnrollmentFulfillmentModuleTests(CourseCatalogTestMixin, FulfillmentTestMi
         self.assertEqual(seat_basket.total_excl_tax, 0.00)
 
 
+@ddt.ddt
+@override_settings(EDX_API_KEY='foo', ENROLLMENT_FULFILLMENT_TIMEOUT=0.5)
+class ConcurrentEnrollmentFulfillmentTests(CourseCatalogTestMixin, TestCase):
+    """ Test fulfillment of orders of many seats, against a local Enrollment API. """
+
+    def setUp(self):
+        super(ConcurrentEnrollmentFulfillmentTests, self).setUp()
+        self.course_ids = ['edX/DemoX/Course_{}'.format(i) for i in range(6)]
+
+        basket = BasketFactory()
+        for course_id in self.course_ids:
+            course = Course.objects.create(id=course_id, name=course_id)
+            basket.add_product(course.create_or_update_seat('verified', True, 100, self.partner), 1)
+        self.order = factories.create_order(basket=basket, user=UserFactory())
+
+    def fulfill(self, server):
+        with override_settings(ENROLLMENT_API_URL=server.url):
+            EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
+
+    def assert_line_statuses(self, expected):
+        """ Verify the saved status of the line for each course. """
+        actual = {line.product.attr.course_key: line.status for line in self.order.lines.all()}
+        self.assertEqual(actual, expected)
+
+    @ddt.data(1, 3)
+    def test_concurrency(self, concurrency):
+        """ Verify no more than the configured number of Enrollment API calls are made at once. """
+        with override_settings(ENROLLMENT_FULFILLMENT_CONCURRENCY=concurrency):
+            with StubEnrollmentApiServer(latency=0.05) as server:
+                self.fulfill(server)
+
+        self.assertEqual(sorted(course_id for course_id, __ in server.requests), self.course_ids)
+        self.assertEqual(server.max_concurrent_requests, concurrency)
+        self.assert_line_statuses({course_id: LINE.COMPLETE for course_id in self.course_ids})
+
+    @override_settings(ENROLLMENT_FULFILLMENT_CONCURRENCY=1)
+    def test_keep_alive(self):
+        """ Verify a single connection is used to make consecutive Enrollment API calls. """
+        with StubEnrollmentApiServer() as server:
+            self.fulfill(server)
+
+        self.assertEqual(len(set(client_address for __, client_address in server.requests)), 1)
+
+    def test_errors(self):
+        """ Verify the failure of individual Enrollment API calls is recorded on the corresponding lines only. """
+        behaviours = {
+            self.course_ids[0]: SERVER_ERROR,
+            self.course_ids[1]: TIMEOUT,
+            self.course_ids[2]: DISCONNECT,
+        }
+        with StubEnrollmentApiServer(behaviours=behaviours) as server:
+            self.fulfill(server)
+
+        expected = {course_id: LINE.COMPLETE for course_id in self.course_ids}
+        expected.update({
+            self.course_ids[0]: LINE.FULFILLMENT_SERVER_ERROR,
+            self.course_ids[1]: LINE.FULFILLMENT_TIMEOUT_ERROR,
+            self.course_ids[2]: LINE.FULFILLMENT_NETWORK_ERROR,
+        })
+        self.assert_line_statuses(expected)
+
+    def test_history(self):
+        """ Verify a historical record is created for each line whose status is set. """
+        with StubEnrollmentApiServer() as server:
+            self.fulfill(server)
+
+        for line in self.order.lines.all():
+            self.assertEqual(line.history.latest().status, LINE.COMPLETE)
+
+
 class CouponFulfillmentModuleTest(FulfillmentTestMixin, TestCase):
     """ Test coupon fulfillment. """
 
@@ -0,0 +1,324 @@
+from __future__ import unicode_literals
+
+import datetime
+from StringIO import StringIO
+import threading
+import time
+
+import ddt
+from django.core.cache import cache
+from django.core.management import call_command, CommandError
+from django.test import override_settings
+from django.utils import timezone
+from django.utils.timezone import now
+import httpretty
+import mock
+from oscar.core.loading import get_model
+from oscar.test import factories
+from requests.exceptions import Timeout
+
+from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.extensions.fulfillment.refulfillment import (
+    claim_order, get_order_batches, get_refulfillable_orders, parse_datetime, refulfill_orders, release_order
+)
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+from ecommerce.extensions.fulfillment.tasks import RefulfillmentStatus, get_refulfillment
+from ecommerce.extensions.fulfillment import tasks
+from ecommerce.extensions.fulfillment.tests.mixins import FulfillmentTestMixin
+from ecommerce.tests.testcases import TestCase
+
+Order = get_model('order', 'Order')
+
+
+class RefulfillmentTestMixin(CourseCatalogTestMixin, FulfillmentTestMixin):
+    def setUp(self):
+        super(RefulfillmentTestMixin, self).setUp()
+        cache.clear()
+        self.course = Course.objects.create(id='edX/DemoX/Demo_Course', name='Demo Course')
+        self.seat = self.course.create_or_update_seat('verified', True, 100, self.partner)
+
+
+# Orders are re-fulfilled on the main thread, since other threads cannot read data created by a test.
+@ddt.ddt
+@override_settings(EDX_API_KEY='foo', REFULFILLMENT_CONCURRENCY=1)
+class RefulfillmentTests(RefulfillmentTestMixin, TestCase):
+    def test_parse_datetime(self):
+        """ Verify dates and times are parsed as UTC, unless they have a timezone. """
+        self.assertEqual(parse_datetime('2016-01-02'), datetime.datetime(2016, 1, 2, tzinfo=timezone.utc))
+        self.assertEqual(
+            parse_datetime('2016-01-02T03:04:05'),
+            datetime.datetime(2016, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            parse_datetime('2016-01-02T03:04:05+01:00'),
+            datetime.datetime(2016, 1, 2, 2, 4, 5, tzinfo=timezone.utc)
+        )
+        self.assertRaises(ValueError, parse_datetime, 'not-a-date')
+
+    def test_get_refulfillable_orders(self):
+        """ Verify orders are selected by status, date placed, product class, and course. """
+        failed = self.create_failed_order()
+        self.create_failed_order(status=ORDER.OPEN)
+        self.create_failed_order(status=ORDER.COMPLETE)
+        coupon = self.create_failed_order(product=factories.create_product(product_class='Coupon', price=10))
+
+        old = self.create_failed_order()
+        old.date_placed = now() - datetime.timedelta(days=7)
+        old.save()
+
+        other_course = Course.objects.create(id='a/b/c', name='Other')
+        other = self.create_failed_order(other_course.create_or_update_seat('verified', True, 100, self.partner))
+
+        def assert_orders(expected, **kwargs):
+            self.assertEqual(set(get_refulfillable_orders(**kwargs)), set(expected))
+
+        assert_orders([failed, coupon, old, other])
+        assert_orders([failed, coupon, old, other], statuses=[ORDER.FULFILLMENT_ERROR])
+        assert_orders([failed, coupon, other], start=now() - datetime.timedelta(days=1))
+        assert_orders([old], end=now() - datetime.timedelta(days=1))
+        assert_orders([failed, old, other], product_class='Seat')
+        assert_orders([coupon], product_class='Coupon')
+        assert_orders([other], course_id=other_course.id)
+
+    @ddt.data(ORDER.OPEN, ORDER.COMPLETE)
+    def test_get_refulfillable_orders_invalid_status(self, status):
+        """ Verify open orders, which may still be being fulfilled by checkout, and orders which cannot be fulfilled
+        cannot be selected. """
+        self.assertRaises(ValueError, get_refulfillable_orders, statuses=[status])
+
+    def test_get_order_batches(self):
+        """ Verify orders are read in batches, in order of ID, each with a single query. """
+        orders = [self.create_failed_order() for __ in range(5)]
+
+        with self.assertNumQueries(4):
+            batches = list(get_order_batches(Order.objects.all(), 2))
+        self.assertEqual(batches, [orders[:2], orders[2:4], orders[4:]])
+
+        self.assertEqual(list(get_order_batches(Order.objects.all(), 2, after=orders[2].id)), [orders[3:]])
+
+    def test_claim_order(self):
+        """ Verify an order may only be claimed by one process at a time, until its claim is released. """
+        order = self.create_failed_order()
+
+        self.assertTrue(claim_order(order))
+        self.assertFalse(claim_order(order))
+
+        release_order(order)
+        self.assertTrue(claim_order(order))
+
+    @httpretty.activate
+    def test_refulfill_orders(self):
+        """ Verify the orders are fulfilled, and progress is reported after each batch. """
+        self.mock_enrollment_api()
+        orders = [self.create_failed_order() for __ in range(3)]
+        progress_callback = mock.Mock()
+
+        self.assertEqual(
+            refulfill_orders(get_refulfillable_orders(), batch_size=2, progress_callback=progress_callback),
+            (3, 3, orders[-1].id)
+        )
+
+        self.assertEqual(
+            progress_callback.call_args_list,
+            [mock.call(2, 2, orders[1].id), mock.call(3, 3, orders[2].id)]
+        )
+        for order in orders:
+            order = Order.objects.get(id=order.id)
+            self.assertEqual(order.status, ORDER.COMPLETE)
+            self.assertEqual(order.lines.get().status, LINE.COMPLETE)
+
+    @httpretty.activate
+    def test_refulfill_orders_after(self):
+        """ Verify only orders after the checkpoint are fulfilled. """
+        self.mock_enrollment_api()
+        first, second = self.create_failed_order(), self.create_failed_order()
+
+        self.assertEqual(refulfill_orders(get_refulfillable_orders(), after=first.id), (1, 1, second.id))
+        self.assertEqual(Order.objects.get(id=first.id).status, ORDER.FULFILLMENT_ERROR)
+
+    @httpretty.activate
+    def test_refulfill_orders_claimed(self):
+        """ Verify orders being fulfilled by another process are skipped, and claims are released afterwards. """
+        self.mock_enrollment_api()
+        claimed, unclaimed = self.create_failed_order(), self.create_failed_order()
+        claim_order(claimed)
+
+        self.assertEqual(refulfill_orders(get_refulfillable_orders()), (1, 1, unclaimed.id))
+        self.assertEqual(Order.objects.get(id=claimed.id).status, ORDER.FULFILLMENT_ERROR)
+        self.assertTrue(claim_order(unclaimed))
+
+    def test_refulfill_orders_fulfilled_since_read(self):
+        """ Verify orders fulfilled by another process after their batch was read are skipped, and released. """
+        order = self.create_failed_order()
+
+        def fulfill_and_claim(claimed):
+            # Another process fulfills the order just before it is claimed.
+            Order.objects.filter(id=claimed.id).update(status=ORDER.COMPLETE)
+            return claim_order(claimed)
+
+        with mock.patch('ecommerce.extensions.fulfillment.refulfillment.claim_order', side_effect=fulfill_and_claim):
+            with mock.patch('ecommerce.extensions.fulfillment.refulfillment.refulfill_order') as mock_refulfill_order:
+                self.assertEqual(refulfill_orders(get_refulfillable_orders()), (0, 0, order.id))
+
+        self.assertFalse(mock_refulfill_order.called)
+        self.assertTrue(claim_order(order))
+
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=Timeout))
+    def test_refulfill_orders_failure(self):
+        """ Verify orders which fail again remain unfulfilled. """
+        order = self.create_failed_order()
+
+        self.assertEqual(refulfill_orders(get_refulfillable_orders()), (1, 0, order.id))
+
+        order = Order.objects.get(id=order.id)
+        self.assertEqual(order.status, ORDER.FULFILLMENT_ERROR)
+        self.assertEqual(order.lines.get().status, LINE.FULFILLMENT_TIMEOUT_ERROR)
+
+    def test_refulfill_orders_concurrency(self):
+        """ Verify orders are re-fulfilled concurrently, by no more than the given number at once. """
+        for __ in range(6):
+            self.create_failed_order()
+
+        lock = threading.Lock()
+        in_progress = [0]
+        max_in_progress = [0]
+
+        def refulfill_order(order):  # pylint: disable=unused-argument
+            with lock:
+                in_progress[0] += 1
+                max_in_progress[0] = max(max_in_progress[0], in_progress[0])
+            time.sleep(0.05)
+            with lock:
+                in_progress[0] -= 1
+            return True
+
+        closed = [0]
+
+        def close():
+            # Mock does not count calls made by concurrent threads reliably.
+            with lock:
+                closed[0] += 1
+
+        with mock.patch('ecommerce.extensions.fulfillment.refulfillment.refulfill_order', side_effect=refulfill_order):
+            with mock.patch('ecommerce.extensions.fulfillment.refulfillment.connection') as mock_connection:
+                mock_connection.close.side_effect = close
+                processed, fulfilled, __ = refulfill_orders(get_refulfillable_orders(), concurrency=2)
+
+        self.assertEqual((processed, fulfilled), (6, 6))
+        self.assertEqual(max_in_progress[0], 2)
+        # Each thread's database connection is closed.
+        self.assertEqual(closed[0], 6)
+
+    @override_settings(LMS_ENDPOINT_CONCURRENCY={'enrollment': 8}, ENROLLMENT_FULFILLMENT_CONCURRENCY=4)
+    def test_refulfill_orders_max_concurrency(self):
+        """ Verify no more orders are re-fulfilled at once than the Enrollment API's concurrency cap allows. """
+        self.create_failed_order()
+
+        with mock.patch('ecommerce.extensions.fulfillment.refulfillment._refulfill_batch',
+                        return_value=[True]) as mock_refulfill_batch:
+            refulfill_orders(get_refulfillable_orders(), concurrency=3)
+
+        self.assertEqual(mock_refulfill_batch.call_args[0][1], 2)
+
+    def test_refulfill_orders_unexpected_error(self):
+        """ Verify an order which cannot be re-fulfilled does not prevent others from being re-fulfilled. """
+        orders = [self.create_failed_order() for __ in range(2)]
+
+        with mock.patch('ecommerce.extensions.fulfillment.refulfillment.refulfill_order',
+                        side_effect=[Exception, True]):
+            self.assertEqual(refulfill_orders(get_refulfillable_orders()), (2, 1, orders[-1].id))
+
+
+@override_settings(EDX_API_KEY='foo', REFULFILLMENT_CONCURRENCY=1)
+class RefulfillOrdersTaskTests(RefulfillmentTestMixin, TestCase):
+    @httpretty.activate
+    def test_refulfill_orders(self):
+        """ Verify the task re-fulfills the selected orders, and records its progress. """
+        self.mock_enrollment_api()
+        first, second = self.create_failed_order(), self.create_failed_order()
+
+        tasks.refulfill_orders.delay('job', [ORDER.FULFILLMENT_ERROR], after=first.id)
+
+        self.assertEqual(get_refulfillment('job'), {
+            'status': RefulfillmentStatus.COMPLETE,
+            'total': 1,
+            'processed': 1,
+            'fulfilled': 1,
+            'checkpoint': second.id,
+            'developer_message': None,
+        })
+
+    def test_refulfill_orders_naive_datetimes(self):
+        """ Verify times without a timezone are taken to be UTC. """
+        with mock.patch.object(tasks.refulfillment, 'get_refulfillable_orders',
+                               return_value=Order.objects.none()) as mock_get_refulfillable_orders:
+            tasks.refulfill_orders.delay('job', [ORDER.FULFILLMENT_ERROR], start_datetime='2016-01-02T03:04:05',
+                                         end_datetime='2016-01-03')
+
+        self.assertEqual(mock_get_refulfillable_orders.call_args[1]['start'],
+                         datetime.datetime(2016, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+        self.assertEqual(mock_get_refulfillable_orders.call_args[1]['end'],
+                         datetime.datetime(2016, 1, 3, tzinfo=timezone.utc))
+
+    def test_refulfill_orders_failure(self):
+        """ Verify the failure of the task is recorded, along with its checkpoint. """
+        self.create_failed_order()
+
+        with mock.patch.object(tasks.refulfillment, 'refulfill_orders', side_effect=Exception('Boom!')):
+            tasks.refulfill_orders.delay('job', [ORDER.FULFILLMENT_ERROR], start_datetime=now().isoformat())
+
+        self.assertEqual(get_refulfillment('job'), {
+            'status': RefulfillmentStatus.FAILED,
+            'total': 0,
+            'processed': 0,
+            'fulfilled': 0,
+            'checkpoint': None,
+            'developer_message': 'Boom!',
+        })
+
+
+class RefulfillOrdersCommandTests(RefulfillmentTestMixin, TestCase):
+    command = 'refulfill_orders'
+
+    def setUp(self):
+        super(RefulfillOrdersCommandTests, self).setUp()
+        self.orders = [self.create_failed_order() for __ in range(3)]
+
+    def test_without_commit(self):
+        """ Verify the command does not re-fulfill orders, if the commit flag is not specified. """
+        out = StringIO()
+        call_command(self.command, after=self.orders[0].id, stderr=out)
+
+        self.assertEqual(get_refulfillable_orders().count(), 3)
+        expected = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                   'would have re-fulfilled [2] orders.'
+        self.assertEqual(out.getvalue().strip(), expected)
+
+    @override_settings(EDX_API_KEY='foo')
+    @httpretty.activate
+    def test_with_commit(self):
+        """ Verify the command, when called with the commit flag, re-fulfills orders and reports progress. """
+        self.mock_enrollment_api()
+        out = StringIO()
+        call_command(self.command, '--commit', '--product-class=Seat', '--batch-size=2', '--concurrency=1',
+                     '--start-date=2000-01-01', stderr=out)
+
+        self.assertEqual(get_refulfillable_orders().count(), 0)
+        lines = out.getvalue().strip().splitlines()
+        self.assertEqual(lines[0], 'Re-fulfilling [3] orders...')
+        self.assertTrue(lines[1].startswith('Re-fulfilled [2] of [3] orders, of which [2] were fulfilled, at ['))
+        self.assertTrue(lines[1].endswith('orders per second. Checkpoint: [{}].'.format(self.orders[1].id)))
+        self.assertTrue(lines[2].endswith('Checkpoint: [{}].'.format(self.orders[2].id)))
+        self.assertEqual(lines[3], 'Done. Re-fulfilled [3] orders, of which [3] were fulfilled.')
+
+    @override_settings(LMS_ENDPOINT_CONCURRENCY={'enrollment': 8}, ENROLLMENT_FULFILLMENT_CONCURRENCY=4)
+    def test_invalid_concurrency(self):
+        """ Verify the command fails if more orders would be re-fulfilled at once than the Enrollment API allows. """
+        with self.assertRaises(CommandError):
+            call_command(self.command, '--concurrency=3', stderr=StringIO())
+
+    def test_invalid_status(self):
+        """ Verify the command fails if orders which cannot be fulfilled are selected. """
+        with self.assertRaises(CommandError):
+            call_command(self.command, '--status={}'.format(ORDER.COMPLETE), stderr=StringIO())
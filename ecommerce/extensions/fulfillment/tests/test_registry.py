@@ -0,0 +1,83 @@
+from __future__ import unicode_literals
+
+from django.test import override_settings
+import mock
+from oscar.test import factories
+from oscar.test.newfactories import BasketFactory
+
+from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.extensions.fulfillment.modules import CouponFulfillmentModule, EnrollmentFulfillmentModule
+from ecommerce.extensions.fulfillment.registry import FulfillmentModuleRegistry, fulfillment_module_registry
+from ecommerce.extensions.fulfillment.tests.modules import FakeFulfillmentModule
+from ecommerce.tests.testcases import TestCase
+
+
+@override_settings(FULFILLMENT_MODULES=[
+    'ecommerce.extensions.fulfillment.modules.EnrollmentFulfillmentModule',
+    'ecommerce.extensions.fulfillment.modules.CouponFulfillmentModule',
+    'ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule',
+])
+class FulfillmentModuleRegistryTests(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(FulfillmentModuleRegistryTests, self).setUp()
+        self.registry = FulfillmentModuleRegistry()
+
+        basket = BasketFactory()
+        for course_id in ('edX/DemoX/Course_1', 'edX/DemoX/Course_2'):
+            course = Course.objects.create(id=course_id, name=course_id)
+            basket.add_product(course.create_or_update_seat('verified', True, 100, self.partner), 1)
+        basket.add_product(factories.create_product(product_class='Coupon', price=100), 1)
+        basket.add_product(factories.create_product(product_class='Widget', price=100), 1)
+        self.seat_line_1, self.seat_line_2, self.coupon_line, self.widget_line = \
+            factories.create_order(basket=basket).lines.order_by('id')
+
+    def test_modules(self):
+        """ Verify the declared modules are instantiated once, in the order in which they are declared. """
+        modules = self.registry.modules
+        self.assertEqual(
+            [module.__class__ for module in modules],
+            [EnrollmentFulfillmentModule, CouponFulfillmentModule, FakeFulfillmentModule]
+        )
+        self.assertIs(self.registry.modules, modules)
+
+    def test_modules_setting_changed(self):
+        """ Verify the modules are reloaded if the FULFILLMENT_MODULES setting is changed. """
+        self.assertEqual(len(fulfillment_module_registry.modules), 3)
+
+        with override_settings(FULFILLMENT_MODULES=[]):
+            self.assertEqual(fulfillment_module_registry.modules, [])
+
+    def test_get_modules_for_line(self):
+        """ Verify each module's support for a product class is determined once, from the first line of the class. """
+        enrollment_module, coupon_module, fake_module = self.registry.modules
+
+        with mock.patch.object(CouponFulfillmentModule, 'supports_line', return_value=False) as supports_line:
+            self.assertEqual(self.registry.get_modules_for_line(self.seat_line_1), [enrollment_module, fake_module])
+            self.assertEqual(self.registry.get_modules_for_line(self.seat_line_2), [enrollment_module, fake_module])
+            self.assertEqual(self.registry.get_modules_for_line(self.coupon_line), [fake_module])
+            self.assertEqual(supports_line.call_count, 2)
+
+    def test_group_lines(self):
+        """ Verify lines are assigned to the first module which supports them. """
+        enrollment_module, coupon_module, fake_module = self.registry.modules
+        lines = [self.seat_line_1, self.coupon_line, self.seat_line_2, self.widget_line]
+
+        self.assertEqual(self.registry.group_lines(lines), (
+            [
+                (enrollment_module, [self.seat_line_1, self.seat_line_2]),
+                (coupon_module, [self.coupon_line]),
+                (fake_module, [self.widget_line]),
+            ],
+            []
+        ))
+
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.modules.CouponFulfillmentModule'])
+    def test_group_lines_unsupported(self):
+        """ Verify lines which no module supports are returned separately. """
+        coupon_module = self.registry.modules[0]
+
+        self.assertEqual(
+            self.registry.group_lines([self.seat_line_1, self.coupon_line]),
+            ([(coupon_module, [self.coupon_line])], [self.seat_line_1])
+        )
@@ -0,0 +1,180 @@
+from __future__ import unicode_literals
+
+import datetime
+from StringIO import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils.timezone import now
+import httpretty
+import mock
+from oscar.core.loading import get_model
+from oscar.test import factories
+from oscar.test.newfactories import BasketFactory
+from requests.exceptions import Timeout
+
+from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.extensions.fulfillment.refulfillment import claim_order
+from ecommerce.extensions.fulfillment.retry import (
+    RETRY_SLOT_CACHE_KEY_TEMPLATE, get_retry_delay, get_retryable_lines, retry_fulfillment
+)
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+from ecommerce.extensions.fulfillment.tests.mixins import FulfillmentTestMixin
+from ecommerce.tests.testcases import TestCase
+
+Line = get_model('order', 'Line')
+
+
+@override_settings(EDX_API_KEY='foo', FULFILLMENT_RETRY_BASE_DELAY=60, FULFILLMENT_RETRY_MAX_DELAY=600)
+class RetryFulfillmentTests(CourseCatalogTestMixin, FulfillmentTestMixin, TestCase):
+    def setUp(self):
+        super(RetryFulfillmentTests, self).setUp()
+        cache.clear()
+        self.course = Course.objects.create(id='edX/DemoX/Demo_Course', name='Demo Course')
+        self.seat = self.course.create_or_update_seat('verified', True, 100, self.partner)
+        self.order = self.create_failed_order(line_status=LINE.FULFILLMENT_NETWORK_ERROR)
+
+    def test_get_retry_delay(self):
+        """ Verify the delay doubles with each retry, is jittered by up to half its length, and is capped. """
+        for attempts, delay in ((1, 60), (2, 120), (4, 480), (5, 600), (10, 600)):
+            with mock.patch('random.uniform', side_effect=lambda a, b: (a, b)):
+                self.assertEqual(get_retry_delay(attempts), (delay / 2.0, delay))
+
+    def test_get_retryable_lines(self):
+        """ Verify only due lines of orders which failed for transient reasons only are retried. """
+        timed_out = self.create_failed_order(line_status=LINE.FULFILLMENT_TIMEOUT_ERROR)
+        rejected = self.create_failed_order(line_status=LINE.FULFILLMENT_REJECTED_ERROR)
+        self.create_failed_order(line_status=LINE.FULFILLMENT_SERVER_ERROR)
+
+        not_due = self.create_failed_order(line_status=LINE.FULFILLMENT_NETWORK_ERROR)
+        not_due.lines.update(fulfillment_attempts=1, next_fulfillment_attempt=now() + datetime.timedelta(minutes=1))
+
+        exhausted = self.create_failed_order(line_status=LINE.FULFILLMENT_NETWORK_ERROR)
+        exhausted.lines.update(fulfillment_attempts=settings.FULFILLMENT_RETRY_MAX_ATTEMPTS)
+
+        due = self.create_failed_order(line_status=LINE.FULFILLMENT_NETWORK_ERROR)
+        due.lines.update(fulfillment_attempts=1, next_fulfillment_attempt=now() - datetime.timedelta(minutes=1))
+
+        # Orders which have other unfulfilled lines must be corrected by hand.
+        basket = BasketFactory()
+        basket.add_product(self.seat, 1)
+        basket.add_product(Course.objects.create(id='a/b/c', name='Other').create_or_update_seat(
+            'verified', True, 100, self.partner), 1)
+        mixed = factories.create_order(basket=basket, status=ORDER.FULFILLMENT_ERROR)
+        mixed_lines = list(mixed.lines.all())
+        Line.objects.filter(id=mixed_lines[0].id).update(status=LINE.FULFILLMENT_NETWORK_ERROR)
+        Line.objects.filter(id=mixed_lines[1].id).update(status=LINE.FULFILLMENT_CONFIGURATION_ERROR)
+
+        self.assertEqual(
+            set(get_retryable_lines().values_list('order_id', flat=True)),
+            {self.order.id, timed_out.id, rejected.id, due.id}
+        )
+
+    @httpretty.activate
+    def test_retry_fulfillment(self):
+        """ Verify orders are fulfilled, and the attempt is recorded on their lines. """
+        self.mock_enrollment_api()
+
+        self.assertEqual(retry_fulfillment(), (1, 1))
+
+        order = self.order.__class__.objects.get(id=self.order.id)
+        self.assertEqual(order.status, ORDER.COMPLETE)
+        line = order.lines.get()
+        self.assertEqual(line.status, LINE.COMPLETE)
+        self.assertEqual(line.fulfillment_attempts, 1)
+
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=Timeout))
+    def test_retry_fulfillment_failure(self):
+        """ Verify lines which fail again are retried after a delay. """
+        self.assertEqual(retry_fulfillment(), (1, 0))
+
+        line = self.order.lines.get()
+        self.assertEqual(line.status, LINE.FULFILLMENT_TIMEOUT_ERROR)
+        self.assertEqual(line.fulfillment_attempts, 1)
+        self.assertGreaterEqual(line.next_fulfillment_attempt, now() + datetime.timedelta(seconds=29))
+        self.assertLessEqual(line.next_fulfillment_attempt, now() + datetime.timedelta(seconds=60))
+
+        # The line is not retried again until it is due.
+        self.assertEqual(retry_fulfillment(), (0, 0))
+
+    def test_claimed_order(self):
+        """ Verify orders being fulfilled by another process are skipped. """
+        claim_order(self.order)
+
+        self.assertEqual(retry_fulfillment(), (0, 0))
+        self.assertEqual(self.order.lines.get().fulfillment_attempts, 0)
+
+    @override_settings(FULFILLMENT_RETRY_RATE_LIMIT=2)
+    @httpretty.activate
+    def test_rate_limit(self):
+        """ Verify no more than the configured number of orders are retried per minute, across runs. """
+        self.mock_enrollment_api()
+        for __ in range(2):
+            self.create_failed_order(line_status=LINE.FULFILLMENT_NETWORK_ERROR)
+
+        self.assertEqual(retry_fulfillment(), (2, 2))
+        self.assertEqual(retry_fulfillment(), (0, 0))
+        self.assertEqual(get_retryable_lines().count(), 1)
+
+    @httpretty.activate
+    def test_max_orders(self):
+        """ Verify no more than the given number of orders are retried by a run. """
+        self.mock_enrollment_api()
+        self.create_failed_order(line_status=LINE.FULFILLMENT_NETWORK_ERROR)
+
+        self.assertEqual(retry_fulfillment(max_orders=1), (1, 1))
+        self.assertEqual(self.order.lines.get().status, LINE.COMPLETE)
+
+    @override_settings(FULFILLMENT_RETRY_CONCURRENCY=2)
+    def test_concurrency(self):
+        """ Verify no more than the configured number of runs may be in progress at once. """
+        for slot in range(2):
+            cache.set(RETRY_SLOT_CACHE_KEY_TEMPLATE.format(slot=slot), True)
+
+        self.assertIsNone(retry_fulfillment())
+        self.assertEqual(self.order.lines.get().fulfillment_attempts, 0)
+
+        # Slots are released when runs finish.
+        cache.delete(RETRY_SLOT_CACHE_KEY_TEMPLATE.format(slot=1))
+        with mock.patch('requests.Session.post', mock.Mock(side_effect=Timeout)):
+            self.assertEqual(retry_fulfillment(), (1, 0))
+        self.assertIsNone(cache.get(RETRY_SLOT_CACHE_KEY_TEMPLATE.format(slot=1)))
+
+
+class RetryFulfillmentCommandTests(CourseCatalogTestMixin, TestCase):
+    command = 'retry_fulfillment'
+
+    def setUp(self):
+        super(RetryFulfillmentCommandTests, self).setUp()
+        cache.clear()
+        basket = BasketFactory()
+        course = Course.objects.create(id='edX/DemoX/Demo_Course', name='Demo Course')
+        basket.add_product(course.create_or_update_seat('verified', True, 100, self.partner), 1)
+        self.order = factories.create_order(basket=basket, status=ORDER.FULFILLMENT_ERROR)
+        self.order.lines.update(status=LINE.FULFILLMENT_TIMEOUT_ERROR)
+
+    def test_without_commit(self):
+        """ Verify the command does not retry fulfillment, if the commit flag is not specified. """
+        out = StringIO()
+        call_command(self.command, commit=False, stderr=out)
+
+        self.assertEqual(self.order.lines.get().fulfillment_attempts, 0)
+        expected = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                   'would have retried fulfillment of [1] orders.'
+        self.assertEqual(out.getvalue().strip(), expected)
+
+    @override_settings(EDX_API_KEY='foo')
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=Timeout))
+    def test_with_commit(self):
+        """ Verify the command, when called with the commit flag, retries fulfillment. """
+        out = StringIO()
+        call_command(self.command, commit=True, stderr=out)
+
+        self.assertEqual(self.order.lines.get().fulfillment_attempts, 1)
+        actual = out.getvalue().strip()
+        self.assertTrue(actual.startswith('Retrying fulfillment of up to [{}] orders...'.format(
+            settings.FULFILLMENT_RETRY_BATCH_SIZE)))
+        self.assertTrue(actual.endswith('Done. Retried [1] orders, of which [0] were fulfilled.'))
@@ -19,6 +19,19 @@ class Range(AbstractRange):
     def num_products(self):
         return len(self.all_products())
 
+    def first_stock_record(self):
+        """ Returns the first of the catalog's stock records, with its product, or None if there is none. """
+        if self.catalog:
+            return self.catalog.stock_records.select_related('product').order_by('id').first()
+        return None
+
+    def first_product(self):
+        """ Returns the first of the products returned by all_products(), without retrieving the others. """
+        stock_record = self.first_stock_record()
+        if stock_record:
+            return stock_record.product
+        return super(Range, self).all_products().first()
+
     def all_products(self):
         if self.catalog:
             catalog_products = [record.product for record in self.catalog.stock_records.all()]
@@ -49,3 +49,18 @@ class RangeTests(TestCase):
 
         self.assertIn(self.product, self.range_with_catalog.all_products())
         self.assertEqual(len(self.range_with_catalog.all_products()), 1)
+
+    def test_range_first_product(self):
+        """
+        first_product() should return the first product in range, or None if the range is empty
+        """
+        self.assertEqual(self.range.first_product(), self.product)
+        self.assertEqual(self.range_with_catalog.first_product(), self.product)
+        self.assertIsNone(factories.RangeFactory().first_product())
+
+    def test_range_first_stock_record(self):
+        """
+        first_stock_record() should return the first stock record in the range's catalog, or None if there is none
+        """
+        self.assertEqual(self.range_with_catalog.first_stock_record(), self.stock_record)
+        self.assertIsNone(self.range.first_stock_record())
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0009_auto_20150709_1205'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalline',
+            name='fulfillment_attempts',
+            field=models.PositiveIntegerField(default=0, help_text='Number of times fulfillment of this line has been retried.'),
+        ),
+        migrations.AddField(
+            model_name='historicalline',
+            name='next_fulfillment_attempt',
+            field=models.DateTimeField(help_text='Earliest date/time at which fulfillment of this line may next be retried.', null=True, blank=True),
+        ),
+        migrations.AddField(
+            model_name='line',
+            name='fulfillment_attempts',
+            field=models.PositiveIntegerField(default=0, help_text='Number of times fulfillment of this line has been retried.'),
+        ),
+        migrations.AddField(
+            model_name='line',
+            name='next_fulfillment_attempt',
+            field=models.DateTimeField(help_text='Earliest date/time at which fulfillment of this line may next be retried.', null=True, blank=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0010_line_fulfillment_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalline',
+            name='course_id',
+            field=models.CharField(help_text='ID of the course to which the product belongs, copied from the product when the order is placed.', max_length=255, null=True, db_index=True, blank=True),
+        ),
+        migrations.AddField(
+            model_name='line',
+            name='course_id',
+            field=models.CharField(help_text='ID of the course to which the product belongs, copied from the product when the order is placed.', max_length=255, null=True, db_index=True, blank=True),
+        ),
+    ]
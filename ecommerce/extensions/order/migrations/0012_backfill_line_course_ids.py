@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+def backfill_course_ids(apps, schema_editor):
+    """ Copies the course key of each product to the lines of existing orders for the product. """
+    Line = apps.get_model('order', 'Line')
+    ProductAttributeValue = apps.get_model('catalogue', 'ProductAttributeValue')
+
+    course_keys = ProductAttributeValue.objects.filter(attribute__code='course_key').values_list(
+        'product_id', 'value_text'
+    )
+
+    # Lines are updated with one query per product, rather than one per line.
+    for product_id, course_key in course_keys.iterator():
+        Line.objects.filter(product_id=product_id, course_id__isnull=True).update(course_id=course_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0016_backfill_catalog_fingerprints'),
+        ('order', '0011_line_course_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_course_ids, migrations.RunPython.noop),
+    ]
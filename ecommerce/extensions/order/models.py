@@ -21,6 +21,16 @@ class PaymentEvent(AbstractPaymentEvent):
 
 
 class Line(AbstractLine):
+    course_id = models.CharField(
+        max_length=255, null=True, blank=True, db_index=True,
+        help_text=_('ID of the course to which the product belongs, copied from the product when the order is placed.')
+    )
+    fulfillment_attempts = models.PositiveIntegerField(
+        default=0, help_text=_('Number of times fulfillment of this line has been retried.')
+    )
+    next_fulfillment_attempt = models.DateTimeField(
+        null=True, blank=True, help_text=_('Earliest date/time at which fulfillment of this line may next be retried.')
+    )
     history = HistoricalRecords()
 
 
@@ -6,11 +6,16 @@ errors explaining why fulfillment may fail.
 
 """
 
+from django.db.models import Sum
+from django.utils.translation import ugettext as _
 from oscar.apps.order import processing, exceptions
+from oscar.core.loading import get_model
 
 from ecommerce.extensions.fulfillment import api as fulfillment_api
 from ecommerce.extensions.fulfillment.status import LINE
 
+ShippingEventQuantity = get_model('order', 'ShippingEventQuantity')
+
 
 class EventHandler(processing.EventHandler):
     """ Handles Order Processing
@@ -20,6 +25,9 @@ class EventHandler(processing.EventHandler):
     """
 
     def handle_shipping_event(self, order, event_type, lines, line_quantities, **kwargs):
+        # The lines are read once, and the same instances are validated, fulfilled, and added to the event.
+        lines = list(lines)
+
         self.validate_shipping_event(order, event_type, lines, line_quantities, **kwargs)
 
         order = fulfillment_api.fulfill_order(order, lines)
@@ -28,32 +36,68 @@ class EventHandler(processing.EventHandler):
 
         return order
 
+    def validate_shipping_event(self, order, event_type, lines, line_quantities, **kwargs):
+        """
+        Raises InvalidShippingEvent if the given quantity of any line exceeds its quantity not yet involved in an
+        event of the given type.
+
+        This is equivalent to Line.is_shipping_event_permitted, but reads the quantities of all lines at once.
+        """
+        shipped_quantities = self._get_shipped_quantities(event_type, lines)
+
+        errors = []
+        for line, quantity in zip(lines, line_quantities):
+            if shipped_quantities.get(line.id, 0) + quantity > line.quantity:
+                msg = _("The selected quantity for line #%(line_id)s is too large") % {'line_id': line.id}
+                errors.append(msg)
+
+        if errors:
+            raise exceptions.InvalidShippingEvent(", ".join(errors))
+
     def create_shipping_event(self, order, event_type, lines, line_quantities, **kwargs):
         """
         Creates a ShippingEvent for the order.
 
         The ShippingEvent will only contain related LineQuantity objects for items that have been successfully
         fulfilled/shipped (e.g. status is Complete). If no items have been fulfilled, the value None will be returned.
+        The LineQuantity objects are created together.
         """
         reference = kwargs.get('reference', '')
-        event = order.shipping_events.create(event_type=event_type, notes=reference)
-        event_has_lines = False
-
-        try:
-            for line, quantity in zip(lines, line_quantities):
-                # The line should only be added to the ShippingEvent if the line is complete and was
-                # not previously shipped.
-                if line.status == LINE.COMPLETE and not line.has_shipping_event_occurred(event_type):
-                    event.line_quantities.create(line=line, quantity=quantity)
-                    event_has_lines = True
-        except exceptions.InvalidShippingEvent:  # pragma: no cover
-            # CCB: It is practically impossible to mock event.line_quantities.create() and force an error. If the
-            # implementation changes in the future, please remove the pragma and test this branch.
-            event.delete()
-            raise
-
-        if not event_has_lines:
-            event.delete()
+        shipped_quantities = self._get_shipped_quantities(event_type, lines)
+
+        line_quantities_to_ship = []
+        for line, quantity in zip(lines, line_quantities):
+            shipped_quantity = shipped_quantities.get(line.id, 0)
+
+            # The line should only be added to the ShippingEvent if the line is complete and was
+            # not previously shipped.
+            if line.status == LINE.COMPLETE and shipped_quantity != line.quantity:
+                # As when saving a single LineQuantity, the quantity defaults to that of the line, and may not
+                # exceed the quantity of the line which has not yet been shipped.
+                quantity = quantity or line.quantity
+                if shipped_quantity + quantity > line.quantity:
+                    raise exceptions.InvalidShippingEvent
+
+                line_quantities_to_ship.append((line, quantity))
+
+        if not line_quantities_to_ship:
             return None
 
+        event = order.shipping_events.create(event_type=event_type, notes=reference)
+        ShippingEventQuantity.objects.bulk_create([
+            ShippingEventQuantity(event=event, line=line, quantity=quantity)
+            for line, quantity in line_quantities_to_ship
+        ])
+
         return event
+
+    def _get_shipped_quantities(self, event_type, lines):
+        """ Returns a dict mapping the IDs of the given lines to their quantities involved in events of the given type.
+
+        Lines which have not been involved in such an event are omitted.
+        """
+        return dict(
+            ShippingEventQuantity.objects.filter(
+                event__event_type=event_type, line_id__in=[line.id for line in lines]
+            ).values_list('line_id').annotate(Sum('quantity'))
+        )
@@ -1,5 +1,7 @@
+from oscar.apps.order.exceptions import InvalidShippingEvent
 from oscar.core.loading import get_model
 from oscar.test import factories
+from oscar.test.newfactories import BasketFactory
 
 from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
 from ecommerce.extensions.fulfillment.status import LINE
@@ -8,6 +10,7 @@ from ecommerce.tests.testcases import TestCase
 
 ShippingEventType = get_model('order', 'ShippingEventType')
 ShippingEvent = get_model('order', 'ShippingEvent')
+ShippingEventQuantity = get_model('order', 'ShippingEventQuantity')
 
 
 class EventHandlerTests(TestCase):
@@ -87,3 +90,54 @@ class EventHandlerTests(TestCase):
         self.assertEqual(shipping_event.order.id, order.id)
         self.assertEqual(shipping_event.lines.count(), 1)
         self.assertEqual(shipping_event.lines.first().id, lines[1].id)
+
+    def create_order_with_lines(self, count, quantity=1):
+        basket = BasketFactory()
+        for __ in range(count):
+            basket.add_product(factories.create_product(price=10), quantity)
+
+        order = factories.create_order(basket=basket)
+        order.lines.update(status=LINE.COMPLETE)
+        return order, list(order.lines.all())
+
+    def test_create_shipping_event_bulk(self):
+        """ Verify the line quantities of an event are created together, regardless of the number of lines. """
+        order, lines = self.create_order_with_lines(5)
+
+        # One query reads the quantities already shipped, one creates the event, and one creates its line quantities.
+        with self.assertNumQueries(3):
+            event = EventHandler().create_shipping_event(order, self.shipping_event_type, lines, [1] * 5)
+
+        self.assertEqual(
+            set(event.line_quantities.values_list('line_id', 'quantity')),
+            {(line.id, 1) for line in lines}
+        )
+
+    def test_create_shipping_event_partially_shipped(self):
+        """ Verify the remaining quantity of partially-shipped lines may be shipped, and no more. """
+        order, lines = self.create_order_with_lines(1, quantity=2)
+        line = lines[0]
+
+        EventHandler().create_shipping_event(order, self.shipping_event_type, lines, [1])
+        self.assertRaises(
+            InvalidShippingEvent, EventHandler().create_shipping_event, order, self.shipping_event_type, lines, [2]
+        )
+        self.assertEqual(order.shipping_events.count(), 1)
+
+        EventHandler().create_shipping_event(order, self.shipping_event_type, lines, [1])
+        self.assertEqual(line.shipping_event_quantity(self.shipping_event_type), 2)
+
+        # Fully-shipped lines are not shipped again.
+        self.assertIsNone(EventHandler().create_shipping_event(order, self.shipping_event_type, lines, [1]))
+
+    def test_validate_shipping_event(self):
+        """ Verify shipping events are only permitted for quantities of lines which have not yet been shipped. """
+        order, lines = self.create_order_with_lines(2)
+        event = order.shipping_events.create(event_type=self.shipping_event_type)
+        ShippingEventQuantity.objects.create(event=event, line=lines[0], quantity=1)
+
+        with self.assertNumQueries(1):
+            EventHandler().validate_shipping_event(order, self.shipping_event_type, lines[1:], [1])
+
+        with self.assertRaisesRegexp(InvalidShippingEvent, 'line #{}'.format(lines[0].id)):
+            EventHandler().validate_shipping_event(order, self.shipping_event_type, lines, [1, 1])
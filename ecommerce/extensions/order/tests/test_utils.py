@@ -1,13 +1,18 @@
 """Test Order Utility classes """
 from django.test import override_settings
 from oscar.core.loading import get_class
+from oscar.test import factories
 from oscar.test.factories import create_basket as oscar_create_basket
 from oscar.test.newfactories import BasketFactory
 
-from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+from ecommerce.extensions.order.utils import set_line_statuses
 from ecommerce.tests.factories import SiteConfigurationFactory, PartnerFactory
 from ecommerce.tests.testcases import TestCase
 
+InvalidLineStatus = get_class('order.exceptions', 'InvalidLineStatus')
 NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
 OrderCreator = get_class('order.utils', 'OrderCreator')
 OrderNumberGenerator = get_class('order.utils', 'OrderNumberGenerator')
@@ -51,7 +56,7 @@ class OrderNumberGeneratorTests(TestCase):
         self.assertEqual(self.generator.basket_id('ACME-101001'), 1001)
 
 
-class OrderCreatorTests(TestCase):
+class OrderCreatorTests(CourseCatalogTestMixin, TestCase):
     order_creator = OrderCreator()
 
     def setUp(self):
@@ -97,3 +102,60 @@ class OrderCreatorTests(TestCase):
         # Ensure the order has the non-default site
         order = self.create_order_model(basket)
         self.assertEqual(order.site, site)
+
+    def test_create_line_models_course_id(self):
+        """ Verify the course key of each line's product, if any, is copied to the line. """
+        course = Course.objects.create(id='edX/DemoX/Demo_Course', name='Demo Course')
+        seat = course.create_or_update_seat('verified', True, 100, self.partner)
+        product = factories.create_product(price=10)
+
+        basket = BasketFactory()
+        basket.add_product(seat, 1)
+        basket.add_product(product, 1)
+        order = factories.create_order(basket=basket)
+
+        self.assertEqual(order.lines.get(product=seat).course_id, course.id)
+        self.assertIsNone(order.lines.get(product=product).course_id)
+
+
+class SetLineStatusesTests(TestCase):
+    def setUp(self):
+        super(SetLineStatusesTests, self).setUp()
+        basket = oscar_create_basket(empty=True)
+        for __ in range(3):
+            basket.add_product(factories.create_product(price=10), 1)
+        self.order = factories.create_order(basket=basket)
+        self.lines = list(self.order.lines.order_by('id'))
+        self.order.lines.update(status=LINE.OPEN)
+        for line in self.lines:
+            line.status = LINE.OPEN
+
+    def test_set_line_statuses(self):
+        """ Verify the statuses of the lines are saved, and a historical record is created for each line. """
+        statuses = [LINE.COMPLETE, LINE.FULFILLMENT_NETWORK_ERROR, LINE.COMPLETE]
+
+        # One update per distinct status, and one insert of all historical records, within a savepoint.
+        with self.assertNumQueries(5):
+            set_line_statuses(zip(self.lines, statuses))
+
+        self.assertEqual([line.status for line in self.lines], statuses)
+        self.assertEqual(list(self.order.lines.order_by('id').values_list('status', flat=True)), statuses)
+        for line, status in zip(self.lines, statuses):
+            history = line.history.latest()
+            self.assertEqual(history.status, status)
+            self.assertEqual(history.history_type, '~')
+
+    def test_set_line_statuses_invalid(self):
+        """ Verify no statuses are saved if any line cannot be moved to its new status. """
+        self.lines[1].status = LINE.COMPLETE
+        self.order.lines.filter(id=self.lines[1].id).update(status=LINE.COMPLETE)
+
+        with self.assertRaises(InvalidLineStatus):
+            set_line_statuses([(self.lines[0], LINE.COMPLETE), (self.lines[1], LINE.FULFILLMENT_NETWORK_ERROR)])
+
+        self.assertEqual(self.order.lines.get(id=self.lines[0].id).status, LINE.OPEN)
+
+    def test_set_line_statuses_unchanged(self):
+        """ Verify lines which already have their new status are not updated. """
+        with self.assertNumQueries(0):
+            set_line_statuses([(line, LINE.OPEN) for line in self.lines])
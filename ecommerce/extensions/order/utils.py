@@ -1,12 +1,20 @@
 """Order Utility Classes. """
 from __future__ import unicode_literals
+from collections import OrderedDict
 import logging
 
 from django.contrib.sites.models import Site
+from django.db import transaction
+from django.utils.timezone import now
 from oscar.apps.order.utils import OrderCreator as OscarOrderCreator
+from oscar.core.loading import get_class, get_model
+from simple_history.models import HistoricalRecords
 
 logger = logging.getLogger(__name__)
 
+InvalidLineStatus = get_class('order.exceptions', 'InvalidLineStatus')
+Line = get_model('order', 'Line')
+
 
 class OrderNumberGenerator(object):
     OFFSET = 100000
@@ -75,3 +83,78 @@ class OrderCreator(OscarOrderCreator):
         return super(OrderCreator, self).create_order_model(
             user, basket, shipping_address, shipping_method, shipping_charge, billing_address, total, order_number,
             status, **extra_order_fields)
+
+    def create_line_models(self, order, basket_line, extra_line_fields=None):
+        """
+        Create a line model.
+
+        This override copies the course key of the line's product, if it has one, to the line, so that the lines
+        (and orders) associated with a course can be found without reading the attributes of their products.
+        """
+        extra_line_fields = extra_line_fields or {}
+        if 'course_id' not in extra_line_fields:
+            extra_line_fields['course_id'] = getattr(basket_line.product.attr, 'course_key', None)
+
+        return super(OrderCreator, self).create_line_models(order, basket_line, extra_line_fields)
+
+
+def set_line_statuses(line_statuses):
+    """
+    Set the statuses of many order lines, with one update per distinct status.
+
+    This is equivalent to calling Line.set_status for each line, including the creation of a historical
+    record for each modified line, but does not save the lines one at a time.
+
+    Arguments:
+        line_statuses (list): (Line, status) pairs.
+
+    Raises:
+        InvalidLineStatus: If any line cannot be moved to its new status. No statuses are modified.
+    """
+    lines_by_status = OrderedDict()
+    for line, status in line_statuses:
+        if status == line.status:
+            continue
+        if status not in line.available_statuses():
+            raise InvalidLineStatus(
+                "'{new_status}' is not a valid status (current status: '{status}')".format(
+                    new_status=status, status=line.status
+                )
+            )
+        lines_by_status.setdefault(status, []).append(line)
+
+    if not lines_by_status:
+        return
+
+    history_date = now()
+    history_user = _get_history_user()
+    history = []
+
+    with transaction.atomic():
+        for status, lines in lines_by_status.items():
+            Line.objects.filter(id__in=[line.id for line in lines]).update(status=status)
+
+            for line in lines:
+                attrs = {field.attname: getattr(line, field.attname) for field in line._meta.fields}
+                attrs['status'] = status
+                history.append(Line.history.model(
+                    history_date=history_date, history_type='~', history_user=history_user, **attrs
+                ))
+
+        Line.history.bulk_create(history)
+
+    # The lines are only modified once their new statuses have been saved, so that callers may rely on them
+    # rather than reading the lines again.
+    for status, lines in lines_by_status.items():
+        for line in lines:
+            line.status = status
+
+
+def _get_history_user():
+    """ Returns the user making the current request, as recorded by django-simple-history's middleware. """
+    try:
+        user = HistoricalRecords.thread.request.user
+    except AttributeError:
+        return None
+
+    return user if user.is_authenticated() else None
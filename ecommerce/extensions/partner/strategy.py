@@ -1,7 +1,14 @@
+import threading
+import weakref
+
 from django.utils import timezone
 
 from oscar.apps.partner import availability, strategy
-from oscar.core.loading import get_model
+
+from ecommerce.extensions.catalogue.registry import product_class_registry
+
+# Strategies memoizing purchase info, per thread, so that their memos can be cleared when the catalogue changes.
+_purchase_info_caches = threading.local()
 
 
 class CourseSeatAvailabilityPolicyMixin(strategy.StockRequired):
@@ -14,8 +21,7 @@ class CourseSeatAvailabilityPolicyMixin(strategy.StockRequired):
 
     @property
     def seat_class(self):
-        ProductClass = get_model('catalogue', 'ProductClass')
-        return ProductClass.objects.get(slug='seat')
+        return product_class_registry.get(slug='seat')
 
     def availability_policy(self, product, stockrecord):
         """ A product is unavailable for non-admin users if the current date is
@@ -30,11 +36,74 @@ class CourseSeatAvailabilityPolicyMixin(strategy.StockRequired):
             return availability.Unavailable()
 
 
-class DefaultStrategy(strategy.UseFirstStockRecord, CourseSeatAvailabilityPolicyMixin,
+class PurchaseInfoCacheMixin(object):
+    """
+    Memoizes the purchase info computed for each product, for the lifetime of the strategy.
+
+    Strategies built for a request are shared by every caller handling that request (see Selector),
+    so availability and price are computed at most once per product, per user, per request. Memoized
+    purchase info is discarded whenever a product or stock record is saved, or deleted, on the same
+    thread (see `clear_purchase_info_caches`), so changes made while handling a request are seen by
+    the lookups which follow them.
+    """
+
+    def __init__(self, request=None):
+        super(PurchaseInfoCacheMixin, self).__init__(request)
+        self._purchase_info = {}
+
+        strategies = getattr(_purchase_info_caches, 'strategies', None)
+        if strategies is None:
+            strategies = _purchase_info_caches.strategies = weakref.WeakSet()
+        strategies.add(self)
+
+    def fetch_for_product(self, product, stockrecord=None):
+        if product.id is None:
+            return super(PurchaseInfoCacheMixin, self).fetch_for_product(product, stockrecord)
+
+        key = (product.id, stockrecord.id if stockrecord else None)
+        purchase_info = self._purchase_info.get(key)
+
+        if purchase_info is None:
+            purchase_info = super(PurchaseInfoCacheMixin, self).fetch_for_product(product, stockrecord)
+            self._purchase_info[key] = purchase_info
+
+        return purchase_info
+
+    def clear_purchase_info(self):
+        """ Discard the memoized purchase info. """
+        self._purchase_info.clear()
+
+
+def clear_purchase_info_caches():
+    """ Discard the purchase info memoized by every strategy created on the current thread. """
+    for strategy_instance in list(getattr(_purchase_info_caches, 'strategies', ())):
+        strategy_instance.clear_purchase_info()
+
+
+class DefaultStrategy(PurchaseInfoCacheMixin, strategy.UseFirstStockRecord, CourseSeatAvailabilityPolicyMixin,
                       strategy.NoTax, strategy.Structured):
     pass
 
 
 class Selector(object):
     def strategy(self, request=None, user=None, **kwargs):  # pylint: disable=unused-argument
-        return DefaultStrategy(request if hasattr(request, 'user') else None)
+        """
+        Return the strategy for the given request.
+
+        Strategies are stored on the request, keyed by the requesting user, so that the basket middleware, API
+        views and serializers handling the same request share a single strategy (and its cached purchase info).
+        """
+        if not hasattr(request, 'user'):
+            return DefaultStrategy()
+
+        # DRF requests wrap the HttpRequest seen by middleware. Store strategies on the latter.
+        http_request = getattr(request, '_request', request)
+        strategies = getattr(http_request, '_strategies', None)
+        if strategies is None:
+            strategies = http_request._strategies = {}  # pylint: disable=protected-access
+
+        user_id = getattr(request.user, 'id', None)
+        if user_id not in strategies:
+            strategies[user_id] = DefaultStrategy(request)
+
+        return strategies[user_id]
@@ -2,7 +2,8 @@ import datetime
 
 import ddt
 from django.test import RequestFactory
-from oscar.apps.partner import availability
+import mock
+from oscar.apps.partner import availability, strategy
 import pytz
 
 from ecommerce.courses.models import Course
@@ -65,9 +66,49 @@ class DefaultStrategyTests(CourseCatalogTestMixin, TestCase):
         actual = strategy.availability_policy(product, stock_record)
         self.assertIsInstance(actual, available)
 
+    def test_fetch_for_product_cached(self):
+        """ Verify purchase info is computed once per product for the lifetime of the strategy. """
+        with mock.patch.object(strategy.Structured, 'fetch_for_product', return_value='info') as mock_fetch:
+            self.assertEqual(self.strategy.fetch_for_product(self.honor_seat), 'info')
+            self.assertEqual(self.strategy.fetch_for_product(self.honor_seat), 'info')
+            self.assertEqual(mock_fetch.call_count, 1)
+
+            # Purchase info is not shared between strategies.
+            DefaultStrategy().fetch_for_product(self.honor_seat)
+            self.assertEqual(mock_fetch.call_count, 2)
+
+    def test_fetch_for_product_cleared_on_save(self):
+        """ Verify memoized purchase info is discarded when the product's stock record is changed. """
+        stock_record = self.honor_seat.stockrecords.get()
+        self.assertEqual(self.strategy.fetch_for_product(self.honor_seat, stock_record).price.excl_tax, 0)
+
+        stock_record.price_excl_tax = 10
+        stock_record.save()
+
+        self.assertEqual(self.strategy.fetch_for_product(self.honor_seat, stock_record).price.excl_tax, 10)
+
 
 class SelectorTests(TestCase):
     def test_strategy(self):
         """ Verify our own DefaultStrategy is returned. """
         actual = Selector().strategy()
         self.assertIsInstance(actual, DefaultStrategy)
+
+    def test_strategy_per_request(self):
+        """ Verify a single strategy is shared by all callers handling a request, on behalf of the same user. """
+        request = RequestFactory().get('/')
+        request.user = self.create_user()
+
+        actual = Selector().strategy(request=request, user=request.user)
+        self.assertIs(Selector().strategy(request=request), actual)
+        self.assertEqual(actual.user, request.user)
+
+        # Requests made on behalf of a different user (e.g., once authenticated by DRF) receive a new strategy.
+        request.user = self.create_user()
+        self.assertIsNot(Selector().strategy(request=request), actual)
+
+        # Strategies are not shared between requests, or without a request.
+        other_request = RequestFactory().get('/')
+        other_request.user = request.user
+        self.assertIsNot(Selector().strategy(request=other_request), Selector().strategy(request=request))
+        self.assertIsNot(Selector().strategy(), Selector().strategy())
@@ -12,6 +12,7 @@ from suds.sudsobject import asdict
 from suds.wsse import Security, UsernameToken
 
 from ecommerce.core.constants import ISO_8601_FORMAT
+from ecommerce.extensions.catalogue.registry import product_class_registry
 from ecommerce.extensions.order.constants import PaymentEventTypeName
 from ecommerce.extensions.payment.constants import CYBERSOURCE_CARD_TYPE_MAP
 from ecommerce.extensions.payment.exceptions import (InvalidSignatureError, InvalidCybersourceDecision,
@@ -125,7 +126,7 @@ class Cybersource(BasePaymentProcessor):
         class of 'seat'.  Return None if no such products were found.
         """
         try:
-            seat_class = ProductClass.objects.get(slug='seat')
+            seat_class = product_class_registry.get(slug='seat')
         except ProductClass.DoesNotExist:
             # this occurs in test configurations where the seat product class is not in use
             return None
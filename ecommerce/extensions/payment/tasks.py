@@ -0,0 +1,77 @@
+"""Payment tasks."""
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import cache
+from oscar.core.loading import get_class, get_model
+
+from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.payment.helpers import get_processor_class_by_name
+
+Basket = get_model('basket', 'Basket')
+logger = get_task_logger(__name__)
+Selector = get_class('partner.strategy', 'Selector')
+
+PAYMENT_DATA_CACHE_KEY_TEMPLATE = 'basket_payment_data.{basket_id}'
+
+
+class PaymentDataStatus(object):
+    """Statuses of asynchronously-generated payment data."""
+    PENDING = u'pending'
+    COMPLETE = u'complete'
+    FAILED = u'failed'
+
+
+def get_payment_data(basket_id):
+    """Retrieve the state of payment data being generated for the given basket.
+
+    Returns:
+        dict: Containing a status, and either payment data or a developer message. None if payment
+            data is not being generated for the basket.
+    """
+    return cache.get(PAYMENT_DATA_CACHE_KEY_TEMPLATE.format(basket_id=basket_id))
+
+
+def set_payment_data(basket_id, status, payment_data=None, developer_message=None):
+    """Record the state of payment data being generated for the given basket."""
+    cache.set(
+        PAYMENT_DATA_CACHE_KEY_TEMPLATE.format(basket_id=basket_id),
+        {
+            'status': status,
+            AC.KEYS.PAYMENT_DATA: payment_data,
+            'developer_message': developer_message,
+        },
+        settings.ASYNC_PAYMENT_DATA_TIMEOUT
+    )
+
+
+@shared_task(ignore_result=True)
+def generate_payment_data(basket_id, payment_processor_name):
+    """Generate the parameters needed to pay for a frozen basket.
+
+    The result is recorded in the cache, from which it can be retrieved with `get_payment_data`.
+    If the payment processor fails to generate parameters, the basket is thawed.
+
+    Arguments:
+        basket_id (int): ID of the basket being paid for.
+        payment_processor_name (str): Name of the payment processor with which payment will be made.
+    """
+    basket = Basket.objects.get(id=basket_id)
+    basket.strategy = Selector().strategy(user=basket.owner)
+    payment_processor = get_processor_class_by_name(payment_processor_name)()
+
+    try:
+        parameters = payment_processor.get_transaction_parameters(basket)
+    except Exception as ex:  # pylint: disable=broad-except
+        basket.thaw()
+        logger.exception('Failed to generate payment data for Basket [%d]. Basket has been thawed.', basket.id)
+        set_payment_data(basket.id, PaymentDataStatus.FAILED, developer_message=ex.message)
+        return
+
+    payment_page_url = parameters.pop('payment_page_url')
+    set_payment_data(basket.id, PaymentDataStatus.COMPLETE, payment_data={
+        AC.KEYS.PAYMENT_PROCESSOR_NAME: payment_processor.NAME,
+        AC.KEYS.PAYMENT_FORM_DATA: parameters,
+        AC.KEYS.PAYMENT_PAGE_URL: payment_page_url,
+    })
+    logger.info('Generated payment data for Basket [%d].', basket.id)
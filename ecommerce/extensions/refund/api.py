@@ -30,9 +30,7 @@ def find_orders_associated_with_course(user, course_id):
         return []
 
     # Find all complete orders associated with the course.
-    orders = user.orders.filter(status=ORDER.COMPLETE,
-                                lines__product__attribute_values__attribute__code='course_key',
-                                lines__product__attribute_values__value_text=course_id)
+    orders = user.orders.filter(status=ORDER.COMPLETE, lines__course_id=course_id)
 
     return list(orders)
 
@@ -52,9 +50,7 @@ def create_refunds(orders, course_id):
 
     for order in orders:
         # Find lines associated with the course and not refunded.
-        lines = order.lines.filter(refund_lines__id__isnull=True,
-                                   product__attribute_values__attribute__code='course_key',
-                                   product__attribute_values__value_text=course_id)
+        lines = order.lines.filter(refund_lines__id__isnull=True, course_id=course_id)
 
         refund = Refund.create_with_lines(order, lines)
         if refund is not None:
@@ -0,0 +1,63 @@
+"""
+Read-through cache of voucher code lookups.
+
+Coupon offer and redemption pages resolve a voucher code to its voucher, offer and the first product of
+the offer's range, along with the price of that product in the range's catalog. Resolving the product requires
+walking the offer's benefit, range, catalog and stock records, so the results of these lookups are cached in the
+same manner as SKU lookups. Lookups are
+invalidated whenever a voucher, offer, benefit, range or stock record changes.
+"""
+from __future__ import unicode_literals
+
+from collections import namedtuple
+
+from django.conf import settings
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.catalogue.cache import VersionedLookupCache
+
+Voucher = get_model('voucher', 'Voucher')
+
+VOUCHER_CODE_CACHE_KEY_PREFIX = 'voucher_code_lookup'
+VOUCHER_CODE_CACHE_VERSION_KEY = 'voucher_code_lookup_version'
+
+VoucherInfo = namedtuple(
+    'VoucherInfo',
+    ['code', 'voucher_id', 'offer_id', 'product_id', 'price', 'start_datetime', 'end_datetime']
+)
+
+
+class VoucherCodeCache(VersionedLookupCache):
+    """ Resolves voucher codes to VoucherInfo. """
+    key_prefix = VOUCHER_CODE_CACHE_KEY_PREFIX
+    version_key = VOUCHER_CODE_CACHE_VERSION_KEY
+
+    def _load(self, codes):
+        vouchers = Voucher.objects.filter(code__in=codes).prefetch_related('offers__benefit__range__catalog')
+
+        loaded = {}
+        for voucher in vouchers:
+            offers = voucher.offers.all()
+            offer = offers[0] if offers else None
+            product_range = offer.benefit.range if offer else None
+            # The price is that of the catalog's stock record, rather than any other stock record of the product.
+            stock_record = product_range.first_stock_record() if product_range else None
+            if stock_record:
+                product = stock_record.product
+            else:
+                product = product_range.first_product() if product_range else None
+
+            loaded[voucher.code] = VoucherInfo(
+                code=voucher.code,
+                voucher_id=voucher.id,
+                offer_id=offer.id if offer else None,
+                product_id=product.id if product else None,
+                price=stock_record.price_excl_tax if stock_record else None,
+                start_datetime=voucher.start_datetime,
+                end_datetime=voucher.end_datetime,
+            )
+
+        return loaded
+
+
+voucher_code_cache = VoucherCodeCache(settings.VOUCHER_CODE_CACHE_TIMEOUT, settings.VOUCHER_CODE_CACHE_SIZE)
@@ -0,0 +1,44 @@
+"""
+Management command that refills the voucher code pool.
+
+Vouchers claim their codes from the pool when they are created, generating codes themselves only if the pool
+runs out. This command should be run periodically (e.g., by cron) to keep the pool full.
+"""
+from __future__ import unicode_literals
+from django.conf import settings
+from django.core.management import BaseCommand
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.voucher.utils import refill_voucher_code_pool
+
+PooledVoucherCode = get_model('voucher', 'PooledVoucherCode')
+
+
+class Command(BaseCommand):
+    help = 'Add codes to the voucher code pool, until it contains the configured number of codes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size',
+                            action='store',
+                            dest='size',
+                            type=int,
+                            default=settings.VOUCHER_CODE_POOL_SIZE,
+                            help='Number of codes the pool should contain. Defaults to VOUCHER_CODE_POOL_SIZE.')
+        parser.add_argument('--commit',
+                            action='store_true',
+                            dest='commit',
+                            default=False,
+                            help='Actually add the codes.')
+
+    def handle(self, *args, **options):
+        size = options['size']
+
+        if options['commit']:
+            self.stderr.write('Refilling the voucher code pool to [{}] codes...'.format(size))
+            added = refill_voucher_code_pool(size)
+            self.stderr.write('Done. Added [{}] codes.'.format(added))
+        else:
+            count = max(size - PooledVoucherCode.objects.count(), 0)
+            msg = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                  'would have added [{}] codes to the voucher code pool.'.format(count)
+            self.stderr.write(msg)
@@ -0,0 +1,48 @@
+"""
+Management command that creates, or updates, the summaries of coupons.
+
+Coupon summaries are maintained when coupons are created or updated via the API. This command should be run
+to create summaries for coupons created before summaries were introduced, or to rebuild stale summaries.
+"""
+from __future__ import unicode_literals
+from django.core.management import BaseCommand
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.voucher.utils import update_coupon_summary
+
+Product = get_model('catalogue', 'Product')
+
+
+class Command(BaseCommand):
+    help = 'Create, or update, the summaries of coupons.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all',
+                            action='store_true',
+                            dest='all',
+                            default=False,
+                            help='Update the summaries of all coupons, rather than only those without a summary.')
+        parser.add_argument('--commit',
+                            action='store_true',
+                            dest='commit',
+                            default=False,
+                            help='Actually update the summaries.')
+
+    def handle(self, *args, **options):
+        coupons = Product.objects.filter(product_class__name='Coupon')
+        if not options['all']:
+            coupons = coupons.filter(coupon_summary__isnull=True)
+        count = coupons.count()
+
+        if options['commit']:
+            if count:
+                self.stderr.write('Updating the summaries of [{}] coupons...'.format(count))
+                for coupon in coupons.iterator():
+                    update_coupon_summary(coupon)
+                self.stderr.write('Done.')
+            else:
+                self.stderr.write('No coupon summaries to update.')
+        else:
+            msg = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                  'would have updated the summaries of [{}] coupons.'.format(count)
+            self.stderr.write(msg)
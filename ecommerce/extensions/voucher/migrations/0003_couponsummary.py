@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('catalogue', '0014_alter_couponvouchers_attribute'),
+        ('voucher', '0002_couponvouchers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CouponSummary',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('coupon_type', models.CharField(max_length=32)),
+                ('benefit_type', models.CharField(max_length=128, null=True, blank=True)),
+                ('benefit_value', models.DecimalField(null=True, max_digits=12, decimal_places=2, blank=True)),
+                ('voucher_count', models.PositiveIntegerField(default=0)),
+                ('last_edited', models.DateTimeField(null=True, blank=True)),
+                ('client', models.ForeignKey(related_name='+', blank=True, to=settings.AUTH_USER_MODEL, null=True)),
+                ('coupon', models.OneToOneField(related_name='coupon_summary', to='catalogue.Product')),
+                ('last_edited_by', models.ForeignKey(related_name='+', blank=True, to=settings.AUTH_USER_MODEL, null=True)),
+                ('seats', models.ManyToManyField(related_name='_couponsummary_seats_+', to='catalogue.Product', blank=True)),
+            ],
+        ),
+    ]
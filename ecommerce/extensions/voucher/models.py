@@ -1,4 +1,5 @@
 # noinspection PyUnresolvedReferences
+from django.conf import settings
 from django.db import models
 
 
@@ -6,5 +7,40 @@ class CouponVouchers(models.Model):
     coupon = models.ForeignKey('catalogue.Product', related_name='coupon_vouchers')
     vouchers = models.ManyToManyField('voucher.Voucher', blank=True, related_name='coupon_vouchers')
 
+
+class CouponSummary(models.Model):
+    """ Denormalized details of a coupon, maintained when the coupon is created or updated.
+
+    Deriving these details requires walking each coupon's vouchers, offers, ranges and catalogs, which
+    is too expensive to do for every coupon when listing coupons.
+    """
+    ENROLLMENT_CODE = 'Enrollment code'
+    DISCOUNT_CODE = 'Discount code'
+
+    coupon = models.OneToOneField('catalogue.Product', related_name='coupon_summary')
+    coupon_type = models.CharField(max_length=32)
+    benefit_type = models.CharField(max_length=128, null=True, blank=True)
+    benefit_value = models.DecimalField(decimal_places=2, max_digits=12, null=True, blank=True)
+    seats = models.ManyToManyField('catalogue.Product', blank=True, related_name='+')
+    client = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, related_name='+')
+    voucher_count = models.PositiveIntegerField(default=0)
+    last_edited_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, related_name='+')
+    last_edited = models.DateTimeField(null=True, blank=True)
+
+
+class PooledVoucherCode(models.Model):
+    """ A code which has been generated ahead of time, and is not yet used by any voucher.
+
+    Vouchers claim their codes from the pool, which is refilled in bulk by the refill_voucher_code_pool
+    management command, so that code generation is kept off the path of voucher creation. Codes are
+    stored in upper case, as voucher codes are, so that they can be compared exactly.
+    """
+    code = models.CharField(max_length=128, unique=True)
+
+    def save(self, *args, **kwargs):
+        self.code = self.code.upper()
+        super(PooledVoucherCode, self).save(*args, **kwargs)
+
+
 # noinspection PyUnresolvedReferences
 from oscar.apps.voucher.models import *  # noqa pylint: disable=wildcard-import,unused-wildcard-import,wrong-import-position
@@ -0,0 +1,54 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.voucher.cache import voucher_code_cache
+
+Benefit = get_model('offer', 'Benefit')
+Catalog = get_model('catalogue', 'Catalog')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+Range = get_model('offer', 'Range')
+StockRecord = get_model('partner', 'StockRecord')
+Voucher = get_model('voucher', 'Voucher')
+
+
+@receiver(post_delete, sender=Voucher, dispatch_uid='invalidate_voucher_code_cache_voucher_delete')
+@receiver(post_delete, sender=ConditionalOffer, dispatch_uid='invalidate_voucher_code_cache_offer_delete')
+@receiver(post_save, sender=Benefit, dispatch_uid='invalidate_voucher_code_cache_benefit_save')
+@receiver(post_delete, sender=Benefit, dispatch_uid='invalidate_voucher_code_cache_benefit_delete')
+@receiver(post_save, sender=Range, dispatch_uid='invalidate_voucher_code_cache_range_save')
+@receiver(post_delete, sender=Range, dispatch_uid='invalidate_voucher_code_cache_range_delete')
+@receiver(post_save, sender=StockRecord, dispatch_uid='invalidate_voucher_code_cache_stockrecord_save')
+@receiver(post_delete, sender=StockRecord, dispatch_uid='invalidate_voucher_code_cache_stockrecord_delete')
+@receiver(m2m_changed, sender=Voucher.offers.through, dispatch_uid='invalidate_voucher_code_cache_voucher_offers')
+@receiver(m2m_changed, sender=Catalog.stock_records.through,
+          dispatch_uid='invalidate_voucher_code_cache_catalog_stock_records')
+def invalidate_voucher_code_cache(*_args, **_kwargs):
+    """ Invalidate cached voucher code lookups whenever the data they are built from changes. """
+    voucher_code_cache.invalidate()
+
+
+@receiver(post_save, sender=Voucher, dispatch_uid='invalidate_voucher_code_cache_voucher_save')
+def invalidate_voucher_code_cache_on_voucher_save(instance, **_kwargs):
+    """ Invalidate cached voucher code lookups if the saved voucher's cached details have changed.
+
+    Vouchers are saved whenever they are used, which should not invalidate lookups of heavily-used codes.
+    Lookups are not invalidated if the code is not cached, since there is nothing to invalidate (e.g., when
+    vouchers are created).
+    """
+    info = voucher_code_cache.get_cached(instance.code)
+    if info is not None and (info.voucher_id, info.start_datetime, info.end_datetime) != (
+            instance.id, instance.start_datetime, instance.end_datetime):
+        voucher_code_cache.invalidate()
+
+
+@receiver(pre_save, sender=ConditionalOffer, dispatch_uid='invalidate_voucher_code_cache_offer_save')
+def invalidate_voucher_code_cache_on_offer_save(instance, **_kwargs):
+    """ Invalidate cached voucher code lookups if the benefit of the saved offer has changed.
+
+    Like vouchers, offers are saved whenever they are used.
+    """
+    if instance.pk:
+        benefit_id = ConditionalOffer.objects.filter(pk=instance.pk).values_list('benefit_id', flat=True).first()
+        if benefit_id != instance.benefit_id:
+            voucher_code_cache.invalidate()
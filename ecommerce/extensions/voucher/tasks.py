@@ -0,0 +1,168 @@
+"""Voucher tasks."""
+from decimal import Decimal
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+import dateutil.parser
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.voucher.utils import claim_pooled_codes, create_vouchers, update_coupon_summary
+
+Catalog = get_model('catalogue', 'Catalog')
+logger = get_task_logger(__name__)
+Product = get_model('catalogue', 'Product')
+
+VOUCHER_GENERATION_CACHE_KEY_TEMPLATE = 'voucher_generation.{coupon_id}'
+VOUCHER_GENERATION_TASK_CACHE_KEY_TEMPLATE = 'voucher_generation_task.{coupon_id}'
+VOUCHER_GENERATION_RETRY_CACHE_KEY_TEMPLATE = 'voucher_generation_retry.{coupon_id}'
+
+# Seconds after which a retry which was not completed (e.g., because the process making it was killed) lapses.
+VOUCHER_GENERATION_RETRY_TIMEOUT = 60
+
+
+class VoucherGenerationStatus(object):
+    """Statuses of vouchers being created by a background task."""
+    PENDING = u'pending'
+    IN_PROGRESS = u'in_progress'
+    COMPLETE = u'complete'
+    FAILED = u'failed'
+
+
+def get_voucher_generation(coupon_id):
+    """Retrieve the progress of vouchers being created for the given coupon.
+
+    Returns:
+        dict: Containing a status, the number of vouchers created and to be created, and a developer
+            message if creation failed. None if vouchers are not being created for the coupon.
+    """
+    return cache.get(VOUCHER_GENERATION_CACHE_KEY_TEMPLATE.format(coupon_id=coupon_id))
+
+
+def set_voucher_generation(coupon_id, status, quantity, created=0, developer_message=None):
+    """Record the progress of vouchers being created for the given coupon."""
+    cache.set(
+        VOUCHER_GENERATION_CACHE_KEY_TEMPLATE.format(coupon_id=coupon_id),
+        {
+            'status': status,
+            'quantity': quantity,
+            'created': created,
+            'developer_message': developer_message,
+        },
+        settings.VOUCHER_GENERATION_STATUS_TIMEOUT
+    )
+
+
+def start_voucher_generation(coupon_id, catalog_id, name, benefit_type, benefit_value, start_datetime, end_datetime,
+                             voucher_type, quantity):
+    """Send the task creating the vouchers of a coupon, which must have been committed.
+
+    The task's arguments are recorded alongside its progress, so that it can be retried, with
+    `retry_voucher_generation`, if it fails. Arguments are as for `generate_vouchers`.
+    """
+    args = (coupon_id, catalog_id, name, benefit_type, benefit_value, start_datetime, end_datetime, voucher_type,
+            quantity)
+    cache.set(
+        VOUCHER_GENERATION_TASK_CACHE_KEY_TEMPLATE.format(coupon_id=coupon_id),
+        args,
+        settings.VOUCHER_GENERATION_STATUS_TIMEOUT
+    )
+    set_voucher_generation(coupon_id, VoucherGenerationStatus.PENDING, quantity)
+    generate_vouchers.delay(*args)
+
+
+def retry_voucher_generation(coupon_id):
+    """Send the task creating the vouchers of the given coupon again, if it failed.
+
+    Failed tasks create no vouchers, so the task can be retried without creating duplicate vouchers.
+    Retries are made by one process at a time, so a task is never sent twice for the same failure.
+
+    Returns:
+        bool: True if the task was sent; False if it has not failed, is being retried by another process,
+            or its arguments are no longer known.
+    """
+    retry_key = VOUCHER_GENERATION_RETRY_CACHE_KEY_TEMPLATE.format(coupon_id=coupon_id)
+    if not cache.add(retry_key, True, VOUCHER_GENERATION_RETRY_TIMEOUT):
+        return False
+
+    try:
+        voucher_generation = get_voucher_generation(coupon_id)
+        args = cache.get(VOUCHER_GENERATION_TASK_CACHE_KEY_TEMPLATE.format(coupon_id=coupon_id))
+        if not voucher_generation or voucher_generation['status'] != VoucherGenerationStatus.FAILED or not args:
+            return False
+
+        logger.info('Retrying creation of [%d] vouchers for coupon [%d].', voucher_generation['quantity'], coupon_id)
+        start_voucher_generation(*args)
+        return True
+    finally:
+        cache.delete(retry_key)
+
+
+@shared_task(ignore_result=True)
+def generate_vouchers(coupon_id, catalog_id, name, benefit_type, benefit_value, start_datetime, end_datetime,
+                      voucher_type, quantity):
+    """Create the vouchers of a coupon.
+
+    Progress is recorded in the cache, from which it can be retrieved with `get_voucher_generation`.
+    Vouchers are created in a single transaction, so either all or none of them are created. Their codes are
+    claimed from the voucher code pool beforehand, so that the pool is not locked for the whole transaction.
+    The coupon's summary is updated once the task has finished, whether or not it succeeded.
+
+    Arguments:
+        coupon_id (int): ID of the coupon product the vouchers are created for.
+        catalog_id (int): ID of the catalog containing the products to which the vouchers apply.
+        name (str): Voucher name.
+        benefit_type (str): Type of benefit associated with the vouchers.
+        benefit_value (str): Value of benefit associated with the vouchers.
+        start_datetime (str): ISO 8601 formatted start date for the vouchers.
+        end_datetime (str): ISO 8601 formatted end date for the vouchers.
+        voucher_type (str): Type of voucher.
+        quantity (int): Number of vouchers to be created.
+    """
+    set_voucher_generation(coupon_id, VoucherGenerationStatus.IN_PROGRESS, quantity)
+
+    def record_progress(created):
+        set_voucher_generation(coupon_id, VoucherGenerationStatus.IN_PROGRESS, quantity, created=created)
+
+    try:
+        codes = claim_pooled_codes(quantity)
+
+        with transaction.atomic():
+            create_vouchers(
+                benefit_type=benefit_type,
+                benefit_value=Decimal(benefit_value),
+                catalog=Catalog.objects.get(id=catalog_id),
+                coupon=Product.objects.get(id=coupon_id),
+                end_datetime=dateutil.parser.parse(end_datetime),
+                name=name,
+                quantity=quantity,
+                start_datetime=dateutil.parser.parse(start_datetime),
+                voucher_type=voucher_type,
+                codes=codes,
+                progress_callback=record_progress
+            )
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.exception('Failed to create [%d] vouchers for coupon [%d].', quantity, coupon_id)
+        _update_coupon_summary(coupon_id)
+        set_voucher_generation(coupon_id, VoucherGenerationStatus.FAILED, quantity, developer_message=ex.message)
+        return
+
+    _update_coupon_summary(coupon_id)
+    set_voucher_generation(coupon_id, VoucherGenerationStatus.COMPLETE, quantity, created=quantity)
+    logger.info('Created [%d] vouchers for coupon [%d].', quantity, coupon_id)
+
+
+def _update_coupon_summary(coupon_id):
+    """Update the summary of the given coupon, if it exists, to reflect the vouchers created for it.
+
+    The vouchers have been committed, or rolled back, by now, so a failure to update the summary is logged
+    rather than recorded as a failure of the task, which would otherwise be retried.
+    """
+    try:
+        coupon = Product.objects.filter(id=coupon_id).first()
+        if coupon:
+            update_coupon_summary(coupon)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception('Failed to update the summary of coupon [%d].', coupon_id)
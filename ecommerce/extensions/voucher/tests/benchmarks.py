@@ -0,0 +1,100 @@
+"""
+Benchmark of create_vouchers for large coupon orders.
+
+This module is not collected by the test runner. Run it explicitly with:
+
+    $ ./manage.py test ecommerce.extensions.voucher.tests.benchmarks --nocapture
+"""
+from __future__ import print_function, unicode_literals
+import datetime
+from decimal import Decimal
+import timeit
+
+from django.conf import settings
+from django.db import transaction
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.voucher.utils import _generate_code_string, create_vouchers
+from ecommerce.tests.testcases import TestCase
+
+Benefit = get_model('offer', 'Benefit')
+Catalog = get_model('catalogue', 'Catalog')
+CouponVouchers = get_model('voucher', 'CouponVouchers')
+Voucher = get_model('voucher', 'Voucher')
+
+VOUCHER_COUNTS = (1000, 10000, 100000)
+
+# The previous implementation takes several minutes to create 100,000 vouchers, so is only timed up to this count.
+LEGACY_MAX_VOUCHER_COUNT = 10000
+
+
+def legacy_create_vouchers(coupon, offer, quantity):
+    """ The previous implementation of create_vouchers, which created vouchers one at a time. """
+    vouchers = []
+    for __ in range(quantity):
+        voucher_code = _generate_code_string(settings.VOUCHER_CODE_LENGTH)
+        while Voucher.objects.filter(code__iexact=voucher_code).exists():
+            voucher_code = _generate_code_string(settings.VOUCHER_CODE_LENGTH)
+
+        voucher = Voucher.objects.create(
+            name='Benchmark',
+            code=voucher_code,
+            usage=Voucher.SINGLE_USE,
+            start_datetime=datetime.date(2015, 1, 1),
+            end_datetime=datetime.date(2020, 1, 1)
+        )
+        voucher.offers.add(offer)
+
+        coupon_voucher, __ = CouponVouchers.objects.get_or_create(coupon=coupon)
+        coupon_voucher.vouchers.add(voucher)
+        vouchers.append(voucher)
+
+    return vouchers
+
+
+class CreateVouchersBenchmark(TestCase):
+    def setUp(self):
+        super(CreateVouchersBenchmark, self).setUp()
+        self.catalog = Catalog.objects.create(partner=self.partner)
+        self.coupon = factories.create_product(title='Benchmark coupon')
+        self.catalog.stock_records.add(factories.create_stockrecord(self.coupon))
+
+    def _create_vouchers(self, quantity):
+        return create_vouchers(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=Decimal('100.00'),
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2020, 1, 1),
+            name='Benchmark',
+            quantity=quantity,
+            start_datetime=datetime.date(2015, 1, 1),
+            voucher_type=Voucher.SINGLE_USE
+        )
+
+    def _time(self, create, quantity):
+        """ Returns the time, in seconds, taken by create to create the given number of vouchers. """
+        with transaction.atomic():
+            start = timeit.default_timer()
+            create(quantity)
+            elapsed = timeit.default_timer() - start
+
+            # Discard the vouchers, so that each measurement starts from the same state.
+            transaction.set_rollback(True)
+
+        return elapsed
+
+    def test_create_vouchers(self):
+        # Create the offer, so that it is not created by the first measurement.
+        offer = self._create_vouchers(1)[0].offers.get()
+
+        print('\n{:>10} {:>12} {:>12}'.format('vouchers', 'legacy (s)', 'current (s)'))
+        for count in VOUCHER_COUNTS:
+            if count <= LEGACY_MAX_VOUCHER_COUNT:
+                legacy = '{:>12.2f}'.format(self._time(lambda quantity: legacy_create_vouchers(
+                    self.coupon, offer, quantity), count))
+            else:
+                legacy = '{:>12}'.format('-')
+            current = self._time(self._create_vouchers, count)
+            print('{:>10} {} {:>12.2f}'.format(count, legacy, current))
@@ -0,0 +1,120 @@
+from __future__ import unicode_literals
+
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.utils.timezone import now
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.voucher.cache import VoucherCodeCache, VoucherInfo
+from ecommerce.tests.testcases import TestCase
+
+Catalog = get_model('catalogue', 'Catalog')
+Voucher = get_model('voucher', 'Voucher')
+
+
+class VoucherCodeCacheTests(TestCase):
+    def setUp(self):
+        super(VoucherCodeCacheTests, self).setUp()
+        self.addCleanup(cache.clear)
+
+        self.product = factories.ProductFactory(stockrecords__partner=self.partner, stockrecords__price_excl_tax=50)
+        self.catalog = Catalog.objects.create(name='Test catalog', partner=self.partner)
+        self.catalog.stock_records.add(self.product.stockrecords.get())
+        self.range = factories.RangeFactory(catalog=self.catalog)
+        self.benefit = factories.BenefitFactory(range=self.range)
+        self.offer = factories.ConditionalOfferFactory(benefit=self.benefit)
+        self.voucher = factories.VoucherFactory(
+            code='COUPONTEST',
+            start_datetime=now() - datetime.timedelta(days=1),
+            end_datetime=now() + datetime.timedelta(days=1)
+        )
+        self.voucher.offers.add(self.offer)
+        self.voucher_cache = VoucherCodeCache(60, 10)
+
+    def test_get(self):
+        """ Verify the code is resolved to its voucher, offer, and the first product of the offer's range. """
+        expected = VoucherInfo(
+            code='COUPONTEST',
+            voucher_id=self.voucher.id,
+            offer_id=self.offer.id,
+            product_id=self.product.id,
+            price=Decimal('50.00'),
+            start_datetime=self.voucher.start_datetime,
+            end_datetime=self.voucher.end_datetime,
+        )
+        self.assertEqual(self.voucher_cache.get('COUPONTEST'), expected)
+        self.assertIsNone(self.voucher_cache.get('INVALID'))
+
+    def test_catalog_price(self):
+        """ Verify the price is that of the product's stock record in the range's catalog. """
+        product = factories.ProductFactory(stockrecords__price_excl_tax=10)
+        stock_record = factories.create_stockrecord(product, price_excl_tax=Decimal('20.00'),
+                                                    partner_name=self.partner.name)
+        self.catalog.stock_records = [stock_record]
+
+        info = self.voucher_cache.get('COUPONTEST')
+        self.assertEqual(info.product_id, product.id)
+        self.assertEqual(info.price, Decimal('20.00'))
+
+    def test_read_through(self):
+        """ Verify lookups are served from the local cache, then the shared cache, before the database. """
+        self.voucher_cache.get('COUPONTEST')
+
+        with self.assertNumQueries(0):
+            self.voucher_cache.get('COUPONTEST')
+
+    def test_uncached_code_does_not_invalidate(self):
+        """ Verify saving a voucher whose code is not cached does not invalidate cached lookups. """
+        self.voucher_cache.get('COUPONTEST')
+
+        factories.VoucherFactory(code='OTHERCODE')
+
+        with self.assertNumQueries(0):
+            self.voucher_cache.get('COUPONTEST')
+        self.assertEqual(self.voucher_cache.stats(), {'local_hits': 1, 'shared_hits': 0, 'misses': 1})
+
+        # Simulate a lookup from another process
+        other = VoucherCodeCache(60, 10)
+        with self.assertNumQueries(0):
+            other.get('COUPONTEST')
+        self.assertEqual(other.stats(), {'local_hits': 0, 'shared_hits': 1, 'misses': 0})
+
+    def test_invalidation(self):
+        """ Verify changes to the voucher, its offers or their range invalidate cached lookups. """
+        self.voucher_cache.get('COUPONTEST')
+        end_datetime = now() + datetime.timedelta(days=10)
+        self.voucher.end_datetime = end_datetime
+        self.voucher.save()
+        self.assertEqual(self.voucher_cache.get('COUPONTEST').end_datetime, end_datetime)
+
+        other_product = factories.ProductFactory(stockrecords__partner=self.partner)
+        other_range = factories.RangeFactory(products=[other_product])
+        self.benefit.range = other_range
+        self.benefit.save()
+        self.assertEqual(self.voucher_cache.get('COUPONTEST').product_id, other_product.id)
+
+        self.voucher.offers.clear()
+        self.assertIsNone(self.voucher_cache.get('COUPONTEST').offer_id)
+
+    def test_usage_does_not_invalidate(self):
+        """ Verify recording the usage of a voucher and its offer does not invalidate cached lookups. """
+        self.voucher_cache.get('COUPONTEST')
+
+        self.voucher.num_basket_additions += 1
+        self.voucher.save()
+        self.offer.record_usage({'discount': Decimal('10.00'), 'freq': 1})
+
+        with self.assertNumQueries(0):
+            self.voucher_cache.get('COUPONTEST')
+
+    def test_uncached_code_does_not_invalidate(self):
+        """ Verify saving a voucher whose code is not cached does not invalidate cached lookups. """
+        self.voucher_cache.get('COUPONTEST')
+
+        factories.VoucherFactory(code='OTHERCODE')
+
+        with self.assertNumQueries(0):
+            self.voucher_cache.get('COUPONTEST')
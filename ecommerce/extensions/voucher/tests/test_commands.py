@@ -0,0 +1,92 @@
+from __future__ import unicode_literals
+from StringIO import StringIO
+
+from django.core.management import call_command
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.test.factories import create_coupon
+from ecommerce.extensions.voucher.utils import update_coupon_summary
+from ecommerce.tests.testcases import TestCase
+
+Catalog = get_model('catalogue', 'Catalog')
+CouponSummary = get_model('voucher', 'CouponSummary')
+PooledVoucherCode = get_model('voucher', 'PooledVoucherCode')
+
+
+class UpdateCouponSummariesCommandTests(TestCase):
+    command = 'update_coupon_summaries'
+
+    def setUp(self):
+        super(UpdateCouponSummariesCommandTests, self).setUp()
+        self.summarized_coupon = self._create_coupon('Summarized coupon')
+        update_coupon_summary(self.summarized_coupon)
+        self.coupons = [self._create_coupon('Coupon {}'.format(i)) for i in range(2)]
+
+    def _create_coupon(self, title):
+        catalog = Catalog.objects.create(name='Catalog for {}'.format(title), partner=self.partner)
+        return create_coupon(title=title, partner=self.partner, catalog=catalog)
+
+    def test_without_commit(self):
+        """ Verify the command does not create summaries, if the commit flag is not specified. """
+        out = StringIO()
+        call_command(self.command, commit=False, stderr=out)
+
+        self.assertEqual(CouponSummary.objects.count(), 1)
+        expected = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                   'would have updated the summaries of [{}] coupons.'.format(len(self.coupons))
+        self.assertEqual(out.getvalue().strip(), expected)
+
+    def test_with_commit(self):
+        """ Verify the command, when called with the commit flag, creates summaries for coupons without one. """
+        out = StringIO()
+        call_command(self.command, commit=True, stderr=out)
+
+        self.assertEqual(
+            set(CouponSummary.objects.values_list('coupon_id', flat=True)),
+            {coupon.id for coupon in self.coupons + [self.summarized_coupon]}
+        )
+        for summary in CouponSummary.objects.all():
+            self.assertEqual(summary.voucher_count, 5)
+
+        actual = out.getvalue().strip()
+        self.assertTrue(actual.startswith('Updating the summaries of [{}] coupons...'.format(len(self.coupons))))
+        self.assertTrue(actual.endswith('Done.'))
+
+    def test_with_all(self):
+        """ Verify the command, when called with the all flag, updates every coupon's summary. """
+        CouponSummary.objects.filter(coupon=self.summarized_coupon).update(voucher_count=0)
+
+        call_command(self.command, commit=True, all=True, stderr=StringIO())
+
+        self.assertEqual(CouponSummary.objects.count(), len(self.coupons) + 1)
+        self.assertEqual(CouponSummary.objects.get(coupon=self.summarized_coupon).voucher_count, 5)
+
+    def test_commit_without_coupons(self):
+        """ Verify the command does nothing if every coupon has a summary. """
+        call_command(self.command, commit=True, stderr=StringIO())
+
+        out = StringIO()
+        call_command(self.command, commit=True, stderr=out)
+        self.assertEqual(out.getvalue().strip(), 'No coupon summaries to update.')
+
+
+class RefillVoucherCodePoolCommandTests(TestCase):
+    command = 'refill_voucher_code_pool'
+
+    def test_without_commit(self):
+        """ Verify the command does not add codes, if the commit flag is not specified. """
+        out = StringIO()
+        call_command(self.command, size=3, commit=False, stderr=out)
+
+        self.assertFalse(PooledVoucherCode.objects.exists())
+        expected = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                   'would have added [3] codes to the voucher code pool.'
+        self.assertEqual(out.getvalue().strip(), expected)
+
+    def test_with_commit(self):
+        """ Verify the command, when called with the commit flag, fills the pool to the requested size. """
+        out = StringIO()
+        call_command(self.command, size=3, commit=True, stderr=out)
+
+        self.assertEqual(PooledVoucherCode.objects.count(), 3)
+        self.assertIn('Added [3] codes.', out.getvalue())
@@ -0,0 +1,163 @@
+from __future__ import unicode_literals
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+import mock
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.voucher.tasks import (generate_vouchers, get_voucher_generation, retry_voucher_generation,
+                                                set_voucher_generation, start_voucher_generation,
+                                                VoucherGenerationStatus, VOUCHER_GENERATION_RETRY_CACHE_KEY_TEMPLATE)
+from ecommerce.extensions.voucher import utils
+from ecommerce.extensions.voucher.utils import claim_pooled_codes
+from ecommerce.tests.testcases import TestCase, TransactionTestCase
+
+Benefit = get_model('offer', 'Benefit')
+Catalog = get_model('catalogue', 'Catalog')
+CouponSummary = get_model('voucher', 'CouponSummary')
+CouponVouchers = get_model('voucher', 'CouponVouchers')
+PooledVoucherCode = get_model('voucher', 'PooledVoucherCode')
+Voucher = get_model('voucher', 'Voucher')
+
+
+@override_settings(VOUCHER_GENERATION_BATCH_SIZE=2)
+class GenerateVouchersTests(TestCase):
+    """ Tests for the generate_vouchers task. """
+
+    def setUp(self):
+        super(GenerateVouchersTests, self).setUp()
+        cache.clear()
+        self.catalog = Catalog.objects.create(partner=self.partner)
+        self.coupon = factories.create_product(title='Test coupon')
+        self.catalog.stock_records.add(factories.create_stockrecord(self.coupon))
+
+    def _task_args(self, quantity, coupon_id=None):
+        return (
+            coupon_id or self.coupon.id, self.catalog.id, 'Test coupon', Benefit.PERCENTAGE, '100',
+            '2015-01-01T00:00:00', '2020-01-01T00:00:00', Voucher.SINGLE_USE, quantity
+        )
+
+    def _generate_vouchers(self, quantity, coupon_id=None):
+        generate_vouchers(*self._task_args(quantity, coupon_id=coupon_id))
+
+    def test_generate_vouchers(self):
+        """ Verify the task creates the coupon's vouchers, and records its progress. """
+        with mock.patch('ecommerce.extensions.voucher.tasks.set_voucher_generation',
+                        wraps=set_voucher_generation) as mock_set_voucher_generation:
+            self._generate_vouchers(5)
+
+        vouchers = CouponVouchers.objects.get(coupon=self.coupon).vouchers.all()
+        self.assertEqual(vouchers.count(), 5)
+        self.assertEqual(vouchers.first().end_datetime.year, 2020)
+        progress = [call[1].get('created', 0) for call in mock_set_voucher_generation.call_args_list]
+        self.assertEqual(progress, [0, 2, 4, 5, 5])
+        self.assertEqual(get_voucher_generation(self.coupon.id), {
+            'status': VoucherGenerationStatus.COMPLETE,
+            'quantity': 5,
+            'created': 5,
+            'developer_message': None,
+        })
+        self.assertEqual(CouponSummary.objects.get(coupon=self.coupon).voucher_count, 5)
+
+    def test_generate_vouchers_failure(self):
+        """ Verify no vouchers are created, the failure is recorded, and the summary updated, if the task fails. """
+        def create_vouchers(**kwargs):
+            # The vouchers are created, but the task fails before its transaction is committed.
+            utils.create_vouchers(**kwargs)
+            raise Exception('Boom')
+
+        with mock.patch('ecommerce.extensions.voucher.tasks.create_vouchers', side_effect=create_vouchers):
+            self._generate_vouchers(5)
+
+        self.assertFalse(Voucher.objects.exists())
+        voucher_generation = get_voucher_generation(self.coupon.id)
+        self.assertEqual(voucher_generation['status'], VoucherGenerationStatus.FAILED)
+        self.assertEqual(voucher_generation['developer_message'], 'Boom')
+        self.assertEqual(CouponSummary.objects.get(coupon=self.coupon).voucher_count, 0)
+
+    def test_generate_vouchers_summary_failure(self):
+        """ Verify the task succeeds, since its vouchers have been committed, if the summary cannot be updated. """
+        with mock.patch('ecommerce.extensions.voucher.tasks.update_coupon_summary', side_effect=Exception):
+            self._generate_vouchers(5)
+
+        self.assertEqual(Voucher.objects.count(), 5)
+        self.assertEqual(get_voucher_generation(self.coupon.id)['status'], VoucherGenerationStatus.COMPLETE)
+
+    def test_retry_voucher_generation(self):
+        """ Verify failed tasks are sent again, with the same arguments, and other tasks are not. """
+        with mock.patch('ecommerce.extensions.voucher.tasks.create_vouchers', side_effect=Exception('Boom')):
+            start_voucher_generation(*self._task_args(5))
+        self.assertEqual(get_voucher_generation(self.coupon.id)['status'], VoucherGenerationStatus.FAILED)
+
+        self.assertTrue(retry_voucher_generation(self.coupon.id))
+        self.assertEqual(get_voucher_generation(self.coupon.id)['status'], VoucherGenerationStatus.COMPLETE)
+        self.assertEqual(CouponVouchers.objects.get(coupon=self.coupon).vouchers.count(), 5)
+        self.assertEqual(CouponSummary.objects.get(coupon=self.coupon).voucher_count, 5)
+
+        # Tasks which have not failed are not retried.
+        self.assertFalse(retry_voucher_generation(self.coupon.id))
+        self.assertEqual(Voucher.objects.count(), 5)
+
+    def test_retry_voucher_generation_claimed(self):
+        """ Verify failed tasks being retried by another process are not sent again. """
+        set_voucher_generation(self.coupon.id, VoucherGenerationStatus.FAILED, 5)
+        cache.add(VOUCHER_GENERATION_RETRY_CACHE_KEY_TEMPLATE.format(coupon_id=self.coupon.id), True)
+
+        with mock.patch('ecommerce.extensions.voucher.tasks.generate_vouchers.delay') as mock_delay:
+            self.assertFalse(retry_voucher_generation(self.coupon.id))
+        self.assertFalse(mock_delay.called)
+
+    def test_retry_voucher_generation_unknown_arguments(self):
+        """ Verify failed tasks whose arguments are no longer known are not sent again. """
+        set_voucher_generation(self.coupon.id, VoucherGenerationStatus.FAILED, 5)
+
+        with mock.patch('ecommerce.extensions.voucher.tasks.generate_vouchers.delay') as mock_delay:
+            self.assertFalse(retry_voucher_generation(self.coupon.id))
+        self.assertFalse(mock_delay.called)
+
+    def test_generate_vouchers_missing_coupon(self):
+        """ Verify the failure is recorded if the coupon does not exist. """
+        coupon_id = self.coupon.id
+        self.coupon.delete()
+        self._generate_vouchers(5, coupon_id=coupon_id)
+
+        self.assertEqual(get_voucher_generation(coupon_id)['status'], VoucherGenerationStatus.FAILED)
+
+
+# Why TransactionTestCase? Claims must be committed, not made inside a transaction opened by the test.
+@override_settings(VOUCHER_GENERATION_BATCH_SIZE=2)
+class GenerateVouchersConcurrencyTests(TransactionTestCase):
+    """ Tests of codes claimed from the voucher code pool while the generate_vouchers task is running. """
+
+    def test_claim_during_generation(self):
+        """ Verify the task claims its codes before its transaction, and other claimants claim other codes. """
+        for code in ('aaaa', 'bbbb', 'cccc', 'dddd'):
+            PooledVoucherCode.objects.create(code=code)
+        catalog = Catalog.objects.create(partner=self.partner)
+        coupon = factories.create_product(title='Test coupon')
+
+        claimed_in_transaction = []
+        task_codes = []
+        other_codes = []
+
+        def claim(count):
+            claimed_in_transaction.append(connection.in_atomic_block)
+            return claim_pooled_codes(count)
+
+        def create_vouchers(codes, **kwargs):  # pylint: disable=unused-argument
+            task_codes.extend(codes)
+            # Another claimant, e.g. a coupon being created, claims codes while the task's transaction is open.
+            other_codes.extend(claim_pooled_codes(2))
+
+        with mock.patch('ecommerce.extensions.voucher.tasks.claim_pooled_codes', side_effect=claim):
+            with mock.patch('ecommerce.extensions.voucher.tasks.create_vouchers', side_effect=create_vouchers):
+                with mock.patch('ecommerce.extensions.voucher.tasks.update_coupon_summary'):
+                    generate_vouchers(coupon.id, catalog.id, 'Test coupon', Benefit.PERCENTAGE, '100',
+                                      '2015-01-01T00:00:00', '2020-01-01T00:00:00', Voucher.SINGLE_USE, 2)
+
+        self.assertEqual(claimed_in_transaction, [False])
+        self.assertEqual(task_codes, ['AAAA', 'BBBB'])
+        self.assertEqual(other_codes, ['CCCC', 'DDDD'])
+        self.assertEqual(get_voucher_generation(coupon.id)['status'], VoucherGenerationStatus.COMPLETE)
@@ -1,17 +1,25 @@
 import datetime
+from decimal import Decimal
 
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from oscar.core.loading import get_model
 from oscar.test import factories
+import mock
 
-from ecommerce.extensions.voucher.utils import create_vouchers, generate_coupon_report
+from ecommerce.extensions.voucher.utils import (
+    _generate_code_strings, claim_pooled_codes, create_vouchers, generate_coupon_report, get_coupon_type,
+    refill_voucher_code_pool, update_coupon_summary
+)
 from ecommerce.tests.testcases import TestCase
 
 Benefit = get_model('offer', 'Benefit')
 Catalog = get_model('catalogue', 'Catalog')
+CouponSummary = get_model('voucher', 'CouponSummary')
 CouponVouchers = get_model('voucher', 'CouponVouchers')
+PooledVoucherCode = get_model('voucher', 'PooledVoucherCode')
 Product = get_model('catalogue', 'Product')
 ProductClass = get_model('catalogue', 'ProductClass')
 StockRecord = get_model('partner', 'StockRecord')
@@ -72,6 +80,127 @@ class UtilTests(TestCase):
         self.assertEqual(voucher.start_datetime, datetime.date(2015, 10, 1))
         self.assertEqual(voucher.usage, Voucher.SINGLE_USE)
 
+    @override_settings(VOUCHER_GENERATION_BATCH_SIZE=5)
+    def test_create_vouchers_in_batches(self):
+        """
+        Test vouchers are created in batches, with a constant number of queries per batch
+        """
+        def create(quantity, progress_callback=None):
+            return create_vouchers(
+                benefit_type=Benefit.PERCENTAGE,
+                benefit_value=Decimal('100.00'),
+                catalog=self.catalog,
+                coupon=self.coupon,
+                end_datetime=datetime.date(2015, 10, 30),
+                name="Test voucher",
+                quantity=quantity,
+                start_datetime=datetime.date(2015, 10, 1),
+                voucher_type=Voucher.SINGLE_USE,
+                progress_callback=progress_callback
+            )
+
+        progress = []
+        vouchers = create(12, progress_callback=progress.append)
+
+        self.assertEqual(progress, [5, 10, 12])
+        self.assertEqual(len(vouchers), 12)
+        self.assertEqual(len(set(voucher.code for voucher in vouchers)), 12)
+
+        # The number of queries made for each batch should not depend on the size of the batch.
+        with override_settings(VOUCHER_GENERATION_BATCH_SIZE=1):
+            with CaptureQueriesContext(connection) as single_voucher_batches:
+                vouchers += create(3)
+        with override_settings(VOUCHER_GENERATION_BATCH_SIZE=50):
+            with self.assertNumQueries(len(single_voucher_batches)):
+                vouchers += create(3 * 50)
+
+        coupon_voucher = CouponVouchers.objects.get(coupon=self.coupon)
+        self.assertEqual(coupon_voucher.vouchers.count(), 165)
+        for voucher in vouchers:
+            self.assertEqual(len(voucher.code), settings.VOUCHER_CODE_LENGTH)
+            self.assertEqual(voucher.offers.get().benefit.value, 100)
+
+    def test_generate_code_strings(self):
+        """
+        Test that generated codes colliding with existing voucher codes are regenerated
+        """
+        Voucher.objects.create(code='AAAA', start_datetime=datetime.date(2015, 10, 1),
+                               end_datetime=datetime.date(2015, 10, 30))
+
+        with mock.patch('ecommerce.extensions.voucher.utils._generate_code_string',
+                        side_effect=['AAAA', 'BBBB', 'BBBB', 'CCCC']):
+            codes = _generate_code_strings(4, 2)
+
+        self.assertEqual(sorted(codes), ['BBBB', 'CCCC'])
+
+    def test_generate_code_strings_pooled(self):
+        """
+        Test that generated codes colliding with pooled codes are regenerated
+        """
+        PooledVoucherCode.objects.create(code='AAAA')
+
+        with mock.patch('ecommerce.extensions.voucher.utils._generate_code_string', side_effect=['AAAA', 'BBBB']):
+            codes = _generate_code_strings(4, 1)
+
+        self.assertEqual(codes, ['BBBB'])
+
+    @override_settings(VOUCHER_GENERATION_BATCH_SIZE=2)
+    def test_claim_pooled_codes(self):
+        """
+        Test that codes are removed from the pool when claimed, in batches, until the pool runs out
+        """
+        for code in ('aaaa', 'bbbb', 'cccc', 'dddd'):
+            PooledVoucherCode.objects.create(code=code)
+
+        self.assertEqual(claim_pooled_codes(3), ['AAAA', 'BBBB', 'CCCC'])
+        self.assertEqual(claim_pooled_codes(2), ['DDDD'])
+        self.assertEqual(claim_pooled_codes(2), [])
+        self.assertFalse(PooledVoucherCode.objects.exists())
+
+    def test_create_vouchers_from_pool(self):
+        """
+        Test that vouchers use the codes claimed from the pool, generating codes once the pool runs out
+        """
+        refill_voucher_code_pool(3)
+        pooled_codes = set(PooledVoucherCode.objects.values_list('code', flat=True))
+        claimed_codes = claim_pooled_codes(5)
+
+        with mock.patch('ecommerce.extensions.voucher.utils._generate_code_strings',
+                        wraps=_generate_code_strings) as mock_generate:
+            vouchers = create_vouchers(
+                benefit_type=Benefit.PERCENTAGE,
+                benefit_value=Decimal('100.00'),
+                catalog=self.catalog,
+                coupon=self.coupon,
+                end_datetime=datetime.date(2015, 10, 30),
+                name="Test voucher",
+                quantity=5,
+                start_datetime=datetime.date(2015, 10, 1),
+                voucher_type=Voucher.SINGLE_USE,
+                codes=claimed_codes
+            )
+
+        codes = set(voucher.code for voucher in vouchers)
+        self.assertEqual(len(codes), 5)
+        self.assertTrue(pooled_codes.issubset(codes))
+        self.assertFalse(PooledVoucherCode.objects.exists())
+        mock_generate.assert_called_once_with(settings.VOUCHER_CODE_LENGTH, 2)
+
+    @override_settings(VOUCHER_GENERATION_BATCH_SIZE=2)
+    def test_refill_voucher_code_pool(self):
+        """
+        Test that the pool is refilled to the requested size, discarding codes of the wrong length
+        """
+        PooledVoucherCode.objects.create(code='A' * settings.VOUCHER_CODE_LENGTH)
+        PooledVoucherCode.objects.create(code='B')
+
+        self.assertEqual(refill_voucher_code_pool(5), 4)
+        self.assertEqual(refill_voucher_code_pool(5), 0)
+
+        codes = PooledVoucherCode.objects.values_list('code', flat=True)
+        self.assertEqual(len(codes), 5)
+        self.assertTrue(all(len(code) == settings.VOUCHER_CODE_LENGTH for code in codes))
+
     @override_settings(VOUCHER_CODE_LENGTH=VOUCHER_CODE_LENGTH)
     def test_regenerate_voucher_code(self):
         """
@@ -190,6 +319,7 @@ class UtilTests(TestCase):
         coupon_vouchers = CouponVouchers.objects.filter(coupon=self.coupon)
 
         field_names, rows = generate_coupon_report(coupon_vouchers)
+        rows = list(rows)
 
         self.assertEqual(field_names, ['Name', 'Code', 'Discount', 'URL'])
         self.assertEqual(
@@ -209,3 +339,91 @@ class UtilTests(TestCase):
             enrollment_code_row['URL'],
             settings.ECOMMERCE_URL_ROOT + REDEMPTION_URL.format(enrollment_code_row['Code'])
         )
+
+    @override_settings(COUPON_REPORT_CHUNK_SIZE=2)
+    def test_generate_coupon_report_in_chunks(self):
+        """
+        Test coupon report rows are generated lazily, from chunks of vouchers
+        """
+        vouchers = create_vouchers(
+            benefit_type=Benefit.FIXED,
+            benefit_value=10.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2015, 10, 30),
+            name="Discount code",
+            quantity=5,
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.SINGLE_USE
+        )
+
+        with self.assertNumQueries(0):
+            __, rows = generate_coupon_report(CouponVouchers.objects.filter(coupon=self.coupon))
+
+        # The coupon vouchers and currency are retrieved once, followed by the vouchers, offers
+        # and benefits of each of the three chunks, and a query for the (empty) fourth chunk.
+        with self.assertNumQueries(12):
+            rows = list(rows)
+
+        self.assertEqual([row['Code'] for row in rows], [voucher.code for voucher in vouchers])
+        for row in rows:
+            self.assertEqual(row['Discount'], '10.00 USD')
+
+    def test_update_coupon_summary(self):
+        """ Verify the summary of a coupon reflects its vouchers, seats, client and history. """
+        create_vouchers(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=100.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2015, 10, 30),
+            name="Enrollment code",
+            quantity=3,
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.SINGLE_USE
+        )
+        client = self.create_user()
+
+        summary = update_coupon_summary(self.coupon, client=client)
+
+        self.assertEqual(summary.coupon, self.coupon)
+        self.assertEqual(summary.coupon_type, CouponSummary.ENROLLMENT_CODE)
+        self.assertEqual(summary.benefit_type, Benefit.PERCENTAGE)
+        self.assertEqual(summary.benefit_value, 100)
+        self.assertEqual(list(summary.seats.all()), [self.coupon])
+        self.assertEqual(summary.client, client)
+        self.assertEqual(summary.voucher_count, 3)
+        self.assertEqual(summary.last_edited, self.coupon.history.latest().history_date)
+
+        # Updating the summary again should not create another summary.
+        create_vouchers(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=100.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2015, 10, 30),
+            name="Enrollment code",
+            quantity=2,
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.SINGLE_USE
+        )
+        update_coupon_summary(self.coupon)
+
+        summary = CouponSummary.objects.get(coupon=self.coupon)
+        self.assertEqual(summary.voucher_count, 5)
+        self.assertIsNone(summary.client)
+
+    def test_update_coupon_summary_without_vouchers(self):
+        """ Verify a summary can be created for a coupon without vouchers. """
+        summary = update_coupon_summary(self.coupon)
+
+        self.assertEqual(summary.coupon_type, CouponSummary.DISCOUNT_CODE)
+        self.assertIsNone(summary.benefit_type)
+        self.assertEqual(summary.voucher_count, 0)
+        self.assertEqual(summary.seats.count(), 0)
+
+    def test_get_coupon_type(self):
+        """ Verify coupons whose vouchers provide a full discount are enrollment codes. """
+        self.assertEqual(get_coupon_type(Benefit(type=Benefit.PERCENTAGE, value=100)), CouponSummary.ENROLLMENT_CODE)
+        self.assertEqual(get_coupon_type(Benefit(type=Benefit.PERCENTAGE, value=20)), CouponSummary.DISCOUNT_CODE)
+        self.assertEqual(get_coupon_type(Benefit(type=Benefit.FIXED, value=100)), CouponSummary.DISCOUNT_CODE)
@@ -26,7 +26,9 @@ class CouponReportCSVViewTest(TestCase):
         response = CouponReportCSVView().get(request, coupon_id=coupon_id)
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.content.splitlines()), 6)
+        content = ''.join(response.streaming_content)
+        self.assertEqual(len(content.splitlines()), 6)
+        self.assertEqual(content.splitlines()[0], 'Name,Code,Discount,URL')
 
     def test_get_csv_report_for_specific_coupon(self):
         """
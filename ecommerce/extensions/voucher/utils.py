@@ -5,53 +5,83 @@ import logging
 import uuid
 
 from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Length
 from django.utils.translation import ugettext_lazy as _
 from oscar.core.loading import get_model
 
 logger = logging.getLogger(__name__)
 
+Basket = get_model('basket', 'Basket')
 Benefit = get_model('offer', 'Benefit')
 Condition = get_model('offer', 'Condition')
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
+CouponSummary = get_model('voucher', 'CouponSummary')
 CouponVouchers = get_model('voucher', 'CouponVouchers')
+PooledVoucherCode = get_model('voucher', 'PooledVoucherCode')
 Range = get_model('offer', 'Range')
 StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
+VoucherApplication = get_model('voucher', 'VoucherApplication')
 
 
 def generate_coupon_report(coupon_vouchers):
     """
     Generate coupon report data
 
+    Rows are generated lazily, so that reports for coupons with many vouchers
+    can be streamed without holding every row in memory.
+
     Args:
         coupon_vouchers (List[CouponVouchers]): List of coupon_vouchers the report should be generated for
 
     Returns:
         List[str]
-        List[dict]
+        Iterator[dict]
     """
 
     field_names = [_('Name'), _('Code'), _('Discount'), _('URL')]
-    rows = []
+    return field_names, _generate_coupon_report_rows(coupon_vouchers)
+
+
+def _generate_coupon_report_rows(coupon_vouchers):
+    """
+    Yield a coupon report row for each voucher of the given coupon_vouchers.
 
+    Vouchers are retrieved in chunks of settings.COUPON_REPORT_CHUNK_SIZE, ordered by ID, with
+    each chunk's offers and benefits retrieved alongside it.
+    """
     for coupon_voucher in coupon_vouchers:
-        for voucher in coupon_voucher.vouchers.all():
-            offer = voucher.offers.all().first()
-            currency = StockRecord.objects.get(product=coupon_voucher.coupon).price_currency
-            benefit_value = offer.benefit.value
-            if offer.benefit.type == Benefit.PERCENTAGE:
-                discount = _("{percentage} %").format(percentage=benefit_value)
-            else:
-                discount = _("{amount} {currency}").format(amount=benefit_value, currency=currency)
-            URL = '{}/coupons/redeem/?code={}'.format(settings.ECOMMERCE_URL_ROOT, voucher.code)
-            rows.append({
-                'Name': voucher.name,
-                'Code': voucher.code,
-                'Discount': discount,
-                'URL': URL
-            })
-
-    return field_names, rows
+        currency = StockRecord.objects.filter(
+            product_id=coupon_voucher.coupon_id
+        ).values_list('price_currency', flat=True).first()
+
+        last_voucher_id = 0
+        while True:
+            vouchers = list(
+                coupon_voucher.vouchers.filter(
+                    id__gt=last_voucher_id
+                ).order_by('id').prefetch_related('offers__benefit')[:settings.COUPON_REPORT_CHUNK_SIZE]
+            )
+            if not vouchers:
+                break
+
+            for voucher in vouchers:
+                # Index the offers, rather than calling first(), so that prefetched offers are used.
+                benefit = voucher.offers.all()[0].benefit
+                if benefit.type == Benefit.PERCENTAGE:
+                    discount = _("{percentage} %").format(percentage=benefit.value)
+                else:
+                    discount = _("{amount} {currency}").format(amount=benefit.value, currency=currency)
+                URL = '{}/coupons/redeem/?code={}'.format(settings.ECOMMERCE_URL_ROOT, voucher.code)
+                yield {
+                    'Name': voucher.name,
+                    'Code': voucher.code,
+                    'Discount': discount,
+                    'URL': URL
+                }
+
+            last_voucher_id = vouchers[-1].id
 
 
 def _get_or_create_offer(product_range, benefit_type, benefit_value):
@@ -110,46 +140,142 @@ def _generate_code_string(length):
 
     h = hashlib.sha256()
     h.update(uuid.uuid4().get_bytes())
-    voucher_code = base64.b32encode(h.digest())[0:length]
-    if Voucher.objects.filter(code__iexact=voucher_code).exists():
-        return _generate_code_string(length)
+    return base64.b32encode(h.digest())[0:length]
+
+
+def _generate_code_strings(length, count):
+    """
+    Create random voucher codes, of specified length, which are not used by existing vouchers.
+
+    Candidate codes are generated in batches, each of which is checked against existing
+    vouchers, and the voucher code pool, with a single query each. Codes colliding with
+    existing vouchers or pooled codes are regenerated.
+
+    Args:
+        length (int): Defines the length of randomly generated codes
+        count (int): Number of codes to create
+
+    Raises:
+        ValueError raised if length is less than one.
+
+    Returns:
+        List[str]
+    """
+    codes = set()
+    while len(codes) < count:
+        candidates = set(_generate_code_string(length) for __ in range(count - len(codes))) - codes
+        existing_codes = set(Voucher.objects.filter(code__in=candidates).values_list('code', flat=True))
+        existing_codes.update(PooledVoucherCode.objects.filter(code__in=candidates).values_list('code', flat=True))
+        codes |= candidates.difference(existing_codes)
+
+    return list(codes)
+
+
+def claim_pooled_codes(count):
+    """
+    Remove up to the specified number of codes from the voucher code pool.
 
-    return voucher_code
+    Codes are claimed in batches of settings.VOUCHER_GENERATION_BATCH_SIZE, each of which is
+    locked, and removed, in a short transaction of its own, so that concurrent callers cannot
+    claim the same codes. Callers should claim codes before starting the transaction in which
+    their vouchers are created; otherwise the locks are held until that transaction commits,
+    and every other caller waits for it. Codes which are claimed, but not used because that
+    transaction is rolled back, are discarded.
 
+    Args:
+        count (int): Number of codes to claim
 
-def _create_new_voucher(code, coupon, end_datetime, name, offer, start_datetime, voucher_type):
+    Returns:
+        List[str]: The claimed codes. Fewer codes than requested are returned if the pool
+                   does not contain enough codes.
     """
-    Creates a voucher.
+    codes = []
+    while len(codes) < count:
+        with transaction.atomic():
+            claimed = list(
+                PooledVoucherCode.objects.select_for_update().order_by('id').values_list('id', 'code')[
+                    :min(settings.VOUCHER_GENERATION_BATCH_SIZE, count - len(codes))
+                ]
+            )
+            PooledVoucherCode.objects.filter(id__in=[pooled_id for pooled_id, __ in claimed]).delete()
+
+        if not claimed:
+            break
+
+        codes += [code for __, code in claimed]
+
+    return codes
 
-    If randomly generated voucher code already exists, new code will be generated and reverified.
+
+def refill_voucher_code_pool(size):
+    """
+    Add codes to the voucher code pool, until it contains the specified number of codes.
+
+    Codes are generated, and inserted, in batches of settings.VOUCHER_GENERATION_BATCH_SIZE.
+    Pooled codes whose length is not settings.VOUCHER_CODE_LENGTH are discarded first.
 
     Args:
-        code (str): Code associated with vouchers. If not provided, one will be generated.
-        coupon (Product): Coupon product associated with voucher.
+        size (int): Number of codes the pool should contain
+
+    Returns:
+        int: Number of codes added to the pool.
+    """
+    length = settings.VOUCHER_CODE_LENGTH
+    PooledVoucherCode.objects.annotate(length=Length('code')).exclude(length=length).delete()
+
+    missing = size - PooledVoucherCode.objects.count()
+    added = 0
+    while added < missing:
+        codes = _generate_code_strings(length, min(settings.VOUCHER_GENERATION_BATCH_SIZE, missing - added))
+        PooledVoucherCode.objects.bulk_create([PooledVoucherCode(code=code) for code in codes])
+        added += len(codes)
+
+    return added
+
+
+def _create_new_vouchers(codes, coupon_voucher, end_datetime, name, offer, start_datetime, voucher_type):
+    """
+    Creates a voucher for each of the given codes.
+
+    Vouchers, and their associations with the offer and coupon, are inserted in bulk.
+
+    Args:
+        codes (List[str]): Codes of the vouchers to be created.
+        coupon_voucher (CouponVouchers): Coupon vouchers the vouchers are added to.
         end_datetime (datetime): Voucher end date.
         name (str): Voucher name.
-        offer (Offer): Offer associated with voucher.
+        offer (Offer): Offer associated with vouchers.
         start_datetime (datetime): Voucher start date.
         voucher_type (str): Voucher usage.
 
     Returns:
-        Voucher
+        List[Voucher]
     """
-    voucher_code = code or _generate_code_string(settings.VOUCHER_CODE_LENGTH)
-
-    voucher = Voucher.objects.create(
-        name=name,
-        code=voucher_code,
-        usage=voucher_type,
-        start_datetime=start_datetime,
-        end_datetime=end_datetime
-    )
-    voucher.offers.add(offer)
-
-    coupon_voucher, __ = CouponVouchers.objects.get_or_create(coupon=coupon)
-    coupon_voucher.vouchers.add(voucher)
+    # Voucher.save(), which is bypassed by bulk_create(), stores codes in upper case.
+    vouchers = [
+        Voucher(
+            name=name,
+            code=code.upper(),
+            usage=voucher_type,
+            start_datetime=start_datetime,
+            end_datetime=end_datetime
+        ) for code in codes
+    ]
+    Voucher.objects.bulk_create(vouchers)
+
+    # Primary keys are not set by bulk_create() on all databases, so they must be retrieved.
+    voucher_ids = dict(Voucher.objects.filter(code__in=[voucher.code for voucher in vouchers]).values_list('code', 'id'))
+    for voucher in vouchers:
+        voucher.id = voucher_ids[voucher.code]
+
+    Voucher.offers.through.objects.bulk_create([
+        Voucher.offers.through(voucher=voucher, conditionaloffer=offer) for voucher in vouchers
+    ])
+    CouponVouchers.vouchers.through.objects.bulk_create([
+        CouponVouchers.vouchers.through(couponvouchers=coupon_voucher, voucher=voucher) for voucher in vouchers
+    ])
 
-    return voucher
+    return vouchers
 
 
 def create_vouchers(
@@ -162,10 +288,17 @@ def create_vouchers(
         quantity,
         start_datetime,
         voucher_type,
-        code=None):
+        code=None,
+        codes=None,
+        progress_callback=None):
     """
     Create vouchers
 
+    Vouchers are created in batches of settings.VOUCHER_GENERATION_BATCH_SIZE, with
+    a constant number of queries per batch. Vouchers use the given codes, which callers
+    claim from the voucher code pool with claim_pooled_codes, and further codes are only
+    generated if too few codes are given.
+
     Args:
             benefit_type (str): Type of benefit associated with vouchers.
             benefit_value (Decimal): Value of benefit associated with vouchers.
@@ -178,6 +311,10 @@ def create_vouchers(
             start_datetime (datetime): Start date for voucher offer.
             voucher_type (str): Type of voucher.
             code (str): Code associated with vouchers. Defaults to None.
+            codes (List[str]): Codes claimed from the voucher code pool, used if code
+                               is not given. Defaults to None.
+            progress_callback (callable): Called with the number of vouchers created
+                                          so far, after each batch is created.
 
     Returns:
             List[Voucher]
@@ -198,16 +335,173 @@ def create_vouchers(
         benefit_type=benefit_type,
         benefit_value=benefit_value
     )
-    for __ in range(quantity):
-        voucher = _create_new_voucher(
-            coupon=coupon,
+    coupon_voucher, __ = CouponVouchers.objects.get_or_create(coupon=coupon)
+
+    pooled_codes = list(codes or [])
+    batch_size = settings.VOUCHER_GENERATION_BATCH_SIZE
+    for created in range(0, quantity, batch_size):
+        count = min(batch_size, quantity - created)
+        if code:
+            batch_codes = [code] * count
+        else:
+            batch_codes = pooled_codes[created:created + count]
+            if len(batch_codes) < count:
+                batch_codes += _generate_code_strings(settings.VOUCHER_CODE_LENGTH, count - len(batch_codes))
+
+        vouchers += _create_new_vouchers(
+            codes=batch_codes,
+            coupon_voucher=coupon_voucher,
             end_datetime=end_datetime,
+            name=name,
             offer=offer,
             start_datetime=start_datetime,
-            voucher_type=voucher_type,
-            code=code,
-            name=name
+            voucher_type=voucher_type
         )
-        vouchers.append(voucher)
+
+        if progress_callback:
+            progress_callback(len(vouchers))
 
     return vouchers
+
+
+def get_coupon_type(benefit):
+    """
+    Return the type of coupon whose vouchers provide the given benefit.
+
+    Args:
+        benefit (Benefit): Benefit provided by the coupon's vouchers.
+
+    Returns:
+        str
+    """
+    if benefit.type == Benefit.PERCENTAGE and benefit.value == 100:
+        return CouponSummary.ENROLLMENT_CODE
+    return CouponSummary.DISCOUNT_CODE
+
+
+def update_coupon_summary(coupon, client=None):
+    """
+    Create, or update, the summary of a coupon.
+
+    Args:
+        coupon (Product): Coupon product the summary should be updated for.
+        client (User): Client the coupon was sold to. If not provided, the client
+                       is looked up from the basket the coupon was purchased with.
+
+    Returns:
+        CouponSummary
+    """
+    coupon_vouchers = CouponVouchers.objects.filter(coupon=coupon).first()
+    vouchers = coupon_vouchers.vouchers.all() if coupon_vouchers else Voucher.objects.none()
+    voucher = vouchers.first()
+    offer = voucher.offers.select_related('benefit', 'condition__range').first() if voucher else None
+
+    if client is None:
+        basket = Basket.objects.filter(lines__product_id=coupon.id).select_related('owner').first()
+        client = basket.owner if basket else None
+
+    try:
+        history = coupon.history.select_related('history_user').latest()
+    except coupon.history.model.DoesNotExist:
+        history = None
+
+    summary, __ = CouponSummary.objects.update_or_create(
+        coupon=coupon,
+        defaults={
+            'coupon_type': get_coupon_type(offer.benefit) if offer else CouponSummary.DISCOUNT_CODE,
+            'benefit_type': offer.benefit.type if offer else None,
+            'benefit_value': offer.benefit.value if offer else None,
+            'client': client,
+            'voucher_count': vouchers.count(),
+            'last_edited_by': history.history_user if history else None,
+            'last_edited': history.history_date if history else None,
+        }
+    )
+
+    seat_ids = []
+    if offer and offer.condition.range and offer.condition.range.catalog_id:
+        seat_ids = StockRecord.objects.filter(
+            catalogs__id=offer.condition.range.catalog_id
+        ).values_list('product_id', flat=True)
+    summary.seats = seat_ids
+
+    return summary
+
+
+def validate_vouchers(codes, strategy):
+    """
+    Determine whether each of the given codes can be redeemed.
+
+    The checks made are those made when a code is redeemed: the code must exist and be active,
+    single-use vouchers must not have been used, and the first product of the voucher's offer
+    must be available to buy. Vouchers which may be used once per customer are not checked
+    against any particular customer.
+
+    Vouchers, their offers, and their usage are retrieved with a fixed number of queries for each
+    chunk of settings.VOUCHER_VALIDATION_CHUNK_SIZE codes. The product of each distinct range, and
+    the purchase information of each distinct product, are retrieved once.
+
+    Args:
+        codes (List[str]): Codes to validate.
+        strategy (Strategy): Strategy used to determine the availability of products.
+
+    Returns:
+        List[dict]: One result for each code, in the order given, containing the code, whether it is
+            valid, a message explaining why it is not, and the SKU of its product.
+    """
+    vouchers = {}
+    used_voucher_ids = set()
+    chunk_size = settings.VOUCHER_VALIDATION_CHUNK_SIZE
+    distinct_codes = list(set(codes))
+    for start in range(0, len(distinct_codes), chunk_size):
+        chunk = Voucher.objects.filter(
+            code__in=distinct_codes[start:start + chunk_size]
+        ).prefetch_related('offers__benefit__range')
+        vouchers.update((voucher.code, voucher) for voucher in chunk)
+
+        single_use_ids = [voucher.id for voucher in chunk if voucher.usage == Voucher.SINGLE_USE]
+        used_voucher_ids.update(
+            VoucherApplication.objects.filter(voucher_id__in=single_use_ids).values_list('voucher_id', flat=True)
+        )
+
+    products = {}
+    purchase_infos = {}
+    results = []
+    for code in codes:
+        result = {'code': code, 'is_valid': False, 'message': '', 'sku': None}
+        results.append(result)
+
+        voucher = vouchers.get(code)
+        if voucher is None:
+            result['message'] = _('Coupon does not exist')
+            continue
+
+        # Index the offers, rather than calling first(), so that prefetched offers are used.
+        offers = voucher.offers.all()
+        product_range = offers[0].benefit.range if offers else None
+        if product_range is None:
+            product = None
+        else:
+            if product_range.id not in products:
+                products[product_range.id] = product_range.first_product()
+            product = products[product_range.id]
+
+        if product is None:
+            result['message'] = _('Coupon is not associated with a product')
+            continue
+
+        if product.id not in purchase_infos:
+            purchase_infos[product.id] = strategy.fetch_for_product(product)
+        purchase_info = purchase_infos[product.id]
+        result['sku'] = purchase_info.stockrecord.partner_sku if purchase_info.stockrecord else None
+
+        if not voucher.is_active():
+            result['message'] = _('Coupon expired')
+        elif voucher.id in used_voucher_ids:
+            result['message'] = _('This coupon has already been used')
+        elif not purchase_info.availability.is_available_to_buy:
+            result['message'] = _('Product [{product}] not available for purchase.'.format(product=product))
+        else:
+            result['is_valid'] = True
+
+    return results
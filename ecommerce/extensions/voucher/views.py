@@ -1,6 +1,6 @@
 import csv
 
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.utils.text import slugify
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import View
@@ -14,12 +14,21 @@ CouponVouchers = get_model('voucher', 'CouponVouchers')
 Product = get_model('catalogue', 'Product')
 
 
+class Echo(object):
+    """File-like object which returns, rather than stores, the values written to it."""
+
+    def write(self, value):
+        return value
+
+
 class CouponReportCSVView(StaffOnlyMixin, View):
     """Generates coupon report and returns it in CSV format."""
 
     def get(self, request, coupon_id):  # pylint: disable=unused-argument
         """
         Generate coupon report for vouchers associated with the coupon.
+
+        The report is streamed, a row at a time, as it is generated.
         """
 
         coupon = Product.objects.get(id=coupon_id)
@@ -30,13 +39,14 @@ class CouponReportCSVView(StaffOnlyMixin, View):
 
         field_names, rows = generate_coupon_report(coupons_vouchers)
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
+        writer = csv.DictWriter(Echo(), fieldnames=field_names)
 
-        writer = csv.DictWriter(response, fieldnames=field_names)
-        writer.writeheader()
+        def generate_csv():
+            yield writer.writerow(dict(zip(field_names, field_names)))
+            for row in rows:
+                yield writer.writerow(row)
 
-        for row in rows:
-            writer.writerow(row)
+        response = StreamingHttpResponse(generate_csv(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
 
         return response
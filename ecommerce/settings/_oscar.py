@@ -58,13 +58,48 @@ OSCAR_LINE_STATUS_PIPELINE = {
         LINE.COMPLETE,
         LINE.FULFILLMENT_CONFIGURATION_ERROR,
         LINE.FULFILLMENT_NETWORK_ERROR,
+        LINE.FULFILLMENT_REJECTED_ERROR,
         LINE.FULFILLMENT_TIMEOUT_ERROR,
         LINE.FULFILLMENT_SERVER_ERROR,
     ),
-    LINE.FULFILLMENT_CONFIGURATION_ERROR: (LINE.COMPLETE,),
-    LINE.FULFILLMENT_NETWORK_ERROR: (LINE.COMPLETE,),
-    LINE.FULFILLMENT_TIMEOUT_ERROR: (LINE.COMPLETE,),
-    LINE.FULFILLMENT_SERVER_ERROR: (LINE.COMPLETE,),
+    # Lines whose fulfillment is retried may fail again, for a different reason.
+    LINE.FULFILLMENT_CONFIGURATION_ERROR: (
+        LINE.COMPLETE,
+        LINE.FULFILLMENT_NETWORK_ERROR,
+        LINE.FULFILLMENT_REJECTED_ERROR,
+        LINE.FULFILLMENT_TIMEOUT_ERROR,
+        LINE.FULFILLMENT_SERVER_ERROR,
+    ),
+    LINE.FULFILLMENT_NETWORK_ERROR: (
+        LINE.COMPLETE,
+        LINE.FULFILLMENT_CONFIGURATION_ERROR,
+        LINE.FULFILLMENT_REJECTED_ERROR,
+        LINE.FULFILLMENT_TIMEOUT_ERROR,
+        LINE.FULFILLMENT_SERVER_ERROR,
+    ),
+    # Calls to the Enrollment API which were rejected before being made (e.g., because the maximum number of
+    # concurrent calls were already in progress).
+    LINE.FULFILLMENT_REJECTED_ERROR: (
+        LINE.COMPLETE,
+        LINE.FULFILLMENT_CONFIGURATION_ERROR,
+        LINE.FULFILLMENT_NETWORK_ERROR,
+        LINE.FULFILLMENT_TIMEOUT_ERROR,
+        LINE.FULFILLMENT_SERVER_ERROR,
+    ),
+    LINE.FULFILLMENT_TIMEOUT_ERROR: (
+        LINE.COMPLETE,
+        LINE.FULFILLMENT_CONFIGURATION_ERROR,
+        LINE.FULFILLMENT_NETWORK_ERROR,
+        LINE.FULFILLMENT_REJECTED_ERROR,
+        LINE.FULFILLMENT_SERVER_ERROR,
+    ),
+    LINE.FULFILLMENT_SERVER_ERROR: (
+        LINE.COMPLETE,
+        LINE.FULFILLMENT_CONFIGURATION_ERROR,
+        LINE.FULFILLMENT_NETWORK_ERROR,
+        LINE.FULFILLMENT_REJECTED_ERROR,
+        LINE.FULFILLMENT_TIMEOUT_ERROR,
+    ),
     LINE.COMPLETE: (),
 }
 
@@ -250,7 +285,46 @@ OSCAR_DASHBOARD_NAVIGATION = [
 # Default timeout for Enrollment API calls
 ENROLLMENT_FULFILLMENT_TIMEOUT = 7
 
+# Maximum number of concurrent Enrollment API calls made when fulfilling the lines of a single order
+ENROLLMENT_FULFILLMENT_CONCURRENCY = 4
+
+# Number of times fulfillment of a line which failed due to a network problem or time out is retried
+FULFILLMENT_RETRY_MAX_ATTEMPTS = 10
+
+# Seconds before the first retry of a failed fulfillment. The delay doubles with each attempt, and is jittered.
+FULFILLMENT_RETRY_BASE_DELAY = 60
+
+# Maximum seconds between retries of a failed fulfillment
+FULFILLMENT_RETRY_MAX_DELAY = 60 * 60 * 6
+
+# Maximum number of fulfillment retry runs, across all servers, which may run at once
+FULFILLMENT_RETRY_CONCURRENCY = 1
+
+# Maximum number of orders, across all retry runs, whose fulfillment may be retried per minute
+FULFILLMENT_RETRY_RATE_LIMIT = 120
+
+# Maximum number of orders whose fulfillment is retried by a single retry run
+FULFILLMENT_RETRY_BATCH_SIZE = 1000
+
+# Number of orders read at once by bulk re-fulfillment (e.g., the refulfill_orders management command)
+REFULFILLMENT_BATCH_SIZE = 100
+
+# Maximum number of orders re-fulfilled at once by a single bulk re-fulfillment run
+REFULFILLMENT_CONCURRENCY = 4
+
 # Coupon code length
 VOUCHER_CODE_LENGTH = 16
 
+# Number of vouchers inserted per batch when creating vouchers for a coupon.
+VOUCHER_GENERATION_BATCH_SIZE = 500
+
+# Number of unused codes the refill_voucher_code_pool management command keeps in the voucher code pool.
+VOUCHER_CODE_POOL_SIZE = 100000
+
+# Coupons with more than this many vouchers have their vouchers created by a background task.
+VOUCHER_ASYNC_GENERATION_THRESHOLD = 1000
+
+# Number of vouchers retrieved per query when generating coupon reports.
+COUPON_REPORT_CHUNK_SIZE = 500
+
 THUMBNAIL_DEBUG = False
@@ -226,6 +226,35 @@ COMMERCE_API_URL = None
 PROVIDER_DATA_PROCESSING_TIMEOUT = 15  # Value is in seconds.
 CREDIT_PROVIDER_CACHE_TIMEOUT = 600
 
+# SKU lookups are cached in the default cache for this many seconds, and in a per-process LRU of this size.
+SKU_LOOKUP_CACHE_TIMEOUT = 60 * 60
+SKU_LOOKUP_CACHE_SIZE = 10000
+
+# Voucher code lookups are cached in the default cache for this many seconds, and in a per-process LRU of this size.
+VOUCHER_CODE_CACHE_TIMEOUT = 60 * 60
+VOUCHER_CODE_CACHE_SIZE = 10000
+
+# Course metadata retrieved from the LMS is considered fresh for this many seconds, and then served while it is
+# refreshed in the background for up to this many more seconds.
+COURSE_INFO_CACHE_TIMEOUT = 60 * 15
+COURSE_INFO_STALE_TIMEOUT = 60 * 60 * 24
+
+# Seconds to wait for the LMS course API to respond.
+COURSE_INFO_API_TIMEOUT = 5
+
+# Maximum number of concurrent calls, per process, to each LMS endpoint. Further calls fail immediately.
+LMS_ENDPOINT_CONCURRENCY = {
+    'commerce': 4,
+    'courses': 8,
+    'credit': 8,
+    'enrollment': 16,
+    'heartbeat': 2,
+}
+
+# Consecutive failed calls to an LMS endpoint after which calls to it fail immediately, for this many seconds.
+LMS_CIRCUIT_BREAKER_THRESHOLD = 5
+LMS_CIRCUIT_BREAKER_RESET_TIMEOUT = 30
+
 # OAuth2 provider URL used for OAuth2 transactions (e.g. validating access tokens)
 OAUTH2_PROVIDER_URL = None
 # END URL CONFIGURATION
@@ -405,6 +434,27 @@ REST_FRAMEWORK = {
         'user': '40/minute',
     },
 }
+
+# Responses to requests made with an Idempotency-Key header are stored for this many seconds.
+IDEMPOTENCY_KEY_TIMEOUT = 60 * 60 * 24
+
+# Seconds after which a key held by an in-flight request is released, should the request never complete.
+IDEMPOTENCY_KEY_LOCK_TIMEOUT = 60
+
+# Seconds a duplicate request will wait for the in-flight request to complete before receiving a 409.
+IDEMPOTENCY_KEY_WAIT = 5
+
+# Maximum number of baskets which may be created by a single request to the batch basket endpoint.
+BASKET_BATCH_MAX_SIZE = 1000
+
+# Number of baskets created by the batch basket endpoint in each database transaction.
+BASKET_BATCH_CHUNK_SIZE = 50
+
+# Maximum number of codes which may be checked by a single request to the voucher validation endpoint.
+VOUCHER_VALIDATION_MAX_SIZE = 5000
+
+# Number of codes whose vouchers are retrieved by each query made by the voucher validation endpoint.
+VOUCHER_VALIDATION_CHUNK_SIZE = 500
 # END DJANGO REST FRAMEWORK
 
 
@@ -432,6 +482,10 @@ BROKER_URL = None
 # See http://celery.readthedocs.org/en/latest/configuration.html#celery-imports.
 CELERY_IMPORTS = (
     'ecommerce_worker.fulfillment.v1.tasks',
+    'ecommerce.courses.tasks',
+    'ecommerce.extensions.fulfillment.tasks',
+    'ecommerce.extensions.payment.tasks',
+    'ecommerce.extensions.voucher.tasks',
 )
 
 CELERY_ROUTES = {'ecommerce_worker.fulfillment.v1.tasks.fulfill_order': {'queue': 'fulfillment'}}
@@ -443,6 +497,15 @@ CELERYD_HIJACK_ROOT_LOGGER = False
 # Execute tasks locally (synchronously) instead of sending them to the queue.
 # See http://celery.readthedocs.org/en/latest/configuration.html#celery-always-eager.
 CELERY_ALWAYS_EAGER = False
+
+# Seconds for which asynchronously-generated payment data is available to clients polling for it.
+ASYNC_PAYMENT_DATA_TIMEOUT = 60 * 60
+
+# Seconds for which the progress of vouchers created by a background task is available to clients polling for it.
+VOUCHER_GENERATION_STATUS_TIMEOUT = 60 * 60 * 24
+
+# Seconds for which the progress of orders re-fulfilled by a background task is available to clients polling for it.
+REFULFILLMENT_STATUS_TIMEOUT = 60 * 60 * 24 * 7
 # END CELERY
 
 
@@ -99,14 +99,25 @@ define([
                 }
             },
 
+            /**
+             * Coupons retrieved from the coupon list contain only the IDs of their seats, and the URL
+             * of their vouchers. Seat and voucher details are only set once a coupon is retrieved itself.
+             */
             updateSeatData: function () {
-                var seat_data = this.get('seats')[0];
+                var seat_data = _.first(this.get('seats'));
+                if (!_.isObject(seat_data)) {
+                    return;
+                }
                 this.set('seat_type', seat_data.attribute_values[0].value);
                 this.set('course_id', seat_data.attribute_values[1].value);
             },
 
             updateVoucherData: function () {
-                var voucher_data = this.get('vouchers')[0];
+                var vouchers = this.get('vouchers'),
+                    voucher_data = _.isArray(vouchers) ? _.first(vouchers) : null;
+                if (!voucher_data) {
+                    return;
+                }
                 this.set('start_date', voucher_data.start_datetime);
                 this.set('end_date', voucher_data.end_datetime);
             },
@@ -11,36 +11,15 @@ define([
                 results: [
                     {
                         id: 4,
-                        url: 'http://localhost:8002/api/v2/coupons/4/',
-                        structure: 'standalone',
-                        product_class: 'Coupon',
                         title: 'Coupon',
+                        coupon_type: 'Enrollment code',
+                        benefit: ['Percentage', '100.00'],
+                        last_edited: ['staff', '2015-12-09T00:00:00Z'],
+                        seats: [9],
+                        client: 'Client',
                         price: '100.00',
-                        expires: null,
-                        attribute_values: [
-                            {
-                                name: 'Coupon vouchers',
-                                value: [
-                                    {
-                                        id: 1,
-                                        name: 'Coupon',
-                                        code: 'P5KM74JY',
-                                        usage: 'Single use',
-                                        start_datetime: '2015-01-01T00:00:00Z',
-                                        end_datetime: '2020-01-01T00:00:00Z',
-                                        num_basket_additions: 1,
-                                        num_orders: 0,
-                                        total_discount: '0.00',
-                                        date_created: '2015-12-09',
-                                        offers: [
-                                            1
-                                        ]
-                                    }
-                                ]
-                            }
-                        ],
-                        is_available_to_buy: true,
-                        stockrecords: []
+                        voucher_count: 1,
+                        vouchers: 'http://localhost:8002/api/v2/coupons/4/vouchers/'
                     }
                 ]
             };
@@ -60,6 +39,18 @@ define([
                     expect(collection.fetch).toHaveBeenCalledWith({remove: false});
                 });
 
+                it('should update coupons already in the collection', function () {
+                    spyOn(collection, 'fetch').and.returnValue(null);
+                    response.next = null;
+
+                    collection.set(collection.parse(response));
+                    response.results[0].seats = [9, 10];
+                    collection.set(collection.parse(response), {remove: false});
+
+                    expect(collection.length).toEqual(1);
+                    expect(collection.get(4).get('seats')).toEqual([9, 10]);
+                });
+
             });
         });
     }
@@ -120,5 +120,29 @@ define([
                 });
             });
 
+            describe('seat and voucher data', function () {
+                it('should set the seat type, course ID and dates from the seats and vouchers', function () {
+                    var model = new Coupon({id: 4});
+                    model.set({
+                        seats: course.products,
+                        vouchers: [{start_datetime: '2015-01-01T00:00:00Z', end_datetime: '2016-01-01T00:00:00Z'}]
+                    });
+                    expect(model.get('seat_type')).toEqual('verified');
+                    expect(model.get('course_id')).toEqual('edX/DemoX/Demo_Course');
+                    expect(model.get('start_date')).toEqual('2015-01-01T00:00:00Z');
+                    expect(model.get('end_date')).toEqual('2016-01-01T00:00:00Z');
+                });
+
+                it('should ignore the seat IDs and voucher URL of coupons in the coupon list', function () {
+                    var model = new Coupon({id: 4});
+                    model.set({seats: [9], vouchers: 'http://localhost:8002/api/v2/coupons/4/vouchers/'});
+                    expect(model.get('seat_type')).toBeUndefined();
+                    expect(model.get('start_date')).toBeUndefined();
+
+                    model.set({seats: [], vouchers: []});
+                    expect(model.get('course_id')).toBeUndefined();
+                    expect(model.get('end_date')).toBeUndefined();
+                });
+            });
         });
 });
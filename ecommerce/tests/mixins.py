@@ -14,9 +14,12 @@ from oscar.core.loading import get_model, get_class
 from oscar.test import factories
 from social.apps.django_app.default.models import UserSocialAuth
 
+from ecommerce.core.lms import reset_lms_endpoints
 from ecommerce.courses.utils import mode_for_seat
 from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.catalogue.registry import category_registry, product_class_registry
 from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
+from ecommerce.extensions.voucher.cache import voucher_code_cache
 from ecommerce.tests.factories import SiteConfigurationFactory
 
 Basket = get_model('basket', 'Basket')
@@ -253,6 +256,19 @@ class SiteMixin(object):
         self.site = site_configuration.site
 
 
+class RegistryMixin(object):
+    def setUp(self):
+        super(RegistryMixin, self).setUp()
+
+        # Registries and lookup caches outlive the transaction in which each test runs, and may hold instances
+        # created by other tests. Likewise, LMS endpoints may hold connections to servers mocked by other tests, and
+        # circuit breakers tripped by them.
+        product_class_registry.clear()
+        category_registry.clear()
+        voucher_code_cache.invalidate()
+        reset_lms_endpoints()
+
+
 class TestServerUrlMixin(object):
     def get_full_url(self, path, site=None):
         """ Returns a complete URL with the given path. """
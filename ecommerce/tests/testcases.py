@@ -2,10 +2,10 @@ from django.test import (TestCase as DjangoTestCase,
                          LiveServerTestCase as DjangoLiveServerTestCase,
                          TransactionTestCase as DjangoTransactionTestCase)
 
-from ecommerce.tests.mixins import SiteMixin, UserMixin, TestServerUrlMixin
+from ecommerce.tests.mixins import RegistryMixin, SiteMixin, UserMixin, TestServerUrlMixin
 
 
-class TestCase(TestServerUrlMixin, UserMixin, SiteMixin, DjangoTestCase):
+class TestCase(TestServerUrlMixin, UserMixin, SiteMixin, RegistryMixin, DjangoTestCase):
     """
     Base test case for ecommerce tests.
 
@@ -14,7 +14,7 @@ class TestCase(TestServerUrlMixin, UserMixin, SiteMixin, DjangoTestCase):
     pass
 
 
-class LiveServerTestCase(TestServerUrlMixin, UserMixin, SiteMixin, DjangoLiveServerTestCase):
+class LiveServerTestCase(TestServerUrlMixin, UserMixin, SiteMixin, RegistryMixin, DjangoLiveServerTestCase):
     """
     Base test case for ecommerce tests.
 
@@ -23,7 +23,7 @@ class LiveServerTestCase(TestServerUrlMixin, UserMixin, SiteMixin, DjangoLiveSer
     pass
 
 
-class TransactionTestCase(TestServerUrlMixin, UserMixin, SiteMixin, DjangoTransactionTestCase):
+class TransactionTestCase(TestServerUrlMixin, UserMixin, SiteMixin, RegistryMixin, DjangoTransactionTestCase):
     """
     Base test case for ecommerce tests.
 
@@ -55,6 +55,7 @@ urlpatterns = [
     url(r'^credit/', include('ecommerce.credit.urls', namespace='credit')),
     url(r'^coupons/', include('ecommerce.coupons.urls', namespace='coupons')),
     url(r'^health/$', core_views.health, name='health'),
+    url(r'^health/lms/$', core_views.LmsEndpointStatsView.as_view(), name='lms_endpoint_stats'),
     url(r'^i18n/', include('django.conf.urls.i18n')),
     url(r'^jsi18n/$', 'django.views.i18n.javascript_catalog', js_info_dict),
     url('', include('social.apps.django_app.urls', namespace='social')),